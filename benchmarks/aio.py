@@ -0,0 +1,130 @@
+"""Benchmark da latência do event loop sob carga concorrente
+
+Um batimento agenda um `asyncio.sleep` a cada INTERVAL segundos e mede o
+atraso de cada acordada enquanto várias corrotinas criptografam mensagens
+com senha (pagando o Scrypt a cada chamada). Chamando core.encrypt dentro
+da corrotina, o atraso cresce com a carga; com encryptdef.aio ele deve se
+manter estável, porque o trabalho sai do event loop.
+
+Uso:
+    python -m benchmarks.aio --concurrency 1,8,64 --messages 64
+"""
+
+import argparse
+import asyncio
+import time
+from statistics import quantiles
+from typing import Any, Awaitable, Callable, Dict, List
+
+from encryptdef import aio
+from encryptdef.core import encrypt
+
+INTERVAL = 0.005
+PASSWORD = "benchmark"
+
+
+async def blocking_encrypt(message: str) -> str:
+    """Chama a função bloqueante direto no event loop, para comparação."""
+    return encrypt(message, PASSWORD)
+
+
+async def offloaded_encrypt(message: str) -> str:
+    """Usa a API assíncrona."""
+    return await aio.encrypt(message, PASSWORD)
+
+
+async def measure_lag(
+    func: Callable[[str], Awaitable[str]], concurrency: int, messages: int
+) -> Dict[str, Any]:
+    """
+    Mede o atraso do batimento enquanto `messages` mensagens são
+    criptografadas por `concurrency` corrotinas.
+
+    Args:
+        func (Callable[[str], Awaitable[str]]): Criptografia medida.
+        concurrency (int): Corrotinas criptografando ao mesmo tempo.
+        messages (int): Total de mensagens.
+
+    Returns:
+        Dict[str, Any]: Atrasos p50, p99 e máximo em milissegundos e a
+        vazão em mensagens por segundo.
+    """
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def heartbeat() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(INTERVAL)
+            lags.append(time.perf_counter() - start - INTERVAL)
+
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for index in range(messages):
+        queue.put_nowait(f"mensagem {index}")
+
+    async def worker() -> None:
+        while not queue.empty():
+            await func(queue.get_nowait())
+            # Dá a vez ao batimento entre as mensagens
+            await asyncio.sleep(0)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(INTERVAL * 2)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await beat
+
+    cuts = (
+        quantiles(lags, n=100, method="inclusive")
+        if len(lags) > 1
+        else lags * 99
+    )
+    return {
+        "p50_ms": cuts[49] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "max_ms": max(lags) * 1000,
+        "messages_per_s": messages / elapsed,
+    }
+
+
+def run(concurrency: List[int], messages: int) -> None:
+    """
+    Executa o benchmark e imprime o atraso do event loop de cada modo.
+
+    Args:
+        concurrency (List[int]): Quantidades de corrotinas a medir.
+        messages (int): Mensagens criptografadas em cada medição.
+    """
+    modes = {"bloqueante": blocking_encrypt, "aio": offloaded_encrypt}
+
+    print(
+        f"{'modo':<12}{'corrotinas':>11}{'p50 ms':>9}{'p99 ms':>9}"
+        f"{'máx ms':>9}{'msgs/s':>9}"
+    )
+    for name, func in modes.items():
+        for level in concurrency:
+            stats = asyncio.run(measure_lag(func, level, messages))
+            print(
+                f"{name:<12}{level:>11}{stats['p50_ms']:>9.2f}"
+                f"{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.2f}"
+                f"{stats['messages_per_s']:>9.1f}"
+            )
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(item) for item in value.split(",")],
+        default=[1, 8, 64],
+    )
+    parser.add_argument("--messages", type=int, default=64)
+    args = parser.parse_args()
+    run(args.concurrency, args.messages)
+
+
+if __name__ == "__main__":
+    main()
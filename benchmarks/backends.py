@@ -0,0 +1,75 @@
+"""Benchmark de escalabilidade por núcleo dos backends de execução
+
+Compara o backend de threads com o backend de processos criptografando as
+mesmas linhas com uma chave já derivada, variando o número de trabalhadores.
+
+Uso:
+    python -m benchmarks.backends --lines 200000 --workers 1,2,4,8
+"""
+
+import argparse
+import os
+import time
+from typing import List
+
+from encryptdef.api import encrypt_with_key
+from encryptdef.backends import BACKENDS
+from encryptdef.core import process_lines
+from encryptdef.kdf import derive_key
+
+
+def default_workers() -> List[int]:
+    """Potências de 2 até a quantidade de núcleos disponíveis."""
+    cpus = os.cpu_count() or 1
+    workers = [1]
+    while workers[-1] * 2 <= cpus:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != cpus:
+        workers.append(cpus)
+    return workers
+
+
+def run(lines_count: int, line_size: int, workers: List[int]) -> None:
+    """
+    Executa o benchmark e imprime linhas por segundo de cada combinação.
+
+    Args:
+        lines_count (int): Quantidade de linhas geradas.
+        line_size (int): Tamanho de cada linha em caracteres.
+        workers (List[int]): Quantidades de trabalhadores a medir.
+    """
+    key = derive_key("benchmark", b"0" * 16)
+    lines = [("x" * line_size) + "\n" for _ in range(lines_count)]
+    baseline = None
+
+    print(f"{'backend':<10}{'workers':>8}{'linhas/s':>14}{'speedup':>10}")
+    for backend in BACKENDS:
+        for max_workers in workers:
+            start = time.perf_counter()
+            process_lines(lines, key, encrypt_with_key, max_workers, backend)
+            rate = lines_count / (time.perf_counter() - start)
+
+            if baseline is None:
+                baseline = rate
+            print(
+                f"{backend:<10}{max_workers:>8}{rate:>14.0f}"
+                f"{rate / baseline:>9.2f}x"
+            )
+
+
+def main() -> None:
+    """Ponto de entrada do benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--line-size", type=int, default=80)
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(item) for item in value.split(",")],
+        default=default_workers(),
+    )
+    args = parser.parse_args()
+    run(args.lines, args.line_size, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark do custo de despacho das linhas no backend de threads
+
+Criptografa as mesmas linhas curtas, com uma chave já derivada, enviando
+uma linha por tarefa e em lotes adaptativos. Com a chave derivada uma vez
+por arquivo, criar um futuro e atualizar o progresso por linha pesa tanto
+quanto a criptografia; a diferença entre as duas colunas é esse custo.
+
+Uso:
+    python -m benchmarks.batching --lines 200000 --workers 1,4
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.backends import default_workers
+from encryptdef.api import encrypt_with_key, iter_process_lines
+from encryptdef.kdf import derive_key
+
+# Linhas por tarefa de cada modo; None adapta os lotes ao custo medido
+MODES: Dict[str, Optional[int]] = {"por-linha": 1, "adaptativo": None}
+
+
+def measure(
+    lines: List[str], key: bytes, max_workers: int, batch_size: Optional[int]
+) -> Dict[str, Any]:
+    """
+    Processa as linhas uma vez e mede a vazão e as chamadas de progresso.
+
+    Args:
+        lines (List[str]): Linhas a criptografar.
+        key (bytes): Chave já derivada.
+        max_workers (int): Quantidade de threads.
+        batch_size (Optional[int]): Linhas por tarefa, ou None.
+
+    Returns:
+        Dict[str, Any]: Linhas por segundo, microssegundos por linha e
+        chamadas de progresso.
+    """
+    updates: List[int] = []
+    start = time.perf_counter()
+    for _ in iter_process_lines(
+        lines,
+        key,
+        encrypt_with_key,
+        max_workers,
+        total=len(lines),
+        on_progress=updates.append,
+        batch_size=batch_size,
+    ):
+        pass
+    elapsed = time.perf_counter() - start
+
+    return {
+        "lines_per_s": len(lines) / elapsed,
+        "us_per_line": elapsed / len(lines) * 1e6,
+        "progress_calls": len(updates),
+    }
+
+
+def run(
+    lines_count: int, line_size: int, workers: List[int]
+) -> List[Dict[str, Any]]:
+    """
+    Executa o benchmark e imprime a vazão de cada modo.
+
+    Args:
+        lines_count (int): Quantidade de linhas geradas.
+        line_size (int): Tamanho de cada linha em caracteres.
+        workers (List[int]): Quantidades de threads a medir.
+
+    Returns:
+        List[Dict[str, Any]]: Uma medida por modo e quantidade de threads.
+    """
+    key = derive_key("benchmark", b"0" * 16)
+    lines = [("x" * line_size) + "\n" for _ in range(lines_count)]
+    results = []
+
+    print(
+        f"{'modo':<12}{'workers':>8}{'linhas/s':>12}{'us/linha':>10}"
+        f"{'progresso':>11}{'speedup':>9}"
+    )
+    for max_workers in workers:
+        baseline = None
+        for mode, batch_size in MODES.items():
+            entry = measure(lines, key, max_workers, batch_size)
+            entry.update(mode=mode, workers=max_workers)
+            results.append(entry)
+
+            if baseline is None:
+                baseline = entry["lines_per_s"]
+            print(
+                f"{mode:<12}{max_workers:>8}{entry['lines_per_s']:>12.0f}"
+                f"{entry['us_per_line']:>10.1f}"
+                f"{entry['progress_calls']:>11}"
+                f"{entry['lines_per_s'] / baseline:>8.2f}x"
+            )
+
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Ponto de entrada do benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--line-size", type=int, default=40)
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(item) for item in value.split(",")],
+        default=default_workers(),
+    )
+    args = parser.parse_args(argv)
+    run(args.lines, args.line_size, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Comparação de resultados de benchmarks com detecção de regressões
+
+Compara dois resultados da suíte (arquivos JSON gerados por
+benchmarks.suite ou revisões do git, que são medidas na hora) e calcula,
+para cada benchmark, a variação do tempo médio com um intervalo de
+confiança por bootstrap. Uma variação só é considerada quando o intervalo
+não contém 0%, e o comando termina com código 1 se algum benchmark ficar
+significativamente mais lento que o limite configurado.
+
+Uso:
+    python -m benchmarks.compare base.json head.json
+    python -m benchmarks.compare v1.0.9 HEAD --repeat 5 --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from statistics import fmean
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_CONFIDENCE = 0.95
+BOOTSTRAP_RESAMPLES = 2000
+
+REGRESSION = "REGRESSÃO"
+SLOWER = "mais lento"
+FASTER = "mais rápido"
+UNCHANGED = "sem mudança"
+FEW_SAMPLES = "poucas amostras"
+
+
+class Comparison(NamedTuple):
+    """Resultado da comparação de um benchmark entre base e head"""
+
+    name: str
+    base_mean: float
+    head_mean: float
+    change: float
+    low: float
+    high: float
+    status: str
+
+
+def bootstrap_change(
+    base: Sequence[float],
+    head: Sequence[float],
+    confidence: float = DEFAULT_CONFIDENCE,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = 0,
+) -> Tuple[float, float]:
+    """
+    Intervalo de confiança da variação relativa do tempo médio.
+
+    Args:
+        base (Sequence[float]): Amostras de tempo da base.
+        head (Sequence[float]): Amostras de tempo do head.
+        confidence (float): Nível de confiança do intervalo.
+        resamples (int): Quantidade de reamostragens do bootstrap.
+        seed (int): Semente, para que a mesma entrada gere o mesmo intervalo.
+
+    Returns:
+        Tuple[float, float]: Limites inferior e superior da variação, onde
+        0.1 significa 10% mais lento.
+    """
+    rng = random.Random(seed)
+    changes = sorted(
+        fmean(rng.choices(head, k=len(head)))
+        / fmean(rng.choices(base, k=len(base)))
+        - 1
+        for _ in range(resamples)
+    )
+    tail = (1 - confidence) / 2
+    return (
+        changes[int(tail * resamples)],
+        changes[min(resamples - 1, int((1 - tail) * resamples))],
+    )
+
+
+def compare_samples(
+    name: str,
+    base: Sequence[float],
+    head: Sequence[float],
+    threshold: float = DEFAULT_THRESHOLD,
+    confidence: float = DEFAULT_CONFIDENCE,
+) -> Comparison:
+    """
+    Compara as amostras de um benchmark e classifica a variação.
+
+    Args:
+        name (str): Identificador do benchmark.
+        base (Sequence[float]): Amostras de tempo da base.
+        head (Sequence[float]): Amostras de tempo do head.
+        threshold (float): Variação a partir da qual uma piora significativa
+        é uma regressão, por exemplo 0.2 para 20%.
+        confidence (float): Nível de confiança do intervalo.
+
+    Returns:
+        Comparison: Médias, variação, intervalo de confiança e situação.
+    """
+    base_mean = fmean(base)
+    head_mean = fmean(head)
+    change = head_mean / base_mean - 1
+
+    if len(base) < 2 or len(head) < 2:
+        return Comparison(
+            name, base_mean, head_mean, change, change, change, FEW_SAMPLES
+        )
+
+    low, high = bootstrap_change(base, head, confidence)
+    if low > 0:
+        status = REGRESSION if change > threshold else SLOWER
+    elif high < 0:
+        status = FASTER
+    else:
+        status = UNCHANGED
+
+    return Comparison(name, base_mean, head_mean, change, low, high, status)
+
+
+def compare_documents(
+    base: Dict[str, Any],
+    head: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    confidence: float = DEFAULT_CONFIDENCE,
+) -> Tuple[List[Comparison], List[str]]:
+    """
+    Compara todos os benchmarks presentes nos dois resultados.
+
+    Args:
+        base (Dict[str, Any]): Resultado da suíte usado como referência.
+        head (Dict[str, Any]): Resultado da suíte comparado.
+        threshold (float): Variação que caracteriza uma regressão.
+        confidence (float): Nível de confiança dos intervalos.
+
+    Returns:
+        Tuple[List[Comparison], List[str]]: As comparações e os nomes dos
+        benchmarks presentes em apenas um dos resultados.
+    """
+    base_samples = {item["name"]: item["samples"] for item in base["results"]}
+    head_samples = {item["name"]: item["samples"] for item in head["results"]}
+
+    comparisons = [
+        compare_samples(
+            name, base_samples[name], samples, threshold, confidence
+        )
+        for name, samples in head_samples.items()
+        if name in base_samples
+    ]
+    missing = sorted(set(base_samples) ^ set(head_samples))
+    return comparisons, missing
+
+
+def run_revision(revision: str, suite_args: List[str]) -> Dict[str, Any]:
+    """
+    Mede uma revisão do git com a sua própria suíte, em um worktree
+    temporário.
+
+    Args:
+        revision (str): Revisão do git, por exemplo uma tag ou "HEAD".
+        suite_args (List[str]): Argumentos repassados a benchmarks.suite.
+
+    Returns:
+        Dict[str, Any]: O resultado da suíte.
+
+    Raises:
+        subprocess.CalledProcessError: Se a revisão não existir ou não tiver
+        a suíte de benchmarks.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        worktree = os.path.join(directory, "tree")
+        output = os.path.join(directory, "results.json")
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", worktree, revision],
+            cwd=REPO_DIR,
+            check=True,
+            capture_output=True,
+        )
+        try:
+            # O encryptdef importado é o do worktree, não o instalado
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.suite",
+                    "--output",
+                    output,
+                    *suite_args,
+                ],
+                cwd=worktree,
+                env={**os.environ, "PYTHONPATH": worktree},
+                check=True,
+            )
+            with open(output, "r", encoding="utf-8") as file_:
+                return json.load(file_)
+        finally:
+            subprocess.run(
+                ["git", "worktree", "remove", "--force", worktree],
+                cwd=REPO_DIR,
+                check=False,
+                capture_output=True,
+            )
+
+
+def load_results(source: str, suite_args: List[str]) -> Dict[str, Any]:
+    """
+    Carrega um resultado de um arquivo JSON ou mede uma revisão do git.
+
+    Args:
+        source (str): Caminho de um JSON da suíte ou revisão do git.
+        suite_args (List[str]): Argumentos repassados a benchmarks.suite ao
+        medir uma revisão.
+
+    Returns:
+        Dict[str, Any]: O resultado da suíte.
+    """
+    if os.path.isfile(source):
+        with open(source, "r", encoding="utf-8") as file_:
+            return json.load(file_)
+
+    print(f"Medindo a revisão {source}...", file=sys.stderr)
+    return run_revision(source, suite_args)
+
+
+def format_report(
+    comparisons: List[Comparison], missing: List[str], confidence: float
+) -> str:
+    """Tabela com a variação e o intervalo de confiança de cada benchmark."""
+    ci_label = f"IC {confidence:.0%}"
+    lines = [
+        f"{'benchmark':<36}{'base':>11}{'head':>11}{'variação':>10}"
+        f"{ci_label:>20}  situação"
+    ]
+    for item in comparisons:
+        interval = f"[{item.low:+.1%}, {item.high:+.1%}]"
+        lines.append(
+            f"{item.name:<36}{item.base_mean:>10.4f}s{item.head_mean:>10.4f}s"
+            f"{item.change:>+10.1%}{interval:>20}  {item.status}"
+        )
+    for name in missing:
+        lines.append(f"{name:<36}  presente em apenas um dos resultados")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Ponto de entrada da comparação.
+
+    Returns:
+        int: 1 se houver alguma regressão acima do limite, 0 caso contrário.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", help="JSON da suíte ou revisão do git.")
+    parser.add_argument("head", help="JSON da suíte ou revisão do git.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Piora relativa que falha a comparação. Padrão: 0.2 (20%%).",
+    )
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Execuções de cada benchmark ao medir revisões do git.",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Usa a suíte curta ao medir revisões do git.",
+    )
+    args = parser.parse_args(argv)
+
+    suite_args = ["--repeat", str(args.repeat)]
+    if args.quick:
+        suite_args.append("--quick")
+
+    comparisons, missing = compare_documents(
+        load_results(args.base, suite_args),
+        load_results(args.head, suite_args),
+        args.threshold,
+        args.confidence,
+    )
+    print(format_report(comparisons, missing, args.confidence))
+
+    regressions = [item for item in comparisons if item.status == REGRESSION]
+    if regressions:
+        print(
+            f"\n{len(regressions)} regressão(ões) acima de "
+            f"{args.threshold:.0%}.",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""Teste de carga do daemon `encryptdef serve`
+
+Abre várias conexões no socket Unix, cada uma com até PIPELINE requisições
+em andamento, e mede a vazão, as latências p50 e p99 e o tamanho médio dos
+lotes formados pelo servidor. Sem --socket, um servidor é iniciado em um
+diretório temporário. Para comparação, --spawn mede o custo de iniciar a
+linha de comando para cada valor.
+
+Uso:
+    python -m benchmarks.serve --connections 1,8,32 --requests 5000
+    python -m benchmarks.serve --socket /run/user/1000/encryptdef.sock
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from statistics import quantiles
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+PASSWORD = "benchmark"
+VALUE = "usuario@example.com"
+PIPELINE = 64
+
+# Linha de comando da ferramenta, sem depender do script instalado
+COMMAND = [sys.executable, "-c", "from encryptdef.cli import main; main()"]
+
+
+def _request(request_id: Any, method: str, **params: Any) -> bytes:
+    """Serializa uma requisição JSON-RPC em uma linha."""
+    return (
+        json.dumps(
+            {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": method,
+                "params": params,
+            }
+        ).encode("utf-8")
+        + b"\n"
+    )
+
+
+async def call(socket_path: str, method: str, **params: Any) -> Any:
+    """
+    Envia uma requisição em uma nova conexão e retorna o resultado.
+
+    Raises:
+        RuntimeError: Se o servidor responder com um erro.
+    """
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    try:
+        writer.write(_request(0, method, **params))
+        response = json.loads(await reader.readline())
+    finally:
+        writer.close()
+
+    if "error" in response:
+        raise RuntimeError(response["error"]["message"])
+    return response["result"]
+
+
+async def _connection(
+    socket_path: str,
+    count: int,
+    pipeline: int,
+    request: Callable[[int], bytes],
+    latencies: List[float],
+) -> None:
+    """Envia `count` requisições com até `pipeline` em andamento."""
+    reader, writer = await asyncio.open_unix_connection(
+        socket_path, limit=2**24
+    )
+    sent: Dict[int, float] = {}
+    slots = asyncio.Semaphore(pipeline)
+
+    async def send() -> None:
+        for request_id in range(count):
+            await slots.acquire()
+            sent[request_id] = time.perf_counter()
+            writer.write(request(request_id))
+            await writer.drain()
+
+    async def receive() -> None:
+        for _ in range(count):
+            response = json.loads(await reader.readline())
+            if "error" in response:
+                raise RuntimeError(response["error"]["message"])
+            latencies.append(time.perf_counter() - sent.pop(response["id"]))
+            slots.release()
+
+    try:
+        await asyncio.gather(send(), receive())
+    finally:
+        writer.close()
+
+
+async def load_test(
+    socket_path: str,
+    connections: int,
+    requests: int,
+    pipeline: int = PIPELINE,
+    method: str = "encrypt",
+) -> Dict[str, Any]:
+    """
+    Mede o servidor com `requests` requisições divididas entre as conexões.
+
+    Args:
+        socket_path (str): Socket Unix do servidor.
+        connections (int): Conexões simultâneas.
+        requests (int): Total de requisições.
+        pipeline (int): Requisições em andamento por conexão.
+        method (str): "encrypt" ou "decrypt".
+
+    Returns:
+        Dict[str, Any]: Vazão em requisições por segundo, latências p50,
+        p99 e máxima em milissegundos e o tamanho médio dos lotes.
+    """
+    value = VALUE
+    if method == "decrypt":
+        value = await call(socket_path, "encrypt", value=VALUE)
+
+    def request(request_id: int) -> bytes:
+        return _request(request_id, method, value=value)
+
+    per_connection = max(1, requests // connections)
+    before = await call(socket_path, "stats")
+    latencies: List[float] = []
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _connection(
+                socket_path, per_connection, pipeline, request, latencies
+            )
+            for _ in range(connections)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    after = await call(socket_path, "stats")
+
+    cuts = (
+        quantiles(latencies, n=100, method="inclusive")
+        if len(latencies) > 1
+        else latencies * 99
+    )
+    batches = after["batches"] - before["batches"]
+    return {
+        "requests_per_s": len(latencies) / elapsed,
+        "p50_ms": cuts[49] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "max_ms": max(latencies) * 1000,
+        "avg_batch": (after["requests"] - before["requests"])
+        / max(1, batches),
+    }
+
+
+def spawn_latency(count: int, keyfile: str) -> float:
+    """
+    Mede o tempo médio de uma execução da linha de comando por valor.
+
+    Args:
+        count (int): Quantidade de execuções.
+        keyfile (str): Arquivo com a senha.
+
+    Returns:
+        float: Segundos por valor.
+    """
+    start = time.perf_counter()
+    for _ in range(count):
+        subprocess.run(
+            COMMAND
+            + ["encrypt", "--keyfile", keyfile, "--message", VALUE]
+            + ["--output", "raw"],
+            check=True,
+            capture_output=True,
+        )
+    return (time.perf_counter() - start) / count
+
+
+@contextmanager
+def spawned_server(
+    directory: str, keyfile: str, workers: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Inicia um servidor em um socket temporário e o encerra no final.
+
+    Yields:
+        str: O caminho do socket.
+    """
+    socket_path = os.path.join(directory, "encryptdef.sock")
+    command = COMMAND + ["serve", "--socket", socket_path]
+    command += ["--keyfile", keyfile]
+    if workers is not None:
+        command += ["--workers", str(workers)]
+
+    with subprocess.Popen(command, stderr=subprocess.DEVNULL) as process:
+        try:
+            deadline = time.monotonic() + 10
+            while not os.path.exists(socket_path):
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("o servidor não iniciou")
+                time.sleep(0.05)
+            yield socket_path
+        finally:
+            process.terminate()
+
+
+def run(
+    socket_path: str,
+    connections: List[int],
+    requests: int,
+    pipeline: int,
+    method: str,
+) -> None:
+    """
+    Executa o teste de carga e imprime uma linha por quantidade de
+    conexões.
+    """
+    print(
+        f"{'conexões':>9}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}"
+        f"{'máx ms':>9}{'lote':>7}"
+    )
+    for level in connections:
+        stats = asyncio.run(
+            load_test(socket_path, level, requests, pipeline, method)
+        )
+        print(
+            f"{level:>9}{stats['requests_per_s']:>10.0f}"
+            f"{stats['p50_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+            f"{stats['max_ms']:>9.2f}{stats['avg_batch']:>7.1f}"
+        )
+
+
+def main() -> None:
+    """Ponto de entrada do teste de carga"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", default=None)
+    parser.add_argument(
+        "--connections",
+        type=lambda value: [int(item) for item in value.split(",")],
+        default=[1, 8, 32],
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--pipeline", type=int, default=PIPELINE)
+    parser.add_argument(
+        "--method", choices=["encrypt", "decrypt"], default="encrypt"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--spawn", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        keyfile = os.path.join(directory, "key.txt")
+        with open(keyfile, "w", encoding="utf-8") as file_:
+            file_.write(PASSWORD)
+
+        if args.spawn:
+            per_value = spawn_latency(args.spawn, keyfile)
+            print(
+                f"linha de comando por valor: {per_value * 1000:.1f} ms "
+                f"({1 / per_value:.1f} valores/s)\n"
+            )
+
+        if args.socket is not None:
+            run(
+                args.socket,
+                args.connections,
+                args.requests,
+                args.pipeline,
+                args.method,
+            )
+            return
+
+        with spawned_server(directory, keyfile, args.workers) as socket_path:
+            run(
+                socket_path,
+                args.connections,
+                args.requests,
+                args.pipeline,
+                args.method,
+            )
+
+
+if __name__ == "__main__":
+    main()
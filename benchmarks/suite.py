@@ -0,0 +1,431 @@
+"""Suíte de benchmarks das primitivas e do pipeline de arquivos
+
+Mede a latência de uma mensagem, a vazão de lotes de valores e de linhas
+por quantidade de trabalhadores, a vazão de arquivos de KB a GB e o pico de
+memória, e grava
+o resultado em JSON para que execuções diferentes possam ser comparadas.
+
+Uso:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --quick --output quick.json
+    python -m benchmarks.suite --sizes 1MB,1GB --workers 1,4 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from rich import get_console
+
+from benchmarks.backends import default_workers
+from encryptdef.api import decrypt, encrypt, encrypt_with_key
+from encryptdef.backends import BACKENDS
+from encryptdef.batch import decrypt_many, encrypt_many
+from encryptdef.core import process_file_content, process_lines
+from encryptdef.kdf import derive_key
+from encryptdef.keys import KeyContext
+from encryptdef.settings import console
+
+SCHEMA_VERSION = 1
+
+SIZE_UNITS = {"KB": 1024, "MB": 1024**2, "GB": 1024**3}
+DEFAULT_SIZES = ["1KB", "1MB", "32MB"]
+QUICK_SIZES = ["1KB", "256KB"]
+
+LINE_SIZE = 80
+PASSWORD = "benchmark"
+
+Result = Dict[str, Any]
+
+
+def parse_size(value: str) -> int:
+    """
+    Converte um tamanho como "64KB", "1MB" ou "2GB" em bytes.
+
+    Args:
+        value (str): Tamanho com unidade KB, MB ou GB, ou apenas bytes.
+
+    Returns:
+        int: Tamanho em bytes.
+    """
+    value = value.strip().upper()
+    for unit, multiplier in SIZE_UNITS.items():
+        if value.endswith(unit):
+            return int(float(value[: -len(unit)]) * multiplier)
+    return int(value)
+
+
+def measure(func: Callable[[], Any], repeat: int) -> List[float]:
+    """
+    Executa a função `repeat` vezes e retorna a duração de cada execução.
+
+    Args:
+        func (Callable[[], Any]): Função medida.
+        repeat (int): Quantidade de execuções.
+
+    Returns:
+        List[float]: Duração de cada execução em segundos.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def peak_memory(func: Callable[[], Any]) -> int:
+    """
+    Executa a função uma vez e retorna o pico de memória alocada pelo Python.
+
+    Args:
+        func (Callable[[], Any]): Função medida.
+
+    Returns:
+        int: Pico de memória em bytes, medido com tracemalloc.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def result(
+    name: str,
+    samples: List[float],
+    items: Optional[int] = None,
+    unit: str = "s",
+    **params: Any,
+) -> Result:
+    """
+    Monta a entrada de um benchmark no formato gravado em JSON.
+
+    Args:
+        name (str): Identificador único do benchmark.
+        samples (List[float]): Duração de cada execução em segundos.
+        items (Optional[int]): Quantidade de itens (linhas ou bytes)
+        processados por execução, usada para calcular a vazão.
+        unit (str): Unidade dos itens, usada no nome da vazão.
+        **params (Any): Parâmetros do benchmark.
+
+    Returns:
+        Result: A entrada do benchmark.
+    """
+    entry: Result = {
+        "name": name,
+        "params": params,
+        "samples": samples,
+        "min": min(samples),
+        "mean": sum(samples) / len(samples),
+    }
+    if items is not None:
+        entry["throughput"] = {
+            "unit": f"{unit}/s",
+            "value": items / min(samples),
+        }
+    return entry
+
+
+@contextmanager
+def silenced() -> Iterator[None]:
+    """Desliga as barras de progresso e mensagens durante as medições."""
+    consoles = [console, get_console()]
+    previous = [item.quiet for item in consoles]
+    for item in consoles:
+        item.quiet = True
+    try:
+        yield
+    finally:
+        for item, quiet in zip(consoles, previous):
+            item.quiet = quiet
+
+
+def bench_messages(repeat: int) -> List[Result]:
+    """Latência de uma mensagem, com e sem reaproveitar a chave mestra."""
+    message = "x" * LINE_SIZE
+    encrypted = encrypt(message, PASSWORD)
+    context = KeyContext(PASSWORD)
+    context_encrypted = encrypt(message, context)
+
+    return [
+        result(
+            "message.encrypt",
+            measure(lambda: encrypt(message, PASSWORD), repeat),
+        ),
+        result(
+            "message.decrypt",
+            measure(lambda: decrypt(encrypted, PASSWORD), repeat),
+        ),
+        result(
+            "message.encrypt.key_context",
+            measure(lambda: encrypt(message, context), repeat),
+        ),
+        result(
+            "message.decrypt.key_context",
+            measure(lambda: decrypt(context_encrypted, context), repeat),
+        ),
+    ]
+
+
+def bench_many(
+    values_count: int, workers: List[int], repeat: int
+) -> List[Result]:
+    """Vazão de encrypt_many comparada a encrypt chamada em um laço."""
+    values = ["x" * LINE_SIZE] * values_count
+    context = KeyContext(PASSWORD)
+    tokens = encrypt_many(values, context)
+    results = [
+        result(
+            "many.encrypt.loop",
+            measure(
+                lambda: [encrypt(value, context) for value in values], repeat
+            ),
+            values_count,
+            "values",
+            values=values_count,
+        )
+    ]
+
+    for backend in BACKENDS:
+        for max_workers in workers:
+            for name, func, items in (
+                ("encrypt", encrypt_many, values),
+                ("decrypt", decrypt_many, tokens),
+            ):
+                samples = measure(
+                    lambda: func(
+                        items,
+                        context,
+                        max_workers=max_workers,
+                        backend=backend,
+                    ),
+                    repeat,
+                )
+                results.append(
+                    result(
+                        f"many.{name}.{backend}.w{max_workers}",
+                        samples,
+                        values_count,
+                        "values",
+                        backend=backend,
+                        workers=max_workers,
+                        values=values_count,
+                    )
+                )
+
+    return results
+
+
+def bench_lines(
+    lines_count: int, workers: List[int], repeat: int
+) -> List[Result]:
+    """Vazão de process_lines por backend e quantidade de trabalhadores."""
+    key = derive_key(PASSWORD, b"0" * 16)
+    lines = [("x" * LINE_SIZE) + "\n" for _ in range(lines_count)]
+    results = []
+
+    for backend in BACKENDS:
+        for max_workers in workers:
+            samples = measure(
+                lambda: process_lines(
+                    lines, key, encrypt_with_key, max_workers, backend
+                ),
+                repeat,
+            )
+            results.append(
+                result(
+                    f"lines.encrypt.{backend}.w{max_workers}",
+                    samples,
+                    lines_count,
+                    "lines",
+                    backend=backend,
+                    workers=max_workers,
+                    lines=lines_count,
+                )
+            )
+
+    return results
+
+
+def write_sample_file(file_path: str, size: int) -> None:
+    """Cria um arquivo de texto com linhas de LINE_SIZE caracteres."""
+    line = ("x" * (LINE_SIZE - 1) + "\n").encode("utf-8")
+    block = line * max(1, (1024 * 1024) // len(line))
+
+    with open(file_path, "wb") as file_:
+        written = 0
+        while written < size:
+            data = block[: size - written]
+            file_.write(data)
+            written += len(data)
+
+
+def bench_files(
+    sizes: List[str], max_workers: int, repeat: int, directory: str
+) -> List[Result]:
+    """Vazão e pico de memória de process_file_content por tamanho."""
+    context = KeyContext(PASSWORD)
+    results = []
+
+    for size_name in sizes:
+        size = parse_size(size_name)
+        plain = os.path.join(directory, f"plain-{size_name}.txt")
+        encrypted = os.path.join(directory, f"encrypt-{size_name}.txt")
+        decrypted = os.path.join(directory, f"decrypt-{size_name}.txt")
+        write_sample_file(plain, size)
+
+        operations: Dict[str, Tuple[str, str, Callable[..., Any]]] = {
+            "encrypt": (plain, encrypted, encrypt),
+            "decrypt": (encrypted, decrypted, decrypt),
+        }
+        for operation, (source, target, func) in operations.items():
+
+            def run_once(
+                source: str = source,
+                target: str = target,
+                func: Callable[..., Any] = func,
+            ) -> None:
+                process_file_content(
+                    source, context, target, func, max_workers=max_workers
+                )
+
+            samples = measure(run_once, repeat)
+            entry = result(
+                f"file.{operation}.{size_name}",
+                samples,
+                size,
+                "bytes",
+                size=size,
+                workers=max_workers,
+            )
+            entry["peak_memory"] = peak_memory(run_once)
+            results.append(entry)
+
+        for path in (plain, encrypted, decrypted):
+            os.remove(path)
+
+    return results
+
+
+def git_revision() -> Optional[str]:
+    """Revisão do git do código medido, se disponível."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def package_version(name: str) -> Optional[str]:
+    """Versão instalada de um pacote, se disponível."""
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def metadata() -> Dict[str, Any]:
+    """Informações da máquina e das versões usadas na execução."""
+    return {
+        "schema": SCHEMA_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "encryptdef": package_version("encryptdef"),
+        "pycryptodomex": package_version("pycryptodomex"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(
+    sizes: List[str],
+    workers: List[int],
+    lines_count: int,
+    repeat: int,
+    message_repeat: int,
+) -> Dict[str, Any]:
+    """
+    Executa todos os benchmarks e retorna o documento gravado em JSON.
+
+    Args:
+        sizes (List[str]): Tamanhos dos arquivos, por exemplo "1MB".
+        workers (List[int]): Quantidades de trabalhadores a medir.
+        lines_count (int): Quantidade de linhas do benchmark de linhas e de
+        valores do benchmark de lotes.
+        repeat (int): Execuções de cada benchmark de linhas e arquivos.
+        message_repeat (int): Execuções de cada benchmark de mensagem.
+
+    Returns:
+        Dict[str, Any]: Metadados da execução e a lista de resultados.
+    """
+    with silenced(), tempfile.TemporaryDirectory() as directory:
+        results = bench_messages(message_repeat)
+        results += bench_many(lines_count, workers, repeat)
+        results += bench_lines(lines_count, workers, repeat)
+        results += bench_files(sizes, max(workers), repeat, directory)
+
+    return {"meta": metadata(), "results": results}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Ponto de entrada da suíte de benchmarks"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--output", help="Arquivo JSON de saída. Padrão: saída padrão."
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Execução curta, para verificar a suíte.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: value.split(","),
+        help=f"Tamanhos dos arquivos. Padrão: {','.join(DEFAULT_SIZES)}.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=lambda value: [int(item) for item in value.split(",")],
+        default=default_workers(),
+    )
+    parser.add_argument("--lines", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    document = run_suite(
+        sizes=args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES),
+        workers=args.workers,
+        lines_count=args.lines or (1_000 if args.quick else 50_000),
+        repeat=args.repeat or (1 if args.quick else 5),
+        message_repeat=args.repeat or (2 if args.quick else 10),
+    )
+
+    output = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file_:
+            file_.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,707 @@
+"""Módulo responsável pelo agente de chaves (`encryptdef agent`)
+
+Cada execução da linha de comando pede a senha e paga o Scrypt de novo. O
+agente funciona como o ssh-agent: um processo recebe a senha uma única vez
+(`encryptdef agent add`), guarda a senha e as chaves mestras derivadas em
+memória travada com mlock e responde, por um socket Unix, às derivações
+pedidas pelos outros comandos. Os comandos encontram o agente pela variável
+de ambiente ENCRYPTDEF_AGENT_SOCK:
+
+    eval "$(encryptdef agent start)"
+    encryptdef agent add
+    encryptdef decrypt --file dados.txt    # sem pergunta e sem Scrypt
+
+O protocolo é o mesmo JSON-RPC 2.0 do `encryptdef serve`, com os métodos
+"add", "derive", "clear", "status", "stop" e "ping". As chaves ficam em
+cache por salt e parâmetros do Scrypt, expiram depois de um tempo sem uso
+e, quando o cache enche, a usada há mais tempo é descartada. A senha expira
+depois do tempo informado em "add", levando as chaves junto.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    cast,
+)
+
+from Cryptodome.Random import get_random_bytes
+
+from encryptdef.exceptions import AgentError
+from encryptdef.kdf import (
+    KEY_SIZE,
+    SALT_SIZE,
+    ScryptParams,
+    derive_key,
+    validate_params,
+)
+from encryptdef.keys import KeyContext
+from encryptdef.output import plain_text
+from encryptdef.server import (
+    INVALID_PARAMS,
+    JSONRPC_VERSION,
+    RpcError,
+    RpcServer,
+)
+from encryptdef.settings import AGENT_SOCKET_ENV
+from encryptdef.template import (
+    TEMPLATE_AGENT_NO_KEY,
+    TEMPLATE_AGENT_UNREACHABLE,
+)
+
+# Segundos que a senha e as chaves sem uso ficam no agente
+AGENT_TTL = 3600.0
+
+# Quantidade máxima de chaves mestras guardadas pelo agente
+MAX_KEYS = 64
+
+# Tamanho máximo da senha, em bytes UTF-8
+MAX_PASSWORD_SIZE = 4096
+
+# Maior salt aceito em "derive"
+MAX_SALT_SIZE = 64
+
+# Segundos esperando a conexão com o agente
+CONNECT_TIMEOUT = 1.0
+
+# Erro devolvido quando o agente não tem uma senha carregada
+NO_KEY_ERROR = -32003
+
+# Linha de comando da ferramenta, sem depender do script instalado
+COMMAND = [sys.executable, "-c", "from encryptdef.cli import main; main()"]
+
+PR_SET_DUMPABLE = 4
+
+CacheKey = Tuple[bytes, ScryptParams]
+
+
+def _libc() -> Optional[ctypes.CDLL]:
+    """Biblioteca C do processo, se existir."""
+    name = ctypes.util.find_library("c")
+    try:
+        return ctypes.CDLL(name, use_errno=True)
+    except OSError:
+        return None
+
+
+class LockedBuffer:
+    """
+    Memória para segredos, travada com mlock para não ir para o swap e
+    zerada ao ser descartada. Em sistemas sem mlock, ou sem permissão para
+    travar a memória, funciona como um bytearray comum e `locked` é False.
+
+    Args:
+        size (int): Tamanho em bytes.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.data = bytearray(size)
+        # Exportar o buffer impede que o bytearray seja realocado
+        self._view = (ctypes.c_char * size).from_buffer(self.data)
+        self.locked = False
+
+        libc = _libc()
+        if libc is not None and hasattr(libc, "mlock"):
+            address = ctypes.addressof(self._view)
+            self.locked = libc.mlock(ctypes.c_void_p(address), size) == 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def write(self, offset: int, data: bytes) -> None:
+        """Copia `data` para a posição `offset`."""
+        ctypes.memmove(ctypes.addressof(self._view) + offset, data, len(data))
+
+    def read(self, offset: int, size: int) -> memoryview:
+        """Retorna uma visão, sem cópia, de `size` bytes em `offset`."""
+        return memoryview(self.data)[slice(offset, offset + size)]
+
+    def wipe(self, offset: int = 0, size: Optional[int] = None) -> None:
+        """Zera `size` bytes a partir de `offset`, ou o buffer inteiro."""
+        if size is None:
+            size = len(self.data) - offset
+        ctypes.memset(ctypes.addressof(self._view) + offset, 0, size)
+
+
+def harden_process() -> None:
+    """
+    Impede core dumps e a leitura da memória do agente por outros
+    processos do mesmo usuário, quando o sistema permitir.
+    """
+    try:
+        import resource  # pylint: disable=C0415
+
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    except (ImportError, OSError, ValueError):
+        pass
+
+    libc = _libc()
+    if libc is not None and hasattr(libc, "prctl"):
+        libc.prctl(PR_SET_DUMPABLE, 0, 0, 0, 0)
+
+
+class KeyStore:
+    """
+    Guarda a senha e as chaves mestras em um LockedBuffer: a senha no
+    início e cada chave em uma posição de KEY_SIZE bytes.
+
+    Args:
+        ttl (float): Segundos sem uso até uma chave ser descartada, e
+        duração padrão da senha.
+        max_keys (int): Quantidade máxima de chaves; ao passar dela, a
+        chave usada há mais tempo é descartada.
+        clock (Callable[[], float]): Relógio em segundos.
+    """
+
+    def __init__(
+        self,
+        ttl: float = AGENT_TTL,
+        max_keys: int = MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.clock = clock
+        self.memory = LockedBuffer(MAX_PASSWORD_SIZE + max_keys * KEY_SIZE)
+        # Muda sempre que a senha muda, invalidando derivações em andamento
+        self.generation = 0
+        self._password_size = 0
+        self._password_expires = 0.0
+        self._keys: "OrderedDict[CacheKey, Tuple[int, float]]"
+        self._keys = OrderedDict()
+        self._free = list(range(max_keys))
+        self._salts: Dict[ScryptParams, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def has_password(self) -> bool:
+        """Indica se há uma senha carregada e ainda válida."""
+        self.purge()
+        return self._password_size > 0
+
+    @property
+    def expires_in(self) -> float:
+        """Segundos até a senha expirar, ou 0 sem senha carregada."""
+        if not self.has_password:
+            return 0.0
+        return self._password_expires - self.clock()
+
+    def set_password(
+        self, password: bytes, ttl: Optional[float] = None
+    ) -> None:
+        """
+        Carrega a senha, descartando a anterior e as chaves derivadas dela.
+
+        Args:
+            password (bytes): A senha em UTF-8.
+            ttl (Optional[float]): Segundos até a senha expirar. Se None,
+            usa o `ttl` do KeyStore.
+
+        Raises:
+            ValueError: Se a senha estiver vazia ou passar de
+            MAX_PASSWORD_SIZE bytes.
+        """
+        if not password or len(password) > MAX_PASSWORD_SIZE:
+            raise ValueError(
+                f"a senha precisa ter de 1 a {MAX_PASSWORD_SIZE} bytes"
+            )
+
+        self.clear()
+        self.memory.write(0, password)
+        self._password_size = len(password)
+        self._password_expires = self.clock() + (ttl or self.ttl)
+
+    def password(self) -> memoryview:
+        """
+        Retorna a senha carregada, sem copiá-la para fora da memória
+        travada.
+
+        Raises:
+            AgentError: Se não houver senha carregada.
+        """
+        if not self.has_password:
+            raise AgentError(TEMPLATE_AGENT_NO_KEY)
+        return self.memory.read(0, self._password_size)
+
+    def encryption_salt(self, params: ScryptParams) -> bytes:
+        """
+        Salt usado pelos comandos que encriptam com estes parâmetros. Ele é
+        mantido enquanto a senha estiver carregada, para que a chave mestra
+        seja derivada uma única vez; cada mensagem continua com a própria
+        subchave.
+        """
+        return self._salts.setdefault(params, get_random_bytes(SALT_SIZE))
+
+    def get(self, salt: bytes, params: ScryptParams) -> Optional[bytes]:
+        """
+        Retorna a chave mestra em cache, renovando o prazo dela.
+
+        Returns:
+            Optional[bytes]: A chave, ou None se ela não estiver em cache.
+        """
+        self.purge()
+        entry = self._keys.get((salt, params))
+        if entry is None:
+            return None
+
+        slot, _ = entry
+        self._keys[(salt, params)] = (slot, self.clock() + self.ttl)
+        self._keys.move_to_end((salt, params))
+        return bytes(self.memory.read(self._offset(slot), KEY_SIZE))
+
+    def put(self, salt: bytes, params: ScryptParams, key: bytes) -> None:
+        """Guarda a chave mestra, descartando a menos usada se necessário."""
+        entry = self._keys.pop((salt, params), None)
+        if entry is not None:
+            slot = entry[0]
+        elif self._free:
+            slot = self._free.pop()
+        else:
+            _, (slot, _) = self._keys.popitem(last=False)
+
+        self.memory.write(self._offset(slot), key)
+        self._keys[(salt, params)] = (slot, self.clock() + self.ttl)
+
+    def purge(self) -> None:
+        """Descarta a senha vencida e as chaves sem uso."""
+        now = self.clock()
+        if self._password_size and now >= self._password_expires:
+            self.clear()
+            return
+
+        for cache_key, (slot, expires) in list(self._keys.items()):
+            if now >= expires:
+                self._discard(cache_key, slot)
+
+    def clear(self) -> None:
+        """Zera a senha e todas as chaves."""
+        self.memory.wipe()
+        self.generation += 1
+        self._password_size = 0
+        self._keys.clear()
+        self._free = list(range(self.max_keys))
+        self._salts.clear()
+
+    def _offset(self, slot: int) -> int:
+        return MAX_PASSWORD_SIZE + slot * KEY_SIZE
+
+    def _discard(self, cache_key: CacheKey, slot: int) -> None:
+        self.memory.wipe(self._offset(slot), KEY_SIZE)
+        del self._keys[cache_key]
+        self._free.append(slot)
+
+
+def _peer_is_owner(sock: Optional[socket.socket]) -> bool:
+    """
+    Confere se o processo do outro lado do socket é do mesmo usuário. Em
+    sistemas sem SO_PEERCRED vale apenas a permissão do socket.
+    """
+    option = getattr(socket, "SO_PEERCRED", None)
+    if sock is None or option is None:
+        return True
+
+    credentials = sock.getsockopt(
+        socket.SOL_SOCKET, option, struct.calcsize("3i")
+    )
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid == os.getuid()
+
+
+def _params_from(request: Dict[str, Any]) -> ScryptParams:
+    """
+    Lê os parâmetros do Scrypt de uma requisição "derive".
+
+    Raises:
+        RpcError: Se os parâmetros forem inválidos.
+    """
+    values = [request.get(name) for name in ScryptParams._fields]
+    if not all(isinstance(value, int) for value in values):
+        raise RpcError(INVALID_PARAMS, '"n", "r" e "p" precisam ser inteiros')
+    try:
+        return validate_params(ScryptParams(*cast(List[int], values)))
+    except ValueError as e:
+        raise RpcError(INVALID_PARAMS, str(e)) from e
+
+
+def _salt_from(request: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Lê o salt, em base64, de uma requisição "derive".
+
+    Raises:
+        RpcError: Se o salt for inválido.
+    """
+    if request.get("salt") is None:
+        return None
+    try:
+        salt = b64decode(request["salt"], validate=True)
+    except (TypeError, ValueError) as e:
+        raise RpcError(INVALID_PARAMS, '"salt" precisa ser base64') from e
+    if not 0 < len(salt) <= MAX_SALT_SIZE:
+        raise RpcError(INVALID_PARAMS, '"salt" com tamanho inválido')
+    return salt
+
+
+class Agent(RpcServer):
+    """
+    Agente que guarda a senha e deriva as chaves mestras para os comandos
+    do mesmo usuário.
+
+    Args:
+        ttl (float): Segundos sem uso até uma chave ser descartada, e
+        duração padrão da senha.
+        max_keys (int): Quantidade máxima de chaves em cache.
+    """
+
+    def __init__(self, ttl: float = AGENT_TTL, max_keys: int = MAX_KEYS):
+        self.store = KeyStore(ttl, max_keys)
+        self.derivations = 0
+        self.hits = 0
+        self._pending: Dict[Tuple[Any, ...], "asyncio.Future[bytes]"] = {}
+
+    async def call(self, method: str, params: Dict[str, Any]) -> Any:
+        """
+        Executa um método.
+
+        Raises:
+            RpcError: Se o método não existir, os parâmetros forem
+            inválidos ou não houver senha carregada.
+        """
+        if method == "ping":
+            return "pong"
+        if method == "add":
+            return self._add(params)
+        if method == "derive":
+            return await self._derive(params)
+        if method == "clear":
+            self.store.clear()
+            return True
+        if method == "status":
+            return {
+                "password": self.store.has_password,
+                "expires_in": self.store.expires_in,
+                "keys": len(self.store),
+                "locked": self.store.memory.locked,
+                "derivations": self.derivations,
+                "hits": self.hits,
+            }
+        if method == "stop":
+            self.store.clear()
+            self.shutdown()
+            return True
+        return await super().call(method, params)
+
+    def _add(self, params: Dict[str, Any]) -> bool:
+        """Carrega a senha da requisição."""
+        password, ttl = params.get("password"), params.get("ttl")
+        if not isinstance(password, str):
+            raise RpcError(INVALID_PARAMS, '"password" precisa ser um texto')
+        if ttl is not None and (not isinstance(ttl, (int, float)) or ttl <= 0):
+            raise RpcError(INVALID_PARAMS, '"ttl" precisa ser positivo')
+
+        try:
+            self.store.set_password(password.encode("utf-8"), ttl)
+        except ValueError as e:
+            raise RpcError(INVALID_PARAMS, str(e)) from e
+        return True
+
+    async def _derive(self, params: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Retorna a chave mestra do salt e dos parâmetros, derivando com
+        Scrypt apenas na primeira vez. Sem "salt", usa o salt de
+        encriptação do agente.
+        """
+        scrypt_params = _params_from(params)
+        salt = _salt_from(params)
+        if not self.store.has_password:
+            raise RpcError(NO_KEY_ERROR, plain_text(TEMPLATE_AGENT_NO_KEY))
+        if salt is None:
+            salt = self.store.encryption_salt(scrypt_params)
+
+        key = self.store.get(salt, scrypt_params)
+        if key is not None:
+            self.hits += 1
+        else:
+            key = await self._derive_once(salt, scrypt_params)
+
+        return {
+            "salt": b64encode(salt).decode("ascii"),
+            "key": b64encode(key).decode("ascii"),
+        }
+
+    async def _derive_once(self, salt: bytes, params: ScryptParams) -> bytes:
+        """
+        Deriva a chave em uma thread. Pedidos simultâneos da mesma chave
+        esperam a mesma derivação.
+        """
+        generation = self.store.generation
+        pending_key = (salt, params, generation)
+        if pending_key in self._pending:
+            return await asyncio.shield(self._pending[pending_key])
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            None, derive_key, self.store.password(), salt, *params
+        )
+        self._pending[pending_key] = future
+        try:
+            key = await future
+        finally:
+            del self._pending[pending_key]
+
+        # A senha mudou ou foi apagada durante a derivação
+        if self.store.generation != generation:
+            raise RpcError(NO_KEY_ERROR, plain_text(TEMPLATE_AGENT_NO_KEY))
+
+        self.derivations += 1
+        self.store.put(salt, params, key)
+        return key
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Atende apenas conexões de processos do mesmo usuário."""
+        if not _peer_is_owner(writer.get_extra_info("socket")):
+            writer.close()
+            return
+        await super().handle_connection(reader, writer)
+
+    async def _purge_keys(self) -> None:
+        """Descarta periodicamente a senha vencida e as chaves sem uso."""
+        while True:
+            await asyncio.sleep(min(self.store.ttl, 10.0))
+            self.store.purge()
+
+    def background(self) -> List[Coroutine[Any, Any, None]]:
+        """Descarta as chaves sem uso."""
+        return [self._purge_keys()]
+
+
+class AgentClient:
+    """
+    Cliente do agente, com uma conexão por chamada.
+
+    Args:
+        socket_path (str): Socket Unix do agente.
+        timeout (float): Segundos esperando a conexão.
+    """
+
+    def __init__(
+        self, socket_path: str, timeout: float = CONNECT_TIMEOUT
+    ) -> None:
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def call(self, method: str, **params: Any) -> Any:
+        """
+        Executa um método no agente.
+
+        Returns:
+            Any: O resultado do método.
+
+        Raises:
+            AgentError: Se o agente estiver inacessível ou responder com um
+            erro.
+        """
+        import json  # pylint: disable=C0415
+
+        request = {
+            "jsonrpc": JSONRPC_VERSION,
+            "id": 0,
+            "method": method,
+            "params": params,
+        }
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                # Uma derivação com Scrypt pode levar alguns segundos
+                sock.settimeout(None)
+                sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+                with sock.makefile("rb") as reader:
+                    line = reader.readline()
+            response = json.loads(line)
+        except (OSError, ValueError) as e:
+            raise AgentError(
+                TEMPLATE_AGENT_UNREACHABLE % self.socket_path
+            ) from e
+
+        if "error" in response:
+            raise AgentError(response["error"]["message"])
+        return response["result"]
+
+
+class AgentKeyContext(KeyContext):
+    """
+    Contexto de chaves que busca as chaves mestras no agente, em vez de
+    conhecer a senha e derivá-las com Scrypt.
+
+    Args:
+        socket_path (str): Socket Unix do agente.
+        params (Optional[ScryptParams]): Parâmetros do Scrypt ao encriptar.
+        Se None, usa os parâmetros padrão.
+    """
+
+    def __init__(  # pylint: disable=W0231
+        self, socket_path: str, params: Optional[ScryptParams] = None
+    ) -> None:
+        self.client = AgentClient(socket_path)
+        self.params = params or ScryptParams()
+        self._salt: Optional[bytes] = None
+        self._master_keys: "OrderedDict[CacheKey, bytes]"
+        self._master_keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, object]:
+        # As chaves já buscadas seguem para os processos trabalhadores
+        with self._lock:
+            return {
+                "socket_path": self.client.socket_path,
+                "params": self.params,
+                "salt": self._salt,
+                "master_keys": OrderedDict(self._master_keys),
+            }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.client = AgentClient(state["socket_path"])
+        self.params = state["params"]
+        self._salt = state["salt"]
+        self._master_keys = state["master_keys"]
+        self._lock = threading.Lock()
+
+    @property  # type: ignore[override]
+    def salt(self) -> bytes:
+        """Salt de encriptação do agente, buscado na primeira vez."""
+        if self._salt is None:
+            self._fetch(None, self.params)
+        assert self._salt is not None
+        return self._salt
+
+    @salt.setter
+    def salt(self, value: bytes) -> None:
+        self._salt = value
+
+    def for_params(self, params: ScryptParams) -> KeyContext:
+        """Contexto do mesmo agente com outros parâmetros do Scrypt."""
+        if params == self.params:
+            return self
+        return AgentKeyContext(self.client.socket_path, params)
+
+    def master_key(
+        self,
+        salt: Optional[bytes] = None,
+        params: Optional[ScryptParams] = None,
+    ) -> bytes:
+        """
+        Retorna a chave mestra do salt e dos parâmetros, pedindo ao agente
+        apenas na primeira vez.
+
+        Raises:
+            AgentError: Se o agente estiver inacessível ou sem senha.
+        """
+        cache_key = (salt or self.salt, params or self.params)
+
+        with self._lock:
+            if cache_key in self._master_keys:
+                return self._master_keys[cache_key]
+
+        return self._fetch(*cache_key)
+
+    def legacy_key(self, salt: bytes) -> bytes:
+        """Chave de uma mensagem no formato antigo, derivada pelo agente."""
+        return self.master_key(salt, ScryptParams())
+
+    def _fetch(self, salt: Optional[bytes], params: ScryptParams) -> bytes:
+        """Pede a chave mestra ao agente e a guarda no contexto."""
+        fields: Dict[str, Any] = params._asdict()
+        if salt is not None:
+            fields["salt"] = b64encode(salt).decode("ascii")
+
+        result = self.client.call("derive", **fields)
+        salt, master_key = b64decode(result["salt"]), b64decode(result["key"])
+
+        with self._lock:
+            if self._salt is None and "salt" not in fields:
+                self._salt = salt
+            self._master_keys[(salt, params)] = master_key
+        return master_key
+
+
+def agent_socket() -> Optional[str]:
+    """Socket do agente informado em ENCRYPTDEF_AGENT_SOCK."""
+    return os.environ.get(AGENT_SOCKET_ENV) or None
+
+
+def agent_key_context(
+    params: Optional[ScryptParams] = None,
+) -> Optional[AgentKeyContext]:
+    """
+    Contexto do agente da sessão, se houver um agente com senha carregada.
+
+    Args:
+        params (Optional[ScryptParams]): Parâmetros do Scrypt ao encriptar.
+
+    Returns:
+        Optional[AgentKeyContext]: O contexto, ou None se a variável de
+        ambiente não estiver definida, o agente estiver inacessível ou sem
+        senha.
+    """
+    socket_path = agent_socket()
+    if socket_path is None:
+        return None
+    try:
+        status = AgentClient(socket_path).call("status")
+    except AgentError:
+        return None
+    return AgentKeyContext(socket_path, params) if status["password"] else None
+
+
+def spawn_agent(
+    socket_path: str, ttl: float = AGENT_TTL, max_keys: int = MAX_KEYS
+) -> int:
+    """
+    Inicia o agente em segundo plano, em uma nova sessão, e espera o
+    socket aparecer.
+
+    Returns:
+        int: O PID do agente.
+
+    Raises:
+        OSError: Se o agente não iniciar.
+    """
+    command = COMMAND + ["agent", "start", "--foreground"]
+    command += ["--socket", socket_path, "--ttl", str(ttl)]
+    command += ["--max-keys", str(max_keys)]
+
+    # pylint: disable=R1732
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + 10
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise OSError(TEMPLATE_AGENT_UNREACHABLE % socket_path)
+        time.sleep(0.05)
+    return process.pid
@@ -0,0 +1,581 @@
+"""Módulo com a API assíncrona, para uso dentro de um event loop
+
+As funções de encryptdef.api bloqueiam a thread que as chama (o Scrypt
+leva dezenas de milissegundos), o que trava um serviço baseado em asyncio.
+Aqui, o trabalho é enviado a um AsyncExecutor: um pool de threads com um
+limite de tarefas em andamento. Quem chama além do limite espera a vez sem
+bloquear o event loop, o que dá contrapressão natural sob carga.
+
+Com um KeyContext reutilizado o Scrypt roda uma única vez e cada mensagem
+custa apenas o HKDF:
+
+    context = KeyContext("minha-chave")
+    encrypted = await aio.encrypt("mensagem", context)
+    assert await aio.decrypt(encrypted, context) == "mensagem"
+
+Os arquivos de linhas são lidos, processados e escritos em fluxo, em lotes,
+com no máximo uma janela de linhas em memória.
+"""
+
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import TracebackType
+from typing import (
+    IO,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    Deque,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from encryptdef import api
+from encryptdef.backends import (
+    THREAD_WORKER_MEMORY,
+    BatchSizer,
+    run_thread_batch,
+)
+from encryptdef.ciphers import (
+    DEFAULT_CIPHER,
+    cipher_from_fields,
+    resolve_cipher,
+)
+from encryptdef.header import is_file_header, parse_header
+from encryptdef.kdf import ScryptParams
+from encryptdef.keys import KeyContext, as_key_context
+from encryptdef.resources import plan_workers
+from encryptdef.stream import decrypt_stream, encrypt_stream, is_stream_file
+from encryptdef.utils import atomic_write, open_temporary, remove_temporary
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Tarefas em andamento por thread antes de quem chama precisar esperar
+PENDING_FACTOR = 4
+
+# Linhas lidas ou escritas no arquivo por tarefa
+FILE_BATCH_LINES = 256
+
+Lines = Union[Iterable[str], AsyncIterable[str]]
+
+
+class AsyncExecutor:
+    """
+    Pool de threads com limite de tarefas em andamento, usado pela API
+    assíncrona para tirar a criptografia do event loop.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            max_workers (Optional[int]): Threads do pool. Se None, usa os
+            núcleos disponíveis que cabem no orçamento de memória.
+            max_pending (Optional[int]): Tarefas em andamento ou na fila do
+            pool. Além disso, quem chama espera. Se None, usa
+            max_workers * PENDING_FACTOR.
+        """
+        self.max_workers = max_workers or plan_workers(
+            None, THREAD_WORKER_MEMORY
+        )
+        self.max_pending = max_pending or self.max_workers * PENDING_FACTOR
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        """Pool de threads, criado no primeiro uso."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="encryptdef-aio"
+            )
+        return self._pool
+
+    def _slots(self) -> asyncio.Semaphore:
+        """Semáforo das tarefas em andamento no event loop atual."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, func: Callable[..., R], *args: Any) -> R:
+        """
+        Executa a função no pool, esperando por uma vaga se o limite de
+        tarefas em andamento já foi atingido.
+
+        Args:
+            func (Callable[..., R]): Função bloqueante.
+            *args (Any): Argumentos da função.
+
+        Returns:
+            R: O retorno da função.
+        """
+        async with self._slots():
+            return await asyncio.get_running_loop().run_in_executor(
+                self.pool, partial(func, *args)
+            )
+
+    async def map(
+        self,
+        func: Callable[[T], R],
+        items: Union[Iterable[T], AsyncIterable[T]],
+    ) -> AsyncIterator[R]:
+        """
+        Aplica a função a cada item no pool, com no máximo max_pending itens
+        em andamento, e entrega os resultados na ordem original.
+
+        Args:
+            func (Callable[[T], R]): Função bloqueante.
+            items (Union[Iterable[T], AsyncIterable[T]]): Itens processados.
+
+        Yields:
+            R: Os resultados, em ordem.
+        """
+        pending: Deque["asyncio.Future[R]"] = deque()
+        try:
+            async for item in _aiter(items):
+                pending.append(asyncio.ensure_future(self.run(func, item)))
+                if len(pending) >= self.max_pending:
+                    yield await pending.popleft()
+                while pending and pending[0].done():
+                    yield pending.popleft().result()
+
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # Cancela o que ainda não começou após um erro ou uma parada
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        """Encerra o pool, esperando as tarefas em andamento."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    async def __aenter__(self) -> "AsyncExecutor":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+_default_executor: Optional[AsyncExecutor] = None
+
+
+def get_executor() -> AsyncExecutor:
+    """Executor padrão da API assíncrona, criado no primeiro uso."""
+    global _default_executor  # pylint: disable=W0603
+
+    if _default_executor is None:
+        _default_executor = AsyncExecutor()
+    return _default_executor
+
+
+async def _aiter(
+    items: Union[Iterable[T], AsyncIterable[T]],
+) -> AsyncIterator[T]:
+    """Percorre um iterável comum ou assíncrono."""
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def encrypt(
+    message: str,
+    key: Union[str, KeyContext],
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+    executor: Optional[AsyncExecutor] = None,
+) -> str:
+    """
+    Versão assíncrona de api.encrypt.
+
+    Args:
+        message (str): A mensagem que será criptografada.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves.
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+        usados ao criar um novo contexto.
+        cipher (str): Identificador do cifrador ou "auto".
+        executor (Optional[AsyncExecutor]): Executor usado. Se None, usa o
+        executor padrão.
+
+    Returns:
+        str: A mensagem criptografada.
+    """
+    executor = executor or get_executor()
+    return await executor.run(api.encrypt, message, key, params, cipher)
+
+
+async def decrypt(
+    message: str,
+    key: Union[str, KeyContext],
+    executor: Optional[AsyncExecutor] = None,
+) -> str:
+    """
+    Versão assíncrona de api.decrypt.
+
+    Args:
+        message (str): A mensagem criptografada.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves.
+        executor (Optional[AsyncExecutor]): Executor usado. Se None, usa o
+        executor padrão.
+
+    Returns:
+        str: A mensagem descriptografada.
+
+    Raises:
+        InvalidEncryptedFormat: Se a mensagem estiver malformada.
+        InvalidKey: Se a chave estiver incorreta.
+    """
+    executor = executor or get_executor()
+    return await executor.run(api.decrypt, message, key)
+
+
+def _new_file_key(
+    key: Union[str, KeyContext], params: Optional[ScryptParams], cipher: str
+) -> Tuple[str, bytes, str]:
+    """Cabeçalho, chave e cifrador de um novo arquivo de linhas."""
+    cipher = resolve_cipher(cipher)
+    header, file_key = as_key_context(key, params).new_key({"cipher": cipher})
+    return header, file_key, cipher
+
+
+async def aiter_encrypt_lines(
+    lines: Lines,
+    key: Union[str, KeyContext],
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+    executor: Optional[AsyncExecutor] = None,
+) -> AsyncIterator[str]:
+    """
+    Versão assíncrona de api.iter_encrypt_lines: gera o cabeçalho e depois
+    cada linha criptografada, em ordem.
+
+    Args:
+        lines (Lines): Linhas, de um iterável comum ou assíncrono.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves.
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt.
+        cipher (str): Identificador do cifrador ou "auto".
+        executor (Optional[AsyncExecutor]): Executor usado. Se None, usa o
+        executor padrão.
+
+    Yields:
+        str: Linhas do arquivo criptografado terminadas em quebra de linha.
+    """
+    executor = executor or get_executor()
+    header, file_key, cipher = await executor.run(
+        _new_file_key, key, params, cipher
+    )
+    yield header + "\n"
+
+    def encrypt_line(line: str, line_key: bytes) -> str:
+        return api.encrypt_with_key(line.rstrip("\n"), line_key, cipher)
+
+    async for line in _amap_lines(executor, encrypt_line, file_key, lines):
+        yield line + "\n"
+
+
+async def aiter_decrypt_lines(
+    lines: Lines,
+    key: Union[str, KeyContext],
+    executor: Optional[AsyncExecutor] = None,
+) -> AsyncIterator[str]:
+    """
+    Versão assíncrona de api.iter_decrypt_lines, para o formato versionado
+    e para o formato antigo de uma mensagem por linha.
+
+    Args:
+        lines (Lines): Linhas do arquivo criptografado.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves.
+        executor (Optional[AsyncExecutor]): Executor usado. Se None, usa o
+        executor padrão.
+
+    Yields:
+        str: Linhas descriptografadas terminadas em quebra de linha.
+
+    Raises:
+        InvalidEncryptedFormat: Se uma linha estiver malformada.
+        InvalidKey: Se a chave estiver incorreta.
+    """
+    executor = executor or get_executor()
+    context = as_key_context(key)
+    iterator = _aiter(lines).__aiter__()
+    try:
+        first_line = await iterator.__anext__()
+    except StopAsyncIteration:
+        return
+
+    if is_file_header(first_line):
+        fields = parse_header(first_line)
+        file_key = await executor.run(context.key_from_fields, fields)
+        cipher = cipher_from_fields(fields)
+
+        def decrypt_line(line: str, line_key: bytes) -> str:
+            return api.decrypt_with_key(line.rstrip("\n"), line_key, cipher)
+
+        results = _amap_lines(executor, decrypt_line, file_key, iterator)
+    else:
+
+        def decrypt_legacy_line(line: str, line_context: KeyContext) -> str:
+            return api.decrypt(line.rstrip("\n"), line_context)
+
+        results = _amap_lines(
+            executor,
+            decrypt_legacy_line,
+            context,
+            _chain_first(first_line, iterator),
+        )
+
+    async for line in results:
+        yield line + "\n"
+
+
+async def _abatches(
+    items: Lines, sizer: BatchSizer
+) -> AsyncIterator[List[str]]:
+    """Agrupa as linhas em lotes do tamanho atual do `sizer`."""
+    batch: List[str] = []
+    async for item in _aiter(items):
+        batch.append(item)
+        if len(batch) >= sizer.size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _amap_lines(
+    executor: AsyncExecutor,
+    process_line_func: Callable[[str, Any], str],
+    key: Any,
+    lines: Lines,
+) -> AsyncIterator[str]:
+    """
+    Processa as linhas no executor em lotes adaptativos, como
+    api.iter_process_lines, com uma tarefa por lote em vez de uma por
+    linha, e entrega os resultados na ordem original.
+    """
+    sizer = BatchSizer()
+    task = partial(run_thread_batch, process_line_func, key, sizer=sizer)
+    async for results in executor.map(task, _abatches(lines, sizer)):
+        for result in results:
+            yield result
+
+
+async def _chain_first(
+    first: str, iterator: AsyncIterator[str]
+) -> AsyncIterator[str]:
+    """Devolve a primeira linha já lida à frente das demais."""
+    yield first
+    async for line in iterator:
+        yield line
+
+
+async def _aiter_file_lines(
+    file_: IO[str], executor: AsyncExecutor
+) -> AsyncIterator[str]:
+    """Lê o arquivo em lotes de linhas, sem bloquear o event loop."""
+    while True:
+        batch: List[str] = await executor.run(_read_batch, file_)
+        if not batch:
+            return
+        for line in batch:
+            yield line
+
+
+def _read_batch(file_: IO[str]) -> List[str]:
+    """Lê até FILE_BATCH_LINES linhas do arquivo."""
+    batch = []
+    for line in file_:
+        batch.append(line)
+        if len(batch) >= FILE_BATCH_LINES:
+            break
+    return batch
+
+
+async def _write_lines(
+    lines: AsyncIterable[str], new_file_path: str, executor: AsyncExecutor
+) -> None:
+    """
+    Escreve as linhas em lotes, sem bloquear o event loop, em um arquivo
+    temporário que só substitui `new_file_path` no fim. Em caso de erro ou
+    cancelamento, o destino fica intacto.
+    """
+    target = await executor.run(open_temporary, new_file_path)
+    try:
+        batch: List[str] = []
+        async for line in lines:
+            batch.append(line)
+            if len(batch) >= FILE_BATCH_LINES:
+                await executor.run(target.writelines, batch)
+                batch = []
+        await executor.run(target.writelines, batch)
+        await executor.run(target.close)
+        await executor.run(os.replace, target.name, new_file_path)
+    except BaseException:
+        target.close()
+        remove_temporary(target.name)
+        raise
+
+
+def _process_stream_file(
+    file_path: str,
+    new_file_path: str,
+    key: Union[str, KeyContext],
+    encrypting: bool,
+    max_workers: int,
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+) -> None:
+    """Criptografa ou descriptografa um arquivo no formato em blocos."""
+    with (
+        open(file_path, "rb") as source,
+        atomic_write(new_file_path, "wb") as temporary,
+    ):
+        target = cast(BinaryIO, temporary)
+        if encrypting:
+            encrypt_stream(
+                source, target, key, max_workers, params=params, cipher=cipher
+            )
+        else:
+            decrypt_stream(source, target, key, max_workers)
+
+
+async def encrypt_file(
+    file_path: str,
+    new_file_path: str,
+    key: Union[str, KeyContext],
+    binary: bool = False,
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+    executor: Optional[AsyncExecutor] = None,
+) -> str:
+    """
+    Criptografa um arquivo em fluxo, sem bloquear o event loop. O destino
+    só é substituído se o arquivo for processado por inteiro.
+
+    Args:
+        file_path (str): Caminho do arquivo original.
+        new_file_path (str): Caminho do arquivo criptografado.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves.
+        binary (bool): Se True, usa o formato em blocos binários, processado
+        por uma única tarefa do executor.
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt.
+        cipher (str): Identificador do cifrador ou "auto".
+        executor (Optional[AsyncExecutor]): Executor usado. Se None, usa o
+        executor padrão.
+
+    Returns:
+        str: O caminho do arquivo criptografado.
+    """
+    executor = executor or get_executor()
+    if binary:
+        await executor.run(
+            _process_stream_file,
+            file_path,
+            new_file_path,
+            key,
+            True,
+            executor.max_workers,
+            params,
+            cipher,
+        )
+        return new_file_path
+
+    source = await executor.run(
+        partial(open, file_path, "r", encoding="utf-8", errors="ignore")
+    )
+    try:
+        await _write_lines(
+            aiter_encrypt_lines(
+                _aiter_file_lines(source, executor),
+                key,
+                params,
+                cipher,
+                executor,
+            ),
+            new_file_path,
+            executor,
+        )
+    finally:
+        await executor.run(source.close)
+    return new_file_path
+
+
+async def decrypt_file(
+    file_path: str,
+    new_file_path: str,
+    key: Union[str, KeyContext],
+    executor: Optional[AsyncExecutor] = None,
+) -> str:
+    """
+    Descriptografa um arquivo em fluxo, sem bloquear o event loop. O
+    formato (linhas ou blocos) é detectado pelo cabeçalho, e o destino só
+    é substituído se o arquivo for processado por inteiro.
+
+    Args:
+        file_path (str): Caminho do arquivo criptografado.
+        new_file_path (str): Caminho do arquivo descriptografado.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves.
+        executor (Optional[AsyncExecutor]): Executor usado. Se None, usa o
+        executor padrão.
+
+    Returns:
+        str: O caminho do arquivo descriptografado.
+
+    Raises:
+        InvalidEncryptedFormat: Se o arquivo estiver malformado.
+        InvalidKey: Se a chave estiver incorreta.
+    """
+    executor = executor or get_executor()
+    if await executor.run(is_stream_file, file_path):
+        await executor.run(
+            _process_stream_file,
+            file_path,
+            new_file_path,
+            key,
+            False,
+            executor.max_workers,
+        )
+        return new_file_path
+
+    source = await executor.run(
+        partial(open, file_path, "r", encoding="utf-8", errors="ignore")
+    )
+    try:
+        await _write_lines(
+            aiter_decrypt_lines(
+                _aiter_file_lines(source, executor), key, executor
+            ),
+            new_file_path,
+            executor,
+        )
+    finally:
+        await executor.run(source.close)
+    return new_file_path
@@ -0,0 +1,827 @@
+"""Módulo com a API de biblioteca, sem console e sem interação
+
+Reúne as funções de criptografia de mensagens, linhas e arquivos e as
+classes Encryptor e Decryptor, que guardam o contexto de chaves e o
+cifrador para serem reutilizados entre chamadas. Nada aqui pergunta,
+imprime ou exibe progresso: os resultados são retornados como strings,
+bytes ou estruturas e os erros são exceções. A linha de comando, em
+encryptdef.core, é uma camada fina sobre este módulo.
+
+    encryptor = Encryptor("minha-chave")
+    encrypted = encryptor.encrypt("mensagem")
+    assert Decryptor("minha-chave").decrypt(encrypted) == "mensagem"
+"""
+
+import io
+from base64 import b64decode, b64encode
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from itertools import chain
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+    cast,
+)
+
+from encryptdef.backends import (
+    BATCH_SIZE,
+    PROCESS_BACKEND,
+    THREAD_BACKEND,
+    BatchSizer,
+    batch_size_for,
+    batched,
+    iter_batches_in_processes,
+    run_thread_batch,
+)
+from encryptdef.batch import (
+    decrypt_many,
+    decrypt_token,
+    encrypt_many,
+    is_token,
+)
+from encryptdef.ciphers import (
+    AES_GCM,
+    DEFAULT_CIPHER,
+    cipher_from_fields,
+    new_cipher,
+    resolve_cipher,
+)
+from encryptdef.exceptions import InvalidEncryptedFormat, InvalidKey
+from encryptdef.header import is_file_header, is_header, parse_header
+from encryptdef.kdf import ScryptParams
+from encryptdef.keys import KeyContext, as_key_context
+from encryptdef.stream import (
+    CHUNK_SIZE,
+    STREAM_MODE,
+    decrypt_stream,
+    encrypt_stream,
+    is_stream_file,
+)
+from encryptdef.template import (
+    TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT,
+    TEMPLATE_INVALID_KEY,
+    TEMPLATE_TYPE_ERROR,
+)
+from encryptdef.tuner import (
+    AUTO_WORKERS,
+    Workers,
+    WorkerTuner,
+    resolve_workers,
+    task_name,
+)
+from encryptdef.utils import atomic_write, iter_file_lines, write_file
+
+# Formato de um arquivo processado, informado em FileResult
+LINES_MODE = "lines"
+
+# Quantidade de tarefas em andamento por trabalhador na janela de linhas
+WINDOW_FACTOR = 4
+
+
+def encrypt(
+    message: str,
+    password: Union[str, KeyContext],
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+) -> str:
+    """
+    Criptografa uma mensagem com um cifrador autenticado e uma subchave
+    derivada por HKDF de uma chave mestra derivada por Scrypt.
+
+    Com um KeyContext reutilizado, o Scrypt roda uma única vez e cada
+    mensagem custa apenas o HKDF.
+
+    Args:
+        message (str): A mensagem que será criptografada.
+        password (Union[str, KeyContext]): A senha usada para derivar a chave
+        de criptografia, ou um contexto de chaves já criado.
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+        usados ao criar um novo contexto. Se None, usa os parâmetros padrão.
+        cipher (str): Identificador do cifrador ou "auto" para o mais rápido
+        desta máquina.
+
+    Returns:
+        str: A mensagem criptografada contendo o cabeçalho com os salts, os
+        parâmetros do Scrypt e o cifrador, seguido de texto cifrado, nonce e
+        tag.
+    """
+    cipher = resolve_cipher(cipher)
+
+    # Gera um salt de HKDF aleatório e deriva a subchave da mensagem
+    header, private_key = as_key_context(password, params).new_key(
+        {"cipher": cipher}
+    )
+
+    return header + "*" + encrypt_with_key(message, private_key, cipher)
+
+
+def decrypt(enc_string: str, password: Union[str, KeyContext]) -> str:
+    """
+    Descriptografa uma mensagem criptografada com o cifrador indicado no
+    cabeçalho e uma chave derivada por Scrypt.
+
+    Args:
+        enc_string (str): A mensagem criptografada.
+        password (Union[str, KeyContext]): A senha usada para derivar a chave
+        de descriptografia, ou um contexto de chaves que reaproveita as
+        chaves mestras já derivadas.
+
+    Returns:
+        str: A mensagem descriptografada ou uma mensagem de erro.
+    """
+    context = as_key_context(password)
+
+    # Tokens de encrypt_many carregam os campos do cabeçalho em binário
+    if is_token(enc_string):
+        return decrypt_token(enc_string, context)
+
+    # Mensagens com cabeçalho carregam os próprios parâmetros do Scrypt
+    if is_header(enc_string):
+        header, _, record = enc_string.partition("*")
+        fields = parse_header(header)
+        return decrypt_with_key(
+            record, context.key_from_fields(fields), cipher_from_fields(fields)
+        )
+
+    try:
+        enc_parts = enc_string.split("*")
+        if len(enc_parts) != 4:
+            raise InvalidEncryptedFormat(
+                TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+            )
+
+        # Decodifica as partes criptografadas de base64
+        cipher_text, salt, nonce, tag = map(b64decode, enc_parts)
+
+        # Gera a chave privada a partir da senha e do salt
+        private_key = context.legacy_key(salt)
+
+        # O formato antigo usa sempre AES GCM
+        cipher = new_cipher(AES_GCM, private_key, nonce)
+
+        # Descriptografa o texto cifrado e verifica a tag
+        decrypted = cipher.decrypt_and_verify(cipher_text, tag)
+
+        return decrypted.decode("utf-8")
+
+    except ValueError as e:
+        raise InvalidKey(TEMPLATE_INVALID_KEY) from e
+
+
+def encrypt_with_key(
+    message: str, private_key: bytes, cipher_name: str = AES_GCM
+) -> str:
+    """
+    Criptografa uma linha com uma chave já derivada.
+
+    Usada no formato de arquivo versionado, onde o salt e os parâmetros do
+    KDF ficam no cabeçalho e a chave é derivada uma única vez por arquivo.
+
+    Args:
+        message (str): A linha que será criptografada.
+        private_key (bytes): A chave derivada do cabeçalho do arquivo.
+        cipher_name (str): Identificador do cifrador registrado.
+
+    Returns:
+        str: A linha criptografada contendo texto cifrado, nonce e tag.
+    """
+    cipher = new_cipher(cipher_name, private_key)
+    cipher_text, tag = cipher.encrypt_and_digest(message.encode("utf-8"))
+
+    encrypted_parts = {
+        "cipher_text": b64encode(cipher_text).decode("utf-8"),
+        "nonce": b64encode(cipher.nonce).decode("utf-8"),
+        "tag": b64encode(tag).decode("utf-8"),
+    }
+
+    return "*".join(encrypted_parts.values())
+
+
+def decrypt_with_key(
+    enc_string: str, private_key: bytes, cipher_name: str = AES_GCM
+) -> str:
+    """
+    Descriptografa uma linha do formato de arquivo versionado usando uma
+    chave já derivada.
+
+    Args:
+        enc_string (str): A linha criptografada.
+        private_key (bytes): A chave derivada do cabeçalho do arquivo.
+        cipher_name (str): Identificador do cifrador registrado.
+
+    Returns:
+        str: A linha descriptografada.
+    """
+    try:
+        enc_parts = enc_string.split("*")
+        if len(enc_parts) != 3:
+            raise InvalidEncryptedFormat(
+                TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+            )
+
+        cipher_text, nonce, tag = map(b64decode, enc_parts)
+        cipher = new_cipher(cipher_name, private_key, nonce)
+        decrypted = cipher.decrypt_and_verify(cipher_text, tag)
+
+        return decrypted.decode("utf-8")
+
+    except ValueError as e:
+        raise InvalidKey(TEMPLATE_INVALID_KEY) from e
+
+
+def _iter_lines_in_threads(
+    lines: Iterable[str],
+    key: Union[str, bytes, KeyContext],
+    process_line_func: Callable[[str, Any], Union[str, bool]],
+    max_workers: int,
+    window: int,
+    batch_size: Optional[int] = None,
+    batch_limit: int = BATCH_SIZE,
+    tuner: Optional[WorkerTuner] = None,
+) -> Iterator[List[Union[str, bool]]]:
+    """
+    Processa lotes de linhas em threads com no máximo `window` lotes em
+    andamento. Se `batch_size` for None, o tamanho dos lotes se adapta ao
+    custo medido de cada linha, até `batch_limit`. Com um `tuner`, os
+    lotes passam por ele, que decide quantas das `max_workers` threads
+    trabalham ao mesmo tempo.
+    """
+    sizer: Optional[BatchSizer] = None
+    if batch_size is None:
+        sizer = BatchSizer(batch_limit)
+        batches = sizer.batches(lines)
+    else:
+        batches = batched(lines, batch_size)
+
+    pending: Deque["Future[List[Union[str, bool]]]"] = deque()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for batch in batches:
+                task = partial(
+                    run_thread_batch, process_line_func, key, batch, sizer
+                )
+                if tuner is None:
+                    future = executor.submit(task)
+                else:
+                    future = executor.submit(
+                        tuner.run, task, records=len(batch)
+                    )
+                pending.append(future)
+
+                # Libera em ordem os lotes já concluídos do início
+                while len(pending) >= window or (
+                    pending and pending[0].done()
+                ):
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+            if tuner is not None:
+                tuner.save()
+        except BaseException:
+            # Cancela os lotes que ainda não começaram após um erro
+            executor.shutdown(cancel_futures=True)
+            raise
+
+
+def iter_process_lines(
+    lines: Iterable[str],
+    key: Union[str, bytes, KeyContext],
+    process_line_func: Callable[[str, Any], Union[str, bool]],
+    max_workers: Workers = 1,
+    backend: str = THREAD_BACKEND,
+    total: Optional[int] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    window: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Processa as linhas em lotes, com uma janela limitada de tarefas,
+    liberando os resultados na ordem original assim que o início da janela
+    termina.
+
+    Args:
+        lines (Iterable[str]): Linhas a serem processadas.
+        key (Union[str, bytes, KeyContext]): Senha, contexto de chaves ou
+        chave derivada para criptografar ou descriptografar.
+        process_line_func (Callable[[str, Any], Union[str, bool]]): Função
+        para processar cada linha.
+        max_workers (Workers): Número máximo de núcleos da CPU a serem
+        usados, ou "auto" para ajustar as threads pela vazão medida. No
+        backend de processos, "auto" usa os núcleos que cabem na memória.
+        backend (str): "thread" para um pool de threads ou "process" para
+        enviar lotes de linhas a processos por memória compartilhada.
+        total (Optional[int]): Quantidade de linhas, se conhecida. Usada
+        para limitar os lotes, para que todos os trabalhadores recebam
+        trabalho.
+        on_progress (Optional[Callable[[int], None]]): Chamada a cada lote
+        liberado, com a quantidade de linhas do lote.
+        window (Optional[int]): Quantidade máxima de lotes em andamento no
+        backend de threads. Se None, usa max_workers * WINDOW_FACTOR.
+        batch_size (Optional[int]): Linhas por tarefa. Com window=1 e
+        batch_size=1, cada linha é liberada antes da próxima ser lida, o
+        que importa quando a entrada chega aos poucos. Se None, o backend
+        de threads adapta os lotes ao custo medido de cada linha e o de
+        processos usa lotes de até BATCH_SIZE linhas.
+
+    Yields:
+        str: Linhas processadas terminadas em quebra de linha.
+
+    Raises:
+        TypeError: Se a função retornar algo diferente de string.
+    """
+    stripped_lines = (line.rstrip("\n") for line in lines)
+    workers = resolve_workers(max_workers, backend)
+
+    results: Iterator[Sequence[Union[str, bool]]]
+    if backend == PROCESS_BACKEND:
+        results = iter_batches_in_processes(
+            stripped_lines,
+            key,
+            process_line_func,
+            workers,
+            batch_size or batch_size_for(total, workers),
+        )
+    else:
+        tuner = None
+        if max_workers == AUTO_WORKERS:
+            tuner = WorkerTuner(workers, task_name(process_line_func))
+        results = _iter_lines_in_threads(
+            stripped_lines,
+            key,
+            process_line_func,
+            workers,
+            window or workers * WINDOW_FACTOR,
+            batch_size,
+            batch_size_for(total, workers),
+            tuner,
+        )
+
+    for batch in results:
+        for result in batch:
+            if not isinstance(result, str):
+                raise TypeError(TEMPLATE_TYPE_ERROR % {type(result)})
+            yield result + "\n"
+
+        if on_progress is not None:
+            on_progress(len(batch))
+
+
+def iter_encrypt_lines(
+    lines: Iterable[str],
+    key: Union[str, KeyContext],
+    max_workers: Workers = 1,
+    backend: str = THREAD_BACKEND,
+    total: Optional[int] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+    window: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Criptografa as linhas no formato de arquivo versionado, gerando primeiro
+    o cabeçalho e depois cada linha criptografada, em ordem.
+
+    Args:
+        lines (Iterable[str]): Linhas a serem criptografadas.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves usado para
+        derivar a chave do arquivo.
+        max_workers (Workers): Número máximo de núcleos da CPU a serem
+        usados, ou "auto".
+        backend (str): Backend de execução, "thread" ou "process".
+        total (Optional[int]): Quantidade de linhas, se conhecida.
+        on_progress (Optional[Callable[[int], None]]): Chamada a cada lote
+        liberado.
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+        usados ao criptografar. Se None, usa os parâmetros padrão.
+        cipher (str): Identificador do cifrador ou "auto".
+        window (Optional[int]): Quantidade máxima de lotes em andamento.
+        batch_size (Optional[int]): Linhas por tarefa. Se None, adapta os
+        lotes ao custo de cada linha.
+
+    Yields:
+        str: Linhas do arquivo criptografado terminadas em quebra de linha.
+    """
+    cipher = resolve_cipher(cipher)
+    header, file_key = as_key_context(key, params).new_key({"cipher": cipher})
+    yield header + "\n"
+    yield from iter_process_lines(
+        lines,
+        file_key,
+        partial(encrypt_with_key, cipher_name=cipher),
+        max_workers,
+        backend,
+        total,
+        on_progress,
+        window,
+        batch_size,
+    )
+
+
+def iter_decrypt_lines(
+    lines: Iterable[str],
+    key: Union[str, KeyContext],
+    max_workers: Workers = 1,
+    backend: str = THREAD_BACKEND,
+    total: Optional[int] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    window: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Descriptografa as linhas de um arquivo. Se a primeira linha for um
+    cabeçalho versionado a chave é derivada uma única vez, caso contrário
+    cada linha é descriptografada no formato antigo.
+
+    Args:
+        lines (Iterable[str]): Linhas do arquivo criptografado.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves usado para
+        derivar a chave.
+        max_workers (Workers): Número máximo de núcleos da CPU a serem
+        usados, ou "auto".
+        backend (str): Backend de execução, "thread" ou "process".
+        total (Optional[int]): Quantidade de linhas, se conhecida.
+        on_progress (Optional[Callable[[int], None]]): Chamada a cada lote
+        liberado.
+        window (Optional[int]): Quantidade máxima de lotes em andamento.
+        batch_size (Optional[int]): Linhas por tarefa. Se None, adapta os
+        lotes ao custo de cada linha.
+
+    Yields:
+        str: Linhas descriptografadas terminadas em quebra de linha.
+    """
+    iterator = iter(lines)
+    first_line = next(iterator, None)
+    if first_line is None:
+        return
+
+    context = as_key_context(key)
+    if is_file_header(first_line):
+        fields = parse_header(first_line)
+        yield from iter_process_lines(
+            iterator,
+            context.key_from_fields(fields),
+            partial(decrypt_with_key, cipher_name=cipher_from_fields(fields)),
+            max_workers,
+            backend,
+            total,
+            on_progress,
+            window,
+            batch_size,
+        )
+    else:
+        # Mensagens com o mesmo salt mestre reaproveitam a chave mestra
+        yield from iter_process_lines(
+            chain([first_line], iterator),
+            context,
+            decrypt,
+            max_workers,
+            backend,
+            total,
+            on_progress,
+            window,
+            batch_size,
+        )
+
+
+class FileResult(NamedTuple):
+    """Resultado do processamento de um arquivo"""
+
+    path: str
+    mode: str
+    records: int
+
+
+class _Counter:
+    """Conta os registros processados e repassa o avanço ao chamador."""
+
+    def __init__(self, on_progress: Optional[Callable[[int], None]]) -> None:
+        self.on_progress = on_progress
+        self.records = 0
+
+    def __call__(self, advance: int) -> None:
+        self.records += advance
+        if self.on_progress is not None:
+            self.on_progress(advance)
+
+
+class Encryptor:
+    """
+    Criptografa mensagens, linhas, bytes e arquivos com um mesmo contexto
+    de chaves, pagando o Scrypt uma única vez.
+    """
+
+    def __init__(
+        self,
+        key: Union[str, KeyContext],
+        params: Optional[ScryptParams] = None,
+        cipher: str = DEFAULT_CIPHER,
+        max_workers: Optional[Workers] = None,
+        backend: str = THREAD_BACKEND,
+    ) -> None:
+        """
+        Args:
+            key (Union[str, KeyContext]): Senha ou contexto de chaves.
+            params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+            usados com uma senha. Se None, usa os parâmetros padrão.
+            cipher (str): Identificador do cifrador ou "auto", resolvido
+            uma única vez.
+            max_workers (Optional[Workers]): Trabalhadores usados nas
+            linhas e nos blocos. Se None, usa os núcleos disponíveis que
+            cabem no orçamento de memória. Com "auto", as linhas ajustam as
+            threads pela vazão medida dentro desse mesmo limite.
+            backend (str): Backend de execução das linhas.
+        """
+        self.context = as_key_context(key, params)
+        self.cipher = resolve_cipher(cipher)
+        self.max_workers = resolve_workers(max_workers, backend)
+        self.line_workers: Workers = (
+            AUTO_WORKERS if max_workers == AUTO_WORKERS else self.max_workers
+        )
+        self.backend = backend
+
+    def encrypt(self, message: str) -> str:
+        """Criptografa uma mensagem, com uma subchave própria."""
+        return encrypt(message, self.context, cipher=self.cipher)
+
+    def encrypt_many(self, values: Iterable[str]) -> List[str]:
+        """
+        Criptografa muitos valores com uma única subchave, gerando um token
+        compacto e independente para cada um.
+        """
+        return encrypt_many(
+            values,
+            self.context,
+            cipher=self.cipher,
+            max_workers=self.max_workers,
+            backend=self.backend,
+        )
+
+    def encrypt_bytes(
+        self, data: bytes, chunk_size: int = CHUNK_SIZE
+    ) -> bytes:
+        """Criptografa bytes no formato em blocos."""
+        target = io.BytesIO()
+        self.encrypt_stream(io.BytesIO(data), target, chunk_size)
+        return target.getvalue()
+
+    def iter_lines(
+        self,
+        lines: Iterable[str],
+        total: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        window: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Criptografa as linhas no formato de arquivo versionado.
+
+        Args:
+            lines (Iterable[str]): Linhas a serem criptografadas.
+            total (Optional[int]): Quantidade de linhas, se conhecida.
+            on_progress (Optional[Callable[[int], None]]): Chamada a cada
+            lote liberado.
+            window (Optional[int]): Quantidade máxima de lotes em andamento.
+            batch_size (Optional[int]): Linhas por tarefa. Se None, adapta
+            os lotes ao custo de cada linha.
+
+        Yields:
+            str: O cabeçalho e as linhas criptografadas, com quebra de linha.
+        """
+        return iter_encrypt_lines(
+            lines,
+            self.context,
+            self.line_workers,
+            self.backend,
+            total,
+            on_progress,
+            cipher=self.cipher,
+            window=window,
+            batch_size=batch_size,
+        )
+
+    def encrypt_stream(
+        self,
+        source: BinaryIO,
+        target: BinaryIO,
+        chunk_size: int = CHUNK_SIZE,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Criptografa um fluxo binário em blocos.
+
+        Returns:
+            int: Quantidade de blocos escritos.
+        """
+        return encrypt_stream(
+            source,
+            target,
+            self.context,
+            self.max_workers,
+            chunk_size,
+            on_progress,
+            cipher=self.cipher,
+        )
+
+    def encrypt_file(
+        self,
+        file_path: str,
+        new_file_path: str,
+        binary: bool = False,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> FileResult:
+        """
+        Criptografa um arquivo em fluxo. O resultado é escrito em um arquivo
+        temporário que só substitui `new_file_path` no fim; em caso de erro,
+        o destino fica intacto.
+
+        Args:
+            file_path (str): Caminho do arquivo original.
+            new_file_path (str): Caminho do arquivo criptografado.
+            binary (bool): Se True, usa o formato em blocos binários.
+            on_progress (Optional[Callable[[int], None]]): Chamada a cada
+            linha ou bloco processado.
+
+        Returns:
+            FileResult: Caminho, formato e quantidade de linhas ou blocos.
+        """
+        counter = _Counter(on_progress)
+        if binary:
+            with (
+                open(file_path, "rb") as source,
+                atomic_write(new_file_path, "wb") as target,
+            ):
+                self.encrypt_stream(
+                    source, cast(BinaryIO, target), on_progress=counter
+                )
+            mode = STREAM_MODE
+        else:
+            write_file(
+                new_file_path,
+                self.iter_lines(
+                    iter_file_lines(file_path), on_progress=counter
+                ),
+            )
+            mode = LINES_MODE
+
+        return FileResult(new_file_path, mode, counter.records)
+
+
+class Decryptor:
+    """
+    Descriptografa mensagens, linhas, bytes e arquivos com um mesmo
+    contexto de chaves, reaproveitando as chaves mestras já derivadas.
+    """
+
+    def __init__(
+        self,
+        key: Union[str, KeyContext],
+        max_workers: Optional[Workers] = None,
+        backend: str = THREAD_BACKEND,
+    ) -> None:
+        """
+        Args:
+            key (Union[str, KeyContext]): Senha ou contexto de chaves.
+            max_workers (Optional[Workers]): Trabalhadores usados nas
+            linhas e nos blocos. Se None, usa os núcleos disponíveis que
+            cabem no orçamento de memória. Com "auto", as linhas ajustam as
+            threads pela vazão medida dentro desse mesmo limite.
+            backend (str): Backend de execução das linhas.
+        """
+        self.context = as_key_context(key)
+        self.max_workers = resolve_workers(max_workers, backend)
+        self.line_workers: Workers = (
+            AUTO_WORKERS if max_workers == AUTO_WORKERS else self.max_workers
+        )
+        self.backend = backend
+
+    def decrypt(self, message: str) -> str:
+        """
+        Descriptografa uma mensagem.
+
+        Raises:
+            InvalidEncryptedFormat: Se a mensagem estiver malformada.
+            InvalidKey: Se a chave estiver incorreta.
+        """
+        return decrypt(message, self.context)
+
+    def decrypt_many(self, tokens: Iterable[str]) -> List[str]:
+        """
+        Descriptografa tokens gerados por encrypt_many.
+
+        Raises:
+            InvalidEncryptedFormat: Se algum token estiver malformado.
+            InvalidKey: Se a chave estiver incorreta.
+        """
+        return decrypt_many(
+            tokens,
+            self.context,
+            max_workers=self.max_workers,
+            backend=self.backend,
+        )
+
+    def decrypt_bytes(self, data: bytes) -> bytes:
+        """Descriptografa bytes gerados por Encryptor.encrypt_bytes."""
+        target = io.BytesIO()
+        self.decrypt_stream(io.BytesIO(data), target)
+        return target.getvalue()
+
+    def iter_lines(
+        self,
+        lines: Iterable[str],
+        total: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        window: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[str]:
+        """
+        Descriptografa as linhas de um arquivo, no formato versionado ou
+        no formato antigo de uma mensagem por linha.
+
+        Yields:
+            str: Linhas descriptografadas terminadas em quebra de linha.
+        """
+        return iter_decrypt_lines(
+            lines,
+            self.context,
+            self.line_workers,
+            self.backend,
+            total,
+            on_progress,
+            window,
+            batch_size,
+        )
+
+    def decrypt_stream(
+        self,
+        source: BinaryIO,
+        target: BinaryIO,
+        on_progress: Optional[Callable[[int], None]] = None,
+        fields: Optional[Dict[str, str]] = None,
+    ) -> int:
+        """
+        Descriptografa um fluxo binário em blocos.
+
+        Returns:
+            int: Quantidade de blocos lidos.
+        """
+        return decrypt_stream(
+            source, target, self.context, self.max_workers, on_progress, fields
+        )
+
+    def decrypt_file(
+        self,
+        file_path: str,
+        new_file_path: str,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> FileResult:
+        """
+        Descriptografa um arquivo em fluxo, detectando o formato (linhas ou
+        blocos) pelo cabeçalho. O resultado é escrito em um arquivo
+        temporário que só substitui `new_file_path` no fim; em caso de erro,
+        o destino fica intacto.
+
+        Args:
+            file_path (str): Caminho do arquivo criptografado.
+            new_file_path (str): Caminho do arquivo descriptografado.
+            on_progress (Optional[Callable[[int], None]]): Chamada a cada
+            linha ou bloco processado.
+
+        Returns:
+            FileResult: Caminho, formato e quantidade de linhas ou blocos.
+
+        Raises:
+            InvalidEncryptedFormat: Se o arquivo estiver malformado.
+            InvalidKey: Se a chave estiver incorreta.
+        """
+        counter = _Counter(on_progress)
+        if is_stream_file(file_path):
+            with (
+                open(file_path, "rb") as source,
+                atomic_write(new_file_path, "wb") as target,
+            ):
+                self.decrypt_stream(source, cast(BinaryIO, target), counter)
+            mode = STREAM_MODE
+        else:
+            write_file(
+                new_file_path,
+                self.iter_lines(
+                    iter_file_lines(file_path), on_progress=counter
+                ),
+            )
+            mode = LINES_MODE
+
+        return FileResult(new_file_path, mode, counter.records)
@@ -0,0 +1,357 @@
+"""Módulo responsável pelos backends de execução do processamento de linhas
+
+O backend "thread" usa um ThreadPoolExecutor e é o padrão. O backend
+"process" envia lotes grandes de linhas para processos trabalhadores através
+de memória compartilhada, evitando serializar cada linha individualmente e
+escapando do GIL no trabalho de base64, codificação e divisão de strings.
+
+As threads também recebem lotes de linhas. Com linhas curtas e a chave já
+derivada, criar um futuro por linha custa tanto quanto a criptografia;
+BatchSizer mede o custo de cada linha e aumenta os lotes até que cada
+tarefa dure cerca de TARGET_TASK_SECONDS.
+
+Layout de um lote na memória compartilhada:
+
+    <quantidade: 8 bytes><offsets: (quantidade + 1) * 8 bytes><dados UTF-8>
+"""
+
+import math
+import struct
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+
+from encryptdef.kdf import ScryptParams, scrypt_maxmem
+from encryptdef.template import TEMPLATE_TYPE_ERROR
+
+# O multiprocessing só é importado quando o backend de processos é usado
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Future
+    from multiprocessing.shared_memory import SharedMemory
+
+THREAD_BACKEND = "thread"
+PROCESS_BACKEND = "process"
+BACKENDS = (THREAD_BACKEND, PROCESS_BACKEND)
+
+BATCH_SIZE = 4096
+
+# Duração desejada de uma tarefa do backend de threads: longa o bastante
+# para diluir o custo de criar o futuro e curta o bastante para que todas
+# as threads recebam trabalho
+TARGET_TASK_SECONDS = 0.002
+
+# Peso da última medição na média móvel do custo por linha
+COST_SMOOTHING = 0.3
+
+# Memória de um trabalhador, usada para saber quantos cabem no orçamento. As
+# threads dividem o processo e guardam apenas as linhas e os blocos da
+# janela; um processo carrega o próprio interpretador e pode derivar uma
+# chave com Scrypt.
+THREAD_WORKER_MEMORY = 1024 * 1024
+PROCESS_WORKER_MEMORY = 32 * 1024 * 1024
+
+_COUNT = struct.Struct("<Q")
+
+
+def pack_batch(items: Sequence[str]) -> bytes:
+    """
+    Serializa um lote de strings em um único bloco de bytes.
+
+    Args:
+        items (Sequence[str]): Strings do lote.
+
+    Returns:
+        bytes: O lote serializado.
+    """
+    encoded = [item.encode("utf-8") for item in items]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    return (
+        _COUNT.pack(len(encoded))
+        + struct.pack(f"<{len(offsets)}Q", *offsets)
+        + b"".join(encoded)
+    )
+
+
+def unpack_batch(buffer: memoryview) -> List[str]:
+    """
+    Lê um lote de strings serializado por pack_batch.
+
+    Args:
+        buffer (memoryview): Bloco de bytes com o lote.
+
+    Returns:
+        List[str]: Strings do lote.
+    """
+    (count,) = _COUNT.unpack_from(buffer)
+    offsets = struct.unpack_from(f"<{count + 1}Q", buffer, _COUNT.size)
+    start = _COUNT.size + (count + 1) * 8
+
+    data = bytes(buffer[slice(start, start + offsets[-1])])
+    return [
+        data[begin:end].decode("utf-8")
+        for begin, end in zip(offsets, offsets[1:])
+    ]
+
+
+def _write_shared(data: bytes) -> "SharedMemory":
+    """Cria um bloco de memória compartilhada contendo os dados."""
+    from multiprocessing import shared_memory  # pylint: disable=C0415
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    cast(memoryview, shm.buf)[: len(data)] = data
+    return shm
+
+
+def _read_shared(name: str, unlink: bool) -> List[str]:
+    """Lê um lote da memória compartilhada e libera o bloco."""
+    from multiprocessing import shared_memory  # pylint: disable=C0415
+
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return unpack_batch(cast(memoryview, shm.buf))
+    finally:
+        shm.close()
+        if unlink:
+            shm.unlink()
+
+
+def run_batch(
+    process_line_func: Callable[[str, Any], Any], key: Any, name: str
+) -> Tuple[str, Optional[type]]:
+    """
+    Processa no processo trabalhador um lote lido da memória compartilhada.
+
+    Args:
+        process_line_func (Callable[[str, Any], Any]): Função para processar
+        cada linha.
+        key (Any): Senha ou chave derivada.
+        name (str): Nome do bloco de memória compartilhada com o lote.
+
+    Returns:
+        Tuple[str, Optional[type]]: O nome do bloco com os resultados e, caso
+        algum resultado não seja string, o seu tipo.
+    """
+    results = []
+    for line in _read_shared(name, unlink=False):
+        result = process_line_func(line, key)
+        if not isinstance(result, str):
+            return "", type(result)
+        results.append(result)
+
+    shm = _write_shared(pack_batch(results))
+    shm.close()
+    return shm.name, None
+
+
+def worker_memory(backend: str) -> int:
+    """
+    Memória usada por um trabalhador do backend, em bytes.
+
+    Args:
+        backend (str): "thread" ou "process".
+
+    Returns:
+        int: Bytes por trabalhador.
+    """
+    if backend == PROCESS_BACKEND:
+        return PROCESS_WORKER_MEMORY + scrypt_maxmem(ScryptParams())
+    return THREAD_WORKER_MEMORY
+
+
+def batch_size_for(total: Optional[int], max_workers: int) -> int:
+    """
+    Calcula o tamanho dos lotes enviados aos processos.
+
+    Args:
+        total (Optional[int]): Quantidade de linhas, se conhecida.
+        max_workers (int): Número máximo de processos.
+
+    Returns:
+        int: Lotes menores que BATCH_SIZE quando há poucas linhas por
+        processo, para que todos os processos recebam trabalho.
+    """
+    if total is None:
+        return BATCH_SIZE
+    return max(1, min(BATCH_SIZE, math.ceil(total / (max_workers * 4))))
+
+
+def batched(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Agrupa as linhas em listas de até `size` elementos."""
+    iterator = iter(lines)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class BatchSizer:
+    """
+    Tamanho adaptativo dos lotes de linhas: começa com uma linha por
+    tarefa e, a cada lote concluído, ajusta o tamanho pela média móvel do
+    custo por linha para que uma tarefa dure cerca de `target` segundos.
+
+    Args:
+        limit (int): Tamanho máximo de um lote.
+        target (float): Duração desejada de uma tarefa, em segundos.
+    """
+
+    def __init__(
+        self, limit: int = BATCH_SIZE, target: float = TARGET_TASK_SECONDS
+    ) -> None:
+        self.limit = max(1, limit)
+        self.target = target
+        self.size = 1
+        self.item_cost: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, items: int, elapsed: float) -> None:
+        """
+        Registra um lote concluído e recalcula o tamanho dos próximos.
+
+        Args:
+            items (int): Linhas do lote.
+            elapsed (float): Duração do lote, em segundos.
+        """
+        cost = elapsed / max(1, items)
+        with self._lock:
+            if self.item_cost is None:
+                self.item_cost = cost
+            else:
+                self.item_cost += COST_SMOOTHING * (cost - self.item_cost)
+            size = int(self.target / max(self.item_cost, 1e-9))
+            self.size = max(1, min(self.limit, size))
+
+    def batches(self, lines: Iterable[str]) -> Iterator[List[str]]:
+        """Agrupa as linhas em lotes do tamanho atual."""
+        iterator = iter(lines)
+        while batch := list(islice(iterator, self.size)):
+            yield batch
+
+
+def run_thread_batch(
+    process_line_func: Callable[[str, Any], Any],
+    key: Any,
+    batch: List[str],
+    sizer: Optional[BatchSizer] = None,
+) -> List[Any]:
+    """
+    Processa um lote de linhas em uma thread trabalhadora.
+
+    Args:
+        process_line_func (Callable[[str, Any], Any]): Função para
+        processar cada linha.
+        key (Any): Senha, contexto de chaves ou chave derivada.
+        batch (List[str]): Linhas do lote.
+        sizer (Optional[BatchSizer]): Recebe a duração do lote, se os
+        lotes forem adaptativos.
+
+    Returns:
+        List[Any]: Os resultados, na ordem das linhas.
+    """
+    start = time.perf_counter()
+    results = [process_line_func(line, key) for line in batch]
+    if sizer is not None:
+        sizer.record(len(batch), time.perf_counter() - start)
+    return results
+
+
+def _collect(
+    shm: "SharedMemory",
+    future: "Future[Tuple[str, Optional[type]]]",
+) -> List[str]:
+    """Aguarda um lote, libera a sua entrada e lê os resultados."""
+    try:
+        name, invalid_type = future.result()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    if invalid_type is not None:
+        if name:
+            _read_shared(name, unlink=True)
+        raise TypeError(TEMPLATE_TYPE_ERROR % {invalid_type})
+
+    return _read_shared(name, unlink=True)
+
+
+def iter_batches_in_processes(
+    lines: Iterable[str],
+    key: Any,
+    process_line_func: Callable[[str, Any], Any],
+    max_workers: int,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[List[str]]:
+    """
+    Processa as linhas em lotes usando um ProcessPoolExecutor, mantendo no
+    máximo 2 * max_workers lotes em andamento.
+
+    Args:
+        lines (Iterable[str]): Linhas já sem a quebra de linha final.
+        key (Any): Senha ou chave derivada.
+        process_line_func (Callable[[str, Any], Any]): Função para processar
+        cada linha. Precisa ser definida no nível do módulo.
+        max_workers (int): Número máximo de processos.
+        batch_size (int): Quantidade de linhas por lote.
+
+    Yields:
+        List[str]: Lotes de linhas processadas, na ordem original.
+
+    Raises:
+        TypeError: Se a função retornar algo diferente de string.
+    """
+    window = max_workers * 2
+    from concurrent.futures import (  # pylint: disable=C0415
+        ProcessPoolExecutor,
+    )
+
+    pending: Deque[
+        Tuple["SharedMemory", "Future[Tuple[str, Optional[type]]]"]
+    ] = deque()
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for batch in batched(lines, batch_size):
+                    shm = _write_shared(pack_batch(batch))
+                    future = executor.submit(
+                        run_batch, process_line_func, key, shm.name
+                    )
+                    pending.append((shm, future))
+
+                    # Libera em ordem os lotes concluídos do início da janela
+                    while len(pending) >= window or (
+                        pending and pending[0][1].done()
+                    ):
+                        yield _collect(*pending.popleft())
+
+                while pending:
+                    yield _collect(*pending.popleft())
+            except BaseException:
+                # Cancela os lotes que ainda não começaram após um erro
+                executor.shutdown(cancel_futures=True)
+                raise
+
+    finally:
+        # Libera as entradas e os resultados não lidos após um erro
+        for shm, future in pending:
+            shm.close()
+            shm.unlink()
+            if not future.cancelled() and future.exception() is None:
+                name, _ = future.result()
+                if name:
+                    _read_shared(name, unlink=True)
@@ -0,0 +1,403 @@
+"""Módulo responsável pela criptografia de muitos valores pequenos de uma vez
+
+encrypt_many deriva a chave mestra e uma única subchave por chamada, em vez
+de uma por valor, e gera os nonces a partir de um prefixo aleatório e de um
+contador, sem chamar o gerador aleatório para cada valor. Cada valor vira um
+token compacto e independente, que carrega os campos do cabeçalho em binário
+e pode ser descriptografado sozinho, por decrypt_many ou por decrypt:
+
+    ed2.<base64url(<campos da chave><nonce: 12 bytes><tag: 16 bytes><texto>)>
+
+Os campos da chave são o KDF (com o salt e os parâmetros do Scrypt), o salt
+do HKDF, o valor de verificação da chave e o cifrador, e são autenticados
+como dados associados. Tokens da mesma chamada compartilham esses campos,
+então decrypt_many deriva cada subchave uma única vez.
+
+Lotes grandes são divididos entre trabalhadores, em threads ou processos.
+"""
+
+import math
+import struct
+from base64 import b64decode, b64encode, urlsafe_b64decode, urlsafe_b64encode
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from itertools import accumulate, chain
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from Cryptodome.Random import get_random_bytes
+
+from encryptdef.backends import PROCESS_BACKEND, THREAD_BACKEND
+from encryptdef.ciphers import (
+    AES_GCM,
+    CHACHA20_POLY1305,
+    DEFAULT_CIPHER,
+    cipher_from_fields,
+    new_cipher,
+    resolve_cipher,
+)
+from encryptdef.exceptions import InvalidEncryptedFormat, InvalidKey
+from encryptdef.header import parse_header
+from encryptdef.kdf import KEY_CHECK_SIZE, SALT_SIZE, ScryptParams
+from encryptdef.keys import RAW_KDF, KeyContext, as_key_context
+from encryptdef.stream import NONCE_PREFIX_SIZE, TAG_SIZE, frame_nonce
+from encryptdef.template import (
+    TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT,
+    TEMPLATE_INVALID_KEY,
+)
+
+TOKEN_PREFIX = "ed2."
+
+NONCE_SIZE = NONCE_PREFIX_SIZE + 8
+
+T = TypeVar("T")
+
+# Abaixo desta quantidade de valores, o lote é processado sem trabalhadores
+PARALLEL_THRESHOLD = 2048
+
+# Identificadores binários do KDF e do cifrador
+_KDF_IDS = {RAW_KDF: 0, "scrypt": 1}
+_CIPHER_IDS = {AES_GCM: 0, CHACHA20_POLY1305: 1}
+_KDF_NAMES = {kdf_id: name for name, kdf_id in _KDF_IDS.items()}
+_CIPHER_NAMES = {cipher_id: name for name, cipher_id in _CIPHER_IDS.items()}
+
+_KDF_ID = struct.Struct(">B")
+_SCRYPT_PARAMS = struct.Struct(">BII")
+
+
+def is_token(value: str) -> bool:
+    """
+    Verifica se o valor é um token gerado por encrypt_many.
+
+    Args:
+        value (str): Valor criptografado.
+
+    Returns:
+        bool: True se o valor começar com o prefixo dos tokens.
+    """
+    return value.startswith(TOKEN_PREFIX)
+
+
+def pack_key_fields(fields: Dict[str, str]) -> bytes:
+    """
+    Converte os campos de um cabeçalho no bloco binário dos tokens.
+
+    Args:
+        fields (Dict[str, str]): Campos gerados por KeyContext.new_key, com
+        o campo "cipher".
+
+    Returns:
+        bytes: Os campos da chave em binário.
+    """
+    data = _KDF_ID.pack(_KDF_IDS[fields["kdf"]])
+    if fields["kdf"] != RAW_KDF:
+        n, r, p = (int(fields[name]) for name in ("n", "r", "p"))
+        data += _SCRYPT_PARAMS.pack(int(math.log2(n)), r, p)
+        data += b64decode(fields["salt"])
+
+    return (
+        data
+        + b64decode(fields["hkdf"])
+        + b64decode(fields["kcv"])
+        + bytes([_CIPHER_IDS[fields["cipher"]]])
+    )
+
+
+def key_fields_size(data: bytes) -> int:
+    """
+    Calcula o tamanho do bloco de campos da chave pelo seu primeiro byte,
+    sem ler os campos.
+
+    Args:
+        data (bytes): Token decodificado.
+
+    Returns:
+        int: O tamanho do bloco.
+
+    Raises:
+        InvalidEncryptedFormat: Se o KDF for desconhecido.
+    """
+    try:
+        kdf = _KDF_NAMES[data[0]]
+    except (IndexError, KeyError) as e:
+        raise InvalidEncryptedFormat(
+            TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+        ) from e
+
+    size = _KDF_ID.size + SALT_SIZE + KEY_CHECK_SIZE + 1
+    if kdf != RAW_KDF:
+        size += _SCRYPT_PARAMS.size + SALT_SIZE
+    return size
+
+
+def unpack_key_fields(key_fields: bytes) -> Dict[str, str]:
+    """
+    Lê o bloco binário dos campos da chave de um token.
+
+    Args:
+        key_fields (bytes): Bloco com o tamanho dado por key_fields_size.
+
+    Returns:
+        Dict[str, str]: Os campos no formato do cabeçalho.
+
+    Raises:
+        InvalidEncryptedFormat: Se o bloco estiver malformado.
+    """
+    if len(key_fields) != key_fields_size(key_fields):
+        raise InvalidEncryptedFormat(TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT)
+
+    fields = {"kdf": _KDF_NAMES[key_fields[0]]}
+    offset = _KDF_ID.size
+    sizes = [("hkdf", SALT_SIZE), ("kcv", KEY_CHECK_SIZE)]
+    if fields["kdf"] != RAW_KDF:
+        log_n, r, p = _SCRYPT_PARAMS.unpack_from(key_fields, offset)
+        offset += _SCRYPT_PARAMS.size
+        fields.update(n=str(2**log_n), r=str(r), p=str(p))
+        sizes.insert(0, ("salt", SALT_SIZE))
+
+    for name, size in sizes:
+        end = offset + size
+        fields[name] = b64encode(key_fields[offset:end]).decode()
+        offset = end
+
+    try:
+        fields["cipher"] = _CIPHER_NAMES[key_fields[offset]]
+    except KeyError as e:
+        raise InvalidEncryptedFormat(
+            TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+        ) from e
+
+    return fields
+
+
+def seal_values(
+    key: bytes,
+    cipher_name: str,
+    key_fields: bytes,
+    nonce_prefix: bytes,
+    start: int,
+    values: Sequence[str],
+) -> List[str]:
+    """
+    Criptografa uma parte do lote. Precisa estar no nível do módulo para ser
+    enviada ao backend de processos.
+
+    Args:
+        key (bytes): Subchave do lote.
+        cipher_name (str): Identificador do cifrador.
+        key_fields (bytes): Campos da chave, gravados em cada token.
+        nonce_prefix (bytes): Prefixo aleatório dos nonces do lote.
+        start (int): Posição do primeiro valor no lote, usada como contador.
+        values (Sequence[str]): Valores a serem criptografados.
+
+    Returns:
+        List[str]: Os tokens, na ordem dos valores.
+    """
+    tokens = []
+    for index, value in enumerate(values, start):
+        nonce = frame_nonce(nonce_prefix, index)
+        cipher = new_cipher(cipher_name, key, nonce)
+        cipher.update(key_fields)
+        cipher_text, tag = cipher.encrypt_and_digest(value.encode("utf-8"))
+        tokens.append(
+            TOKEN_PREFIX
+            + urlsafe_b64encode(key_fields + nonce + tag + cipher_text)
+            .rstrip(b"=")
+            .decode("ascii")
+        )
+    return tokens
+
+
+def _decode_token(token: str) -> bytes:
+    """Decodifica o base64url de um token, sem o prefixo."""
+    if not is_token(token):
+        raise InvalidEncryptedFormat(TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT)
+
+    body = token.removeprefix(TOKEN_PREFIX).strip()
+    try:
+        return urlsafe_b64decode(body + "=" * (-len(body) % 4))
+    except ValueError as e:
+        raise InvalidEncryptedFormat(
+            TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+        ) from e
+
+
+def open_tokens(
+    keys: Dict[bytes, Tuple[bytes, str]],
+    tokens: Sequence[Tuple[int, bytes]],
+) -> List[str]:
+    """
+    Descriptografa uma parte do lote com as subchaves já derivadas. Precisa
+    estar no nível do módulo para ser enviada ao backend de processos.
+
+    Args:
+        keys (Dict[bytes, Tuple[bytes, str]]): Subchave e cifrador de cada
+        bloco de campos da chave.
+        tokens (Sequence[Tuple[int, bytes]]): Tamanho do bloco de campos e
+        token decodificado.
+
+    Returns:
+        List[str]: Os valores descriptografados, na ordem dos tokens.
+
+    Raises:
+        InvalidEncryptedFormat: Se algum token estiver malformado.
+        InvalidKey: Se algum token não for autenticado.
+    """
+    values = []
+    for fields_size, data in tokens:
+        key_fields = data[:fields_size]
+        key, cipher_name = keys[key_fields]
+        nonce_end = fields_size + NONCE_SIZE
+        tag_end = nonce_end + TAG_SIZE
+        if len(data) < tag_end:
+            raise InvalidEncryptedFormat(
+                TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+            )
+
+        cipher = new_cipher(cipher_name, key, data[fields_size:nonce_end])
+        cipher.update(key_fields)
+        try:
+            plain = cipher.decrypt_and_verify(
+                data[tag_end:], data[nonce_end:tag_end]
+            )
+            values.append(plain.decode("utf-8"))
+        except ValueError as e:
+            raise InvalidKey(TEMPLATE_INVALID_KEY) from e
+    return values
+
+
+def _new_executor(backend: str, max_workers: int) -> Executor:
+    """Cria o pool de trabalhadores do backend informado."""
+    if backend == PROCESS_BACKEND:
+        from concurrent.futures import (  # pylint: disable=C0415
+            ProcessPoolExecutor,
+        )
+
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def _split(items: Sequence[T], max_workers: int) -> Iterator[Sequence[T]]:
+    """Divide o lote em cerca de quatro partes por trabalhador."""
+    size = max(1, math.ceil(len(items) / (max_workers * 4)))
+    for start in range(0, len(items), size):
+        yield items[slice(start, start + size)]
+
+
+def encrypt_many(
+    values: Iterable[str],
+    password: Union[str, KeyContext],
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+    max_workers: int = 1,
+    backend: str = THREAD_BACKEND,
+) -> List[str]:
+    """
+    Criptografa muitos valores com uma única derivação de chave, gerando um
+    token compacto e independente para cada um.
+
+    Args:
+        values (Iterable[str]): Valores a serem criptografados.
+        password (Union[str, KeyContext]): Senha ou contexto de chaves.
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+        usados ao criar um novo contexto. Se None, usa os parâmetros padrão.
+        cipher (str): Identificador do cifrador ou "auto".
+        max_workers (int): Trabalhadores usados em lotes a partir de
+        PARALLEL_THRESHOLD valores.
+        backend (str): "thread" ou "process".
+
+    Returns:
+        List[str]: Os tokens, na ordem dos valores.
+    """
+    values = list(values)
+    cipher = resolve_cipher(cipher)
+    header, key = as_key_context(password, params).new_key({"cipher": cipher})
+    seal = partial(
+        seal_values,
+        key,
+        cipher,
+        pack_key_fields(parse_header(header)),
+        get_random_bytes(NONCE_PREFIX_SIZE),
+    )
+
+    if max_workers <= 1 or len(values) < PARALLEL_THRESHOLD:
+        return seal(0, values)
+
+    chunks = list(_split(values, max_workers))
+    starts = accumulate((len(chunk) for chunk in chunks), initial=0)
+    with _new_executor(backend, max_workers) as executor:
+        return list(chain.from_iterable(executor.map(seal, starts, chunks)))
+
+
+def decrypt_many(
+    tokens: Iterable[str],
+    password: Union[str, KeyContext],
+    max_workers: int = 1,
+    backend: str = THREAD_BACKEND,
+) -> List[str]:
+    """
+    Descriptografa tokens gerados por encrypt_many, derivando a subchave de
+    cada lote de origem uma única vez.
+
+    Args:
+        tokens (Iterable[str]): Tokens a serem descriptografados, de um ou
+        mais lotes.
+        password (Union[str, KeyContext]): Senha ou contexto de chaves.
+        max_workers (int): Trabalhadores usados em lotes a partir de
+        PARALLEL_THRESHOLD tokens.
+        backend (str): "thread" ou "process".
+
+    Returns:
+        List[str]: Os valores, na ordem dos tokens.
+
+    Raises:
+        InvalidEncryptedFormat: Se algum token estiver malformado.
+        InvalidKey: Se a chave estiver incorreta.
+    """
+    context = as_key_context(password)
+    keys: Dict[bytes, Tuple[bytes, str]] = {}
+    decoded = []
+
+    for token in tokens:
+        data = _decode_token(token)
+        fields_size = key_fields_size(data)
+        key_fields = data[:fields_size]
+        if key_fields not in keys:
+            fields = unpack_key_fields(key_fields)
+            keys[key_fields] = (
+                context.key_from_fields(fields),
+                cipher_from_fields(fields),
+            )
+        decoded.append((fields_size, data))
+
+    if max_workers <= 1 or len(decoded) < PARALLEL_THRESHOLD:
+        return open_tokens(keys, decoded)
+
+    with _new_executor(backend, max_workers) as executor:
+        chunks = executor.map(
+            partial(open_tokens, keys), _split(decoded, max_workers)
+        )
+        return list(chain.from_iterable(chunks))
+
+
+def decrypt_token(token: str, password: Union[str, KeyContext]) -> str:
+    """
+    Descriptografa um único token gerado por encrypt_many.
+
+    Args:
+        token (str): O token.
+        password (Union[str, KeyContext]): Senha ou contexto de chaves.
+
+    Returns:
+        str: O valor descriptografado.
+    """
+    return decrypt_many([token], password)[0]
@@ -0,0 +1,204 @@
+"""Módulo responsável pelo registro de cifradores autenticados
+
+Cada texto criptografado grava o identificador do cifrador no campo
+"cipher" do cabeçalho. Cabeçalhos sem esse campo usam AES GCM.
+
+O modo "auto" mede os cifradores registrados na primeira vez em que é
+usado e guarda o mais rápido desta máquina em CACHE_DIR, evitando repetir
+a medição a cada execução.
+
+O Cryptodome só é importado quando um cifrador é criado, para não pesar na
+inicialização da linha de comando.
+"""
+
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from encryptdef.exceptions import InvalidEncryptedFormat
+from encryptdef.resources import host_id
+from encryptdef.settings import CACHE_DIR
+from encryptdef.template import TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+
+AES_GCM = "aes-gcm"
+CHACHA20_POLY1305 = "chacha20-poly1305"
+AUTO_CIPHER = "auto"
+DEFAULT_CIPHER = AES_GCM
+
+CIPHER_CACHE_FILE = "cipher.json"
+
+# Tamanho dos dados e repetições usados para medir cada cifrador
+BENCHMARK_SIZE = 256 * 1024
+BENCHMARK_ROUNDS = 3
+
+
+def _new_aes_gcm(key: bytes, nonce: Optional[bytes] = None) -> Any:
+    """Cria um cifrador AES GCM."""
+    from Cryptodome.Cipher import AES  # pylint: disable=C0415
+
+    return AES.new(key, AES.MODE_GCM, nonce=nonce)
+
+
+def _new_chacha20_poly1305(key: bytes, nonce: Optional[bytes] = None) -> Any:
+    """Cria um cifrador ChaCha20-Poly1305."""
+    from Cryptodome.Cipher import (  # pylint: disable=C0415
+        ChaCha20_Poly1305,
+    )
+
+    return ChaCha20_Poly1305.new(key=key, nonce=nonce)
+
+
+CIPHERS: Dict[str, Callable[..., Any]] = {
+    AES_GCM: _new_aes_gcm,
+    CHACHA20_POLY1305: _new_chacha20_poly1305,
+}
+
+CIPHER_CHOICES = [*CIPHERS, AUTO_CIPHER]
+
+_fastest_cipher: Optional[str] = None
+
+
+def new_cipher(name: str, key: bytes, nonce: Optional[bytes] = None) -> Any:
+    """
+    Cria um cifrador autenticado registrado.
+
+    Args:
+        name (str): Identificador do cifrador em CIPHERS.
+        key (bytes): Chave com KEY_SIZE bytes.
+        nonce (Optional[bytes]): Nonce do cifrador. Se None, um nonce
+        aleatório é gerado.
+
+    Returns:
+        Any: Objeto com encrypt_and_digest, decrypt_and_verify e update.
+
+    Raises:
+        InvalidEncryptedFormat: Se o cifrador não existir.
+    """
+    try:
+        factory = CIPHERS[name]
+    except KeyError as e:
+        raise InvalidEncryptedFormat(
+            TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+        ) from e
+
+    return factory(key, nonce)
+
+
+def cipher_from_fields(fields: Dict[str, str]) -> str:
+    """
+    Lê o identificador do cifrador dos campos do cabeçalho.
+
+    Args:
+        fields (Dict[str, str]): Campos lidos do cabeçalho.
+
+    Returns:
+        str: O identificador do cifrador, AES GCM se o campo não existir.
+
+    Raises:
+        InvalidEncryptedFormat: Se o cifrador não existir.
+    """
+    name = fields.get("cipher", AES_GCM)
+    if name not in CIPHERS:
+        raise InvalidEncryptedFormat(TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT)
+
+    return name
+
+
+def benchmark_ciphers(
+    size: int = BENCHMARK_SIZE, rounds: int = BENCHMARK_ROUNDS
+) -> Dict[str, float]:
+    """
+    Mede o tempo de criptografia de cada cifrador registrado.
+
+    Args:
+        size (int): Quantidade de bytes criptografados por rodada.
+        rounds (int): Quantidade de rodadas; vale o menor tempo.
+
+    Returns:
+        Dict[str, float]: Menor tempo em segundos de cada cifrador.
+    """
+    key = bytes(32)
+    data = bytes(size)
+    timings = {}
+
+    for name in CIPHERS:
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            new_cipher(name, key).encrypt_and_digest(data)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+
+    return timings
+
+
+def _load_cached_cipher(cache_file: str) -> Optional[str]:
+    """Lê o cifrador mais rápido guardado para esta máquina."""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as file_:
+            cached = json.load(file_)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        isinstance(cached, dict)
+        and cached.get("host") == host_id()
+        and cached.get("cipher") in CIPHERS
+    ):
+        return cached["cipher"]
+    return None
+
+
+def _save_cached_cipher(cache_file: str, name: str) -> None:
+    """Guarda o cifrador mais rápido, ignorando diretórios sem escrita."""
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as file_:
+            json.dump({"host": host_id(), "cipher": name}, file_)
+    except OSError:
+        pass
+
+
+def fastest_cipher() -> str:
+    """
+    Retorna o cifrador mais rápido desta máquina, medindo apenas na
+    primeira vez e reaproveitando o resultado guardado em CACHE_DIR.
+
+    Returns:
+        str: O identificador do cifrador mais rápido.
+    """
+    global _fastest_cipher  # pylint: disable=W0603
+
+    if _fastest_cipher is None:
+        cache_file = os.path.join(CACHE_DIR, CIPHER_CACHE_FILE)
+        name = _load_cached_cipher(cache_file)
+        if name is None:
+            timings = benchmark_ciphers()
+            name = min(timings, key=timings.__getitem__)
+            _save_cached_cipher(cache_file, name)
+        _fastest_cipher = name
+
+    return _fastest_cipher
+
+
+def resolve_cipher(name: str) -> str:
+    """
+    Resolve o modo "auto" para o cifrador mais rápido desta máquina.
+
+    Args:
+        name (str): Identificador do cifrador ou "auto".
+
+    Returns:
+        str: O identificador de um cifrador registrado.
+
+    Raises:
+        ValueError: Se o cifrador não existir.
+    """
+    if name == AUTO_CIPHER:
+        return fastest_cipher()
+
+    if name not in CIPHERS:
+        raise ValueError(f"cifrador '{name}' não existe")
+
+    return name
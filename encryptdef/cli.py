@@ -1,12 +1,37 @@
 """Módulo responsável por todos os comandos CLI"""
 
-from importlib.metadata import version
-from typing import List, Optional
+import os
+import sys
+from typing import Any, List, Optional
 
 import rich_click as click
 
-from encryptdef import core
-from encryptdef.template import TEMPLATE_DECRYPT_KEY, TEMPLATE_ENCRYPT_KEY
+from encryptdef import core, kdf, resources, tuner
+from encryptdef.backends import BACKENDS, THREAD_BACKEND
+from encryptdef.ciphers import CIPHER_CHOICES, DEFAULT_CIPHER
+from encryptdef.keys import KEY_FORMATS, PASSWORD_KEY_FORMAT
+from encryptdef.output import (
+    OUTPUT_FORMATS,
+    RAW_OUTPUT,
+    OutputOptions,
+    resolve_output_format,
+)
+from encryptdef.settings import (
+    AGENT_SOCKET_ENV,
+    SOCKET_PATH,
+    console,
+    err_console,
+)
+from encryptdef.template import (
+    TEMPLATE_AGENT_KEY,
+    TEMPLATE_AGENT_KEY_ADDED,
+    TEMPLATE_AGENT_NOT_LOCKED,
+    TEMPLATE_AGENT_STATUS,
+    TEMPLATE_CALIBRATE_RESULT,
+    TEMPLATE_DECRYPT_KEY,
+    TEMPLATE_ENCRYPT_KEY,
+    TEMPLATE_SERVE_LISTENING,
+)
 from encryptdef.utils import assigning_a_name_file
 
 # Configurações do Rich Click
@@ -18,8 +43,102 @@ click.rich_click.SHOW_METAVARS_COLUMN = False
 click.rich_click.APPEND_METAVARS_HELP = True
 
 
+def _parse_max_memory(
+    _ctx: click.Context, _param: click.Parameter, value: Optional[str]
+) -> Optional[int]:
+    """Converte o --max-memory em bytes."""
+    if value is None:
+        return None
+    try:
+        return resources.parse_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def max_memory_option(function: Any) -> Any:
+    """Opção --max-memory dos comandos que processam arquivos."""
+    return click.option(
+        "--max-memory",
+        envvar="ENCRYPTDEF_MAX_MEMORY",
+        show_envvar=True,
+        default=None,
+        callback=_parse_max_memory,
+        help="Orçamento de memória, como 512M ou 2G, que limita os "
+        "trabalhadores e os Scrypt simultâneos. Padrão: 75% da memória "
+        "disponível, respeitando o limite do cgroup.",
+    )(function)
+
+
+def _parse_workers(
+    _ctx: click.Context, _param: click.Parameter, value: Optional[str]
+) -> Optional[tuner.Workers]:
+    """Converte o --workers em uma quantidade ou em "auto"."""
+    if value is None:
+        return None
+    try:
+        return tuner.parse_workers(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def workers_option(function: Any) -> Any:
+    """Opção --workers dos comandos que processam arquivos."""
+    return click.option(
+        "--workers",
+        envvar="ENCRYPTDEF_WORKERS",
+        show_envvar=True,
+        default=None,
+        callback=_parse_workers,
+        help="Trabalhadores, N ou auto. 'auto' mede o custo de cada "
+        "registro e ajusta as threads durante o processamento, guardando "
+        "a escolha desta máquina. Sem --workers, arquivos grandes "
+        "perguntam no terminal.",
+    )(function)
+
+
+def output_options(
+    output_format: Optional[str],
+    progress_fd: Optional[int],
+    file: Optional[str] = None,
+    no_progress: bool = False,
+) -> OutputOptions:
+    """
+    Monta as opções de saída a partir dos argumentos da linha de comando.
+
+    Args:
+        output_format (Optional[str]): Formato escolhido com --output.
+        progress_fd (Optional[int]): Descritor escolhido com --progress-fd.
+        file (Optional[str]): Arquivo escolhido com --file. Com "-" a saída
+        padrão recebe os dados, então apenas erros são escritos, na saída
+        de erro.
+        no_progress (bool): Se True, não exibe a barra de progresso.
+
+    Returns:
+        OutputOptions: Formato resolvido e descritor do progresso.
+
+    Raises:
+        click.BadParameter: Se o descritor de progresso não estiver aberto.
+    """
+    if progress_fd is not None:
+        try:
+            os.fstat(progress_fd)
+        except OSError as e:
+            raise click.BadParameter(
+                f"o descritor {progress_fd} não está aberto.",
+                param_hint="--progress-fd",
+            ) from e
+
+    if file == core.STDIO_PATH:
+        return OutputOptions(RAW_OUTPUT, progress_fd)
+
+    return OutputOptions(
+        resolve_output_format(output_format), progress_fd, not no_progress
+    )
+
+
 @click.group(invoke_without_command=True)
-@click.version_option(version("encryptdef"))
+# A versão é resolvida apenas quando --version é usado
+@click.version_option(package_name="encryptdef")
 @click.pass_context
 def main(ctx: Optional[click.Context] = None) -> None:
     """Encryptdef
@@ -53,12 +172,125 @@ def main(ctx: Optional[click.Context] = None) -> None:
     required=False,
     help="Caminho para o arquivo contendo a chave de encriptação.",
 )
+@click.option(
+    "--key-format",
+    type=click.Choice(KEY_FORMATS),
+    default=PASSWORD_KEY_FORMAT,
+    show_default=True,
+    help="Formato do --keyfile: senha derivada pelo Scrypt, ou chave bruta "
+    "de 32 bytes (raw, hex ou base64) usada sem derivação.",
+)
 @click.option("--message", required=False, help="Dados para encriptar.")
-@click.option("--file", required=False, help="Arquivo para encriptar.")
+@click.option(
+    "--file",
+    required=False,
+    help="Arquivo para encriptar. Use '-' para ler da entrada padrão e "
+    "escrever na saída padrão.",
+)
+@click.option(
+    "--binary",
+    is_flag=True,
+    default=False,
+    help="Encripta o arquivo em blocos binários com uso de memória constante.",
+)
+@click.option(
+    "--append",
+    is_flag=True,
+    default=False,
+    help="Encripta apenas as linhas novas do arquivo e as acrescenta ao "
+    "arquivo encriptado existente, continuando do último checkpoint.",
+)
+@click.option(
+    "--follow",
+    is_flag=True,
+    default=False,
+    help="Como --append, mas continua acompanhando o arquivo e encripta as "
+    "linhas assim que chegam, inclusive depois de uma rotação.",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(BACKENDS),
+    default=THREAD_BACKEND,
+    show_default=True,
+    help="Backend de execução para arquivos: threads ou processos.",
+)
+@click.option(
+    "--kdf-profile",
+    type=click.Choice(list(kdf.SCRYPT_PROFILES)),
+    default=kdf.DEFAULT_PROFILE,
+    show_default=True,
+    help="Perfil de custo do Scrypt: barato para alto volume, caro para "
+    "backups arquivados.",
+)
+@click.option(
+    "--scrypt-n",
+    type=int,
+    default=None,
+    help="Custo de CPU/memória do Scrypt (potência de 2). Sobrescreve o "
+    "perfil.",
+)
+@click.option(
+    "--scrypt-r",
+    type=int,
+    default=None,
+    help="Tamanho do bloco do Scrypt. Sobrescreve o perfil.",
+)
+@click.option(
+    "--scrypt-p",
+    type=int,
+    default=None,
+    help="Fator de paralelização do Scrypt. Sobrescreve o perfil.",
+)
+@click.option(
+    "--cipher",
+    type=click.Choice(CIPHER_CHOICES),
+    default=DEFAULT_CIPHER,
+    show_default=True,
+    help="Cifrador autenticado. 'auto' mede os cifradores na primeira vez e "
+    "usa o mais rápido desta máquina.",
+)
+@max_memory_option
+@workers_option
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default=None,
+    help="Formato da saída: rich para o terminal, ou raw, json e ndjson para "
+    "scripts, com apenas o resultado na saída padrão. Padrão: rich em um "
+    "terminal e raw caso contrário.",
+)
+@click.option(
+    "--progress-fd",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Descritor de arquivo que recebe o progresso como NDJSON.",
+)
+@click.option(
+    "--no-progress",
+    is_flag=True,
+    default=False,
+    help="Não exibe a barra de progresso no terminal.",
+)
 def encrypt(
     keyfile: Optional[str],
+    key_format: str,
     message: Optional[str],
     file: Optional[str],
+    binary: bool,
+    append: bool,
+    follow: bool,
+    backend: str,
+    kdf_profile: str,
+    scrypt_n: Optional[int],
+    scrypt_r: Optional[int],
+    scrypt_p: Optional[int],
+    cipher: str,
+    max_memory: Optional[int],
+    workers: Optional[tuner.Workers],
+    output_format: Optional[str],
+    progress_fd: Optional[int],
+    no_progress: bool,
 ) -> None:
     """
     Encriptar dados e arquivos.
@@ -66,20 +298,68 @@ def encrypt(
     Args:
         keyfile (Optional[str]): Caminho para o arquivo contendo a chave de
         encriptação.
+        key_format (str): Formato do conteúdo de 'keyfile'.
         message (Optional[str]): Dados para encriptar.
         file (Optional[str]): Arquivo para encriptar.
+        binary (bool): Encripta o arquivo em blocos binários.
+        append (bool): Acrescenta as linhas novas ao arquivo encriptado.
+        follow (bool): Acompanha o arquivo e encripta as linhas que chegam.
+        backend (str): Backend de execução para arquivos.
+        kdf_profile (str): Perfil de custo do Scrypt.
+        scrypt_n (Optional[int]): Custo de CPU/memória do Scrypt.
+        scrypt_r (Optional[int]): Tamanho do bloco do Scrypt.
+        scrypt_p (Optional[int]): Fator de paralelização do Scrypt.
+        cipher (str): Cifrador autenticado ou "auto".
+        max_memory (Optional[int]): Orçamento de memória em bytes.
+        workers (Optional[Workers]): Trabalhadores ou "auto".
+        output_format (Optional[str]): Formato da saída.
+        progress_fd (Optional[int]): Descritor que recebe o progresso.
+        no_progress (bool): Não exibe a barra de progresso.
     """
+    try:
+        params = kdf.resolve_params(kdf_profile, scrypt_n, scrypt_r, scrypt_p)
+    except ValueError as e:
+        raise click.UsageError(str(e)) from e
+
+    if (append or follow) and (
+        binary or message or file in (None, core.STDIO_PATH)
+    ):
+        raise click.UsageError(
+            "Os argumentos --append e --follow exigem um arquivo de texto em "
+            "--file, sem --binary."
+        )
+
+    resources.set_max_memory(max_memory)
+    output = output_options(output_format, progress_fd, file, no_progress)
     key = core.process_keyfile_and_args(
-        keyfile, message, file, TEMPLATE_ENCRYPT_KEY
+        keyfile, message, file, TEMPLATE_ENCRYPT_KEY, key_format, output
     )
 
     if message:
-        core.encrypt_message(message, key)
+        core.encrypt_message(message, key, params, cipher, output)
 
     elif file:
-        new_file = assigning_a_name_file(file, "encrypt-")
-        data_list: List[str] = [file, key, new_file]
-        core.process_file(data_list, core.encrypt)
+        new_file = (
+            core.STDIO_PATH
+            if file == core.STDIO_PATH
+            else assigning_a_name_file(file, "encrypt-")
+        )
+        data_list: List[Any] = [file, key, new_file]
+        success = core.process_file(
+            data_list,
+            core.encrypt,
+            binary=binary,
+            backend=backend,
+            params=params,
+            cipher=cipher,
+            output=output,
+            append=append,
+            follow=follow,
+            workers=workers,
+        )
+        # Scripts dependem do código de saída para detectar a falha
+        if not success and not output.is_rich:
+            sys.exit(1)
 
 
 @main.command()
@@ -88,12 +368,62 @@ def encrypt(
     required=False,
     help="Caminho para o arquivo contendo a chave de decriptação.",
 )
+@click.option(
+    "--key-format",
+    type=click.Choice(KEY_FORMATS),
+    default=PASSWORD_KEY_FORMAT,
+    show_default=True,
+    help="Formato do --keyfile: senha derivada pelo Scrypt, ou chave bruta "
+    "de 32 bytes (raw, hex ou base64) usada sem derivação.",
+)
 @click.option("--message", required=False, help="Dados para decriptar.")
-@click.option("--file", required=False, help="Arquivo para decriptar.")
+@click.option(
+    "--file",
+    required=False,
+    help="Arquivo para decriptar. Use '-' para ler da entrada padrão e "
+    "escrever na saída padrão.",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(BACKENDS),
+    default=THREAD_BACKEND,
+    show_default=True,
+    help="Backend de execução para arquivos: threads ou processos.",
+)
+@max_memory_option
+@workers_option
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default=None,
+    help="Formato da saída: rich para o terminal, ou raw, json e ndjson para "
+    "scripts, com apenas o resultado na saída padrão. Padrão: rich em um "
+    "terminal e raw caso contrário.",
+)
+@click.option(
+    "--progress-fd",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Descritor de arquivo que recebe o progresso como NDJSON.",
+)
+@click.option(
+    "--no-progress",
+    is_flag=True,
+    default=False,
+    help="Não exibe a barra de progresso no terminal.",
+)
 def decrypt(
     keyfile: Optional[str],
+    key_format: str,
     message: Optional[str],
     file: Optional[str],
+    backend: str,
+    max_memory: Optional[int],
+    workers: Optional[tuner.Workers],
+    output_format: Optional[str],
+    progress_fd: Optional[int],
+    no_progress: bool,
 ) -> None:
     """
     Decriptar dados e arquivos.
@@ -101,17 +431,448 @@ def decrypt(
     Args:
         keyfile (Optional[str]): Caminho para o arquivo contendo a chave de
         decriptação.
+        key_format (str): Formato do conteúdo de 'keyfile'.
         message (Optional[str]): Dados para decriptar.
         file (Optional[str]): Arquivo para decriptar.
+        backend (str): Backend de execução para arquivos.
+        max_memory (Optional[int]): Orçamento de memória em bytes.
+        workers (Optional[Workers]): Trabalhadores ou "auto".
+        output_format (Optional[str]): Formato da saída.
+        progress_fd (Optional[int]): Descritor que recebe o progresso.
+        no_progress (bool): Não exibe a barra de progresso.
     """
+    resources.set_max_memory(max_memory)
+    output = output_options(output_format, progress_fd, file, no_progress)
     key = core.process_keyfile_and_args(
-        keyfile, message, file, TEMPLATE_DECRYPT_KEY
+        keyfile, message, file, TEMPLATE_DECRYPT_KEY, key_format, output
     )
 
+    success = True
     if message:
-        core.decrypt_message(message, key)
+        success = core.decrypt_message(message, key, output)
 
     elif file:
-        new_file = assigning_a_name_file(file, "decrypt-")
-        data_list: List[str] = [file, key, new_file]
-        core.process_file(data_list, core.decrypt)
+        new_file = (
+            core.STDIO_PATH
+            if file == core.STDIO_PATH
+            else assigning_a_name_file(file, "decrypt-")
+        )
+        data_list: List[Any] = [file, key, new_file]
+        success = core.process_file(
+            data_list,
+            core.decrypt,
+            backend=backend,
+            output=output,
+            workers=workers,
+        )
+
+    # Scripts dependem do código de saída para detectar a falha
+    if not success and not output.is_rich:
+        sys.exit(1)
+
+
+@main.command()
+@click.option(
+    "--target-ms",
+    type=click.IntRange(min=1),
+    default=100,
+    show_default=True,
+    help="Tempo máximo desejado por derivação de chave, em milissegundos.",
+)
+@click.option(
+    "--scrypt-r",
+    type=click.IntRange(min=1),
+    default=kdf.SCRYPT_R,
+    show_default=True,
+    help="Tamanho do bloco do Scrypt.",
+)
+@click.option(
+    "--scrypt-p",
+    type=click.IntRange(min=1),
+    default=kdf.SCRYPT_P,
+    show_default=True,
+    help="Fator de paralelização do Scrypt.",
+)
+@click.option(
+    "--max-memory-mb",
+    type=click.IntRange(min=1),
+    default=kdf.SCRYPT_MAXMEM_LIMIT // 1024**2,
+    show_default=True,
+    help="Memória máxima por derivação de chave, em MiB.",
+)
+def calibrate(
+    target_ms: int, scrypt_r: int, scrypt_p: int, max_memory_mb: int
+) -> None:
+    """
+    Mede o Scrypt nesta máquina e sugere o maior custo que respeita o
+    tempo alvo.
+
+    Args:
+        target_ms (int): Tempo máximo por derivação, em milissegundos.
+        scrypt_r (int): Tamanho do bloco do Scrypt.
+        scrypt_p (int): Fator de paralelização do Scrypt.
+        max_memory_mb (int): Memória máxima por derivação, em MiB.
+    """
+    params = kdf.calibrate(
+        target_ms / 1000, scrypt_r, scrypt_p, max_memory_mb * 1024**2
+    )
+    console.print(
+        TEMPLATE_CALIBRATE_RESULT
+        % (
+            params.n,
+            params.r,
+            params.p,
+            kdf.scrypt_maxmem(params) // 1024**2,
+            params.n,
+            params.r,
+            params.p,
+        )
+    )
+
+
+@main.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    default=SOCKET_PATH,
+    show_default="$ENCRYPTDEF_SOCKET ou $XDG_RUNTIME_DIR/encryptdef-UID.sock",
+    help="Socket Unix onde o servidor escuta.",
+)
+@click.option(
+    "--stdio",
+    is_flag=True,
+    default=False,
+    help="Atende como co-processo, com JSON-RPC pela entrada e saída padrão, "
+    "em vez do socket.",
+)
+@click.option(
+    "--keyfile",
+    required=False,
+    help="Arquivo com a chave usada nas requisições sem o campo 'password'.",
+)
+@click.option(
+    "--key-format",
+    type=click.Choice(KEY_FORMATS),
+    default=PASSWORD_KEY_FORMAT,
+    show_default=True,
+    help="Formato do --keyfile.",
+)
+@click.option(
+    "--kdf-profile",
+    type=click.Choice(list(kdf.SCRYPT_PROFILES)),
+    default=kdf.DEFAULT_PROFILE,
+    show_default=True,
+    help="Perfil de custo do Scrypt das senhas ao encriptar.",
+)
+@click.option(
+    "--cipher",
+    type=click.Choice(CIPHER_CHOICES),
+    default=DEFAULT_CIPHER,
+    show_default=True,
+    help="Cifrador autenticado ao encriptar.",
+)
+@click.option(
+    "--key-ttl",
+    type=click.FloatRange(min=1),
+    default=300.0,
+    show_default=True,
+    help="Segundos sem uso até uma chave derivada ser descartada da memória.",
+)
+@click.option(
+    "--max-batch",
+    type=click.IntRange(min=1),
+    default=1024,
+    show_default=True,
+    help="Quantidade máxima de requisições agrupadas em um lote.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Threads que processam os lotes. Padrão: núcleos disponíveis.",
+)
+def serve(
+    socket_path: str,
+    stdio: bool,
+    keyfile: Optional[str],
+    key_format: str,
+    kdf_profile: str,
+    cipher: str,
+    key_ttl: float,
+    max_batch: int,
+    workers: Optional[int],
+) -> None:
+    """
+    Servidor local de criptografia com JSON-RPC por socket Unix.
+
+    Mantém as chaves derivadas em memória e agrupa requisições simultâneas
+    em lotes, evitando a partida do interpretador e o Scrypt a cada valor.
+
+    Args:
+        socket_path (str): Caminho do socket Unix.
+        stdio (bool): Atende pela entrada e saída padrão.
+        keyfile (Optional[str]): Arquivo com a chave padrão.
+        key_format (str): Formato do conteúdo de 'keyfile'.
+        kdf_profile (str): Perfil de custo do Scrypt.
+        cipher (str): Cifrador autenticado ou "auto".
+        key_ttl (float): Segundos até uma chave sem uso ser descartada.
+        max_batch (int): Requisições por lote.
+        workers (Optional[int]): Threads que processam os lotes.
+    """
+    import asyncio  # pylint: disable=C0415
+
+    from encryptdef.server import Server  # pylint: disable=C0415
+
+    if key_format != PASSWORD_KEY_FORMAT and not keyfile:
+        raise click.UsageError(
+            "O argumento --key-format exige o argumento --keyfile."
+        )
+
+    key = None
+    if keyfile:
+        try:
+            key = core.load_keyfile(keyfile, key_format)
+        except FileNotFoundError as e:
+            raise click.BadParameter(
+                f"o arquivo '{keyfile}' não existe.", param_hint="--keyfile"
+            ) from e
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--keyfile") from e
+
+    server = Server(
+        key,
+        kdf.SCRYPT_PROFILES[kdf_profile],
+        cipher,
+        key_ttl,
+        max_batch,
+        workers,
+    )
+    target = None if stdio else socket_path
+
+    def ready() -> None:
+        if target is not None:
+            err_console.print(TEMPLATE_SERVE_LISTENING % target)
+
+    try:
+        asyncio.run(server.serve(target, ready))
+    except OSError as e:
+        err_console.print(str(e), style="error")
+        sys.exit(1)
+
+
+@main.group()
+def agent() -> None:
+    """
+    Agente de chaves da sessão, como o ssh-agent.
+
+    Guarda a senha e as chaves derivadas em memória travada, para que os
+    comandos encontrados pela variável ENCRYPTDEF_AGENT_SOCK não perguntem
+    a senha nem executem o Scrypt a cada vez.
+
+    Uso: eval "$(encryptdef agent start)" e depois encryptdef agent add.
+    """
+
+
+@agent.command("start")
+@click.option(
+    "--socket",
+    "socket_path",
+    default=None,
+    help="Socket Unix do agente. Padrão: um diretório temporário novo.",
+)
+@click.option(
+    "--ttl",
+    type=click.FloatRange(min=1),
+    default=3600.0,
+    show_default=True,
+    help="Segundos que a senha fica carregada e que uma chave derivada "
+    "fica em memória sem uso.",
+)
+@click.option(
+    "--max-keys",
+    type=click.IntRange(min=1),
+    default=64,
+    show_default=True,
+    help="Quantidade máxima de chaves derivadas em memória.",
+)
+@click.option(
+    "--foreground",
+    is_flag=True,
+    default=False,
+    help="Atende neste processo, em vez de iniciar o agente em segundo "
+    "plano.",
+)
+def agent_start(
+    socket_path: Optional[str], ttl: float, max_keys: int, foreground: bool
+) -> None:
+    """
+    Inicia o agente e imprime o comando que exporta ENCRYPTDEF_AGENT_SOCK.
+
+    Args:
+        socket_path (Optional[str]): Caminho do socket Unix.
+        ttl (float): Segundos até a senha e as chaves sem uso expirarem.
+        max_keys (int): Quantidade máxima de chaves derivadas em memória.
+        foreground (bool): Atende neste processo.
+    """
+    import shlex  # pylint: disable=C0415
+    import tempfile  # pylint: disable=C0415
+
+    from encryptdef.agent import spawn_agent  # pylint: disable=C0415
+
+    if socket_path is None:
+        directory = tempfile.mkdtemp(prefix="encryptdef-agent-")
+        socket_path = os.path.join(directory, "agent.sock")
+    export = f"{AGENT_SOCKET_ENV}={shlex.quote(socket_path)}; "
+    export += f"export {AGENT_SOCKET_ENV};"
+
+    if foreground:
+        _run_agent(socket_path, ttl, max_keys, export)
+        return
+
+    try:
+        pid = spawn_agent(socket_path, ttl, max_keys)
+    except OSError as e:
+        err_console.print(str(e), style="error")
+        sys.exit(1)
+    click.echo(export)
+    click.echo(f"echo PID do agente: {pid};")
+
+
+def _run_agent(
+    socket_path: str, ttl: float, max_keys: int, export: str
+) -> None:
+    """Atende o agente neste processo até ele ser encerrado."""
+    import asyncio  # pylint: disable=C0415
+
+    from encryptdef.agent import Agent, harden_process  # pylint: disable=C0415
+
+    harden_process()
+    server = Agent(ttl, max_keys)
+    try:
+        asyncio.run(server.serve(socket_path, lambda: click.echo(export)))
+    except OSError as e:
+        err_console.print(str(e), style="error")
+        sys.exit(1)
+    finally:
+        server.store.clear()
+
+    # Remove o diretório temporário criado pelo `agent start`
+    directory = os.path.dirname(socket_path)
+    if os.path.basename(directory).startswith("encryptdef-agent-"):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+
+def agent_socket_option(function: Any) -> Any:
+    """Opção --socket dos comandos que falam com um agente já iniciado."""
+    return click.option(
+        "--socket",
+        "socket_path",
+        envvar=AGENT_SOCKET_ENV,
+        required=True,
+        show_envvar=True,
+        help="Socket Unix do agente.",
+    )(function)
+
+
+def agent_call(socket_path: str, method: str, **params: Any) -> Any:
+    """Executa um método no agente, encerrando com erro se ele falhar."""
+    from encryptdef.agent import AgentClient  # pylint: disable=C0415
+    from encryptdef.exceptions import AgentError  # pylint: disable=C0415
+
+    try:
+        return AgentClient(socket_path).call(method, **params)
+    except AgentError as e:
+        err_console.print(str(e), style="error")
+        sys.exit(1)
+
+
+@agent.command("add")
+@agent_socket_option
+@click.option(
+    "--keyfile",
+    required=False,
+    help="Arquivo com a senha. Se ausente, a senha é perguntada.",
+)
+@click.option(
+    "--ttl",
+    type=click.FloatRange(min=1),
+    default=None,
+    help="Segundos até a senha expirar. Padrão: o --ttl do agente.",
+)
+def agent_add(
+    socket_path: str, keyfile: Optional[str], ttl: Optional[float]
+) -> None:
+    """
+    Carrega a senha no agente, substituindo a anterior.
+
+    Args:
+        socket_path (str): Socket Unix do agente.
+        keyfile (Optional[str]): Arquivo com a senha.
+        ttl (Optional[float]): Segundos até a senha expirar.
+    """
+    password: Optional[str] = None
+    if keyfile:
+        try:
+            password = str(core.load_keyfile(keyfile))
+        except FileNotFoundError as e:
+            raise click.BadParameter(
+                f"o arquivo '{keyfile}' não existe.", param_hint="--keyfile"
+            ) from e
+
+    while not password or password.isspace():
+        password = err_console.input(TEMPLATE_AGENT_KEY, password=True)
+        password = password.strip()
+
+    agent_call(socket_path, "add", password=password, ttl=ttl)
+    status = agent_call(socket_path, "status")
+    err_console.print(TEMPLATE_AGENT_KEY_ADDED % round(status["expires_in"]))
+    if not status["locked"]:
+        err_console.print(TEMPLATE_AGENT_NOT_LOCKED, style="warning")
+
+
+@agent.command("status")
+@agent_socket_option
+def agent_status(socket_path: str) -> None:
+    """
+    Mostra se o agente tem a senha e quantas chaves estão em memória.
+
+    Args:
+        socket_path (str): Socket Unix do agente.
+    """
+    status = agent_call(socket_path, "status")
+    console.print(
+        TEMPLATE_AGENT_STATUS
+        % (
+            socket_path,
+            "sim" if status["password"] else "não",
+            status["keys"],
+            "sim" if status["locked"] else "não",
+        )
+    )
+
+
+@agent.command("clear")
+@agent_socket_option
+def agent_clear(socket_path: str) -> None:
+    """
+    Apaga a senha e as chaves do agente, que continua de pé.
+
+    Args:
+        socket_path (str): Socket Unix do agente.
+    """
+    agent_call(socket_path, "clear")
+
+
+@agent.command("stop")
+@agent_socket_option
+def agent_stop(socket_path: str) -> None:
+    """
+    Apaga a senha e as chaves e encerra o agente.
+
+    Args:
+        socket_path (str): Socket Unix do agente.
+    """
+    agent_call(socket_path, "stop")
@@ -1,16 +1,53 @@
 """Módulo que contém as funções principais da ferramenta"""
 
-import hashlib
+import math
+import os
 import sys
-from base64 import b64decode, b64encode
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, List, Optional, Union
+import threading
+from functools import partial
+from itertools import chain
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sized,
+    Tuple,
+    Union,
+    cast,
+)
 
 import rich_click as click
-from Cryptodome.Cipher import AES
-from Cryptodome.Random import get_random_bytes
-from rich.progress import Progress
 
+from encryptdef.api import (
+    Decryptor,
+    Encryptor,
+    decrypt,
+    encrypt,
+    encrypt_with_key,
+    iter_process_lines,
+)
+from encryptdef.backends import THREAD_BACKEND, worker_memory
+from encryptdef.ciphers import (
+    DEFAULT_CIPHER,
+    cipher_from_fields,
+    resolve_cipher,
+)
+from encryptdef.exceptions import (
+    EmptyFileError,
+    InvalidEncryptedFormat,
+    InvalidKey,
+)
+from encryptdef.follow import (
+    FileFollower,
+    checkpoint_path,
+    load_checkpoint,
+    save_checkpoint,
+)
+from encryptdef.header import is_file_header, is_header, parse_header
 from encryptdef.interactive_interface import (
     print_continue_or_leave,
     print_get_max_workers,
@@ -19,9 +56,32 @@ from encryptdef.interactive_interface import (
     print_requesting_message,
     print_success_message,
 )
-from encryptdef.log import print_and_record_log
-from encryptdef.settings import CURRENT_DIR, console
+from encryptdef.kdf import ScryptParams
+from encryptdef.keys import (
+    PASSWORD_KEY_FORMAT,
+    KeyContext,
+    as_key_context,
+    load_raw_key,
+)
+from encryptdef.log import print_and_record_log, record_log
+from encryptdef.output import (
+    OutputOptions,
+    new_progress,
+    plain_text,
+    write_error,
+    write_result,
+)
+from encryptdef.resources import plan_workers
+from encryptdef.settings import CURRENT_DIR, console, err_console
+from encryptdef.stream import (
+    CHUNK_SIZE,
+    MAX_HEADER_SIZE,
+    STREAM_MODE,
+    is_stream_file,
+)
 from encryptdef.template import (
+    TEMPLATE_APPEND_INVALID_TARGET,
+    TEMPLATE_APPEND_PENDING,
     TEMPLATE_CONTINUE_LEAVE,
     TEMPLATE_DECRYPT_FILE,
     TEMPLATE_DECRYPT_KEY,
@@ -37,126 +97,161 @@ from encryptdef.template import (
     TEMPLATE_ENCRYPTED_FILE,
     TEMPLATE_ENCRYPTED_MESSAGE,
     TEMPLATE_ERROR_EMPTY_FIELD,
-    TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT,
     TEMPLATE_FILE_NOT_FOUND,
     TEMPLATE_INFO_FILE,
-    TEMPLATE_INVALID_KEY,
     TEMPLATE_MENU_ENCRYPT_DECRYPT,
     TEMPLATE_MENU_MESSAGE_FILE,
     TEMPLATE_TASK_DESCRIPTION,
-    TEMPLATE_TYPE_ERROR,
 )
-from encryptdef.utils import get_new_file_path, read_file, write_file
-
+from encryptdef.tuner import Workers, resolve_workers
+from encryptdef.utils import (
+    count_lines,
+    get_new_file_path,
+    iter_file_lines,
+    read_file,
+    write_file,
+)
 
-class InvalidEncryptedFormat(Exception):
-    """Formato de string criptografada inválido"""
+# Caminho que representa a entrada e a saída padrão
+STDIO_PATH = "-"
 
 
-class InvalidKey(Exception):
-    """Formato de string criptografada inválido"""
+def _is_rich(output: Optional[OutputOptions]) -> bool:
+    """True se a saída for a interface com cores, o padrão."""
+    return output is None or output.is_rich
 
 
-class EmptyFileError(Exception):
-    """Formato de string criptografada inválido"""
+def _operation(process_line_func: Callable[..., Any]) -> str:
+    """Nome da operação usado nos resultados estruturados."""
+    return "encrypt" if process_line_func is encrypt else "decrypt"
 
 
-def encrypt(message: str, password: str) -> str:
+def _report_error(
+    output: Optional[OutputOptions], operation: str, message: str
+) -> None:
     """
-    Criptografa uma mensagem usando AES GCM com uma chave derivada por Scrypt.
-
-    Args:
-        message (str): A mensagem que será criptografada.
-        password (str): A senha usada para derivar a chave de criptografia.
-
-    Returns:
-        str: A mensagem criptografada contendo texto cifrado, salt,
-        nonce e tag.
+    Registra um erro e o exibe no console, ou o escreve sem markup nos
+    formatos de saída para scripts.
     """
-    # Gera um salt aleatório
-    salt = get_random_bytes(AES.block_size)
-
-    # Usa Scrypt para derivar a chave privada a partir da senha
-    private_key = hashlib.scrypt(
-        password.encode(), salt=salt, n=2**14, r=8, p=1, dklen=32
-    )
-
-    # Cria a configuração do cifrador em modo GCM
-    cipher = AES.new(private_key, AES.MODE_GCM)
-    cipher_text, tag = cipher.encrypt_and_digest(message.encode("utf-8"))
+    if _is_rich(output):
+        print_and_record_log(message, "error")
+        return
 
-    # Codifica em base64 e retorna uma string formatada
-    encrypted_parts = {
-        "cipher_text": b64encode(cipher_text).decode("utf-8"),
-        "salt": b64encode(salt).decode("utf-8"),
-        "nonce": b64encode(cipher.nonce).decode("utf-8"),
-        "tag": b64encode(tag).decode("utf-8"),
-    }
+    record_log(message, "error")
+    write_error(cast(OutputOptions, output), operation, message)
 
-    return "*".join(encrypted_parts.values())
 
-
-def decrypt(enc_string: str, password: str) -> str:
+def _report_warning(output: Optional[OutputOptions], message: str) -> None:
     """
-    Descriptografa uma mensagem criptografada usando AES GCM com uma chave
-    derivada por Scrypt.
-
-    Args:
-        enc_string (str): A mensagem criptografada.
-        password (str): A senha usada para derivar a chave de descriptografia.
-
-    Returns:
-        str: A mensagem descriptografada ou uma mensagem de erro.
+    Registra um aviso e o exibe no console, ou o escreve sem markup na
+    saída de erro nos formatos para scripts.
     """
-    try:
-        enc_parts = enc_string.split("*")
-        if len(enc_parts) != 4:
-            raise InvalidEncryptedFormat(
-                TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
-            )
+    if _is_rich(output):
+        print_and_record_log(message, "warning")
+        return
 
-        # Decodifica as partes criptografadas de base64
-        cipher_text, salt, nonce, tag = map(b64decode, enc_parts)
+    record_log(message, "warning")
+    sys.stderr.write(plain_text(message) + "\n")
+    sys.stderr.flush()
 
-        # Gera a chave privada a partir da senha e do salt
-        private_key = hashlib.scrypt(
-            password.encode(), salt=salt, n=2**14, r=8, p=1, dklen=32
+
+def _report_file(
+    output: Optional[OutputOptions],
+    process_line_func: Callable[..., Any],
+    new_file_path: str,
+) -> None:
+    """Informa o arquivo gerado, no console ou como resultado."""
+    if _is_rich(output):
+        print_and_record_log(
+            (
+                TEMPLATE_ENCRYPTED_FILE % new_file_path
+                if process_line_func is encrypt
+                else TEMPLATE_DECRYPTED_FILE % new_file_path
+            ),
+            "debug",
         )
+        return
+
+    write_result(
+        cast(OutputOptions, output),
+        {
+            "operation": _operation(process_line_func),
+            "status": "ok",
+            "result": new_file_path,
+        },
+    )
 
-        # Cria a configuração do cifrador em modo GCM
-        cipher = AES.new(private_key, AES.MODE_GCM, nonce=nonce)
 
-        # Descriptografa o texto cifrado e verifica a tag
-        decrypted = cipher.decrypt_and_verify(cipher_text, tag)
+def _file_size(file_path: str) -> Optional[int]:
+    """Tamanho do arquivo para a vazão em bytes, ou None se não existir."""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return None
 
-        return decrypted.decode("utf-8")
 
-    except ValueError as e:
-        raise InvalidKey(TEMPLATE_INVALID_KEY) from e
+def _default_max_workers(
+    output: Optional[OutputOptions],
+    chunks: Sized,
+    backend: str = THREAD_BACKEND,
+) -> int:
+    """
+    Pergunta ao usuário quantos núcleos usar, ou usa todos os disponíveis
+    nos formatos de saída para scripts, que nunca fazem perguntas. Em ambos
+    os casos, limita os trabalhadores ao orçamento de memória.
+    """
+    requested = print_get_max_workers(chunks) if _is_rich(output) else None
+    return plan_workers(requested, worker_memory(backend))
 
 
-def encrypt_message(message: str, key: str) -> None:
+def encrypt_message(
+    message: str,
+    key: Union[str, KeyContext],
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+    output: Optional[OutputOptions] = None,
+) -> None:
     """
     Criptografa os dados usando a chave fornecida e exibe o resultado.
 
     Args:
         message (str): Dados a serem criptografados.
-        key (str): Chave para criptografia.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves para
+        criptografia.
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+        usados ao criptografar. Se None, usa os parâmetros padrão.
+        cipher (str): Identificador do cifrador ou "auto".
+        output (Optional[OutputOptions]): Formato da saída. Se None, exibe
+        o resultado no console com cores.
     """
-    encrypted_message = encrypt(message, key)
-    print_success_message(
-        encrypted_message, TEMPLATE_ENCRYPTED_MESSAGE, TEMPLATE_ENCRYPTED
+    encrypted_message = encrypt(message, key, params, cipher)
+    if _is_rich(output):
+        print_success_message(
+            encrypted_message, TEMPLATE_ENCRYPTED_MESSAGE, TEMPLATE_ENCRYPTED
+        )
+        return
+
+    write_result(
+        cast(OutputOptions, output),
+        {"operation": "encrypt", "status": "ok", "result": encrypted_message},
     )
 
 
-def decrypt_message(message: str, key: str) -> bool:
+def decrypt_message(
+    message: str,
+    key: Union[str, KeyContext],
+    output: Optional[OutputOptions] = None,
+) -> bool:
     """
     Descriptografa os dados usando a chave fornecida. Se a descriptografia
     falhar, retorna False; caso contrário, exibe o resultado e retorna True.
 
     Args:
         message (str): Dados a serem descriptografados.
-        key (str): Chave para descriptografia.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves para
+        descriptografia.
+        output (Optional[OutputOptions]): Formato da saída. Se None, exibe
+        o resultado no console com cores.
 
     Returns:
         bool: True se a descriptografia for bem-sucedida, False caso contrário.
@@ -165,137 +260,564 @@ def decrypt_message(message: str, key: str) -> bool:
         decrypted_message = decrypt(message, key)
 
         if isinstance(decrypted_message, str):
-            print_success_message(
-                decrypted_message,
-                TEMPLATE_DECRYPTED_MESSAGE,
-                TEMPLATE_DECRYPTED,
-            )
+            if _is_rich(output):
+                print_success_message(
+                    decrypted_message,
+                    TEMPLATE_DECRYPTED_MESSAGE,
+                    TEMPLATE_DECRYPTED,
+                )
+            else:
+                write_result(
+                    cast(OutputOptions, output),
+                    {
+                        "operation": "decrypt",
+                        "status": "ok",
+                        "result": decrypted_message,
+                    },
+                )
             return True
 
     except (InvalidEncryptedFormat, InvalidKey) as e:
-        print_and_record_log(str(e), "error")
+        _report_error(output, "decrypt", str(e))
     return False
 
 
 def process_lines(
     lines: List[str],
-    key: str,
-    process_line_func: Callable[[str, str], Union[str, bool]],
+    key: Union[str, bytes, KeyContext],
+    process_line_func: Callable[[str, Any], Union[str, bool]],
     max_workers: int,
+    backend: str = THREAD_BACKEND,
 ) -> List[str]:
     """
     Processa cada linha do arquivo usando a função fornecida.
 
     Args:
         lines (List[str]): Lista de linhas do arquivo.
-        key (str): Chave para criptografar ou descriptografar.
-        process_line_func (Callable[[str, str], Union[str, bool]]): Função para
-        processar cada linha.
+        key (Union[str, bytes, KeyContext]): Senha, contexto de chaves ou
+        chave derivada para criptografar ou descriptografar.
+        process_line_func (Callable[[str, Any], Union[str, bool]]): Função
+        para processar cada linha.
         max_workers (int): Número máximo de núcleos da CPU a serem usados.
+        backend (str): "thread" para um pool de threads ou "process" para
+        enviar lotes de linhas a processos por memória compartilhada.
 
     Returns:
         List[str]: Lista de linhas processadas.
     """
-    indexed_processed_lines = []
-
-    with Progress() as progress:
+    with new_progress() as progress:
         task = progress.add_task(TEMPLATE_TASK_DESCRIPTION, total=len(lines))
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submete as linhas para processamento junto com seus índices
-            future_to_index = {
-                executor.submit(
-                    process_line_func, line.rstrip("\n"), key
-                ): index
-                for index, line in enumerate(lines)
-            }
+        return list(
+            iter_process_lines(
+                lines,
+                key,
+                process_line_func,
+                max_workers,
+                backend,
+                len(lines),
+                lambda advance: progress.update(task, advance=advance),
+            )
+        )
 
-            for future in as_completed(future_to_index):
-                result = future.result()
 
-                if not isinstance(result, str):
-                    raise TypeError(TEMPLATE_TYPE_ERROR % {type(result)})
+def process_file_content(
+    file_path: str,
+    key: Union[str, KeyContext],
+    new_file_path: str,
+    process_line_func: Callable[[str, str], Union[str, bool]],
+    backend: str = THREAD_BACKEND,
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+    max_workers: Optional[Workers] = None,
+    output: Optional[OutputOptions] = None,
+) -> bool:
+    """
+    Processa o conteúdo de um arquivo e salva o resultado em um novo arquivo.
 
-                # Adiciona o resultado junto com o índice original
-                indexed_processed_lines.append(
-                    (future_to_index[future], result)
-                )
+    As linhas são lidas, processadas e escritas em fluxo, então o uso de
+    memória depende do tamanho da janela de tarefas e não do arquivo.
 
-                # Atualiza a barra de progresso
-                progress.update(task, advance=1)
+    Args:
+        file_path (str): Caminho do arquivo original.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves para
+        criptografar ou descriptografar.
+        new_file_path (str): Caminho do novo arquivo.
+        process_line_func (Callable[[str, str], Union[str, bool]]): Função para
+        processar cada linha.
+        backend (str): Backend de execução, "thread" ou "process".
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+        usados ao criptografar. Se None, usa os parâmetros padrão.
+        cipher (str): Cifrador usado ao criptografar, ou "auto". Ao
+        descriptografar, o cifrador é lido do cabeçalho.
+        max_workers (Optional[Workers]): Número de núcleos da CPU a serem
+        usados, ou "auto". Se None, pergunta ao usuário.
+        output (Optional[OutputOptions]): Formato da saída e do progresso.
+        Se None, usa a barra de progresso do rich.
+
+    Returns:
+        bool: True se o processamento for bem-sucedido, False caso contrário.
+    """
+    total = count_lines(file_path)
+    if not total:
+        raise EmptyFileError(TEMPLATE_EMPTY_FILE_ERROR % file_path)
 
-    # Ordena os resultados processados pela ordem original das linhas
-    indexed_processed_lines.sort(key=lambda x: x[0])
+    if max_workers is None:
+        max_workers = _default_max_workers(output, range(total), backend)
 
-    # Retorna apenas as linhas processadas, na ordem correta
-    return [line + "\n" for index, line in indexed_processed_lines]
+    with new_progress(output) as progress:
+        task = progress.add_task(
+            TEMPLATE_TASK_DESCRIPTION,
+            total=total,
+            total_bytes=_file_size(file_path),
+        )
 
+        def on_progress(advance: int) -> None:
+            progress.update(task, advance=advance)
 
-def process_file_content(
+        # No formato versionado a chave é derivada uma vez por arquivo
+        if process_line_func is encrypt:
+            Encryptor(key, params, cipher, max_workers, backend).encrypt_file(
+                file_path, new_file_path, on_progress=on_progress
+            )
+        elif process_line_func is decrypt:
+            Decryptor(key, max_workers, backend).decrypt_file(
+                file_path, new_file_path, on_progress
+            )
+        else:
+            write_file(
+                new_file_path,
+                iter_process_lines(
+                    iter_file_lines(file_path),
+                    key,
+                    process_line_func,
+                    max_workers,
+                    backend,
+                    total,
+                    on_progress,
+                ),
+            )
+
+    _report_file(output, process_line_func, new_file_path)
+    return True
+
+
+def process_stream_content(
     file_path: str,
-    key: str,
+    key: Union[str, KeyContext],
     new_file_path: str,
     process_line_func: Callable[[str, str], Union[str, bool]],
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+    max_workers: Optional[Workers] = None,
+    output: Optional[OutputOptions] = None,
 ) -> bool:
     """
-    Processa o conteúdo de um arquivo e salva o resultado em um novo arquivo.
+    Processa um arquivo binário em blocos de tamanho fixo e salva o resultado
+    em um novo arquivo, mantendo o uso de memória constante.
 
     Args:
         file_path (str): Caminho do arquivo original.
-        key (str): Chave para criptografar ou descriptografar.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves para
+        criptografar ou descriptografar.
         new_file_path (str): Caminho do novo arquivo.
-        process_line_func (Callable[[str, str], Union[str, bool]]): Função para
-        processar cada linha.
+        process_line_func (Callable[[str, str], Union[str, bool]]): encrypt
+        ou decrypt, indicando a operação desejada.
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+        usados ao criptografar. Se None, usa os parâmetros padrão.
+        cipher (str): Cifrador usado ao criptografar, ou "auto". Ao
+        descriptografar, o cifrador é lido do cabeçalho.
+        max_workers (Optional[Workers]): Número de núcleos da CPU a serem
+        usados, ou "auto". Se None, pergunta ao usuário.
+        output (Optional[OutputOptions]): Formato da saída e do progresso.
+        Se None, usa a barra de progresso do rich.
 
     Returns:
         bool: True se o processamento for bem-sucedido, False caso contrário.
     """
-    lines = read_file(file_path)
-    if not lines:
-        raise EmptyFileError(TEMPLATE_EMPTY_FILE_ERROR % file_path)
+    file_size = os.path.getsize(file_path)
+    chunks = range(max(1, math.ceil(file_size / CHUNK_SIZE)))
+    if max_workers is None:
+        max_workers = _default_max_workers(output, chunks)
+
+    with new_progress(output) as progress:
+        task = progress.add_task(
+            TEMPLATE_TASK_DESCRIPTION,
+            total=len(chunks),
+            total_bytes=file_size,
+        )
 
-    max_workers = print_get_max_workers(lines)
-    processed_lines = process_lines(lines, key, process_line_func, max_workers)
-
-    write_file(new_file_path, processed_lines)
-    print_and_record_log(
-        (
-            TEMPLATE_ENCRYPTED_FILE % new_file_path
-            if process_line_func is encrypt
-            else TEMPLATE_DECRYPTED_FILE % new_file_path
-        ),
-        "debug",
+        def on_progress(advance: int) -> None:
+            progress.update(task, advance=advance)
+
+        # A API escreve em um arquivo temporário e só substitui o destino
+        # se todos os blocos forem autenticados
+        if process_line_func is encrypt:
+            Encryptor(key, params, cipher, max_workers).encrypt_file(
+                file_path, new_file_path, binary=True, on_progress=on_progress
+            )
+        else:
+            Decryptor(key, max_workers).decrypt_file(
+                file_path, new_file_path, on_progress
+            )
+
+    _report_file(output, process_line_func, new_file_path)
+    return True
+
+
+def _iter_binary_lines(source: Iterable[bytes]) -> Iterator[str]:
+    """Decodifica as linhas de um fluxo binário, uma por vez."""
+    for line in source:
+        yield line.decode("utf-8", errors="ignore")
+
+
+def process_stdio_content(
+    key: Union[str, KeyContext],
+    process_line_func: Callable[[str, str], Union[str, bool]],
+    binary: bool = False,
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+    output: Optional[OutputOptions] = None,
+    source: Optional[BinaryIO] = None,
+    target: Optional[BinaryIO] = None,
+    max_workers: Optional[Workers] = None,
+) -> bool:
+    """
+    Processa a entrada padrão e escreve o resultado na saída padrão, em
+    fluxo: cada registro ou bloco é entregue assim que fica pronto e apenas
+    uma janela limitada fica em memória. Nenhum dado é gravado em disco.
+
+    As linhas são processadas uma por vez no backend de threads, porque a
+    entrada pode chegar aos poucos e cada registro precisa sair sem esperar
+    pelo próximo. Os blocos binários usam todos os núcleos.
+
+    Ao descriptografar, o formato (linhas ou blocos) é detectado pela
+    primeira linha, sem voltar ao início da entrada.
+
+    Args:
+        key (Union[str, KeyContext]): Senha ou contexto de chaves para
+        criptografar ou descriptografar.
+        process_line_func (Callable[[str, str], Union[str, bool]]): encrypt
+        ou decrypt, indicando a operação desejada.
+        binary (bool): Se True, criptografa em blocos binários.
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+        usados ao criptografar. Se None, usa os parâmetros padrão.
+        cipher (str): Cifrador usado ao criptografar, ou "auto".
+        output (Optional[OutputOptions]): Descritor dos eventos de progresso.
+        source (Optional[BinaryIO]): Entrada. Se None, a entrada padrão.
+        target (Optional[BinaryIO]): Saída. Se None, a saída padrão.
+        max_workers (Optional[Workers]): Número de núcleos da CPU usados
+        nos blocos. Se None ou "auto", usa os núcleos disponíveis.
+
+    Returns:
+        bool: True se o processamento for bem-sucedido.
+    """
+    source = source or sys.stdin.buffer
+    target = target or sys.stdout.buffer
+    workers = resolve_workers(max_workers, THREAD_BACKEND)
+
+    with new_progress(output) as progress:
+        task = progress.add_task(TEMPLATE_TASK_DESCRIPTION, total=None)
+
+        def on_progress(advance: int) -> None:
+            progress.update(task, advance=advance)
+
+        processed_lines: Iterator[str]
+        if process_line_func is encrypt:
+            encryptor = Encryptor(key, params, cipher, workers)
+            if binary:
+                encryptor.encrypt_stream(
+                    source, target, on_progress=on_progress
+                )
+                return True
+
+            processed_lines = encryptor.iter_lines(
+                _iter_binary_lines(source),
+                on_progress=on_progress,
+                window=1,
+                batch_size=1,
+            )
+        else:
+            decryptor = Decryptor(key, workers)
+            first_line = source.readline(MAX_HEADER_SIZE)
+            first_text = first_line.decode("utf-8", errors="ignore")
+            if is_header(first_text) and first_line.endswith(b"\n"):
+                fields = parse_header(first_text)
+                if fields.get("mode") == STREAM_MODE:
+                    decryptor.decrypt_stream(
+                        source, target, on_progress, fields
+                    )
+                    return True
+
+            # Completa uma primeira linha maior que o limite do cabeçalho
+            lines = _iter_binary_lines(source)
+            if first_line and not first_line.endswith(b"\n"):
+                first_text += next(lines, "")
+            processed_lines = decryptor.iter_lines(
+                chain([first_text], lines) if first_text else lines,
+                on_progress=on_progress,
+                window=1,
+                batch_size=1,
+            )
+
+        for line in processed_lines:
+            target.write(line.encode("utf-8"))
+            target.flush()
+
+    return True
+
+
+def _open_append_target(
+    new_file_path: str,
+    key: Union[str, KeyContext],
+    params: Optional[ScryptParams],
+    cipher: str,
+) -> Tuple[bytes, str]:
+    """
+    Obtém a chave e o cifrador de um arquivo criptografado existente, ou
+    cria o arquivo com um novo cabeçalho.
+
+    Raises:
+        InvalidEncryptedFormat: Se o arquivo existente não estiver no
+        formato de linhas versionado.
+        InvalidKey: Se a chave não corresponder ao cabeçalho.
+    """
+    if os.path.exists(new_file_path) and os.path.getsize(new_file_path):
+        with open(new_file_path, "r", encoding="utf-8") as file_:
+            first_line = file_.readline(MAX_HEADER_SIZE)
+
+        fields = parse_header(first_line) if is_file_header(first_line) else {}
+        if not fields or fields.get("mode") == STREAM_MODE:
+            raise InvalidEncryptedFormat(
+                TEMPLATE_APPEND_INVALID_TARGET % new_file_path
+            )
+        return (
+            as_key_context(key).key_from_fields(fields),
+            cipher_from_fields(fields),
+        )
+
+    cipher = resolve_cipher(cipher)
+    header, file_key = as_key_context(key, params).new_key({"cipher": cipher})
+    with open(new_file_path, "w", encoding="utf-8") as file_:
+        file_.write(header + "\n")
+    return file_key, cipher
+
+
+def process_append_content(
+    file_path: str,
+    key: Union[str, KeyContext],
+    new_file_path: str,
+    follow: bool = False,
+    backend: str = THREAD_BACKEND,
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+    output: Optional[OutputOptions] = None,
+    stop: Optional[threading.Event] = None,
+    max_workers: Optional[Workers] = None,
+) -> bool:
+    """
+    Criptografa apenas as linhas novas de um arquivo e as acrescenta a um
+    arquivo criptografado existente, reaproveitando a chave do cabeçalho.
+
+    A posição lida é salva em um checkpoint ao lado do arquivo gerado
+    depois de cada lote, então uma nova execução continua de onde a
+    anterior parou, mesmo depois de uma rotação do arquivo. Sem checkpoint,
+    as linhas já presentes no arquivo criptografado são puladas.
+
+    Args:
+        file_path (str): Caminho do arquivo original.
+        key (Union[str, KeyContext]): Senha ou contexto de chaves.
+        new_file_path (str): Caminho do arquivo criptografado.
+        follow (bool): Se True, continua esperando novas linhas e as
+        criptografa assim que chegam, até `stop` ou uma interrupção.
+        backend (str): Backend de execução, "thread" ou "process".
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+        usados ao criar o arquivo. Se None, usa os parâmetros padrão.
+        cipher (str): Cifrador usado ao criar o arquivo, ou "auto". Em um
+        arquivo existente, o cifrador é lido do cabeçalho.
+        output (Optional[OutputOptions]): Formato da saída e do progresso.
+        stop (Optional[threading.Event]): Evento que encerra o modo follow.
+        max_workers (Optional[Workers]): Número de núcleos da CPU a serem
+        usados. Se None ou "auto", usa os núcleos disponíveis, porque os
+        lotes são curtos demais para o ajuste automático.
+
+    Returns:
+        bool: True se o processamento for bem-sucedido.
+
+    Raises:
+        InvalidEncryptedFormat: Se o arquivo gerado não estiver no formato
+        de linhas versionado.
+    """
+    checkpoint_file = checkpoint_path(new_file_path)
+    checkpoint = load_checkpoint(checkpoint_file)
+    target_size = (
+        os.path.getsize(new_file_path) if os.path.exists(new_file_path) else 0
     )
+    if checkpoint is not None and checkpoint.target_size > target_size:
+        # O arquivo gerado foi substituído depois do checkpoint
+        checkpoint = None
+
+    skip_lines = 0
+    if checkpoint is None and target_size:
+        skip_lines = count_lines(new_file_path) - 1
+
+    # Abre a origem antes de criar o arquivo gerado, para que uma origem
+    # inexistente não deixe um arquivo só com o cabeçalho
+    follower = FileFollower(file_path, checkpoint, skip_lines)
+    workers = resolve_workers(max_workers, backend)
 
+    try:
+        file_key, cipher = _open_append_target(
+            new_file_path, key, params, cipher
+        )
+        encrypt_line = partial(encrypt_with_key, cipher_name=cipher)
+        with (
+            open(new_file_path, "r+b") as target,
+            new_progress(output) as progress,
+        ):
+            # Descarta as linhas escritas depois do último checkpoint
+            if checkpoint is not None:
+                target.truncate(checkpoint.target_size)
+            target.seek(0, os.SEEK_END)
+            task = progress.add_task(TEMPLATE_TASK_DESCRIPTION, total=None)
+
+            def on_progress(advance: int) -> None:
+                progress.update(task, advance=advance)
+
+            for lines in follower.iter_batches(follow, stop):
+                for line in iter_process_lines(
+                    lines,
+                    file_key,
+                    encrypt_line,
+                    min(workers, len(lines)),
+                    backend,
+                    len(lines),
+                    on_progress,
+                ):
+                    target.write(line.encode("utf-8"))
+                target.flush()
+                save_checkpoint(
+                    checkpoint_file, follower.checkpoint(target.tell())
+                )
+
+        # Uma linha incompleta só é criptografada quando terminar
+        pending = follower.pending_bytes()
+        if not follow and pending:
+            _report_warning(
+                output, TEMPLATE_APPEND_PENDING % (file_path, pending)
+            )
+    except KeyboardInterrupt:
+        # O último lote já foi salvo no checkpoint
+        pass
+    finally:
+        follower.close()
+
+    _report_file(output, encrypt, new_file_path)
     return True
 
 
 def process_file(
-    data_list: List[str],
+    data_list: List[Any],
     process_line_func: Callable[[str, str], Union[str, bool]],
+    binary: bool = False,
+    backend: str = THREAD_BACKEND,
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+    output: Optional[OutputOptions] = None,
+    append: bool = False,
+    follow: bool = False,
+    workers: Optional[Workers] = None,
 ) -> bool:
     """
     Processa o conteúdo de um arquivo linha por linha usando a função fornecida
     e salva o resultado em um novo arquivo.
 
     Args:
-        data_list (List[str]): Lista contendo [arquivo, chave, novo_arquivo].
+        data_list (List[Any]): Lista contendo [arquivo, chave, novo_arquivo],
+        onde a chave é uma senha ou um contexto de chaves.
         process_line_func (Callable[[str, str], Union[str, bool]]): Função para
         processar cada linha do arquivo.
+        binary (bool): Se True, criptografa o arquivo em blocos binários.
+        Arquivos em blocos são detectados automaticamente ao descriptografar.
+        backend (str): Backend de execução das linhas, "thread" ou "process".
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+        usados ao criptografar. Se None, usa os parâmetros padrão.
+        cipher (str): Cifrador usado ao criptografar, ou "auto". Ao
+        descriptografar, o cifrador é lido do cabeçalho.
+        output (Optional[OutputOptions]): Formato da saída e do progresso.
+        Se None, usa a interface com cores.
+        append (bool): Se True, criptografa apenas as linhas novas e as
+        acrescenta ao arquivo criptografado existente.
+        follow (bool): Se True, continua acrescentando as linhas que chegam
+        ao arquivo. Implica `append`.
+        workers (Optional[Workers]): Número de trabalhadores ou "auto". Se
+        None, pergunta ao usuário nos arquivos grandes.
 
     Returns:
         bool: True se o processamento for bem-sucedido, False caso contrário.
     """
     try:
         file_path, key, new_file = data_list
+        if file_path == STDIO_PATH:
+            return process_stdio_content(
+                key,
+                process_line_func,
+                binary,
+                params,
+                cipher,
+                output,
+                max_workers=workers,
+            )
+
         new_file_path = get_new_file_path(file_path, new_file, CURRENT_DIR)
+
+        if append or follow:
+            return process_append_content(
+                file_path,
+                key,
+                new_file_path,
+                follow,
+                backend,
+                params,
+                cipher,
+                output,
+                max_workers=workers,
+            )
+
+        if (binary and process_line_func is encrypt) or (
+            process_line_func is decrypt and is_stream_file(file_path)
+        ):
+            return process_stream_content(
+                file_path,
+                key,
+                new_file_path,
+                process_line_func,
+                params,
+                cipher,
+                workers,
+                output,
+            )
+
         return process_file_content(
-            file_path, key, new_file_path, process_line_func
+            file_path,
+            key,
+            new_file_path,
+            process_line_func,
+            backend=backend,
+            params=params,
+            cipher=cipher,
+            max_workers=workers,
+            output=output,
         )
 
     except FileNotFoundError:
-        print_and_record_log(TEMPLATE_FILE_NOT_FOUND % file_path, "error")
-        console.print(TEMPLATE_INFO_FILE)
+        _report_error(
+            output,
+            _operation(process_line_func),
+            TEMPLATE_FILE_NOT_FOUND % file_path,
+        )
+        if _is_rich(output):
+            console.print(TEMPLATE_INFO_FILE)
         return False
 
     except (
@@ -306,21 +828,49 @@ def process_file(
         InvalidKey,
         EmptyFileError,
     ) as e:
-        print_and_record_log(str(e), "error")
+        _report_error(output, _operation(process_line_func), str(e))
         return False
 
 
+def load_keyfile(
+    keyfile: str, key_format: str = PASSWORD_KEY_FORMAT
+) -> Union[str, KeyContext]:
+    """
+    Lê a chave de um arquivo, sem perguntar nada ao usuário.
+
+    Args:
+        keyfile (str): Caminho para o arquivo com a chave.
+        key_format (str): "password" para uma senha, ou "raw", "hex" e
+        "base64" para uma chave bruta usada sem derivação pelo Scrypt.
+
+    Returns:
+        Union[str, KeyContext]: A senha lida, ou o contexto da chave bruta.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+        ValueError: Se a chave bruta for inválida.
+    """
+    if key_format != PASSWORD_KEY_FORMAT:
+        with open(keyfile, "rb") as file:
+            return load_raw_key(file.read(), key_format)
+
+    return "".join(read_file(keyfile)).strip()
+
+
 def process_keyfile_and_args(
     keyfile: Optional[str],
     message: Optional[str],
     file_: Optional[str],
     template_key: str,
-) -> str:
+    key_format: str = PASSWORD_KEY_FORMAT,
+    output: Optional[OutputOptions] = None,
+) -> Union[str, KeyContext]:
     """
     Obtém a chave de criptografia e valida os argumentos.
 
-    Processa a chave de criptografia a partir de um arquivo ou solicita ao
-    usuário, e valida se 'message' ou 'file' foram fornecidos corretamente.
+    Processa a chave de criptografia a partir de um arquivo, do agente
+    indicado em ENCRYPTDEF_AGENT_SOCK ou solicita ao usuário, e valida se
+    'message' ou 'file' foram fornecidos corretamente.
 
     Args:
         keyfile (Optional[str]): Caminho para o arquivo com a chave. Se None,
@@ -331,13 +881,21 @@ def process_keyfile_and_args(
         descriptografado. Usado se 'message' não for fornecido.
         template_key (str): Template para solicitar a chave ao usuário,
         se necessário.
+        key_format (str): Formato do conteúdo de 'keyfile': "password" para
+        uma senha, ou "raw", "hex" e "base64" para uma chave bruta usada sem
+        derivação pelo Scrypt.
+        output (Optional[OutputOptions]): Formato da saída. Nos formatos para
+        scripts a chave é pedida na saída de erro, deixando a saída padrão
+        apenas para o resultado.
 
     Returns:
-        str: A chave de criptografia obtida.
+        Union[str, KeyContext]: A senha obtida, ou o contexto da chave bruta
+        ou do agente.
 
     Raises:
         click.UsageError: Se ambos ou nenhum dos argumentos 'message' e 'file'
-        forem fornecidos.
+        forem fornecidos, ou se uma chave bruta ou a entrada padrão forem
+        usadas sem 'keyfile'.
         SystemExit: Se o arquivo de chave não for encontrado, ou se a chave
         fornecida for inválida.
     """
@@ -351,18 +909,46 @@ def process_keyfile_and_args(
             "Você deve fornecer um dos argumentos: --message ou --file."
         )
 
-    key: Optional[str] = None
+    if file_ == STDIO_PATH and not keyfile:
+        raise click.UsageError(
+            "Ao usar --file -, a entrada padrão recebe os dados: informe a "
+            "chave com --keyfile."
+        )
+
+    operation = (
+        "encrypt" if template_key == TEMPLATE_ENCRYPT_KEY else "decrypt"
+    )
+
+    if key_format != PASSWORD_KEY_FORMAT and not keyfile:
+        raise click.UsageError(
+            "O argumento --key-format exige o argumento --keyfile."
+        )
+
     if keyfile:
         try:
-            key = "".join(read_file(keyfile)).strip()
+            return load_keyfile(keyfile, key_format)
         except FileNotFoundError:
-            print_and_record_log(TEMPLATE_FILE_NOT_FOUND % keyfile, "error")
+            _report_error(output, operation, TEMPLATE_FILE_NOT_FOUND % keyfile)
             sys.exit(1)
-    else:
-        while not key or key.isspace():
-            key = console.input(template_key, password=True).strip()
-            if not key:
-                print_and_record_log(TEMPLATE_ERROR_EMPTY_FIELD, "error")
+        except ValueError as e:
+            _report_error(output, operation, str(e))
+            sys.exit(1)
+
+    # Com um agente da sessão, não há pergunta nem Scrypt a cada execução
+    from encryptdef.agent import agent_key_context  # pylint: disable=C0415
+
+    context = agent_key_context()
+    if context is not None:
+        return context
+
+    key: Optional[str] = None
+    prompt = console if _is_rich(output) else err_console
+    while not key or key.isspace():
+        key = prompt.input(template_key, password=True).strip()
+        if not key and _is_rich(output):
+            print_and_record_log(TEMPLATE_ERROR_EMPTY_FIELD, "error")
+        elif not key:
+            err_console.print(TEMPLATE_ERROR_EMPTY_FIELD, style="error")
 
     return key
 
@@ -0,0 +1,17 @@
+"""Módulo que contém as exceções da ferramenta"""
+
+
+class InvalidEncryptedFormat(Exception):
+    """Formato de string criptografada inválido"""
+
+
+class InvalidKey(Exception):
+    """Formato de string criptografada inválido"""
+
+
+class EmptyFileError(Exception):
+    """Formato de string criptografada inválido"""
+
+
+class AgentError(InvalidKey):
+    """Agente de chaves inacessível ou sem a chave carregada"""
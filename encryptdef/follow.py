@@ -0,0 +1,274 @@
+"""Módulo responsável pela leitura de arquivos que crescem continuamente
+
+Um FileFollower lê apenas as linhas completas acrescentadas a um arquivo,
+como um `tail -F`: ao chegar ao fim ele pode esperar por novas linhas e
+detecta a rotação do arquivo (renomeado e recriado, ou truncado no lugar).
+
+A posição já criptografada fica em um arquivo de checkpoint ao lado do
+arquivo criptografado, com o dispositivo e o inode do arquivo lido, a
+posição nele e o tamanho do arquivo criptografado correspondente. Ao
+reiniciar, o arquivo criptografado é cortado nesse tamanho, descartando
+linhas escritas depois do último checkpoint, e a leitura continua da
+posição salva, então nenhuma linha é perdida nem duplicada. Se o arquivo
+foi rotacionado enquanto nada era lido, o arquivo antigo é procurado pelo
+inode no mesmo diretório e terminado antes do novo.
+"""
+
+import json
+import os
+import threading
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional
+
+CHECKPOINT_SUFFIX = ".offset"
+
+# Intervalo entre duas verificações de novas linhas, em segundos
+POLL_INTERVAL = 0.2
+
+# Quantidade máxima de linhas criptografadas entre dois checkpoints
+MAX_BATCH_LINES = 1024
+
+
+class Checkpoint(NamedTuple):
+    """Posição lida no arquivo de origem e tamanho do arquivo gerado"""
+
+    device: int
+    inode: int
+    offset: int
+    target_size: int
+
+
+def checkpoint_path(target_path: str) -> str:
+    """Caminho do checkpoint de um arquivo criptografado."""
+    return target_path + CHECKPOINT_SUFFIX
+
+
+def load_checkpoint(path: str) -> Optional[Checkpoint]:
+    """
+    Lê um checkpoint salvo.
+
+    Args:
+        path (str): Caminho do arquivo de checkpoint.
+
+    Returns:
+        Optional[Checkpoint]: O checkpoint, ou None se ele não existir ou
+        estiver corrompido.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as file_:
+            return Checkpoint(**json.load(file_))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save_checkpoint(path: str, checkpoint: Checkpoint) -> None:
+    """
+    Grava o checkpoint de forma atômica, para que uma interrupção nunca
+    deixe um checkpoint pela metade.
+
+    Args:
+        path (str): Caminho do arquivo de checkpoint.
+        checkpoint (Checkpoint): Posição a ser salva.
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as file_:
+        json.dump(checkpoint._asdict(), file_)
+    os.replace(temporary, path)
+
+
+def find_by_inode(path: str, device: int, inode: int) -> Optional[str]:
+    """
+    Procura, no diretório de `path`, o arquivo com o dispositivo e o inode
+    informados, por exemplo "app.log.1" depois de uma rotação.
+
+    Args:
+        path (str): Caminho atual do arquivo.
+        device (int): Dispositivo do arquivo procurado.
+        inode (int): Inode do arquivo procurado.
+
+    Returns:
+        Optional[str]: O caminho encontrado, ou None.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if entry.inode() == inode and entry.stat().st_dev == device:
+                    return entry.path
+            except OSError:
+                continue
+    return None
+
+
+class FileFollower:
+    """
+    Lê as linhas completas acrescentadas a um arquivo, acompanhando a
+    rotação e mantendo a posição do que já foi entregue.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        checkpoint: Optional[Checkpoint] = None,
+        skip_lines: int = 0,
+    ) -> None:
+        """
+        Abre o arquivo na posição do checkpoint.
+
+        Args:
+            path (str): Caminho do arquivo acompanhado.
+            checkpoint (Optional[Checkpoint]): Posição salva. Se o arquivo
+            do checkpoint foi rotacionado, ele é terminado primeiro.
+            skip_lines (int): Linhas ignoradas no início do arquivo, usado
+            quando não há checkpoint.
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir.
+        """
+        self.path = path
+        self.pending_path: Optional[str] = None
+
+        stat = os.stat(path)
+        source_path = path
+        offset = 0
+        if checkpoint is not None:
+            if (checkpoint.device, checkpoint.inode) == (
+                stat.st_dev,
+                stat.st_ino,
+            ):
+                # Um arquivo truncado recomeça do início
+                if checkpoint.offset <= stat.st_size:
+                    offset = checkpoint.offset
+            else:
+                rotated = find_by_inode(
+                    path, checkpoint.device, checkpoint.inode
+                )
+                if rotated is not None:
+                    source_path, offset = rotated, checkpoint.offset
+                    self.pending_path = path
+
+        self.source = self._open(source_path, offset)
+        for _ in range(skip_lines):
+            line = self.source.readline()
+            if not line.endswith(b"\n"):
+                self.source.seek(-len(line), os.SEEK_CUR)
+                break
+        self.offset = self.source.tell()
+
+    def _open(self, path: str, offset: int) -> BinaryIO:
+        """Abre o arquivo para leitura na posição informada."""
+        source = open(path, "rb")  # pylint: disable=R1732
+        stat = os.fstat(source.fileno())
+        self.device, self.inode = stat.st_dev, stat.st_ino
+        source.seek(min(offset, stat.st_size))
+        return source
+
+    def checkpoint(self, target_size: int) -> Checkpoint:
+        """Posição atual, junto com o tamanho do arquivo gerado."""
+        return Checkpoint(self.device, self.inode, self.offset, target_size)
+
+    def close(self) -> None:
+        """Fecha o arquivo acompanhado."""
+        self.source.close()
+
+    def pending_bytes(self) -> int:
+        """Bytes depois da última linha completa, ainda não entregues."""
+        return max(0, os.fstat(self.source.fileno()).st_size - self.offset)
+
+    def read_lines(self, max_lines: int = MAX_BATCH_LINES) -> List[str]:
+        """
+        Lê as linhas completas disponíveis agora, sem esperar. Uma linha
+        ainda sem quebra de linha no fim fica para a próxima leitura.
+
+        Args:
+            max_lines (int): Quantidade máxima de linhas lidas.
+
+        Returns:
+            List[str]: As linhas lidas, possivelmente nenhuma.
+        """
+        lines: List[str] = []
+        while len(lines) < max_lines:
+            line = self.source.readline()
+            if not line.endswith(b"\n"):
+                self.source.seek(self.offset)
+                break
+            self.offset += len(line)
+            lines.append(line.decode("utf-8", errors="ignore"))
+        return lines
+
+    def _switch_to(self, path: str) -> List[str]:
+        """
+        Lê o fim do arquivo rotacionado, inclusive uma última linha sem
+        quebra de linha, e passa para o arquivo novo.
+        """
+        remainder = self.source.read()
+        self.close()
+        self.source = self._open(path, 0)
+        self.pending_path = None
+        self.offset = 0
+        *lines, last = remainder.split(b"\n")
+        return [
+            line.decode("utf-8", errors="ignore") + "\n"
+            for line in (lines + [last] if last else lines)
+        ]
+
+    def check_rotation(self) -> List[str]:
+        """
+        Verifica, no fim do arquivo, se ele foi rotacionado ou truncado.
+
+        Returns:
+            List[str]: As últimas linhas do arquivo antigo, se ele foi
+            substituído por um novo.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Entre a renomeação e a criação do novo arquivo
+            return []
+
+        if (stat.st_dev, stat.st_ino) != (self.device, self.inode):
+            return self._switch_to(self.path)
+
+        if stat.st_size < self.offset:
+            self.source.seek(0)
+            self.offset = 0
+        return []
+
+    def iter_batches(
+        self,
+        follow: bool = False,
+        stop: Optional[threading.Event] = None,
+        max_lines: int = MAX_BATCH_LINES,
+    ) -> Iterator[List[str]]:
+        """
+        Entrega as novas linhas em lotes. Depois de cada lote, `offset`
+        aponta para o fim da última linha entregue.
+
+        Args:
+            follow (bool): Se True, espera por novas linhas até `stop` ser
+            acionado. Caso contrário, termina no fim do arquivo.
+            stop (Optional[threading.Event]): Evento que encerra a espera.
+            max_lines (int): Quantidade máxima de linhas por lote.
+
+        Yields:
+            List[str]: Linhas completas, na ordem do arquivo.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            lines = self.read_lines(max_lines)
+            if not lines and self.pending_path is not None:
+                # Terminado o arquivo rotacionado, segue para o atual
+                lines = self._switch_to(self.pending_path)
+                if not lines:
+                    continue
+
+            if lines:
+                yield lines
+                continue
+            if not follow:
+                return
+
+            lines = self.check_rotation()
+            if lines:
+                yield lines
+            else:
+                stop.wait(POLL_INTERVAL)
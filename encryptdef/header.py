@@ -0,0 +1,205 @@
+"""Módulo responsável pelo cabeçalho versionado dos arquivos criptografados
+
+Um arquivo criptografado no formato versionado começa com uma linha de
+cabeçalho contendo o salt e os parâmetros do KDF, por exemplo:
+
+    encryptdef:2:kdf=scrypt,n=16384,r=8,p=1,salt=<base64>,hkdf=<base64>
+
+A chave mestra é derivada pelo Scrypt a partir de "salt" e a chave do
+arquivo é derivada dela por HKDF com o salt "hkdf". Cada linha seguinte é
+selada com a chave do arquivo e o seu próprio nonce. O campo "kcv" guarda
+um valor de verificação da chave, então uma senha errada é detectada com uma
+única derivação, antes de qualquer linha ser processada.
+
+Mensagens usam o mesmo cabeçalho seguido do registro criptografado, então
+cada texto criptografado carrega os seus próprios parâmetros de custo:
+
+    <cabeçalho>*<texto cifrado>*<nonce>*<tag>
+"""
+
+import hmac
+from base64 import b64decode
+from typing import Dict, Tuple
+
+from encryptdef.exceptions import InvalidEncryptedFormat, InvalidKey
+from encryptdef.kdf import (
+    ScryptParams,
+    derive_subkey,
+    key_check_value,
+    validate_params,
+)
+from encryptdef.template import (
+    TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT,
+    TEMPLATE_INVALID_KEY,
+)
+
+HEADER_MAGIC = "encryptdef"
+FORMAT_VERSION = 2
+
+
+def is_header(line: str) -> bool:
+    """
+    Verifica se a linha é um cabeçalho do formato versionado.
+
+    Args:
+        line (str): Primeira linha do arquivo.
+
+    Returns:
+        bool: True se a linha começar com o identificador do cabeçalho.
+    """
+    return line.startswith(HEADER_MAGIC + ":")
+
+
+def is_file_header(line: str) -> bool:
+    """
+    Verifica se a linha é um cabeçalho de arquivo, e não uma mensagem
+    criptografada que também começa com um cabeçalho.
+
+    Args:
+        line (str): Primeira linha do arquivo.
+
+    Returns:
+        bool: True se a linha for apenas um cabeçalho.
+    """
+    return is_header(line) and "*" not in line
+
+
+def build_header(fields: Dict[str, str]) -> str:
+    """
+    Monta a linha de cabeçalho a partir dos campos fornecidos.
+
+    Args:
+        fields (Dict[str, str]): Campos que serão gravados no cabeçalho.
+
+    Returns:
+        str: Linha de cabeçalho sem quebra de linha.
+    """
+    encoded_fields = ",".join(
+        f"{name}={value}" for name, value in fields.items()
+    )
+    return f"{HEADER_MAGIC}:{FORMAT_VERSION}:{encoded_fields}"
+
+
+def parse_header(line: str) -> Dict[str, str]:
+    """
+    Lê os campos de uma linha de cabeçalho.
+
+    Args:
+        line (str): Linha de cabeçalho.
+
+    Returns:
+        Dict[str, str]: Campos contidos no cabeçalho.
+
+    Raises:
+        InvalidEncryptedFormat: Se o cabeçalho estiver malformado ou tiver
+        uma versão não suportada.
+    """
+    parts = line.strip().split(":", 2)
+    if (
+        len(parts) != 3
+        or parts[0] != HEADER_MAGIC
+        or parts[1] != str(FORMAT_VERSION)
+    ):
+        raise InvalidEncryptedFormat(TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT)
+
+    fields = {}
+    for field in parts[2].split(","):
+        name, separator, value = field.partition("=")
+        if not separator:
+            raise InvalidEncryptedFormat(
+                TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+            )
+        fields[name] = value
+
+    return fields
+
+
+def read_kdf_fields(fields: Dict[str, str]) -> Tuple[bytes, ScryptParams]:
+    """
+    Lê o salt e os parâmetros do Scrypt dos campos do cabeçalho.
+
+    Args:
+        fields (Dict[str, str]): Campos lidos do cabeçalho.
+
+    Returns:
+        Tuple[bytes, ScryptParams]: O salt da chave mestra e os parâmetros
+        do Scrypt validados.
+
+    Raises:
+        InvalidEncryptedFormat: Se algum campo do KDF estiver ausente ou
+        for inválido.
+    """
+    try:
+        if fields["kdf"] != "scrypt":
+            raise InvalidEncryptedFormat(
+                TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+            )
+        salt = b64decode(fields["salt"], validate=True)
+        params = validate_params(
+            ScryptParams(int(fields["n"]), int(fields["r"]), int(fields["p"]))
+        )
+        return salt, params
+
+    except (KeyError, ValueError) as e:
+        raise InvalidEncryptedFormat(
+            TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+        ) from e
+
+
+def subkey_from_fields(fields: Dict[str, str], master_key: bytes) -> bytes:
+    """
+    Aplica o HKDF à chave mestra quando o cabeçalho tiver o campo "hkdf".
+
+    Args:
+        fields (Dict[str, str]): Campos lidos do cabeçalho.
+        master_key (bytes): Chave mestra derivada pelo Scrypt.
+
+    Returns:
+        bytes: A subchave da mensagem ou do arquivo, ou a própria chave
+        mestra em cabeçalhos sem o campo "hkdf".
+
+    Raises:
+        InvalidEncryptedFormat: Se o salt do HKDF for inválido.
+    """
+    if "hkdf" not in fields:
+        return master_key
+
+    try:
+        return derive_subkey(
+            master_key, b64decode(fields["hkdf"], validate=True)
+        )
+    except ValueError as e:
+        raise InvalidEncryptedFormat(
+            TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+        ) from e
+
+
+def verify_key_check(fields: Dict[str, str], key: bytes) -> bytes:
+    """
+    Confere a chave derivada com o campo "kcv" do cabeçalho, se existir.
+
+    Args:
+        fields (Dict[str, str]): Campos lidos do cabeçalho.
+        key (bytes): Chave derivada da mensagem ou do arquivo.
+
+    Returns:
+        bytes: A própria chave, se for a correta.
+
+    Raises:
+        InvalidEncryptedFormat: Se o campo "kcv" estiver malformado.
+        InvalidKey: Se a chave não corresponder ao valor de verificação.
+    """
+    if "kcv" not in fields:
+        return key
+
+    try:
+        expected = b64decode(fields["kcv"], validate=True)
+    except ValueError as e:
+        raise InvalidEncryptedFormat(
+            TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+        ) from e
+
+    if not hmac.compare_digest(key_check_value(key), expected):
+        raise InvalidKey(TEMPLATE_INVALID_KEY)
+
+    return key
@@ -1,12 +1,10 @@
 """Módulo que contém toda parte de interação com o usuário"""
 
-import os
 import sys
-from typing import List, Tuple
-
-from rich.markdown import Markdown
+from typing import List, Sized, Tuple
 
 from encryptdef.log import print_and_record_log
+from encryptdef.resources import available_cpus
 from encryptdef.settings import console
 from encryptdef.template import (
     TEMPLATE_ERROR_EMPTY_FIELD,
@@ -29,6 +27,9 @@ def print_template_logo(info: bool = False) -> None:
     console.print(TEMPLATE_LOGO)
 
     if info:
+        # O Markdown é pesado e só é usado na tela de informações
+        from rich.markdown import Markdown  # pylint: disable=C0415
+
         md = Markdown(TEMPLATE_INFO)
         console.print(md)
 
@@ -156,21 +157,19 @@ def print_requesting_file(template_file: str) -> List[str]:
     return validate_and_get_input(data_template)
 
 
-def print_get_max_workers(lines: List[str]) -> int:
+def print_get_max_workers(lines: Sized) -> int:
     """
     Determina o número máximo de núcleos da CPU a serem usados.
 
     Args:
-        lines (List[str]): Lista de linhas do arquivo.
+        lines (Sized): Linhas ou blocos do arquivo.
 
     Returns:
         int: Número máximo de núcleos da CPU a serem usados.
     """
     while True:
         try:
-            max_workers = os.cpu_count()
-            if max_workers is None:
-                max_workers = 1
+            max_workers = available_cpus()
 
             if len(lines) > 500:
                 user_input = console.input(
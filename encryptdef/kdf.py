@@ -0,0 +1,236 @@
+"""Módulo responsável pela derivação das chaves de criptografia"""
+
+import hashlib
+import hmac
+import time
+from typing import Dict, NamedTuple, Optional, Union, cast
+
+from encryptdef.resources import kdf_budget
+
+SALT_SIZE = 16
+KEY_SIZE = 32
+
+SCRYPT_N = 2**14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+HKDF_CONTEXT = b"encryptdef"
+
+# Valor de verificação gravado no cabeçalho para detectar a chave errada
+# antes de descriptografar qualquer linha
+KEY_CHECK_LABEL = b"encryptdef key check"
+KEY_CHECK_SIZE = 8
+
+# Memória extra reservada além do mínimo exigido pelo Scrypt
+SCRYPT_MAXMEM_MARGIN = 1024 * 1024
+
+# Limite de memória aceito ao ler parâmetros de um texto criptografado,
+# evitando que um cabeçalho adulterado consuma toda a memória da máquina
+SCRYPT_MAXMEM_LIMIT = 2 * 1024**3
+
+
+class ScryptParams(NamedTuple):
+    """Parâmetros de custo do Scrypt"""
+
+    n: int = SCRYPT_N
+    r: int = SCRYPT_R
+    p: int = SCRYPT_P
+
+
+DEFAULT_PROFILE = "default"
+
+SCRYPT_PROFILES: Dict[str, ScryptParams] = {
+    "fast": ScryptParams(n=2**12),
+    "default": ScryptParams(),
+    "strong": ScryptParams(n=2**17),
+    "archive": ScryptParams(n=2**20),
+}
+
+
+def scrypt_maxmem(params: ScryptParams) -> int:
+    """
+    Calcula a memória necessária para o Scrypt com os parâmetros fornecidos.
+
+    Args:
+        params (ScryptParams): Parâmetros de custo do Scrypt.
+
+    Returns:
+        int: Valor em bytes para o argumento maxmem do hashlib.scrypt.
+    """
+    return 128 * params.r * (params.n + params.p + 2) + SCRYPT_MAXMEM_MARGIN
+
+
+def validate_params(params: ScryptParams) -> ScryptParams:
+    """
+    Valida os parâmetros de custo do Scrypt.
+
+    Args:
+        params (ScryptParams): Parâmetros de custo do Scrypt.
+
+    Returns:
+        ScryptParams: Os mesmos parâmetros, se forem válidos.
+
+    Raises:
+        ValueError: Se n não for uma potência de 2 maior que 1, se r ou p
+        não forem positivos, ou se a memória exigida passar do limite.
+    """
+    n, r, p = params
+    if n < 2 or n & (n - 1):
+        raise ValueError(f"n={n} precisa ser uma potência de 2 maior que 1")
+    if r < 1 or p < 1:
+        raise ValueError("r e p precisam ser maiores que 0")
+    if scrypt_maxmem(params) > SCRYPT_MAXMEM_LIMIT:
+        raise ValueError(f"n={n}, r={r} exigem memória demais")
+
+    return params
+
+
+def resolve_params(
+    profile: Optional[str] = None,
+    n: Optional[int] = None,
+    r: Optional[int] = None,
+    p: Optional[int] = None,
+) -> ScryptParams:
+    """
+    Monta os parâmetros do Scrypt a partir de um perfil e de valores
+    explícitos, que têm prioridade sobre o perfil.
+
+    Args:
+        profile (Optional[str]): Nome do perfil em SCRYPT_PROFILES.
+        n (Optional[int]): Custo de CPU/memória explícito.
+        r (Optional[int]): Tamanho do bloco explícito.
+        p (Optional[int]): Fator de paralelização explícito.
+
+    Returns:
+        ScryptParams: Os parâmetros validados.
+
+    Raises:
+        ValueError: Se o perfil não existir ou os parâmetros forem inválidos.
+    """
+    try:
+        base = SCRYPT_PROFILES[profile or DEFAULT_PROFILE]
+    except KeyError as e:
+        raise ValueError(f"perfil '{profile}' não existe") from e
+
+    return validate_params(
+        ScryptParams(
+            n=base.n if n is None else n,
+            r=base.r if r is None else r,
+            p=base.p if p is None else p,
+        )
+    )
+
+
+def derive_key(
+    password: Union[str, bytes, memoryview],
+    salt: bytes,
+    n: int = SCRYPT_N,
+    r: int = SCRYPT_R,
+    p: int = SCRYPT_P,
+) -> bytes:
+    """
+    Deriva uma chave privada a partir da senha usando Scrypt.
+
+    Args:
+        password (Union[str, bytes, memoryview]): A senha fornecida pelo
+        usuário, como texto ou já codificada em UTF-8.
+        salt (bytes): Salt aleatório usado na derivação.
+        n (int): Custo de CPU/memória do Scrypt.
+        r (int): Tamanho do bloco do Scrypt.
+        p (int): Fator de paralelização do Scrypt.
+
+    Returns:
+        bytes: Chave privada com KEY_SIZE bytes.
+    """
+    maxmem = scrypt_maxmem(ScryptParams(n, r, p))
+    # Limita os Scrypt simultâneos ao orçamento de memória do processo
+    with kdf_budget().reserve(maxmem):
+        return hashlib.scrypt(
+            password.encode() if isinstance(password, str) else password,
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=maxmem,
+            dklen=KEY_SIZE,
+        )
+
+
+def derive_subkey(master_key: bytes, salt: bytes) -> bytes:
+    """
+    Deriva uma subchave a partir da chave mestra usando HKDF-SHA256.
+
+    Diferente do Scrypt, o HKDF custa microssegundos, então uma chave mestra
+    derivada uma única vez pode gerar uma subchave para cada mensagem.
+
+    Args:
+        master_key (bytes): Chave mestra derivada pelo Scrypt.
+        salt (bytes): Salt aleatório da mensagem ou do arquivo.
+
+    Returns:
+        bytes: Subchave com KEY_SIZE bytes.
+    """
+    # pylint: disable=C0415
+    from Cryptodome.Hash import SHA256
+    from Cryptodome.Protocol.KDF import HKDF
+
+    return cast(
+        bytes,
+        HKDF(master_key, KEY_SIZE, salt, SHA256, context=HKDF_CONTEXT),
+    )
+
+
+def key_check_value(key: bytes) -> bytes:
+    """
+    Calcula o valor de verificação de uma chave já derivada.
+
+    Args:
+        key (bytes): Chave da mensagem ou do arquivo.
+
+    Returns:
+        bytes: Os primeiros KEY_CHECK_SIZE bytes do HMAC-SHA256 da chave.
+    """
+    return hmac.new(key, KEY_CHECK_LABEL, hashlib.sha256).digest()[
+        :KEY_CHECK_SIZE
+    ]
+
+
+def calibrate(
+    target_seconds: float,
+    r: int = SCRYPT_R,
+    p: int = SCRYPT_P,
+    max_memory: int = SCRYPT_MAXMEM_LIMIT,
+) -> ScryptParams:
+    """
+    Mede o Scrypt nesta máquina e escolhe o maior n que respeita o tempo
+    alvo e o limite de memória.
+
+    Args:
+        target_seconds (float): Tempo máximo aceito por derivação.
+        r (int): Tamanho do bloco do Scrypt.
+        p (int): Fator de paralelização do Scrypt.
+        max_memory (int): Memória máxima em bytes por derivação.
+
+    Returns:
+        ScryptParams: Os parâmetros calibrados. Se nem o menor n cumprir o
+        tempo alvo, retorna n=2**10.
+    """
+    best = ScryptParams(n=2**10, r=r, p=p)
+    params = best
+
+    while scrypt_maxmem(params) <= max_memory:
+        start = time.perf_counter()
+        derive_key("calibrate", b"\0" * SALT_SIZE, *params)
+        elapsed = time.perf_counter() - start
+
+        if elapsed > target_seconds:
+            break
+
+        best = params
+        # O custo cresce linearmente com n: evita medir um n que
+        # certamente passaria do tempo alvo
+        if elapsed * 2 > target_seconds:
+            break
+        params = params._replace(n=params.n * 2)
+
+    return best
@@ -0,0 +1,319 @@
+"""Módulo responsável pela hierarquia de chaves
+
+Um KeyContext deriva a chave mestra com Scrypt uma única vez e, para cada
+mensagem ou arquivo, deriva uma subchave barata com HKDF sobre um salt
+aleatório. O cabeçalho gravado continua autocontido: quem tiver apenas a
+senha consegue derivar novamente a chave mestra e a subchave.
+
+Um RawKeyContext usa uma chave de 32 bytes já aleatória (por exemplo, vinda
+de um cofre de segredos) como chave mestra, sem nenhum custo de Scrypt. O
+cabeçalho gravado usa "kdf=raw" para marcar esse modo.
+"""
+
+import threading
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+
+from Cryptodome.Random import get_random_bytes
+
+from encryptdef.exceptions import InvalidKey
+from encryptdef.header import (
+    build_header,
+    parse_header,
+    read_kdf_fields,
+    subkey_from_fields,
+    verify_key_check,
+)
+from encryptdef.kdf import (
+    KEY_SIZE,
+    SALT_SIZE,
+    ScryptParams,
+    derive_key,
+    derive_subkey,
+    key_check_value,
+)
+from encryptdef.template import (
+    TEMPLATE_INVALID_RAW_KEY,
+    TEMPLATE_PASSWORD_REQUIRED,
+    TEMPLATE_RAW_KEY_REQUIRED,
+)
+
+# Quantidade de chaves mestras mantidas em cache por contexto
+MAX_CACHED_MASTER_KEYS = 128
+
+RAW_KDF = "raw"
+
+# Formatos aceitos para o conteúdo de --keyfile
+PASSWORD_KEY_FORMAT = "password"
+RAW_KEY_FORMAT = "raw"
+HEX_KEY_FORMAT = "hex"
+BASE64_KEY_FORMAT = "base64"
+KEY_FORMATS = [
+    PASSWORD_KEY_FORMAT,
+    RAW_KEY_FORMAT,
+    HEX_KEY_FORMAT,
+    BASE64_KEY_FORMAT,
+]
+
+
+class KeyContext:
+    """
+    Contexto de chaves reutilizável para uma senha.
+
+    Args:
+        password (str): A senha usada para derivar a chave mestra.
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt. Se
+        None, usa os parâmetros padrão.
+    """
+
+    def __init__(
+        self, password: str, params: Optional[ScryptParams] = None
+    ) -> None:
+        self.password = password
+        self.params = params or ScryptParams()
+        self.salt = get_random_bytes(SALT_SIZE)
+        self._master_keys: "OrderedDict[Tuple[bytes, ScryptParams], bytes]"
+        self._master_keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, object]:
+        # Locks não podem ser serializados para o backend de processos
+        return {
+            "password": self.password,
+            "params": self.params,
+            "salt": self.salt,
+        }
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        self.__dict__.update(state)
+        self._master_keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def master_key(
+        self,
+        salt: Optional[bytes] = None,
+        params: Optional[ScryptParams] = None,
+    ) -> bytes:
+        """
+        Retorna a chave mestra do salt e dos parâmetros, derivando com Scrypt
+        apenas na primeira vez.
+
+        Args:
+            salt (Optional[bytes]): Salt da chave mestra. Se None, usa o
+            salt do próprio contexto.
+            params (Optional[ScryptParams]): Parâmetros do Scrypt. Se None,
+            usa os parâmetros do próprio contexto.
+
+        Returns:
+            bytes: A chave mestra.
+        """
+        cache_key = (salt or self.salt, params or self.params)
+
+        with self._lock:
+            if cache_key in self._master_keys:
+                self._master_keys.move_to_end(cache_key)
+                return self._master_keys[cache_key]
+
+        master_key = derive_key(self.password, cache_key[0], *cache_key[1])
+
+        with self._lock:
+            self._master_keys[cache_key] = master_key
+            if len(self._master_keys) > MAX_CACHED_MASTER_KEYS:
+                self._master_keys.popitem(last=False)
+
+        return master_key
+
+    def for_params(self, params: ScryptParams) -> "KeyContext":
+        """
+        Retorna o contexto usado para encriptar com os parâmetros do Scrypt.
+        Um contexto já criado mantém os próprios parâmetros.
+
+        Args:
+            params (ScryptParams): Parâmetros pedidos ao encriptar.
+
+        Returns:
+            KeyContext: O contexto de chaves.
+        """
+        return self
+
+    def kdf_fields(self) -> Dict[str, str]:
+        """
+        Retorna os campos do cabeçalho que identificam a chave mestra.
+
+        Returns:
+            Dict[str, str]: Campos do KDF com o salt e os parâmetros.
+        """
+        return {
+            "kdf": "scrypt",
+            "n": str(self.params.n),
+            "r": str(self.params.r),
+            "p": str(self.params.p),
+            "salt": b64encode(self.salt).decode("utf-8"),
+        }
+
+    def legacy_key(self, salt: bytes) -> bytes:
+        """
+        Deriva a chave de uma mensagem no formato antigo, sem cabeçalho.
+
+        Args:
+            salt (bytes): Salt gravado na mensagem.
+
+        Returns:
+            bytes: A chave derivada com os parâmetros padrão do Scrypt.
+        """
+        return derive_key(self.password, salt)
+
+    def new_key(
+        self, extra_fields: Optional[Dict[str, str]] = None
+    ) -> Tuple[str, bytes]:
+        """
+        Gera um salt de HKDF, deriva uma nova subchave e monta o cabeçalho.
+
+        Args:
+            extra_fields (Optional[Dict[str, str]]): Campos adicionais que
+            serão gravados no cabeçalho.
+
+        Returns:
+            Tuple[str, bytes]: A linha de cabeçalho e a subchave.
+        """
+        hkdf_salt = get_random_bytes(SALT_SIZE)
+        key = derive_subkey(self.master_key(), hkdf_salt)
+
+        fields = self.kdf_fields()
+        fields["hkdf"] = b64encode(hkdf_salt).decode("utf-8")
+        fields["kcv"] = b64encode(key_check_value(key)).decode("utf-8")
+        fields.update(extra_fields or {})
+
+        return build_header(fields), key
+
+    def key_from_fields(self, fields: Dict[str, str]) -> bytes:
+        """
+        Deriva a chave de uma mensagem ou arquivo a partir dos campos do
+        cabeçalho, reaproveitando a chave mestra em cache.
+
+        Args:
+            fields (Dict[str, str]): Campos lidos do cabeçalho.
+
+        Returns:
+            bytes: A chave derivada.
+
+        Raises:
+            InvalidEncryptedFormat: Se o cabeçalho estiver malformado.
+            InvalidKey: Se o cabeçalho exigir uma chave bruta ou se a senha
+            não corresponder ao valor de verificação.
+        """
+        if fields.get("kdf") == RAW_KDF:
+            raise InvalidKey(TEMPLATE_RAW_KEY_REQUIRED)
+
+        salt, params = read_kdf_fields(fields)
+        return verify_key_check(
+            fields, subkey_from_fields(fields, self.master_key(salt, params))
+        )
+
+    def key_from_header(self, line: str) -> bytes:
+        """
+        Deriva a chave de uma mensagem ou arquivo a partir do cabeçalho.
+
+        Args:
+            line (str): Linha de cabeçalho.
+
+        Returns:
+            bytes: A chave derivada.
+
+        Raises:
+            InvalidEncryptedFormat: Se o cabeçalho estiver malformado.
+        """
+        return self.key_from_fields(parse_header(line))
+
+
+def as_key_context(
+    key: Union[str, KeyContext], params: Optional[ScryptParams] = None
+) -> KeyContext:
+    """
+    Retorna o contexto fornecido ou cria um novo a partir da senha.
+
+    Args:
+        key (Union[str, KeyContext]): Senha ou contexto de chaves.
+        params (Optional[ScryptParams]): Parâmetros do Scrypt usados ao criar
+        um novo contexto.
+
+    Returns:
+        KeyContext: O contexto de chaves.
+    """
+    if isinstance(key, KeyContext):
+        return key if params is None else key.for_params(params)
+    return KeyContext(key, params)
+
+
+class RawKeyContext(KeyContext):
+    """
+    Contexto de chaves para uma chave bruta de alta entropia, usada como
+    chave mestra sem passar pelo Scrypt.
+
+    Args:
+        key (bytes): Chave com KEY_SIZE bytes.
+
+    Raises:
+        ValueError: Se a chave não tiver KEY_SIZE bytes.
+    """
+
+    def __init__(self, key: bytes) -> None:  # pylint: disable=W0231
+        if len(key) != KEY_SIZE:
+            raise ValueError(TEMPLATE_INVALID_RAW_KEY % KEY_SIZE)
+        self.key = key
+
+    def __getstate__(self) -> Dict[str, object]:
+        return {"key": self.key}
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        self.__dict__.update(state)
+
+    def master_key(
+        self,
+        salt: Optional[bytes] = None,
+        params: Optional[ScryptParams] = None,
+    ) -> bytes:
+        """Retorna a própria chave bruta, sem derivação."""
+        return self.key
+
+    def kdf_fields(self) -> Dict[str, str]:
+        """Marca o cabeçalho com "kdf=raw", sem salt nem parâmetros."""
+        return {"kdf": RAW_KDF}
+
+    def legacy_key(self, salt: bytes) -> bytes:
+        """Mensagens no formato antigo sempre exigem uma senha."""
+        raise InvalidKey(TEMPLATE_PASSWORD_REQUIRED)
+
+    def key_from_fields(self, fields: Dict[str, str]) -> bytes:
+        """Deriva a subchave de um cabeçalho marcado com "kdf=raw"."""
+        if fields.get("kdf") != RAW_KDF:
+            raise InvalidKey(TEMPLATE_PASSWORD_REQUIRED)
+
+        return verify_key_check(fields, subkey_from_fields(fields, self.key))
+
+
+def load_raw_key(data: bytes, key_format: str) -> RawKeyContext:
+    """
+    Lê uma chave bruta no formato informado.
+
+    Args:
+        data (bytes): Conteúdo do arquivo de chave.
+        key_format (str): "raw" para bytes, "hex" ou "base64" para texto.
+
+    Returns:
+        RawKeyContext: O contexto da chave lida.
+
+    Raises:
+        ValueError: Se o conteúdo não puder ser decodificado ou não tiver
+        KEY_SIZE bytes.
+    """
+    try:
+        if key_format == HEX_KEY_FORMAT:
+            data = bytes.fromhex(data.decode("ascii").strip())
+        elif key_format == BASE64_KEY_FORMAT:
+            data = b64decode(data.strip(), validate=True)
+    except ValueError as e:
+        raise ValueError(TEMPLATE_INVALID_RAW_KEY % KEY_SIZE) from e
+
+    return RawKeyContext(data)
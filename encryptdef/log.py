@@ -1,14 +1,31 @@
-"""Módulo que contém as configurações do logging"""
-
+"""Módulo que contém as configurações do logging
+
+Os registros são enviados para uma fila por um QueueHandler e gravados no
+arquivo por um QueueListener em uma thread separada, então registrar uma
+mensagem nunca espera pela escrita em disco. O arquivo fica em LOG_FILE
+(configurável por ENCRYPTDEF_LOG_FILE) e o handler só é criado na primeira
+mensagem registrada. Se o local não puder ser escrito, por exemplo em uma
+instalação somente leitura, as mensagens continuam sendo exibidas no
+console e apenas a gravação em arquivo é desativada.
+"""
+
+import atexit
+import json
 import logging
 import os
-from logging import handlers
-from typing import Optional, Union
+import queue
+from typing import TYPE_CHECKING, Optional, Union
+
+from encryptdef.settings import LOG_FILE, console
 
-from encryptdef.settings import console
+if TYPE_CHECKING:  # pragma: no cover
+    from logging.handlers import QueueListener
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
 
+# "text" para linhas legíveis ou "json" para um objeto JSON por linha
+LOG_FORMAT = os.getenv("ENCRYPTDEF_LOG_FORMAT", "text").lower()
+
 log_instance = logging.getLogger("encryptdef")  # Criando instância de log
 
 # Objeto de formatação de como serão exibidos os logs
@@ -17,25 +34,97 @@ fmt = logging.Formatter(
     "l:%(lineno)d f:%(filename)s: %(message)s"
 )
 
+_listener: Optional["QueueListener"] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada registro como um objeto JSON em uma única linha."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "name": record.name,
+            "level": record.levelname,
+            "file": record.filename,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _file_handler(
+    logfile: Union[str, os.PathLike[str]], log_format: str
+) -> Optional[logging.Handler]:
+    """
+    Cria o handler de arquivo rotativo, ou retorna None se o arquivo não
+    puder ser criado.
+    """
+    from logging import handlers  # pylint: disable=C0415
+
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(logfile)), exist_ok=True)
+        fh = handlers.RotatingFileHandler(
+            logfile, maxBytes=10**6, backupCount=10, encoding="utf-8"
+        )
+    except OSError:
+        return None
+
+    fh.setFormatter(JsonFormatter() if log_format == "json" else fmt)
+    return fh
+
+
+def stop_logger() -> None:
+    """Grava os registros pendentes na fila e encerra a thread do log."""
+    global _listener  # pylint: disable=W0603
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def configure_logger(
-    log_level: str, logfile: Optional[Union[str, os.PathLike[str]]] = None
+    log_level: str,
+    logfile: Optional[Union[str, os.PathLike[str]]] = None,
+    log_format: Optional[str] = None,
 ) -> None:
-    """Configura o logger com um handler de arquivo rotativo."""
-    if logfile is None:
-        # Obtém o diretório raiz do programa
-        root_dir = os.path.dirname(os.path.abspath(__file__))
-        logfile = os.path.join(root_dir, "encryptdef.log")
+    """
+    Configura o logger com uma fila e um handler de arquivo rotativo
+    alimentado por um QueueListener.
+
+    Args:
+        log_level (str): Nível mínimo dos registros gravados.
+        logfile (Optional[Union[str, os.PathLike[str]]]): Caminho do arquivo
+        de log. Se None, usa LOG_FILE.
+        log_format (Optional[str]): "text" ou "json". Se None, usa
+        LOG_FORMAT.
+    """
+    from logging import handlers  # pylint: disable=C0415
+
+    global _listener  # pylint: disable=W0603
 
     # Verifica se o logger já possui handlers para evitar duplicações
-    if not log_instance.hasHandlers():
-        fh = handlers.RotatingFileHandler(
-            logfile, maxBytes=10**6, backupCount=10
-        )
-        fh.setLevel(log_level)
-        fh.setFormatter(fmt)
-        log_instance.addHandler(fh)
-        log_instance.setLevel(log_level)
+    # (só os do próprio logger; handlers do root não contam)
+    if log_instance.handlers:
+        return
+
+    stop_logger()
+    log_instance.setLevel(log_level)
+
+    fh = _file_handler(logfile or LOG_FILE, log_format or LOG_FORMAT)
+    if fh is None:
+        # Sem arquivo de log, os registros são descartados
+        log_instance.addHandler(logging.NullHandler())
+        return
+
+    fh.setLevel(log_level)
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _listener = handlers.QueueListener(
+        log_queue, fh, respect_handler_level=True
+    )
+    _listener.start()
+    log_instance.addHandler(handlers.QueueHandler(log_queue))
 
 
 def get_logger() -> logging.Logger:
@@ -43,25 +132,25 @@ def get_logger() -> logging.Logger:
     return log_instance
 
 
-# Configure o logger ao importar o módulo
-configure_logger(LOG_LEVEL)
-
 log = get_logger()
 
+# Garante que os registros ainda na fila sejam gravados ao sair
+atexit.register(stop_logger)
 
-def print_and_record_log(msg: str, style: Optional[str] = None) -> None:
+
+def record_log(msg: str, style: Optional[str] = None) -> None:
     """
-    Loga uma mensagem e a imprime no console com um estilo especificado.
+    Loga uma mensagem sem imprimi-la no console.
 
     Args:
-        msg (str): A mensagem a ser logada e impressa.
-        style (Optional[str]): O estilo da mensagem de log. Valores possíveis
-        são "critical", "error", "warning", "info" e "debug".
-        Padrão é None.
-
-    Returns:
-        None
+        msg (str): A mensagem a ser logada.
+        style (Optional[str]): O nível do registro. Valores possíveis são
+        "critical", "error", "warning", "info" e "debug". Padrão é None.
     """
+    # O arquivo de log só é configurado na primeira mensagem registrada,
+    # para não pesar na inicialização da ferramenta
+    configure_logger(LOG_LEVEL)
+
     # Garantir que a chave seja sempre uma string
     if style is None:
         style = "info"
@@ -77,4 +166,20 @@ def print_and_record_log(msg: str, style: Optional[str] = None) -> None:
     )  # Garantir que sempre retornará uma função
 
     log_func(msg.strip())
-    console.print(msg, style=style)
+
+
+def print_and_record_log(msg: str, style: Optional[str] = None) -> None:
+    """
+    Loga uma mensagem e a imprime no console com um estilo especificado.
+
+    Args:
+        msg (str): A mensagem a ser logada e impressa.
+        style (Optional[str]): O estilo da mensagem de log. Valores possíveis
+        são "critical", "error", "warning", "info" e "debug".
+        Padrão é None.
+
+    Returns:
+        None
+    """
+    record_log(msg, style)
+    console.print(msg, style=style or "info")
@@ -0,0 +1,426 @@
+"""Módulo responsável pelos formatos de saída da linha de comando
+
+No formato "rich" os resultados são exibidos com cores, barras de progresso
+e mensagens de sucesso. Os formatos "raw", "json" e "ndjson" são feitos para
+scripts: apenas o resultado vai para a saída padrão, sem markup, sem barra
+de progresso e sem perguntas, e os erros vão para a saída de erro (raw) ou
+para um objeto com o campo "error" (json e ndjson).
+
+O progresso dos arquivos pode ser enviado como NDJSON para outro descritor
+de arquivo, por exemplo `--progress-fd 3`, com um evento por linha:
+
+    {"event": "start", "total": 1000}
+    {"event": "progress", "completed": 250, "total": 1000,
+     "records_per_s": 500.0, "bytes_per_s": 40000.0, "eta": 1.5}
+    {"event": "finish", "completed": 1000, "total": 1000}
+
+A barra do rich e os eventos NDJSON acumulam as atualizações e repassam no
+máximo uma a cada PROGRESS_INTERVAL segundos. A vazão e o tempo restante
+vêm de uma média móvel das últimas THROUGHPUT_WINDOW segundos; os bytes
+por segundo são estimados pelo tamanho médio de um registro, quando o
+tamanho da entrada é conhecido.
+"""
+
+import json
+import os
+import sys
+import time
+from collections import deque
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+
+RICH_OUTPUT = "rich"
+RAW_OUTPUT = "raw"
+JSON_OUTPUT = "json"
+NDJSON_OUTPUT = "ndjson"
+OUTPUT_FORMATS = (RICH_OUTPUT, RAW_OUTPUT, JSON_OUTPUT, NDJSON_OUTPUT)
+
+# Intervalo mínimo entre dois eventos de progresso, em segundos
+PROGRESS_INTERVAL = 0.1
+
+# Janela da média móvel da vazão, em segundos
+THROUGHPUT_WINDOW = 5.0
+
+RATE_UNITS = ("", "k", "M", "G", "T")
+
+
+class OutputOptions(NamedTuple):
+    """
+    Formato da saída, descritor opcional dos eventos de progresso e se a
+    barra de progresso deve ser exibida
+    """
+
+    output_format: str = RICH_OUTPUT
+    progress_fd: Optional[int] = None
+    progress: bool = True
+
+    @property
+    def is_rich(self) -> bool:
+        """True se a saída for a interface com cores e barras de progresso."""
+        return self.output_format == RICH_OUTPUT
+
+
+def resolve_output_format(output_format: Optional[str]) -> str:
+    """
+    Resolve o formato de saída. Sem um formato explícito, usa "rich" em um
+    terminal e "raw" quando a saída padrão é um pipe ou arquivo.
+
+    Args:
+        output_format (Optional[str]): Formato escolhido ou None.
+
+    Returns:
+        str: Um dos OUTPUT_FORMATS.
+    """
+    if output_format is not None:
+        return output_format
+    return RICH_OUTPUT if sys.stdout.isatty() else RAW_OUTPUT
+
+
+def plain_text(message: str) -> str:
+    """Remove o markup do rich e os espaços das pontas de uma mensagem."""
+    from rich.text import Text  # pylint: disable=C0415
+
+    return Text.from_markup(message).plain.strip()
+
+
+def write_result(output: OutputOptions, fields: Dict[str, Any]) -> None:
+    """
+    Escreve o resultado de uma operação na saída padrão.
+
+    Args:
+        output (OutputOptions): Formato da saída.
+        fields (Dict[str, Any]): Campos do resultado. No formato "raw" apenas
+        o campo "result" é escrito.
+    """
+    if output.output_format == RAW_OUTPUT:
+        line = str(fields["result"])
+    elif output.output_format == JSON_OUTPUT:
+        line = json.dumps(fields, ensure_ascii=False, indent=2)
+    else:
+        line = json.dumps(fields, ensure_ascii=False, separators=(",", ":"))
+
+    sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+
+
+def write_error(
+    output: OutputOptions, operation: str, message: str, **fields: Any
+) -> None:
+    """
+    Escreve um erro sem markup: na saída de erro no formato "raw", ou como
+    um objeto com o campo "error" nos formatos JSON.
+
+    Args:
+        output (OutputOptions): Formato da saída.
+        operation (str): "encrypt" ou "decrypt".
+        message (str): Mensagem de erro, possivelmente com markup do rich.
+        **fields (Any): Campos extras do objeto de erro.
+    """
+    error = plain_text(message)
+    if output.output_format == RAW_OUTPUT:
+        sys.stderr.write(error + "\n")
+        sys.stderr.flush()
+        return
+
+    write_result(
+        output,
+        {"operation": operation, "status": "error", **fields, "error": error},
+    )
+
+
+def format_rate(value: float, unit: str) -> str:
+    """Formata uma vazão com prefixo decimal, como "1.5 kreg/s"."""
+    for prefix in RATE_UNITS:
+        if abs(value) < 1000 or prefix == RATE_UNITS[-1]:
+            break
+        value /= 1000
+    return f"{value:.1f} {prefix}{unit}/s"
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    """Formata o tempo restante como H:MM:SS, ou "-:--:--" se desconhecido."""
+    if seconds is None:
+        return "-:--:--"
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
+class Throughput:
+    """
+    Vazão em uma janela móvel de amostras (instante, registros concluídos).
+
+    Args:
+        total (Optional[float]): Quantidade de registros, se conhecida.
+        total_bytes (Optional[int]): Tamanho da entrada em bytes, se
+        conhecido.
+        window (float): Duração da janela, em segundos.
+        clock (Callable[[], float]): Relógio em segundos.
+    """
+
+    def __init__(
+        self,
+        total: Optional[float] = None,
+        total_bytes: Optional[int] = None,
+        window: float = THROUGHPUT_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.total = total
+        self.total_bytes = total_bytes
+        self.window = window
+        self.clock = clock
+        self.completed: float = 0
+        self.samples: Deque[Tuple[float, float]] = deque([(clock(), 0)])
+
+    def sample(self) -> None:
+        """Registra o avanço atual e descarta as amostras fora da janela."""
+        now = self.clock()
+        self.samples.append((now, self.completed))
+        # Mantém uma amostra anterior à janela como ponto de partida
+        while (
+            len(self.samples) > 2 and self.samples[1][0] <= now - self.window
+        ):
+            self.samples.popleft()
+
+    @property
+    def records_per_s(self) -> Optional[float]:
+        """Registros por segundo na janela, ou None sem duas amostras."""
+        (start, first), (end, last) = self.samples[0], self.samples[-1]
+        if end <= start:
+            return None
+        return (last - first) / (end - start)
+
+    @property
+    def bytes_per_s(self) -> Optional[float]:
+        """Bytes por segundo, pelo tamanho médio de um registro."""
+        rate = self.records_per_s
+        if rate is None or not self.total or self.total_bytes is None:
+            return None
+        return rate * self.total_bytes / self.total
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Segundos restantes na vazão atual, se o total for conhecido."""
+        rate = self.records_per_s
+        if not rate or self.total is None:
+            return None
+        return max(0.0, self.total - self.completed) / rate
+
+    def fields(self) -> Dict[str, float]:
+        """Vazão e tempo restante conhecidos, arredondados para eventos."""
+        values = {
+            "records_per_s": self.records_per_s,
+            "bytes_per_s": self.bytes_per_s,
+            "eta": self.eta,
+        }
+        return {
+            name: round(value, 1)
+            for name, value in values.items()
+            if value is not None
+        }
+
+    def describe(self) -> str:
+        """Vazão em texto para a barra de progresso."""
+        rate = self.records_per_s
+        if rate is None:
+            return ""
+        text = format_rate(rate, "reg")
+        if self.bytes_per_s is not None:
+            text += " · " + format_rate(self.bytes_per_s, "B")
+        return text
+
+
+class NullProgress:
+    """Progresso que não exibe nada, com a mesma interface do rich."""
+
+    def __enter__(self) -> "NullProgress":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        return None
+
+    def add_task(  # pylint: disable=W0613
+        self,
+        description: str,
+        total: Optional[float] = None,
+        total_bytes: Optional[int] = None,
+    ) -> int:
+        """
+        Registra a tarefa e retorna o seu identificador.
+
+        Args:
+            description (str): Descrição exibida.
+            total (Optional[float]): Quantidade de registros, se conhecida.
+            total_bytes (Optional[int]): Tamanho da entrada em bytes, usado
+            para estimar os bytes por segundo.
+        """
+        return 0
+
+    def update(self, task: int, advance: float = 0) -> None:
+        """Avança a tarefa."""
+
+
+class NdjsonProgress(NullProgress):
+    """
+    Progresso escrito como NDJSON em um descritor de arquivo, com no máximo
+    um evento de progresso a cada PROGRESS_INTERVAL segundos.
+    """
+
+    def __init__(self, fd: int, interval: float = PROGRESS_INTERVAL) -> None:
+        self.fd = fd
+        self.interval = interval
+        self.total: Optional[float] = None
+        self.completed: float = 0
+        self.last_event = 0.0
+        self.throughput = Throughput()
+
+    def _emit(self, event: str, **fields: Any) -> None:
+        line = json.dumps({"event": event, **fields}, separators=(",", ":"))
+        os.write(self.fd, (line + "\n").encode("utf-8"))
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        event = "finish" if exc_type is None else "error"
+        self._emit(event, completed=self.completed, total=self.total)
+
+    def add_task(
+        self,
+        description: str,
+        total: Optional[float] = None,
+        total_bytes: Optional[int] = None,
+    ) -> int:
+        self.total = total
+        self.throughput = Throughput(total, total_bytes)
+        self.last_event = time.monotonic()
+        self._emit("start", total=total)
+        return 0
+
+    def update(self, task: int, advance: float = 0) -> None:
+        self.completed += advance
+        self.throughput.completed = self.completed
+        now = time.monotonic()
+        if now - self.last_event >= self.interval:
+            self.last_event = now
+            self.throughput.sample()
+            self._emit(
+                "progress",
+                completed=self.completed,
+                total=self.total,
+                **self.throughput.fields(),
+            )
+
+
+class RichProgress:
+    """
+    Barra de progresso do rich com a vazão e o tempo restante da média
+    móvel. As atualizações são acumuladas e repassadas ao rich no máximo
+    uma vez a cada PROGRESS_INTERVAL segundos, em vez de uma por registro.
+    """
+
+    def __init__(self, interval: float = PROGRESS_INTERVAL) -> None:
+        # O rich.progress só é importado quando a barra é exibida
+        from rich.progress import (  # pylint: disable=C0415
+            BarColumn,
+            Progress,
+            TaskProgressColumn,
+            TextColumn,
+        )
+
+        self.progress = Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            TextColumn("{task.fields[speed]}"),
+            TextColumn("[progress.remaining]{task.fields[eta]}"),
+        )
+        self.interval = interval
+        self.throughput = Throughput()
+        self.pending: float = 0
+        self.last_update = 0.0
+        self.task: Any = None
+
+    def __enter__(self) -> "RichProgress":
+        self.progress.__enter__()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._flush()
+        self.progress.__exit__(exc_type, exc, traceback)
+
+    def add_task(
+        self,
+        description: str,
+        total: Optional[float] = None,
+        total_bytes: Optional[int] = None,
+    ) -> int:
+        self.throughput = Throughput(total, total_bytes)
+        self.last_update = time.monotonic()
+        self.task = self.progress.add_task(
+            description, total=total, speed="", eta=format_eta(None)
+        )
+        return 0
+
+    def update(self, task: int, advance: float = 0) -> None:
+        self.pending += advance
+        self.throughput.completed += advance
+        now = time.monotonic()
+        if now - self.last_update >= self.interval:
+            self.last_update = now
+            self._flush()
+
+    def _flush(self) -> None:
+        """Repassa ao rich o avanço acumulado, a vazão e o tempo restante."""
+        if self.task is None:
+            return
+        self.throughput.sample()
+        self.progress.update(
+            self.task,
+            advance=self.pending,
+            speed=self.throughput.describe(),
+            eta=format_eta(self.throughput.eta),
+        )
+        self.pending = 0
+
+
+def new_progress(output: Optional[OutputOptions] = None) -> Any:
+    """
+    Cria o indicador de progresso adequado ao formato da saída.
+
+    Args:
+        output (Optional[OutputOptions]): Formato da saída. Se None, usa a
+        barra de progresso do rich.
+
+    Returns:
+        Any: Um objeto com add_task e update, usado como gerenciador de
+        contexto: a barra do rich, os eventos NDJSON ou nenhum progresso.
+        Com `progress` falso, apenas os eventos NDJSON pedidos continuam.
+    """
+    output = output or OutputOptions()
+    if output.progress_fd is not None:
+        return NdjsonProgress(output.progress_fd)
+    if not output.is_rich or not output.progress:
+        return NullProgress()
+    return RichProgress()
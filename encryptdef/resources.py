@@ -0,0 +1,312 @@
+"""Módulo responsável pelos recursos da máquina disponíveis para o trabalho
+
+Cada Scrypt com n=2**14 e r=8 aloca cerca de 16 MiB. Em máquinas grandes,
+ou em contêineres com limites menores que a máquina, escolher os
+trabalhadores por os.cpu_count() pode levar ao swap ou ao OOM killer. Aqui
+os núcleos vêm da afinidade do processo e da cota de CPU do cgroup, e a
+memória do MemAvailable e do limite de memória do cgroup (v1 ou v2).
+
+O orçamento de memória, limitado também por --max-memory, decide quantos
+trabalhadores cabem e quantos Scrypt rodam ao mesmo tempo no processo.
+"""
+
+import math
+import os
+import platform
+import re
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+PROC_CGROUP = "/proc/self/cgroup"
+PROC_MEMINFO = "/proc/meminfo"
+
+# Limites do cgroup v1 acima disso significam "sem limite"
+CGROUP_V1_UNLIMITED = 2**60
+
+# Fração da memória detectada que o trabalho pode usar; o resto fica para
+# o interpretador, o cache de páginas e os outros processos
+AVAILABLE_MEMORY_FRACTION = 0.75
+
+SIZE_UNITS = {
+    "": 1,
+    "k": 1024,
+    "m": 1024**2,
+    "g": 1024**3,
+    "t": 1024**4,
+}
+
+_max_memory: Optional[int] = None
+_kdf_budget: Optional["MemoryBudget"] = None
+_kdf_budget_lock = threading.Lock()
+
+
+def _read_int(path: str) -> Optional[int]:
+    """Lê um inteiro de um arquivo, ou None se ele não existir ou for "max"."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            value = file.read().split()
+    except OSError:
+        return None
+    if not value or not value[0].lstrip("-").isdigit():
+        return None
+    return int(value[0])
+
+
+def _cgroup_dirs() -> List[str]:
+    """
+    Diretórios do cgroup v2 do processo, do mais interno até a raiz. Um
+    limite de um cgroup pai também vale para o processo.
+    """
+    relative = ""
+    try:
+        with open(PROC_CGROUP, encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("0::"):
+                    relative = line.strip().removeprefix("0::").strip("/")
+    except OSError:
+        pass
+
+    dirs = [CGROUP_ROOT]
+    parts = [part for part in relative.split("/") if part]
+    for index in range(1, len(parts) + 1):
+        dirs.append(os.path.join(CGROUP_ROOT, *parts[:index]))
+    return dirs[::-1]
+
+
+def cgroup_cpu_limit() -> Optional[int]:
+    """
+    Núcleos permitidos pela cota de CPU do cgroup, arredondados para cima.
+
+    Returns:
+        Optional[int]: Os núcleos, ou None se não houver cota.
+    """
+    limits = []
+    for directory in _cgroup_dirs():
+        try:
+            with open(
+                os.path.join(directory, "cpu.max"), encoding="utf-8"
+            ) as file:
+                quota, period = file.read().split()
+        except (OSError, ValueError):
+            continue
+        if quota != "max" and int(period) > 0:
+            limits.append(math.ceil(int(quota) / int(period)))
+
+    quota_v1 = _read_int(os.path.join(CGROUP_ROOT, "cpu", "cpu.cfs_quota_us"))
+    period_v1 = _read_int(
+        os.path.join(CGROUP_ROOT, "cpu", "cpu.cfs_period_us")
+    )
+    if quota_v1 is not None and quota_v1 > 0 and period_v1:
+        limits.append(math.ceil(quota_v1 / period_v1))
+
+    return max(1, min(limits)) if limits else None
+
+
+def available_cpus() -> int:
+    """
+    Núcleos que o processo pode usar: a afinidade do processo, ou
+    os.cpu_count() onde ela não existe, limitada pela cota do cgroup.
+
+    Returns:
+        int: Quantidade de núcleos, no mínimo 1.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+
+    quota = cgroup_cpu_limit()
+    if quota is not None:
+        cpus = min(cpus, quota)
+    return max(1, cpus)
+
+
+def _meminfo_available() -> Optional[int]:
+    """MemAvailable do /proc/meminfo, em bytes."""
+    try:
+        with open(PROC_MEMINFO, encoding="utf-8") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def cgroup_memory_available() -> Optional[int]:
+    """
+    Memória que ainda cabe no limite do cgroup, em bytes.
+
+    Returns:
+        Optional[int]: O limite menos o uso atual, ou None se não houver
+        limite.
+    """
+    free = []
+    for directory in _cgroup_dirs():
+        limit = _read_int(os.path.join(directory, "memory.max"))
+        if limit is not None:
+            usage = _read_int(os.path.join(directory, "memory.current"))
+            free.append(limit - (usage or 0))
+
+    memory_v1 = os.path.join(CGROUP_ROOT, "memory")
+    limit = _read_int(os.path.join(memory_v1, "memory.limit_in_bytes"))
+    if limit is not None and limit < CGROUP_V1_UNLIMITED:
+        usage = _read_int(os.path.join(memory_v1, "memory.usage_in_bytes"))
+        free.append(limit - (usage or 0))
+
+    return max(0, min(free)) if free else None
+
+
+def available_memory() -> Optional[int]:
+    """
+    Memória disponível para o processo: o menor valor entre o MemAvailable
+    e a folga no limite do cgroup.
+
+    Returns:
+        Optional[int]: Bytes disponíveis, ou None se não for possível
+        descobrir.
+    """
+    values = [
+        value
+        for value in (_meminfo_available(), cgroup_memory_available())
+        if value is not None
+    ]
+    return min(values) if values else None
+
+
+def host_id() -> str:
+    """
+    Identifica a máquina nos caches de medições, para não reaproveitar as
+    medições de outro host.
+
+    Returns:
+        str: O nome e a arquitetura da máquina.
+    """
+    return f"{platform.node()}/{platform.machine()}"
+
+
+def parse_size(text: str) -> int:
+    """
+    Converte um tamanho como "512M", "2G", "1.5GiB" ou "1048576" em bytes.
+
+    Raises:
+        ValueError: Se o texto não for um tamanho válido.
+    """
+    match = re.fullmatch(
+        r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*", text, re.IGNORECASE
+    )
+    if match is None:
+        raise ValueError(f"tamanho inválido: '{text}'")
+
+    size = int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+    if size <= 0:
+        raise ValueError(f"tamanho inválido: '{text}'")
+    return size
+
+
+def set_max_memory(size: Optional[int]) -> None:
+    """
+    Define o orçamento de memória do processo, como o --max-memory da linha
+    de comando.
+
+    Args:
+        size (Optional[int]): Bytes. Se None, usa apenas a memória
+        disponível detectada.
+    """
+    global _max_memory, _kdf_budget  # pylint: disable=W0603
+
+    with _kdf_budget_lock:
+        _max_memory = size
+        _kdf_budget = None
+
+
+def memory_budget() -> Optional[int]:
+    """
+    Memória que o trabalho pode usar: uma fração da memória disponível,
+    limitada pelo orçamento de set_max_memory.
+
+    Returns:
+        Optional[int]: Bytes, ou None se não houver limite conhecido.
+    """
+    available = available_memory()
+    if available is not None:
+        available = int(available * AVAILABLE_MEMORY_FRACTION)
+    if _max_memory is None:
+        return available
+    if available is None:
+        return _max_memory
+    return min(_max_memory, available)
+
+
+def plan_workers(requested: Optional[int], worker_memory: int) -> int:
+    """
+    Quantidade de trabalhadores que cabe nos núcleos e na memória.
+
+    Args:
+        requested (Optional[int]): Trabalhadores pedidos. Se None, usa os
+        núcleos disponíveis.
+        worker_memory (int): Memória usada por um trabalhador, em bytes.
+
+    Returns:
+        int: Trabalhadores, no mínimo 1.
+    """
+    workers = requested or available_cpus()
+    budget = memory_budget()
+    if budget is not None:
+        workers = min(workers, budget // max(1, worker_memory))
+    return max(1, workers)
+
+
+class MemoryBudget:
+    """
+    Orçamento de memória compartilhado entre threads: quem reserva além do
+    que sobra espera uma reserva ser devolvida.
+
+    Args:
+        total (Optional[int]): Bytes do orçamento. Se None, não há limite.
+    """
+
+    def __init__(self, total: Optional[int]) -> None:
+        self.total = total
+        self.used = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, size: int) -> Iterator[None]:
+        """
+        Reserva `size` bytes enquanto o bloco executa. Uma reserva maior
+        que o orçamento inteiro espera até ficar sozinha.
+
+        Args:
+            size (int): Bytes reservados.
+        """
+        total = self.total
+        if total is None:
+            yield
+            return
+
+        size = min(size, total)
+        with self._condition:
+            self._condition.wait_for(lambda: self.used + size <= total)
+            self.used += size
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.used -= size
+                self._condition.notify_all()
+
+
+def kdf_budget() -> MemoryBudget:
+    """
+    Orçamento que limita os Scrypt simultâneos no processo, criado na
+    primeira derivação a partir de memory_budget().
+    """
+    global _kdf_budget  # pylint: disable=W0603
+
+    with _kdf_budget_lock:
+        if _kdf_budget is None:
+            _kdf_budget = MemoryBudget(memory_budget())
+        return _kdf_budget
@@ -0,0 +1,622 @@
+"""Módulo responsável pelo daemon de criptografia (`encryptdef serve`)
+
+Serviços escritos em outras linguagens pagariam, a cada valor, a partida do
+interpretador, as importações e o Scrypt. O daemon fica de pé e responde
+por um socket Unix, ou como co-processo pela entrada e saída padrão, com
+JSON-RPC 2.0 e uma requisição por linha:
+
+    {"jsonrpc": "2.0", "id": 1, "method": "encrypt",
+     "params": {"value": "segredo"}}
+    {"jsonrpc": "2.0", "id": 1, "result": "ed2.AQ..."}
+
+Métodos: "encrypt" e "decrypt" (com "value" e, opcionalmente, "password"
+no lugar da chave do servidor), "stats" e "ping". Uma conexão pode enviar
+várias requisições sem esperar as respostas, que chegam na ordem em que
+ficam prontas, identificadas pelo "id".
+
+Os contextos de chaves ficam em memória e são descartados depois de
+KEY_TTL segundos sem uso. As requisições que chegam enquanto os
+trabalhadores estão ocupados são agrupadas em lotes por método e chave e
+processadas com encrypt_many, então um lote paga uma única subchave.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from encryptdef.api import decrypt
+from encryptdef.backends import THREAD_WORKER_MEMORY
+from encryptdef.batch import decrypt_many, encrypt_many, is_token
+from encryptdef.ciphers import DEFAULT_CIPHER, resolve_cipher
+from encryptdef.exceptions import InvalidEncryptedFormat, InvalidKey
+from encryptdef.kdf import ScryptParams
+from encryptdef.keys import KeyContext
+from encryptdef.output import plain_text
+from encryptdef.resources import plan_workers
+from encryptdef.template import TEMPLATE_KEY_REQUIRED, TEMPLATE_SOCKET_IN_USE
+
+JSONRPC_VERSION = "2.0"
+
+# Segundos sem uso até um contexto de chaves ser descartado
+KEY_TTL = 300.0
+
+# Quantidade máxima de requisições em um lote
+MAX_BATCH = 1024
+
+# Requisições em andamento por conexão antes de parar de ler
+MAX_PENDING_PER_CONNECTION = 4096
+
+# Tamanho máximo de uma linha de requisição
+MAX_REQUEST_SIZE = 16 * 1024 * 1024
+
+# Códigos de erro do JSON-RPC 2.0 e do encryptdef
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INVALID_KEY_ERROR = -32001
+INVALID_FORMAT_ERROR = -32002
+
+ENCRYPT_METHOD = "encrypt"
+DECRYPT_METHOD = "decrypt"
+
+Result = Union[str, Exception]
+
+
+class RpcError(Exception):
+    """Erro devolvido ao cliente no campo "error" da resposta"""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class KeyCache:
+    """
+    Contextos de chaves por senha, descartados depois de `ttl` segundos sem
+    uso. Enquanto um contexto está em cache, as chaves mestras que ele já
+    derivou são reaproveitadas.
+    """
+
+    def __init__(
+        self,
+        ttl: float = KEY_TTL,
+        params: Optional[ScryptParams] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            ttl (float): Segundos sem uso até o descarte.
+            params (Optional[ScryptParams]): Parâmetros do Scrypt dos novos
+            contextos, usados ao criptografar.
+            clock (Callable[[], float]): Relógio, em segundos.
+        """
+        self.ttl = ttl
+        self.params = params
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[KeyContext, float]]"
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def purge(self) -> None:
+        """Descarta os contextos sem uso há mais de `ttl` segundos."""
+        now = self.clock()
+        while self._entries:
+            password, (_, last_used) = next(iter(self._entries.items()))
+            if now - last_used < self.ttl:
+                break
+            del self._entries[password]
+
+    def get(self, key: Union[str, KeyContext]) -> KeyContext:
+        """
+        Retorna o contexto da senha, criando um novo se necessário.
+
+        Args:
+            key (Union[str, KeyContext]): Senha, ou um contexto já criado,
+            como o de uma chave bruta, que é retornado sem cache.
+
+        Returns:
+            KeyContext: O contexto de chaves.
+        """
+        if isinstance(key, KeyContext):
+            return key
+
+        self.purge()
+        entry = self._entries.pop(key, None)
+        context = entry[0] if entry else KeyContext(key, self.params)
+        self._entries[key] = (context, self.clock())
+        return context
+
+
+def encrypt_values(
+    values: List[str], context: KeyContext, cipher: str
+) -> List[Result]:
+    """Criptografa um lote com uma única subchave."""
+    return list(encrypt_many(values, context, cipher=cipher))
+
+
+def decrypt_values(
+    values: List[str], context: KeyContext, _cipher: str
+) -> List[Result]:
+    """
+    Descriptografa um lote. Tokens de encrypt_many são descriptografados
+    juntos; se algum falhar, ou se houver outros formatos, cada valor é
+    descriptografado sozinho, para que o erro vá apenas para quem o enviou.
+    """
+    if all(is_token(value) for value in values):
+        try:
+            return list(decrypt_many(values, context))
+        except (InvalidEncryptedFormat, InvalidKey):
+            pass
+
+    results: List[Result] = []
+    for value in values:
+        try:
+            results.append(decrypt(value, context))
+        except (InvalidEncryptedFormat, InvalidKey) as e:
+            results.append(e)
+    return results
+
+
+BATCH_FUNCS: Dict[str, Callable[[List[str], KeyContext, str], List[Result]]]
+BATCH_FUNCS = {ENCRYPT_METHOD: encrypt_values, DECRYPT_METHOD: decrypt_values}
+
+
+class _Job(NamedTuple):
+    """Valor aguardando um lote"""
+
+    method: str
+    context: KeyContext
+    value: str
+    future: "asyncio.Future[str]"
+
+
+class Batcher:
+    """
+    Agrupa as requisições em lotes e os processa em um pool de threads,
+    com no máximo um lote em andamento por thread. Enquanto todas as
+    threads estão ocupadas, as novas requisições se acumulam e formam o
+    próximo lote, então o tamanho dos lotes cresce com a carga sem atrasar
+    requisições isoladas.
+    """
+
+    def __init__(
+        self,
+        cipher: str = DEFAULT_CIPHER,
+        max_batch: int = MAX_BATCH,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            cipher (str): Identificador do cifrador ou "auto".
+            max_batch (int): Quantidade máxima de requisições por lote.
+            max_workers (Optional[int]): Threads do pool. Se None, usa os
+            núcleos disponíveis que cabem no orçamento de memória.
+        """
+        self.cipher = resolve_cipher(cipher)
+        self.max_batch = max_batch
+        self.max_workers = max_workers or plan_workers(
+            None, THREAD_WORKER_MEMORY
+        )
+        self.requests = 0
+        self.batches = 0
+        self._queue: "Optional[asyncio.Queue[_Job]]" = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    async def submit(
+        self, method: str, context: KeyContext, value: str
+    ) -> str:
+        """
+        Enfileira um valor e espera o resultado do seu lote.
+
+        Raises:
+            InvalidEncryptedFormat: Se o valor estiver malformado.
+            InvalidKey: Se a chave estiver incorreta.
+        """
+        if self._queue is None:
+            raise RuntimeError("o Batcher não está em execução")
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Job(method, context, value, future))
+        return await future
+
+    async def run(self) -> None:
+        """Forma e despacha os lotes até ser cancelado."""
+        self._queue = asyncio.Queue()
+        self._pool = ThreadPoolExecutor(
+            self.max_workers, thread_name_prefix="encryptdef-serve"
+        )
+        slots = asyncio.Semaphore(self.max_workers)
+        running: Set["asyncio.Task[None]"] = set()
+
+        try:
+            while True:
+                await slots.acquire()
+                jobs = [await self._queue.get()]
+                while len(jobs) < self.max_batch and not self._queue.empty():
+                    jobs.append(self._queue.get_nowait())
+
+                task = asyncio.create_task(self._run_batch(jobs))
+                running.add(task)
+                task.add_done_callback(running.discard)
+                task.add_done_callback(lambda _: slots.release())
+        finally:
+            for task in running:
+                task.cancel()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_batch(self, jobs: List[_Job]) -> None:
+        """Processa um lote, um grupo por método e contexto de chaves."""
+        groups: Dict[Tuple[str, int], List[_Job]] = {}
+        for job in jobs:
+            groups.setdefault((job.method, id(job.context)), []).append(job)
+
+        loop = asyncio.get_running_loop()
+        for (method, _), group in groups.items():
+            self.requests += len(group)
+            self.batches += 1
+            try:
+                results = await loop.run_in_executor(
+                    self._pool,
+                    BATCH_FUNCS[method],
+                    [job.value for job in group],
+                    group[0].context,
+                    self.cipher,
+                )
+            except Exception as e:  # pylint: disable=W0718
+                results = [e] * len(group)
+
+            for job, result in zip(group, results):
+                if job.future.done():
+                    continue
+                if isinstance(result, Exception):
+                    job.future.set_exception(result)
+                else:
+                    job.future.set_result(result)
+
+
+def _response(request_id: Any, result: Any) -> Dict[str, Any]:
+    return {"jsonrpc": JSONRPC_VERSION, "id": request_id, "result": result}
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {
+        "jsonrpc": JSONRPC_VERSION,
+        "id": request_id,
+        "error": {"code": code, "message": message},
+    }
+
+
+class RpcServer:
+    """
+    Base dos servidores JSON-RPC por socket Unix ou pela entrada e saída
+    padrão. As subclasses implementam `call` e, se precisarem de tarefas
+    em segundo plano, `background`.
+    """
+
+    _stop: Optional[asyncio.Event] = None
+
+    async def call(self, method: str, params: Dict[str, Any]) -> Any:
+        """
+        Executa um método.
+
+        Raises:
+            RpcError: Se o método não existir ou os parâmetros forem
+            inválidos.
+        """
+        raise RpcError(METHOD_NOT_FOUND, f"método '{method}' não existe")
+
+    def background(self) -> List[Coroutine[Any, Any, None]]:
+        """Tarefas executadas enquanto o servidor estiver de pé."""
+        return []
+
+    def shutdown(self) -> None:
+        """Encerra o servidor iniciado por `serve`."""
+        if self._stop is not None:
+            self._stop.set()
+
+    async def handle_line(self, line: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Responde uma linha com uma requisição JSON-RPC.
+
+        Args:
+            line (bytes): A requisição, em JSON.
+
+        Returns:
+            Optional[Dict[str, Any]]: A resposta, ou None para notificações,
+            que não têm "id".
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return _error(None, PARSE_ERROR, "JSON inválido")
+
+        if (
+            not isinstance(request, dict)
+            or request.get("jsonrpc") != JSONRPC_VERSION
+            or not isinstance(request.get("method"), str)
+            or not isinstance(request.get("params", {}), dict)
+        ):
+            return _error(
+                request.get("id") if isinstance(request, dict) else None,
+                INVALID_REQUEST,
+                "requisição JSON-RPC 2.0 inválida",
+            )
+
+        try:
+            result = await self.call(
+                request["method"], request.get("params", {})
+            )
+            response = _response(request.get("id"), result)
+        except RpcError as e:
+            response = _error(request.get("id"), e.code, e.message)
+
+        return response if "id" in request else None
+
+    async def handle_stream(
+        self, reader: asyncio.StreamReader, write: Callable[[bytes], Any]
+    ) -> None:
+        """
+        Lê as requisições de uma conexão e responde cada uma assim que ela
+        fica pronta, sem esperar as anteriores.
+
+        Args:
+            reader (asyncio.StreamReader): Entrada da conexão.
+            write (Callable[[bytes], Any]): Escreve uma linha de resposta.
+        """
+        pending: Set["asyncio.Task[None]"] = set()
+        slots = asyncio.Semaphore(MAX_PENDING_PER_CONNECTION)
+
+        async def respond(line: bytes) -> None:
+            try:
+                response = await self.handle_line(line)
+                if response is not None:
+                    write(json.dumps(response).encode("utf-8") + b"\n")
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Linha maior que MAX_REQUEST_SIZE
+                    write(
+                        json.dumps(
+                            _error(
+                                None, PARSE_ERROR, "requisição grande demais"
+                            )
+                        ).encode("utf-8")
+                        + b"\n"
+                    )
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                await slots.acquire()
+                task = asyncio.create_task(respond(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Atende uma conexão do socket Unix."""
+        try:
+            await self.handle_stream(reader, writer.write)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(
+        self,
+        socket_path: Optional[str] = None,
+        on_ready: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Atende até receber SIGINT ou SIGTERM, ou até a entrada padrão
+        terminar no modo co-processo.
+
+        Args:
+            socket_path (Optional[str]): Caminho do socket Unix. Se None,
+            usa a entrada e a saída padrão.
+            on_ready (Optional[Callable[[], None]]): Chamada quando o
+            servidor começa a aceitar requisições.
+
+        Raises:
+            OSError: Se o socket estiver em uso por outro servidor.
+        """
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        server = None
+        if socket_path is not None:
+            server = await start_unix_server(
+                self.handle_connection, socket_path
+            )
+
+        self._stop = stop
+        tasks = [asyncio.create_task(job) for job in self.background()]
+        if server is None:
+            tasks.append(asyncio.create_task(self._serve_stdio(stop)))
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        try:
+            if on_ready is not None:
+                on_ready()
+            await stop.wait()
+        finally:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(signum)
+            if server is not None:
+                server.close()
+                if socket_path is not None and os.path.exists(socket_path):
+                    os.remove(socket_path)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _serve_stdio(self, stop: asyncio.Event) -> None:
+        """Atende o processo pai pela entrada e saída padrão."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=MAX_REQUEST_SIZE)
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+        )
+
+        def write(data: bytes) -> None:
+            sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
+
+        try:
+            await self.handle_stream(reader, write)
+        finally:
+            stop.set()
+
+
+class Server(RpcServer):
+    """
+    Atende as requisições de criptografia de conexões por socket Unix ou
+    pela entrada e saída padrão.
+    """
+
+    def __init__(
+        self,
+        key: Optional[Union[str, KeyContext]] = None,
+        params: Optional[ScryptParams] = None,
+        cipher: str = DEFAULT_CIPHER,
+        key_ttl: float = KEY_TTL,
+        max_batch: int = MAX_BATCH,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            key (Optional[Union[str, KeyContext]]): Chave usada quando a
+            requisição não traz o campo "password". Se None, o campo é
+            obrigatório.
+            params (Optional[ScryptParams]): Parâmetros do Scrypt usados ao
+            criptografar com uma senha.
+            cipher (str): Identificador do cifrador ou "auto".
+            key_ttl (float): Segundos sem uso até um contexto de chaves ser
+            descartado.
+            max_batch (int): Quantidade máxima de requisições por lote.
+            max_workers (Optional[int]): Threads que processam os lotes.
+        """
+        self.key = key
+        self.keys = KeyCache(key_ttl, params)
+        self.batcher = Batcher(cipher, max_batch, max_workers)
+
+    def _context(self, params: Dict[str, Any]) -> KeyContext:
+        """Contexto de chaves da requisição."""
+        password = params.get("password")
+        if password is not None and not isinstance(password, str):
+            raise RpcError(INVALID_PARAMS, '"password" precisa ser um texto')
+
+        key = password or self.key
+        if key is None:
+            raise RpcError(INVALID_PARAMS, plain_text(TEMPLATE_KEY_REQUIRED))
+        return self.keys.get(key)
+
+    async def call(self, method: str, params: Dict[str, Any]) -> Any:
+        """
+        Executa um método.
+
+        Raises:
+            RpcError: Se o método não existir, os parâmetros forem
+            inválidos ou a criptografia falhar.
+        """
+        if method == "ping":
+            return "pong"
+        if method == "stats":
+            return {
+                "requests": self.batcher.requests,
+                "batches": self.batcher.batches,
+                "keys": len(self.keys),
+            }
+        if method not in BATCH_FUNCS:
+            raise RpcError(METHOD_NOT_FOUND, f"método '{method}' não existe")
+
+        value = params.get("value")
+        if not isinstance(value, str):
+            raise RpcError(INVALID_PARAMS, '"value" precisa ser um texto')
+
+        try:
+            return await self.batcher.submit(
+                method, self._context(params), value
+            )
+        except InvalidKey as e:
+            raise RpcError(INVALID_KEY_ERROR, plain_text(str(e))) from e
+        except InvalidEncryptedFormat as e:
+            raise RpcError(INVALID_FORMAT_ERROR, plain_text(str(e))) from e
+
+    def background(self) -> List[Coroutine[Any, Any, None]]:
+        """Processa os lotes e descarta as chaves sem uso."""
+        return [self.batcher.run(), self._purge_keys()]
+
+    async def _purge_keys(self) -> None:
+        """Descarta periodicamente os contextos sem uso."""
+        while True:
+            await asyncio.sleep(min(self.keys.ttl, 60.0))
+            self.keys.purge()
+
+
+async def start_unix_server(
+    handler: Callable[..., Any], socket_path: str
+) -> asyncio.AbstractServer:
+    """
+    Abre o socket Unix com permissão apenas para o usuário atual. Um socket
+    abandonado por um servidor que terminou sem removê-lo é substituído.
+
+    Raises:
+        OSError: Se outro servidor estiver usando o socket.
+    """
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.remove(socket_path)
+        else:
+            raise OSError(plain_text(TEMPLATE_SOCKET_IN_USE % socket_path))
+        finally:
+            probe.close()
+
+    # O socket nasce sem permissão para outros usuários
+    previous = os.umask(0o177)
+    try:
+        return await asyncio.start_unix_server(
+            handler, socket_path, limit=MAX_REQUEST_SIZE
+        )
+    finally:
+        os.umask(previous)
@@ -1,12 +1,44 @@
 """Módulo que contém as configurações da ferramenta"""
 
 import os
+import tempfile
 
 from rich.console import Console
 from rich.theme import Theme
 
 CURRENT_DIR = os.getcwd()
 
+# Diretório onde ficam os resultados de medições feitas nesta máquina
+CACHE_DIR = os.getenv(
+    "ENCRYPTDEF_CACHE_DIR",
+    os.path.join(
+        os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+        "encryptdef",
+    ),
+)
+
+# Arquivo de log, fora do diretório de instalação do pacote
+LOG_FILE = os.getenv(
+    "ENCRYPTDEF_LOG_FILE",
+    os.path.join(
+        os.getenv("XDG_STATE_HOME", os.path.expanduser("~/.local/state")),
+        "encryptdef",
+        "encryptdef.log",
+    ),
+)
+
+# Socket Unix do daemon `encryptdef serve`, acessível apenas ao usuário
+SOCKET_PATH = os.getenv(
+    "ENCRYPTDEF_SOCKET",
+    os.path.join(
+        os.getenv("XDG_RUNTIME_DIR", tempfile.gettempdir()),
+        f"encryptdef-{os.getuid()}.sock",
+    ),
+)
+
+# Variável de ambiente com o socket do agente de chaves da sessão
+AGENT_SOCKET_ENV = "ENCRYPTDEF_AGENT_SOCK"
+
 CUSTOM_THEME = Theme(
     {
         "critical": "bold red",
@@ -17,3 +49,7 @@ CUSTOM_THEME = Theme(
     }
 )
 console = Console(theme=CUSTOM_THEME)
+
+# Console da saída de erro, usado para perguntas quando a saída padrão
+# recebe apenas o resultado
+err_console = Console(theme=CUSTOM_THEME, stderr=True)
@@ -0,0 +1,376 @@
+"""Módulo responsável pela criptografia de arquivos binários em blocos
+
+O arquivo é lido em blocos de tamanho fixo e cada bloco é selado como um
+quadro autenticado. O arquivo criptografado começa com o cabeçalho
+versionado (com "mode=stream") seguido dos quadros:
+
+    <tamanho do texto cifrado: 4 bytes><texto cifrado><tag: 16 bytes>
+
+O nonce de cada quadro é formado pelo prefixo aleatório do cabeçalho e pelo
+índice do quadro, e o índice junto com a marcação de último quadro é
+autenticado como dado associado, impedindo reordenação e truncamento.
+
+Apenas uma janela limitada de quadros fica em memória, então o consumo
+de memória é proporcional a chunk_size * max_workers, independente do
+tamanho do arquivo.
+"""
+
+import struct
+from base64 import b64decode, b64encode
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Deque, Dict, Optional, Union
+
+from Cryptodome.Random import get_random_bytes
+
+from encryptdef.ciphers import (
+    AES_GCM,
+    DEFAULT_CIPHER,
+    cipher_from_fields,
+    new_cipher,
+    resolve_cipher,
+)
+from encryptdef.exceptions import InvalidEncryptedFormat, InvalidKey
+from encryptdef.header import is_header, parse_header
+from encryptdef.kdf import ScryptParams
+from encryptdef.keys import KeyContext, as_key_context
+from encryptdef.template import (
+    TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT,
+    TEMPLATE_INVALID_KEY,
+)
+
+STREAM_MODE = "stream"
+CHUNK_SIZE = 64 * 1024
+# Maior bloco aceito; o campo "chunk" do cabeçalho é lido antes de qualquer
+# autenticação e limita a memória alocada para cada quadro
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+NONCE_PREFIX_SIZE = 4
+TAG_SIZE = 16
+MAX_HEADER_SIZE = 4096
+
+FRAME_LENGTH = struct.Struct(">I")
+FRAME_AAD = struct.Struct(">Q?")
+FRAME_COUNTER = struct.Struct(">Q")
+
+
+def frame_nonce(nonce_prefix: bytes, index: int) -> bytes:
+    """
+    Nonce de 12 bytes derivado do prefixo e do contador do quadro.
+
+    Args:
+        nonce_prefix (bytes): Prefixo aleatório do nonce.
+        index (int): Contador do quadro.
+
+    Returns:
+        bytes: O nonce do quadro.
+    """
+    return nonce_prefix + FRAME_COUNTER.pack(index)
+
+
+def seal_frame(
+    key: bytes,
+    nonce_prefix: bytes,
+    index: int,
+    last: bool,
+    chunk: bytes,
+    cipher_name: str = AES_GCM,
+) -> bytes:
+    """
+    Criptografa um bloco e retorna o quadro autenticado.
+
+    Args:
+        key (bytes): Chave derivada do cabeçalho.
+        nonce_prefix (bytes): Prefixo aleatório do nonce.
+        index (int): Índice do quadro no arquivo.
+        last (bool): Se True, o quadro é o último do arquivo.
+        chunk (bytes): Bloco de texto puro.
+        cipher_name (str): Identificador do cifrador registrado.
+
+    Returns:
+        bytes: O quadro com tamanho, texto cifrado e tag.
+    """
+    cipher = new_cipher(cipher_name, key, frame_nonce(nonce_prefix, index))
+    cipher.update(FRAME_AAD.pack(index, last))
+    cipher_text, tag = cipher.encrypt_and_digest(chunk)
+    return FRAME_LENGTH.pack(len(cipher_text)) + cipher_text + tag
+
+
+def open_frame(
+    key: bytes,
+    nonce_prefix: bytes,
+    index: int,
+    last: bool,
+    frame: bytes,
+    cipher_name: str = AES_GCM,
+) -> bytes:
+    """
+    Verifica e descriptografa o conteúdo de um quadro.
+
+    Args:
+        key (bytes): Chave derivada do cabeçalho.
+        nonce_prefix (bytes): Prefixo aleatório do nonce.
+        index (int): Índice do quadro no arquivo.
+        last (bool): Se True, o quadro é o último do arquivo.
+        frame (bytes): Texto cifrado seguido da tag.
+        cipher_name (str): Identificador do cifrador registrado.
+
+    Returns:
+        bytes: O bloco de texto puro.
+
+    Raises:
+        InvalidKey: Se a chave estiver errada ou o quadro foi alterado.
+    """
+    cipher = new_cipher(cipher_name, key, frame_nonce(nonce_prefix, index))
+    cipher.update(FRAME_AAD.pack(index, last))
+    try:
+        return cipher.decrypt_and_verify(frame[:-TAG_SIZE], frame[-TAG_SIZE:])
+    except ValueError as e:
+        raise InvalidKey(TEMPLATE_INVALID_KEY) from e
+
+
+def _drain(
+    pending: Deque["Future[bytes]"],
+    target: BinaryIO,
+    limit: int,
+    on_progress: Optional[Callable[[int], None]],
+) -> None:
+    """Escreve em ordem os quadros da janela até restarem `limit`."""
+    while len(pending) > limit:
+        data = pending.popleft().result()
+        target.write(data)
+        # Entrega cada quadro assim que pronto, por exemplo em um pipe
+        target.flush()
+        if on_progress is not None:
+            on_progress(1)
+
+
+def encrypt_stream(
+    source: BinaryIO,
+    target: BinaryIO,
+    password: Union[str, KeyContext],
+    max_workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+    on_progress: Optional[Callable[[int], None]] = None,
+    params: Optional[ScryptParams] = None,
+    cipher: str = DEFAULT_CIPHER,
+) -> int:
+    """
+    Criptografa um fluxo binário em quadros autenticados de tamanho fixo.
+
+    Args:
+        source (BinaryIO): Fluxo de entrada aberto em modo binário.
+        target (BinaryIO): Fluxo de saída aberto em modo binário.
+        password (Union[str, KeyContext]): A senha ou o contexto de chaves
+        usado para derivar a chave do arquivo.
+        max_workers (int): Número máximo de núcleos da CPU a serem usados.
+        chunk_size (int): Tamanho de cada bloco em bytes.
+        on_progress (Optional[Callable[[int], None]]): Chamada a cada
+        quadro escrito.
+        params (Optional[ScryptParams]): Parâmetros de custo do Scrypt
+        usados ao criar um novo contexto. Se None, usa os parâmetros padrão.
+        cipher (str): Identificador do cifrador ou "auto".
+
+    Returns:
+        int: Quantidade de quadros escritos.
+
+    Raises:
+        ValueError: Se chunk_size não estiver entre 1 e MAX_CHUNK_SIZE.
+    """
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"tamanho de bloco inválido: {chunk_size}")
+
+    cipher = resolve_cipher(cipher)
+    nonce_prefix = get_random_bytes(NONCE_PREFIX_SIZE)
+    header, key = as_key_context(password, params).new_key(
+        {
+            "cipher": cipher,
+            "mode": STREAM_MODE,
+            "chunk": str(chunk_size),
+            "nonce": b64encode(nonce_prefix).decode("utf-8"),
+        }
+    )
+    target.write(header.encode("utf-8") + b"\n")
+
+    pending: Deque["Future[bytes]"] = deque()
+    window = max_workers * 2
+    index = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            chunk = source.read(chunk_size)
+            while True:
+                # Lê um bloco à frente para saber se o atual é o último
+                next_chunk = source.read(chunk_size)
+                last = not next_chunk
+                pending.append(
+                    executor.submit(
+                        seal_frame,
+                        key,
+                        nonce_prefix,
+                        index,
+                        last,
+                        chunk,
+                        cipher,
+                    )
+                )
+                _drain(pending, target, window, on_progress)
+                index += 1
+
+                if last:
+                    break
+                chunk = next_chunk
+
+            _drain(pending, target, 0, on_progress)
+        except BaseException:
+            # Cancela os quadros que ainda não começaram após um erro
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    return index
+
+
+def read_stream_header(source: BinaryIO) -> Optional[Dict[str, str]]:
+    """
+    Lê o cabeçalho de um fluxo criptografado em blocos.
+
+    Args:
+        source (BinaryIO): Fluxo de entrada aberto em modo binário.
+
+    Returns:
+        Optional[Dict[str, str]]: Campos do cabeçalho, ou None se o fluxo
+        não estiver no formato em blocos.
+    """
+    line = source.readline(MAX_HEADER_SIZE).decode("utf-8", errors="ignore")
+    if not is_header(line):
+        return None
+
+    fields = parse_header(line)
+    if fields.get("mode") != STREAM_MODE:
+        return None
+
+    return fields
+
+
+def is_stream_file(file_path: str) -> bool:
+    """
+    Verifica se o arquivo foi criptografado no formato em blocos.
+
+    Args:
+        file_path (str): Caminho do arquivo.
+
+    Returns:
+        bool: True se o arquivo começar com um cabeçalho "mode=stream".
+    """
+    with open(file_path, "rb") as file_:
+        try:
+            return read_stream_header(file_) is not None
+        except InvalidEncryptedFormat:
+            return False
+
+
+def _read_frame(source: BinaryIO, max_length: int) -> Optional[bytes]:
+    """Lê o próximo quadro do fluxo, ou None ao final do arquivo."""
+    length_bytes = source.read(FRAME_LENGTH.size)
+    if not length_bytes:
+        return None
+
+    if len(length_bytes) != FRAME_LENGTH.size:
+        raise InvalidEncryptedFormat(TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT)
+
+    (length,) = FRAME_LENGTH.unpack(length_bytes)
+    if length > max_length:
+        raise InvalidEncryptedFormat(TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT)
+
+    frame = source.read(length + TAG_SIZE)
+    if len(frame) != length + TAG_SIZE:
+        raise InvalidEncryptedFormat(TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT)
+
+    return frame
+
+
+def decrypt_stream(
+    source: BinaryIO,
+    target: BinaryIO,
+    password: Union[str, KeyContext],
+    max_workers: int = 1,
+    on_progress: Optional[Callable[[int], None]] = None,
+    fields: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    Descriptografa um fluxo gerado por encrypt_stream.
+
+    Args:
+        source (BinaryIO): Fluxo de entrada aberto em modo binário.
+        target (BinaryIO): Fluxo de saída aberto em modo binário.
+        password (Union[str, KeyContext]): A senha ou o contexto de chaves
+        usado para derivar a chave do arquivo.
+        max_workers (int): Número máximo de núcleos da CPU a serem usados.
+        on_progress (Optional[Callable[[int], None]]): Chamada a cada
+        quadro escrito.
+        fields (Optional[Dict[str, str]]): Campos do cabeçalho já lido, para
+        fluxos que não podem voltar ao início, como a entrada padrão. Se
+        None, o cabeçalho é lido de `source`.
+
+    Returns:
+        int: Quantidade de quadros lidos.
+
+    Raises:
+        InvalidEncryptedFormat: Se o cabeçalho ou algum quadro estiver
+        malformado, ou se o arquivo estiver truncado.
+        InvalidKey: Se a chave estiver errada ou algum quadro foi alterado.
+    """
+    if fields is None:
+        fields = read_stream_header(source)
+    if fields is None:
+        raise InvalidEncryptedFormat(TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT)
+
+    try:
+        chunk_size = int(fields["chunk"])
+        nonce_prefix = b64decode(fields["nonce"], validate=True)
+        cipher = cipher_from_fields(fields)
+    except (KeyError, ValueError) as e:
+        raise InvalidEncryptedFormat(
+            TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+        ) from e
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise InvalidEncryptedFormat(TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT)
+
+    key = as_key_context(password).key_from_fields(fields)
+
+    pending: Deque["Future[bytes]"] = deque()
+    window = max_workers * 2
+    index = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            frame = _read_frame(source, chunk_size)
+            if frame is None:
+                raise InvalidEncryptedFormat(
+                    TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT
+                )
+
+            while frame is not None:
+                next_frame = _read_frame(source, chunk_size)
+                last = next_frame is None
+                pending.append(
+                    executor.submit(
+                        open_frame,
+                        key,
+                        nonce_prefix,
+                        index,
+                        last,
+                        frame,
+                        cipher,
+                    )
+                )
+                _drain(pending, target, window, on_progress)
+                index += 1
+                frame = next_frame
+
+            _drain(pending, target, 0, on_progress)
+        except BaseException:
+            # Cancela os quadros que ainda não começaram após um erro
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    return index
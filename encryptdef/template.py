@@ -131,3 +131,59 @@ TEMPLATE_IS_DIRECTORY = """
 
 TEMPLATE_EMPTY_FILE_ERROR = """
  ⚠  ERRO - ARQUIVO '%s' ESTÁ VAZIO."""
+
+TEMPLATE_CALIBRATE_RESULT = """
+[bold green] ⏱  PARÂMETROS CALIBRADOS: n=%s, r=%s, p=%s (~%s MiB por chave)[/bold green]
+
+[bold cyan] Use: [italic]encryptdef encrypt --scrypt-n %s --scrypt-r %s --scrypt-p %s[/italic][/bold cyan]
+"""
+
+TEMPLATE_INVALID_RAW_KEY = """
+ ⚠  ERRO - A CHAVE BRUTA PRECISA TER EXATAMENTE %s BYTES."""
+
+TEMPLATE_RAW_KEY_REQUIRED = """
+ ⚠  ESTE TEXTO FOI ENCRIPTADO COM UMA CHAVE BRUTA, USE --keyfile COM --key-format!
+"""
+
+TEMPLATE_PASSWORD_REQUIRED = """
+ ⚠  ESTE TEXTO FOI ENCRIPTADO COM UMA SENHA, NÃO COM UMA CHAVE BRUTA!
+"""
+
+TEMPLATE_APPEND_INVALID_TARGET = """
+ ⚠  ERRO - '%s' NÃO É UM ARQUIVO DE LINHAS ENCRIPTADO, NÃO É POSSÍVEL ACRESCENTAR LINHAS."""
+
+TEMPLATE_APPEND_PENDING = """
+ ⚠  A ÚLTIMA LINHA DE '%s' NÃO TERMINA EM QUEBRA DE LINHA: %s BYTES FICARAM PENDENTES PARA A PRÓXIMA EXECUÇÃO."""
+
+TEMPLATE_SERVE_LISTENING = """
+[bold green] 🔌 ENCRYPTDEF ESCUTANDO EM [italic]'%s'[/italic][/bold green]
+"""
+
+TEMPLATE_SOCKET_IN_USE = """
+ ⚠  ERRO - O SOCKET '%s' JÁ ESTÁ EM USO POR OUTRO PROCESSO."""
+
+TEMPLATE_KEY_REQUIRED = """
+ ⚠  ERRO - NENHUMA CHAVE: INICIE O SERVIDOR COM --keyfile OU ENVIE O CAMPO "password"."""
+
+TEMPLATE_AGENT_KEY = """\
+[bold cyan] 🔑 DIGITE A CHAVE PARA O AGENTE:[/bold cyan]"""
+
+TEMPLATE_AGENT_KEY_ADDED = """
+[bold green] 🔐 CHAVE CARREGADA NO AGENTE, EXPIRA EM %s SEGUNDOS[/bold green]
+"""
+
+TEMPLATE_AGENT_NOT_LOCKED = """
+ ⚠  A MEMÓRIA DO AGENTE NÃO PÔDE SER TRAVADA COM mlock, A CHAVE PODE IR PARA O SWAP."""
+
+TEMPLATE_AGENT_STATUS = """
+[bold cyan] 🔐 AGENTE EM [italic]'%s'[/italic][/bold cyan]
+ Chave carregada: %s
+ Chaves derivadas em cache: %s
+ Memória travada (mlock): %s
+"""
+
+TEMPLATE_AGENT_UNREACHABLE = """
+ ⚠  ERRO - NÃO FOI POSSÍVEL FALAR COM O AGENTE EM '%s'."""
+
+TEMPLATE_AGENT_NO_KEY = """
+ ⚠  ERRO - O AGENTE NÃO TEM UMA CHAVE CARREGADA, USE 'encryptdef agent add'."""
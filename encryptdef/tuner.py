@@ -0,0 +1,267 @@
+"""Módulo responsável pelo ajuste automático da quantidade de trabalhadores
+
+Com --workers auto, a primeira medição mede o custo de cada registro e o
+pool de threads é ajustado durante o processamento: a quantidade de
+trabalhadores ativos sobe ou desce enquanto a vazão, em registros por
+segundo, melhorar. Registros caros, como um Scrypt por linha, começam
+testando todos os trabalhadores; registros baratos sobem dobrando a partir
+de um, porque mais threads só disputam o GIL.
+
+A quantidade escolhida é guardada por máquina e por operação em CACHE_DIR
+e serve de ponto de partida nas próximas execuções.
+"""
+
+import json
+import os
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+
+from encryptdef.backends import worker_memory
+from encryptdef.resources import host_id, plan_workers
+from encryptdef.settings import CACHE_DIR
+
+AUTO_WORKERS = "auto"
+
+# Quantidade fixa de trabalhadores ou "auto"
+Workers = Union[int, str]
+
+WORKERS_CACHE_FILE = "workers.json"
+
+# Duração e registros mínimos de cada medição de vazão
+TUNE_INTERVAL = 0.2
+MIN_INTERVAL_RECORDS = 8
+
+# Ganho mínimo de vazão para trocar de configuração
+MIN_GAIN = 0.05
+
+# Medições na configuração escolhida antes de testar as vizinhas de novo
+SETTLE_ROUNDS = 10
+
+# Segundos de trabalhador por registro a partir dos quais o registro é
+# considerado caro
+HEAVY_RECORD_COST = 0.001
+
+T = TypeVar("T")
+
+
+def parse_workers(value: Union[int, str]) -> Workers:
+    """
+    Converte um valor de --workers em uma quantidade ou em "auto".
+
+    Args:
+        value (Union[int, str]): Inteiro positivo ou "auto".
+
+    Returns:
+        Workers: A quantidade de trabalhadores ou "auto".
+
+    Raises:
+        ValueError: Se o valor não for um inteiro positivo nem "auto".
+    """
+    if isinstance(value, str):
+        if value.strip().lower() == AUTO_WORKERS:
+            return AUTO_WORKERS
+        if not value.strip().isdigit():
+            raise ValueError(f"trabalhadores inválidos: '{value}'")
+        value = int(value)
+
+    if value < 1:
+        raise ValueError(f"trabalhadores inválidos: '{value}'")
+    return value
+
+
+def resolve_workers(workers: Optional[Workers], backend: str) -> int:
+    """
+    Resolve uma quantidade fixa de trabalhadores. Com None ou "auto", usa
+    os núcleos disponíveis que cabem no orçamento de memória, o limite
+    dentro do qual o ajuste automático trabalha.
+
+    Args:
+        workers (Optional[Workers]): Quantidade, "auto" ou None.
+        backend (str): Backend de execução, "thread" ou "process".
+
+    Returns:
+        int: Trabalhadores, no mínimo 1.
+    """
+    if workers is None or workers == AUTO_WORKERS:
+        return plan_workers(None, worker_memory(backend))
+    return int(parse_workers(workers))
+
+
+def task_name(func: Callable[..., Any]) -> str:
+    """Nome da operação usado no cache, sem os argumentos de partial."""
+    while isinstance(func, partial):
+        func = func.func
+    return getattr(func, "__name__", "custom")
+
+
+def _load_cache(cache_file: str) -> Dict[str, int]:
+    """Lê as quantidades guardadas para esta máquina."""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as file_:
+            cached = json.load(file_)
+    except (OSError, ValueError):
+        return {}
+
+    if (
+        not isinstance(cached, dict)
+        or cached.get("host") != host_id()
+        or not isinstance(cached.get("workers"), dict)
+    ):
+        return {}
+    return {
+        task: workers
+        for task, workers in cached["workers"].items()
+        if isinstance(workers, int) and workers > 0
+    }
+
+
+def load_tuned_workers(task: str) -> Optional[int]:
+    """
+    Quantidade de trabalhadores escolhida para a operação nesta máquina.
+
+    Args:
+        task (str): Nome da operação.
+
+    Returns:
+        Optional[int]: A quantidade, ou None se ela nunca foi medida.
+    """
+    return _load_cache(os.path.join(CACHE_DIR, WORKERS_CACHE_FILE)).get(task)
+
+
+def save_tuned_workers(task: str, workers: int) -> None:
+    """
+    Guarda a quantidade escolhida para a operação, ignorando diretórios
+    sem escrita.
+
+    Args:
+        task (str): Nome da operação.
+        workers (int): Quantidade de trabalhadores.
+    """
+    cache_file = os.path.join(CACHE_DIR, WORKERS_CACHE_FILE)
+    tuned = _load_cache(cache_file)
+    tuned[task] = workers
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as file_:
+            json.dump({"host": host_id(), "workers": tuned}, file_)
+    except OSError:
+        pass
+
+
+class WorkerTuner:
+    """
+    Limita as tarefas em andamento em um pool de `max_workers` threads e
+    ajusta o limite pela vazão medida a cada intervalo.
+
+    Args:
+        max_workers (int): Limite superior, o tamanho do pool.
+        task (Optional[str]): Nome da operação. Se informado, começa pela
+        quantidade guardada no cache e save() guarda a escolhida.
+        interval (float): Duração mínima de cada medição, em segundos.
+        clock (Callable[[], float]): Relógio em segundos.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        task: Optional[str] = None,
+        interval: float = TUNE_INTERVAL,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.task = task
+        self.interval = interval
+        self.clock = clock
+
+        cached = load_tuned_workers(task) if task is not None else None
+        self.workers = min(self.max_workers, cached or 1)
+        self.best = self.workers
+        self.record_cost: Optional[float] = None
+        self.measurements = 0
+
+        self._best_rate = 0.0
+        self._queue: List[int] = []
+        self._settle = 0
+        self._active = 0
+        self._records = 0
+        self._started = clock()
+        self._condition = threading.Condition()
+
+    def run(self, func: Callable[..., T], *args: Any, records: int = 1) -> T:
+        """
+        Executa `func(*args)` quando houver vaga entre os trabalhadores
+        ativos e registra os `records` registros concluídos na medição
+        atual.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._active < self.workers)
+            self._active += 1
+        try:
+            return func(*args)
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._record(records)
+                self._condition.notify_all()
+
+    def _record(self, records: int) -> None:
+        """Conta os registros e fecha a medição quando o intervalo acaba."""
+        self._records += records
+        elapsed = self.clock() - self._started
+        if self._records < MIN_INTERVAL_RECORDS or elapsed < self.interval:
+            return
+
+        self._step(self._records / max(elapsed, 1e-9))
+        self._records = 0
+        self._started = self.clock()
+
+    def _neighbour(self, workers: int, direction: int) -> int:
+        """Próxima quantidade a testar acima ou abaixo de `workers`."""
+        if direction < 0:
+            return max(1, workers // 2)
+        if (self.record_cost or 0) >= HEAVY_RECORD_COST:
+            return self.max_workers
+        return min(self.max_workers, workers * 2)
+
+    def _step(self, rate: float) -> None:
+        """
+        Subida de encosta: mede a configuração escolhida, testa as
+        vizinhas e segue na direção que melhorar a vazão em MIN_GAIN.
+        """
+        self.measurements += 1
+        if self.record_cost is None:
+            self.record_cost = self.workers / rate
+
+        if self.workers == self.best:
+            self._best_rate = rate
+            if self._settle > 0:
+                self._settle -= 1
+                return
+            self._queue = [
+                workers
+                for workers in dict.fromkeys(
+                    (
+                        self._neighbour(self.best, 1),
+                        self._neighbour(self.best, -1),
+                    )
+                )
+                if workers != self.best
+            ]
+        elif rate > self._best_rate * (1 + MIN_GAIN):
+            direction = 1 if self.workers > self.best else -1
+            self.best, self._best_rate = self.workers, rate
+            following = self._neighbour(self.best, direction)
+            self._queue = [following] if following != self.best else []
+
+        if self._queue:
+            self.workers = self._queue.pop(0)
+        else:
+            self.workers = self.best
+            self._settle = SETTLE_ROUNDS
+
+    def save(self) -> None:
+        """Guarda a quantidade escolhida, se houve alguma medição."""
+        if self.task is not None and self.measurements:
+            save_tuned_workers(self.task, self.best)
@@ -2,7 +2,9 @@
 
 import os
 import re
-from typing import List
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Any, Iterable, Iterator, List
 
 from encryptdef.template import TEMPLATE_IS_DIRECTORY
 
@@ -75,15 +77,105 @@ def read_file(file: str) -> List[str]:
         return file_.readlines()
 
 
-def write_file(new_file_path: str, processed_lines: List[str]) -> None:
+def iter_file_lines(file: str) -> Iterator[str]:
     """
-    Escreve as linhas processadas em um novo arquivo.
+    Lê o arquivo sob demanda, uma linha por vez.
+
+    Args:
+        file (str): Caminho do arquivo a ser lido.
+
+    Yields:
+        str: Cada linha do arquivo.
+    """
+    with open(file, "r", encoding="utf-8", errors="ignore") as file_:
+        yield from file_
+
+
+def count_lines(file: str, block_size: int = 1024 * 1024) -> int:
+    """
+    Conta as linhas do arquivo lendo blocos binários, sem carregá-lo
+    inteiro na memória.
+
+    Args:
+        file (str): Caminho do arquivo.
+        block_size (int): Tamanho de cada bloco lido.
+
+    Returns:
+        int: Quantidade de linhas, incluindo uma última linha sem quebra.
+    """
+    count = 0
+    last_byte = b"\n"
+    with open(file, "rb") as file_:
+        while block := file_.read(block_size):
+            count += block.count(b"\n")
+            last_byte = block[-1:]
+
+    return count if last_byte == b"\n" else count + 1
+
+
+def open_temporary(new_file_path: str, mode: str = "w") -> IO[Any]:
+    """
+    Abre um arquivo temporário no diretório de `new_file_path`, para que
+    ele possa substituir o destino com os.replace.
+
+    Args:
+        new_file_path (str): Caminho do arquivo de destino.
+        mode (str): "w" para texto em UTF-8 ou "wb" para bytes.
+
+    Returns:
+        IO[Any]: O arquivo temporário aberto; o caminho fica em `name`.
+    """
+    directory, name = os.path.split(os.path.abspath(new_file_path))
+    # pylint: disable=R1732
+    return tempfile.NamedTemporaryFile(
+        mode,
+        encoding=None if "b" in mode else "utf-8",
+        dir=directory,
+        prefix=f".{name}.",
+        suffix=".tmp",
+        delete=False,
+    )
+
+
+def remove_temporary(temporary_path: str) -> None:
+    """Remove o arquivo temporário de uma escrita que falhou, se existir."""
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+
+
+@contextmanager
+def atomic_write(new_file_path: str, mode: str = "w") -> Iterator[IO[Any]]:
+    """
+    Escreve em um arquivo temporário que só substitui `new_file_path` se o
+    bloco terminar sem erros. Em caso de erro, o destino fica intacto.
+
+    Args:
+        new_file_path (str): Caminho do arquivo de destino.
+        mode (str): "w" para texto em UTF-8 ou "wb" para bytes.
+
+    Yields:
+        IO[Any]: O arquivo temporário aberto para escrita.
+    """
+    temporary = open_temporary(new_file_path, mode)
+    try:
+        with temporary:
+            yield temporary
+        os.replace(temporary.name, new_file_path)
+    except BaseException:
+        remove_temporary(temporary.name)
+        raise
+
+
+def write_file(new_file_path: str, processed_lines: Iterable[str]) -> None:
+    """
+    Escreve as linhas processadas em um novo arquivo à medida que são
+    geradas. O arquivo só é substituído se todas as linhas forem escritas.
 
     Args:
         new_file_path (str): Caminho do novo arquivo.
-        processed_lines (List[str]): Lista de linhas processadas.
+        processed_lines (Iterable[str]): Linhas processadas.
     """
-    with open(new_file_path, "w", encoding="utf-8") as file_a:
+    with atomic_write(new_file_path) as file_a:
         file_a.writelines(processed_lines)
 
 
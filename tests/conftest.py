@@ -9,3 +9,9 @@ def go_to_tmpdir(request):  # injeção de dependencias
     tmpdir = request.getfixturevalue("tmpdir")
     with tmpdir.as_cwd():
         yield  # protocolo de generators
+
+
+@pytest.fixture(autouse=True)
+def without_agent(monkeypatch):
+    """Os testes não usam o agente de chaves da sessão do desenvolvedor"""
+    monkeypatch.delenv("ENCRYPTDEF_AGENT_SOCK", raising=False)
@@ -0,0 +1,234 @@
+"""Modulo para testar o agente de chaves em agent.py"""
+
+import asyncio
+import json
+import pickle
+from base64 import b64encode
+from unittest.mock import patch
+
+import pytest
+
+from encryptdef import agent
+from encryptdef.agent import (
+    NO_KEY_ERROR,
+    Agent,
+    AgentClient,
+    AgentKeyContext,
+    KeyStore,
+    LockedBuffer,
+    agent_key_context,
+)
+from encryptdef.api import decrypt, encrypt
+from encryptdef.core import process_keyfile_and_args
+from encryptdef.exceptions import AgentError, InvalidKey
+from encryptdef.kdf import ScryptParams, derive_key
+from encryptdef.server import INVALID_PARAMS
+from encryptdef.template import TEMPLATE_ENCRYPT_KEY
+
+FAST = ScryptParams(n=2**4)
+SALT = b"s" * 16
+
+
+def _call(srv, method, **params):
+    """Executa um método do agente e retorna a resposta JSON-RPC"""
+    line = json.dumps(
+        {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+    ).encode()
+    return asyncio.run(srv.handle_line(line))
+
+
+@pytest.fixture(name="loaded_agent")
+def loaded_agent_fixture(monkeypatch):
+    """Agente com a senha carregada, acessado sem socket"""
+    srv = Agent(ttl=60, max_keys=4)
+    assert _call(srv, "add", password="senha")["result"] is True
+
+    def call(_, method, **params):
+        response = _call(srv, method, **params)
+        if "error" in response:
+            raise AgentError(response["error"]["message"])
+        return response["result"]
+
+    monkeypatch.setattr(AgentClient, "call", call)
+    return srv
+
+
+def test_locked_buffer_write_read_and_wipe():
+    """Testa a escrita, a leitura e a limpeza da memória travada"""
+    buffer = LockedBuffer(8)
+    buffer.write(2, b"abc")
+    assert bytes(buffer.read(2, 3)) == b"abc"
+
+    buffer.wipe()
+    assert bytes(buffer.data) == bytes(8)
+
+
+def test_key_store_evicts_least_recently_used():
+    """Testa o descarte da chave usada há mais tempo"""
+    store = KeyStore(ttl=60, max_keys=2)
+    store.set_password(b"senha")
+    store.put(b"a", FAST, b"A" * 32)
+    store.put(b"b", FAST, b"B" * 32)
+    assert store.get(b"a", FAST) == b"A" * 32
+
+    store.put(b"c", FAST, b"C" * 32)
+    assert store.get(b"b", FAST) is None
+    assert store.get(b"a", FAST) == b"A" * 32
+    assert store.get(b"c", FAST) == b"C" * 32
+
+
+def test_key_store_expires_keys_and_password():
+    """Testa o descarte das chaves sem uso e da senha vencida"""
+    now = [0.0]
+    store = KeyStore(ttl=10, max_keys=2, clock=lambda: now[0])
+    store.set_password(b"senha", ttl=30)
+    store.put(b"a", FAST, b"A" * 32)
+
+    now[0] = 11
+    assert store.get(b"a", FAST) is None
+    assert store.has_password
+    assert bytes(store.password()) == b"senha"
+
+    now[0] = 30
+    assert not store.has_password
+    with pytest.raises(AgentError):
+        store.password()
+    assert bytes(store.memory.data) == bytes(len(store.memory))
+
+
+def test_key_store_rejects_oversized_password():
+    """Testa a recusa de senhas maiores que a memória reservada"""
+    with pytest.raises(ValueError):
+        KeyStore().set_password(b"x" * (agent.MAX_PASSWORD_SIZE + 1))
+
+
+def test_agent_derives_once_per_salt(loaded_agent):
+    """Testa se a chave mestra é derivada uma vez e depois vem do cache"""
+    salt = b64encode(SALT).decode()
+    first = _call(loaded_agent, "derive", salt=salt, **FAST._asdict())
+    second = _call(loaded_agent, "derive", salt=salt, **FAST._asdict())
+
+    assert first == second
+    assert first["result"]["key"] == b64encode(
+        derive_key("senha", SALT, *FAST)
+    ).decode("ascii")
+    assert loaded_agent.derivations == 1
+    assert loaded_agent.hits == 1
+
+
+def test_agent_reuses_encryption_salt(loaded_agent):
+    """Testa o salt de encriptação estável enquanto a senha existir"""
+    first = _call(loaded_agent, "derive", **FAST._asdict())["result"]
+    second = _call(loaded_agent, "derive", **FAST._asdict())["result"]
+    assert first == second
+
+    _call(loaded_agent, "add", password="outra")
+    third = _call(loaded_agent, "derive", **FAST._asdict())["result"]
+    assert third["salt"] != first["salt"]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"n": 3, "r": 8, "p": 1},
+        {"n": "16", "r": 8, "p": 1},
+        {"n": 16, "r": 8, "p": 1, "salt": "%%%"},
+        {"n": 16, "r": 8, "p": 1, "salt": ""},
+    ],
+)
+def test_agent_derive_invalid_params(params, loaded_agent):
+    """Testa os parâmetros inválidos em "derive" """
+    response = _call(loaded_agent, "derive", **params)
+    assert response["error"]["code"] == INVALID_PARAMS
+
+
+def test_agent_without_password():
+    """Testa "derive" e "status" sem senha carregada"""
+    srv = Agent()
+    response = _call(srv, "derive", **FAST._asdict())
+    assert response["error"]["code"] == NO_KEY_ERROR
+
+    status = _call(srv, "status")["result"]
+    assert status["password"] is False
+    assert status["keys"] == 0
+
+
+def test_agent_clear(loaded_agent):
+    """Testa o método "clear" """
+    _call(loaded_agent, "derive", **FAST._asdict())
+    _call(loaded_agent, "clear")
+
+    status = _call(loaded_agent, "status")["result"]
+    assert status == {**status, "password": False, "keys": 0}
+
+
+def test_agent_key_context_round_trip(loaded_agent):
+    """Testa encriptar e decriptar com as chaves buscadas no agente"""
+    context = AgentKeyContext("agent.sock", FAST)
+    encrypted = encrypt("segredo", context)
+
+    assert decrypt(encrypted, "senha") == "segredo"
+    assert decrypt(encrypt("segredo", "senha", FAST), context) == "segredo"
+    assert decrypt(encrypted, AgentKeyContext("agent.sock")) == "segredo"
+    # A chave de encriptação vem do cache do agente
+    assert loaded_agent.derivations == 2
+
+
+def test_agent_key_context_wrong_password(loaded_agent):
+    """Testa a senha do agente diferente da usada na mensagem"""
+    encrypted = encrypt("segredo", "outra", FAST)
+
+    with pytest.raises(InvalidKey):
+        decrypt(encrypted, AgentKeyContext("agent.sock"))
+    assert loaded_agent.derivations == 1
+
+
+def test_agent_key_context_for_params():
+    """Testa o contexto do mesmo agente com outros parâmetros"""
+    context = AgentKeyContext("agent.sock", FAST)
+
+    assert context.for_params(FAST) is context
+    other = context.for_params(ScryptParams())
+    assert other.params == ScryptParams()
+    assert other.client.socket_path == "agent.sock"
+
+
+def test_agent_key_context_pickle_keeps_keys(loaded_agent):
+    """Testa se as chaves buscadas seguem para os processos trabalhadores"""
+    context = AgentKeyContext("agent.sock", FAST)
+    key = context.master_key()
+
+    copy = pickle.loads(pickle.dumps(context))
+    assert copy.salt == context.salt
+    assert copy.master_key() == key
+    assert loaded_agent.derivations == 1
+
+
+def test_agent_client_unreachable(tmp_path):
+    """Testa o erro ao falar com um agente inexistente"""
+    with pytest.raises(AgentError):
+        AgentClient(str(tmp_path / "agent.sock")).call("ping")
+
+
+def test_agent_key_context_from_environment(monkeypatch, loaded_agent):
+    """Testa a descoberta do agente pela variável de ambiente"""
+    assert agent_key_context() is None
+
+    monkeypatch.setenv("ENCRYPTDEF_AGENT_SOCK", "agent.sock")
+    context = agent_key_context(FAST)
+    assert isinstance(context, AgentKeyContext)
+    assert context.params == FAST
+
+    _call(loaded_agent, "clear")
+    assert agent_key_context() is None
+
+
+@patch("encryptdef.core.console.input")
+def test_process_keyfile_and_args_uses_agent(mock_input, monkeypatch):
+    """Testa se a senha deixa de ser perguntada com um agente carregado"""
+    context = AgentKeyContext("agent.sock")
+    monkeypatch.setattr(agent, "agent_key_context", lambda: context)
+
+    key = process_keyfile_and_args(None, "oi", None, TEMPLATE_ENCRYPT_KEY)
+    assert key is context
+    mock_input.assert_not_called()
@@ -0,0 +1,250 @@
+"""Modulo para testar a API assíncrona em aio.py"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from encryptdef import aio
+from encryptdef.core import decrypt, encrypt
+from encryptdef.exceptions import InvalidKey
+from encryptdef.keys import RawKeyContext
+
+KEY = RawKeyContext(b"k" * 32)
+
+
+def test_encrypt_decrypt_message():
+    """Testa a criptografia e a descriptografia de uma mensagem"""
+
+    async def roundtrip():
+        encrypted = await aio.encrypt("mensagem", KEY)
+        return encrypted, await aio.decrypt(encrypted, KEY)
+
+    encrypted, decrypted = asyncio.run(roundtrip())
+
+    assert decrypted == "mensagem"
+    assert decrypt(encrypted, KEY) == "mensagem"
+
+
+def test_decrypt_wrong_key():
+    """Testa se uma chave incorreta gera InvalidKey"""
+    encrypted = encrypt("mensagem", KEY)
+
+    with pytest.raises(InvalidKey):
+        asyncio.run(aio.decrypt(encrypted, RawKeyContext(b"x" * 32)))
+
+
+def test_executor_limits_pending_tasks():
+    """Testa se o executor nunca tem mais que max_pending tarefas"""
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work(_):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+
+    async def run_many():
+        async with aio.AsyncExecutor(max_workers=4, max_pending=2) as pool:
+            await asyncio.gather(*(pool.run(work, i) for i in range(10)))
+
+    asyncio.run(run_many())
+
+    assert peak == 2
+
+
+def test_executor_map_keeps_order():
+    """Testa se map entrega os resultados na ordem original"""
+
+    def slow_square(value):
+        time.sleep(0.001 * (10 - value))
+        return value * value
+
+    async def collect():
+        async with aio.AsyncExecutor(max_workers=4) as pool:
+            return [item async for item in pool.map(slow_square, range(10))]
+
+    assert asyncio.run(collect()) == [value * value for value in range(10)]
+
+
+def test_executor_reused_across_event_loops():
+    """Testa se o mesmo executor funciona em event loops diferentes"""
+    pool = aio.AsyncExecutor(max_workers=1, max_pending=1)
+
+    for _ in range(2):
+        assert asyncio.run(aio.encrypt("a", KEY, executor=pool))
+    pool.close()
+
+
+def test_event_loop_not_blocked():
+    """Testa se o event loop continua respondendo durante o trabalho"""
+
+    async def measure():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+
+        task = asyncio.create_task(heartbeat())
+        async with aio.AsyncExecutor(max_workers=1) as pool:
+            await pool.run(time.sleep, 0.1)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(measure()) > 10
+
+
+def test_lines_roundtrip_async_iterable():
+    """Testa as linhas a partir de um iterável assíncrono"""
+
+    async def source():
+        for line in ["a\n", "b\n", "\n"]:
+            yield line
+
+    async def roundtrip():
+        encrypted = [
+            line async for line in aio.aiter_encrypt_lines(source(), KEY)
+        ]
+        decrypted = [
+            line async for line in aio.aiter_decrypt_lines(encrypted, KEY)
+        ]
+        return encrypted, decrypted
+
+    encrypted, decrypted = asyncio.run(roundtrip())
+
+    assert len(encrypted) == 4
+    assert decrypted == ["a\n", "b\n", "\n"]
+
+
+def test_lines_are_batched_per_executor_task():
+    """Testa se as linhas vão ao executor em lotes, e não uma por tarefa"""
+    lines = [f"linha {number}\n" for number in range(2000)]
+    executor = aio.AsyncExecutor(2)
+
+    async def roundtrip():
+        encrypted = [
+            line
+            async for line in aio.aiter_encrypt_lines(
+                lines, KEY, executor=executor
+            )
+        ]
+        return [
+            line
+            async for line in aio.aiter_decrypt_lines(encrypted, KEY, executor)
+        ]
+
+    with patch.object(executor, "run", wraps=executor.run) as mock_run:
+        assert asyncio.run(roundtrip()) == lines
+    executor.close()
+
+    # Uma tarefa por linha seriam 4000 chamadas nas duas direções
+    assert mock_run.call_count < len(lines) // 4
+
+
+def test_decrypt_lines_legacy_format():
+    """Testa linhas no formato antigo, uma mensagem por linha"""
+    lines = [encrypt("a", KEY) + "\n", encrypt("b", KEY) + "\n"]
+
+    async def collect():
+        return [line async for line in aio.aiter_decrypt_lines(lines, KEY)]
+
+    assert asyncio.run(collect()) == ["a\n", "b\n"]
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_file_roundtrip(tmp_path, monkeypatch, binary):
+    """Testa a criptografia e a descriptografia de arquivos"""
+    monkeypatch.setattr(aio, "FILE_BATCH_LINES", 3)
+    source = tmp_path / "plain.txt"
+    source.write_text("".join(f"linha {i}\n" for i in range(10)))
+    encrypted = str(tmp_path / "encrypt-plain.txt")
+    decrypted = str(tmp_path / "decrypt-plain.txt")
+
+    async def roundtrip():
+        await aio.encrypt_file(str(source), encrypted, KEY, binary=binary)
+        return await aio.decrypt_file(encrypted, decrypted, KEY)
+
+    assert asyncio.run(roundtrip()) == decrypted
+    assert open(decrypted, encoding="utf-8").read() == source.read_text()
+
+
+def test_decrypt_file_wrong_key_keeps_output(tmp_path):
+    """Testa se uma chave errada não altera nem apaga o destino"""
+    source = tmp_path / "plain.txt"
+    source.write_text("a\n")
+    encrypted = str(tmp_path / "encrypt-plain.txt")
+    decrypted = tmp_path / "decrypt-plain.txt"
+    decrypted.write_text("anterior\n")
+    asyncio.run(aio.encrypt_file(str(source), encrypted, KEY))
+
+    with pytest.raises(InvalidKey):
+        asyncio.run(
+            aio.decrypt_file(
+                encrypted, str(decrypted), RawKeyContext(b"x" * 32)
+            )
+        )
+    assert decrypted.read_text() == "anterior\n"
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+@pytest.mark.parametrize("operation", ["encrypt_file", "decrypt_file"])
+def test_file_missing_source_keeps_output(tmp_path, operation):
+    """Testa se uma origem inexistente não apaga um destino existente"""
+    target = tmp_path / "dest.txt"
+    target.write_text("anterior\n")
+
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(
+            getattr(aio, operation)(
+                str(tmp_path / "missing.txt"), str(target), KEY
+            )
+        )
+    assert target.read_text() == "anterior\n"
+    assert [path.name for path in tmp_path.iterdir()] == ["dest.txt"]
+
+
+@pytest.mark.parametrize("operation", ["encrypt_file", "decrypt_file"])
+def test_cancelled_file_keeps_output(tmp_path, monkeypatch, operation):
+    """Testa se uma tarefa cancelada no meio da escrita não altera o destino
+    nem deixa o arquivo temporário"""
+    source = tmp_path / "plain.txt"
+    source.write_text("".join(f"linha {i}\n" for i in range(20)))
+    encrypted = tmp_path / "encrypt-plain.txt"
+    asyncio.run(aio.encrypt_file(str(source), str(encrypted), KEY))
+    target = tmp_path / "output.txt"
+    target.write_text("anterior\n")
+    files = sorted(tmp_path.iterdir())
+
+    read_batch = aio._read_batch  # pylint: disable=W0212
+
+    def slow_read_batch(file_):
+        time.sleep(0.01)
+        return read_batch(file_)
+
+    monkeypatch.setattr(aio, "FILE_BATCH_LINES", 1)
+    monkeypatch.setattr(aio, "_read_batch", slow_read_batch)
+    file_path = source if operation == "encrypt_file" else encrypted
+
+    async def cancel_while_writing():
+        task = asyncio.ensure_future(
+            getattr(aio, operation)(str(file_path), str(target), KEY)
+        )
+        while len(list(tmp_path.iterdir())) == len(files):
+            await asyncio.sleep(0.001)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancel_while_writing())
+    assert target.read_text() == "anterior\n"
+    assert sorted(tmp_path.iterdir()) == files
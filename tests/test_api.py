@@ -0,0 +1,146 @@
+"""Modulo para testar as classes Encryptor e Decryptor em api.py"""
+
+import io
+import subprocess
+import sys
+
+import pytest
+
+from encryptdef.api import LINES_MODE, Decryptor, Encryptor
+from encryptdef.exceptions import InvalidKey
+from encryptdef.keys import KeyContext, RawKeyContext
+from encryptdef.stream import STREAM_MODE
+
+KEY = RawKeyContext(b"k" * 32)
+
+
+def test_message_roundtrip_reuses_master_key():
+    """Testa se o Encryptor reaproveita a chave mestra entre mensagens"""
+    context = KeyContext("senha")
+    encryptor = Encryptor(context)
+    first, second = encryptor.encrypt("a"), encryptor.encrypt("b")
+
+    assert first.split("*")[0] != second.split("*")[0]
+    assert len(context._master_keys) == 1  # pylint: disable=W0212
+    assert Decryptor("senha").decrypt(second) == "b"
+
+
+def test_cipher_is_resolved_once():
+    """Testa se o cifrador fica guardado no Encryptor"""
+    encryptor = Encryptor(KEY, cipher="chacha20-poly1305")
+    encrypted = encryptor.encrypt("a")
+
+    assert encryptor.cipher == "chacha20-poly1305"
+    assert "cipher=chacha20-poly1305" in encrypted
+    assert Decryptor(KEY).decrypt(encrypted) == "a"
+
+
+def test_bytes_roundtrip():
+    """Testa a criptografia de bytes no formato em blocos"""
+    data = bytes(range(256)) * 100
+    encrypted = Encryptor(KEY).encrypt_bytes(data, chunk_size=1000)
+
+    assert encrypted != data
+    assert Decryptor(KEY).decrypt_bytes(encrypted) == data
+
+
+def test_stream_roundtrip():
+    """Testa a criptografia de fluxos binários"""
+    target = io.BytesIO()
+    frames = Encryptor(KEY, max_workers=2).encrypt_stream(
+        io.BytesIO(b"x" * 100), target, chunk_size=10
+    )
+    plain = io.BytesIO()
+
+    assert frames == 10
+    assert Decryptor(KEY).decrypt_stream(io.BytesIO(target.getvalue()), plain)
+    assert plain.getvalue() == b"x" * 100
+
+
+def test_lines_roundtrip():
+    """Testa a criptografia de linhas no formato versionado"""
+    encrypted = list(Encryptor(KEY).iter_lines(["a\n", "b\n"]))
+
+    assert len(encrypted) == 3
+    assert list(Decryptor(KEY).iter_lines(encrypted)) == ["a\n", "b\n"]
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_file_roundtrip(tmp_path, binary):
+    """Testa a criptografia de arquivos e o resultado retornado"""
+    source = tmp_path / "plain.txt"
+    source.write_text("a\nb\nc\n")
+    encrypted = str(tmp_path / "encrypt-plain.txt")
+    decrypted = str(tmp_path / "decrypt-plain.txt")
+    progress = []
+
+    result = Encryptor(KEY).encrypt_file(
+        str(source), encrypted, binary, on_progress=progress.append
+    )
+    restored = Decryptor(KEY).decrypt_file(encrypted, decrypted)
+
+    mode = STREAM_MODE if binary else LINES_MODE
+    assert result == (encrypted, mode, 1 if binary else 3)
+    assert sum(progress) == result.records
+    assert restored == (decrypted, mode, result.records)
+    assert open(decrypted, encoding="utf-8").read() == "a\nb\nc\n"
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_decrypt_file_wrong_key_keeps_output(tmp_path, binary):
+    """Testa se uma chave errada não altera nem apaga o destino"""
+    source = tmp_path / "plain.txt"
+    source.write_text("a\n")
+    encrypted = str(tmp_path / "encrypt-plain.txt")
+    decrypted = tmp_path / "decrypt-plain.txt"
+    decrypted.write_text("anterior\n")
+    Encryptor(KEY).encrypt_file(str(source), encrypted, binary=binary)
+
+    with pytest.raises(InvalidKey):
+        Decryptor(RawKeyContext(b"x" * 32)).decrypt_file(
+            encrypted, str(decrypted)
+        )
+    assert decrypted.read_text() == "anterior\n"
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "decrypt-plain.txt",
+        "encrypt-plain.txt",
+        "plain.txt",
+    ]
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_file_missing_source_keeps_output(tmp_path, binary):
+    """Testa se uma origem inexistente não apaga um destino existente"""
+    target = tmp_path / "dest.txt"
+    target.write_text("anterior\n")
+    missing = str(tmp_path / "missing.enc")
+
+    with pytest.raises(FileNotFoundError):
+        Encryptor(KEY).encrypt_file(missing, str(target), binary=binary)
+    with pytest.raises(FileNotFoundError):
+        Decryptor(KEY).decrypt_file(missing, str(target))
+
+    assert target.read_text() == "anterior\n"
+    assert [path.name for path in tmp_path.iterdir()] == ["dest.txt"]
+
+
+def test_api_does_not_load_console_modules():
+    """Testa se a API não carrega a linha de comando nem a interface"""
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, encryptdef.api; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.split()
+
+    for module in [
+        "click",
+        "encryptdef.core",
+        "encryptdef.interactive_interface",
+        "encryptdef.output",
+    ]:
+        assert module not in loaded
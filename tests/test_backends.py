@@ -0,0 +1,91 @@
+"""Modulo para testar os backends de execução em backends.py"""
+
+import operator
+
+import pytest
+
+from encryptdef.api import (
+    decrypt_with_key,
+    encrypt_with_key,
+    iter_process_lines,
+)
+from encryptdef.backends import BatchSizer, pack_batch, unpack_batch
+from encryptdef.core import process_lines
+from encryptdef.kdf import derive_key
+
+
+def test_pack_and_unpack_batch():
+    """Testa a serialização de um lote de linhas"""
+    items = ["line1", "", "ção ✓", "a*b*c"]
+    assert unpack_batch(memoryview(pack_batch(items))) == items
+
+
+def test_process_lines_process_backend_roundtrip():
+    """Testa a função process_lines com o backend de processos"""
+    key = derive_key("password", b"0" * 16)
+    lines = [f"line{i}\n" for i in range(50)]
+
+    encrypted = process_lines(
+        lines, key, encrypt_with_key, 2, backend="process"
+    )
+    decrypted = process_lines(
+        encrypted, key, decrypt_with_key, 2, backend="process"
+    )
+
+    assert decrypted == lines
+
+
+def test_process_lines_process_backend_invalid_return_type():
+    """Testa o backend de processos com uma função que não retorna string"""
+    with pytest.raises(TypeError):
+        process_lines(["line1"], "key", operator.contains, 1, "process")
+
+
+def test_batch_sizer_grows_for_cheap_lines():
+    """Testa os lotes maiores quando cada linha custa pouco"""
+    sizer = BatchSizer(limit=1000, target=0.002)
+    assert sizer.size == 1
+
+    sizer.record(1, 0.00001)
+    assert sizer.size == 200
+
+    sizer.record(200, 1.0)
+    assert sizer.size < 200
+
+
+def test_batch_sizer_keeps_expensive_lines_alone():
+    """Testa uma linha por tarefa quando cada linha é cara"""
+    sizer = BatchSizer(target=0.002)
+    sizer.record(1, 0.05)
+    assert sizer.size == 1
+
+
+def test_batch_sizer_respects_limit():
+    """Testa o limite dos lotes"""
+    sizer = BatchSizer(limit=8)
+    sizer.record(1, 1e-9)
+    assert sizer.size == 8
+    assert [len(batch) for batch in sizer.batches(range(20))] == [8, 8, 4]
+
+
+@pytest.mark.parametrize("batch_size", [None, 1, 7])
+def test_iter_process_lines_batches_keep_order(batch_size):
+    """Testa a ordem das linhas e o progresso por lote nas threads"""
+    lines = [f"line{number}\n" for number in range(500)]
+    progress = []
+
+    result = list(
+        iter_process_lines(
+            lines,
+            "key",
+            lambda line, key: line.upper(),
+            2,
+            on_progress=progress.append,
+            batch_size=batch_size,
+        )
+    )
+
+    assert result == [line.upper() for line in lines]
+    assert sum(progress) == len(lines)
+    if batch_size == 7:
+        assert max(progress) == 7
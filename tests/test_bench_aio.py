@@ -0,0 +1,25 @@
+"""Modulo para testar o benchmark do event loop em benchmarks/aio.py"""
+
+import asyncio
+import time
+
+from benchmarks.aio import measure_lag
+
+
+def test_measure_lag_detects_blocking():
+    """Testa se uma chamada bloqueante aparece no atraso do event loop"""
+
+    async def blocking(message):
+        time.sleep(0.05)
+        return message
+
+    async def non_blocking(message):
+        await asyncio.sleep(0.05)
+        return message
+
+    blocked = asyncio.run(measure_lag(blocking, 2, 4))
+    free = asyncio.run(measure_lag(non_blocking, 2, 4))
+
+    assert blocked["max_ms"] > 40
+    assert free["p50_ms"] < 40
+    assert set(free) == {"p50_ms", "p99_ms", "max_ms", "messages_per_s"}
@@ -0,0 +1,14 @@
+"""Modulo para testar o benchmark de lotes em benchmarks/batching.py"""
+
+from benchmarks.batching import run
+
+
+def test_batching_reports_fewer_progress_calls(capsys):
+    """Testa as medidas de cada modo e o progresso agregado em lotes"""
+    results = run(2000, 20, [1])
+
+    by_mode = {entry["mode"]: entry for entry in results}
+    assert by_mode["por-linha"]["progress_calls"] == 2000
+    assert by_mode["adaptativo"]["progress_calls"] < 2000
+    assert all(entry["lines_per_s"] > 0 for entry in results)
+    assert "adaptativo" in capsys.readouterr().out
@@ -0,0 +1,93 @@
+"""Modulo para testar a comparação de benchmarks em benchmarks/compare.py"""
+
+import json
+
+from benchmarks.compare import (
+    FASTER,
+    FEW_SAMPLES,
+    REGRESSION,
+    SLOWER,
+    UNCHANGED,
+    compare_documents,
+    compare_samples,
+    main,
+)
+
+BASE = [1.00, 1.02, 0.98, 1.01, 0.99]
+
+
+def document(samples):
+    """Monta um resultado mínimo da suíte a partir das amostras"""
+    return {
+        "meta": {},
+        "results": [
+            {"name": name, "samples": values}
+            for name, values in samples.items()
+        ],
+    }
+
+
+def test_compare_samples_regression():
+    """Testa se uma piora significativa acima do limite é uma regressão"""
+    comparison = compare_samples("x", BASE, [value * 1.5 for value in BASE])
+
+    assert comparison.status == REGRESSION
+    assert 0 < comparison.low <= comparison.change <= comparison.high
+
+
+def test_compare_samples_slower_below_threshold():
+    """Testa uma piora significativa, mas abaixo do limite"""
+    comparison = compare_samples("x", BASE, [value * 1.1 for value in BASE])
+
+    assert comparison.status == SLOWER
+
+
+def test_compare_samples_faster():
+    """Testa uma melhora significativa"""
+    comparison = compare_samples("x", BASE, [value * 0.5 for value in BASE])
+
+    assert comparison.status == FASTER
+    assert comparison.high < 0
+
+
+def test_compare_samples_noise_is_unchanged():
+    """Testa se amostras sobrepostas não são consideradas uma mudança"""
+    comparison = compare_samples("x", BASE, [1.01, 0.97, 1.03, 1.0, 0.99])
+
+    assert comparison.status == UNCHANGED
+    assert comparison.low < 0 < comparison.high
+
+
+def test_compare_samples_with_one_sample():
+    """Testa se uma amostra só não permite afirmar uma regressão"""
+    comparison = compare_samples("x", [1.0], [2.0])
+
+    assert comparison.status == FEW_SAMPLES
+    assert comparison.change == 1.0
+
+
+def test_compare_documents_reports_missing():
+    """Testa os benchmarks presentes em apenas um dos resultados"""
+    comparisons, missing = compare_documents(
+        document({"a": BASE, "old": BASE}),
+        document({"a": BASE, "new": BASE}),
+    )
+
+    assert [item.name for item in comparisons] == ["a"]
+    assert missing == ["new", "old"]
+
+
+def test_main_exit_code(tmp_path, capsys):
+    """Testa o código de saída com e sem regressão acima do limite"""
+    base = tmp_path / "base.json"
+    head = tmp_path / "head.json"
+    base.write_text(json.dumps(document({"a": BASE})))
+    head.write_text(
+        json.dumps(document({"a": [value * 1.3 for value in BASE]}))
+    )
+
+    assert main([str(base), str(head)]) == 1
+    assert REGRESSION in capsys.readouterr().out
+
+    assert main([str(base), str(head), "--threshold", "0.5"]) == 0
+    assert SLOWER in capsys.readouterr().out
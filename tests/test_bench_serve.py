@@ -0,0 +1,40 @@
+"""Modulo para testar o teste de carga do daemon em benchmarks/serve.py"""
+
+import asyncio
+
+from benchmarks.serve import load_test
+from encryptdef.keys import RawKeyContext
+from encryptdef.server import Server
+
+
+def test_load_test_reports_latency_and_batches(tmp_path):
+    """Testa as medidas do teste de carga contra um servidor local"""
+    socket_path = str(tmp_path / "encryptdef.sock")
+    srv = Server(RawKeyContext(b"k" * 32), max_workers=1)
+
+    async def session():
+        ready = asyncio.Event()
+        serving = asyncio.create_task(srv.serve(socket_path, ready.set))
+        await ready.wait()
+        try:
+            encrypted = await load_test(socket_path, 2, 100, pipeline=16)
+            decrypted = await load_test(
+                socket_path, 1, 20, pipeline=4, method="decrypt"
+            )
+        finally:
+            serving.cancel()
+            await asyncio.gather(serving, return_exceptions=True)
+        return encrypted, decrypted
+
+    encrypted, decrypted = asyncio.run(session())
+
+    assert set(encrypted) == {
+        "requests_per_s",
+        "p50_ms",
+        "p99_ms",
+        "max_ms",
+        "avg_batch",
+    }
+    assert encrypted["avg_batch"] > 1
+    assert encrypted["p50_ms"] <= encrypted["p99_ms"] <= encrypted["max_ms"]
+    assert decrypted["requests_per_s"] > 0
@@ -0,0 +1,52 @@
+"""Modulo para testar a suíte de benchmarks em benchmarks/suite.py"""
+
+import json
+
+from benchmarks.suite import main, parse_size, result
+
+
+def test_parse_size():
+    """Testa a conversão de tamanhos com unidade"""
+    assert parse_size("1KB") == 1024
+    assert parse_size("1.5mb") == 1536 * 1024
+    assert parse_size("2GB") == 2 * 1024**3
+    assert parse_size("100") == 100
+
+
+def test_result_throughput():
+    """Testa a vazão calculada a partir da menor amostra"""
+    entry = result("lines", [2.0, 1.0], 100, "lines", workers=1)
+
+    assert entry["mean"] == 1.5
+    assert entry["throughput"] == {"unit": "lines/s", "value": 100.0}
+    assert entry["params"] == {"workers": 1}
+
+
+def test_suite_writes_json(tmp_path):
+    """Testa se a suíte grava um JSON com todos os grupos de benchmarks"""
+    output = tmp_path / "results.json"
+
+    main(
+        [
+            "--sizes",
+            "1KB",
+            "--workers",
+            "1",
+            "--lines",
+            "10",
+            "--repeat",
+            "1",
+            "--output",
+            str(output),
+        ]
+    )
+
+    document = json.loads(output.read_text())
+    names = [entry["name"] for entry in document["results"]]
+    assert document["meta"]["schema"] == 1
+    assert "message.decrypt" in names
+    assert "many.decrypt.process.w1" in names
+    assert "lines.encrypt.thread.w1" in names
+    assert "file.encrypt.1KB" in names
+    assert all(entry["samples"] for entry in document["results"])
+    assert document["results"][-1]["peak_memory"] > 0
@@ -0,0 +1,121 @@
+"""Modulo para testar o registro de cifradores em ciphers.py"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from encryptdef.api import (
+    decrypt,
+    encrypt,
+    iter_decrypt_lines,
+    iter_encrypt_lines,
+)
+from encryptdef.ciphers import (
+    CIPHERS,
+    benchmark_ciphers,
+    cipher_from_fields,
+    fastest_cipher,
+    resolve_cipher,
+)
+from encryptdef.exceptions import InvalidEncryptedFormat
+from encryptdef.header import parse_header
+from encryptdef.resources import host_id
+
+
+@pytest.fixture(name="cache_dir")
+def cache_dir_fixture(tmp_path):
+    """Isola o cache do modo auto em um diretório temporário"""
+    with (
+        patch("encryptdef.ciphers.CACHE_DIR", str(tmp_path)),
+        patch("encryptdef.ciphers._fastest_cipher", None),
+    ):
+        yield tmp_path
+
+
+@pytest.mark.parametrize("cipher", list(CIPHERS))
+def test_message_roundtrip(cipher):
+    """Testa a ida e volta de uma mensagem com cada cifrador"""
+    message = encrypt("hello", "password", cipher=cipher)
+
+    assert parse_header(message.partition("*")[0])["cipher"] == cipher
+    assert decrypt(message, "password") == "hello"
+
+
+@pytest.mark.parametrize("cipher", list(CIPHERS))
+def test_file_lines_roundtrip(cipher):
+    """Testa a ida e volta das linhas de um arquivo com cada cifrador"""
+    lines = ["line1\n", "line2\n"]
+    encrypted = list(iter_encrypt_lines(lines, "password", cipher=cipher))
+
+    assert list(iter_decrypt_lines(encrypted, "password")) == lines
+
+
+def test_cipher_from_fields():
+    """Testa a leitura do cifrador do cabeçalho"""
+    assert cipher_from_fields({}) == "aes-gcm"
+    assert cipher_from_fields({"cipher": "chacha20-poly1305"}) == (
+        "chacha20-poly1305"
+    )
+
+    with pytest.raises(InvalidEncryptedFormat):
+        cipher_from_fields({"cipher": "rot13"})
+
+
+def test_resolve_cipher_unknown():
+    """Testa a função resolve_cipher com um cifrador inexistente"""
+    with pytest.raises(ValueError):
+        resolve_cipher("rot13")
+
+
+def test_benchmark_ciphers():
+    """Testa se todos os cifradores registrados são medidos"""
+    timings = benchmark_ciphers(size=1024, rounds=1)
+
+    assert set(timings) == set(CIPHERS)
+    assert all(timing >= 0 for timing in timings.values())
+
+
+def test_fastest_cipher_is_cached(cache_dir):
+    """Testa se a medição roda apenas na primeira vez"""
+    timings = {"aes-gcm": 2.0, "chacha20-poly1305": 1.0}
+
+    with patch(
+        "encryptdef.ciphers.benchmark_ciphers", return_value=timings
+    ) as mock_benchmark:
+        assert resolve_cipher("auto") == "chacha20-poly1305"
+        assert resolve_cipher("auto") == "chacha20-poly1305"
+
+    mock_benchmark.assert_called_once()
+    cached = json.loads((cache_dir / "cipher.json").read_text())
+    assert cached["cipher"] == "chacha20-poly1305"
+
+
+def test_fastest_cipher_reads_disk_cache(cache_dir):
+    """Testa se o resultado guardado em disco é reaproveitado"""
+    (cache_dir / "cipher.json").write_text(
+        json.dumps(
+            {
+                "host": host_id(),
+                "cipher": "chacha20-poly1305",
+            }
+        )
+    )
+
+    with patch("encryptdef.ciphers.benchmark_ciphers") as mock_benchmark:
+        assert fastest_cipher() == "chacha20-poly1305"
+
+    mock_benchmark.assert_not_called()
+
+
+def test_fastest_cipher_ignores_other_host(cache_dir):
+    """Testa se uma medição de outra máquina é descartada"""
+    (cache_dir / "cipher.json").write_text(
+        json.dumps({"host": "other/arm64", "cipher": "chacha20-poly1305"})
+    )
+
+    with patch(
+        "encryptdef.ciphers.benchmark_ciphers",
+        return_value={"aes-gcm": 1.0, "chacha20-poly1305": 2.0},
+    ):
+        assert fastest_cipher() == "aes-gcm"
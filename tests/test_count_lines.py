@@ -0,0 +1,18 @@
+"""Modulo para testar a função count_lines em utils.py"""
+
+import pytest
+
+from encryptdef.utils import count_lines, iter_file_lines
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [("", 0), ("a", 1), ("a\n", 1), ("a\nb", 2), ("a\n\nb\n", 3)],
+)
+def test_count_lines(content, expected):
+    """Testando a função count_lines"""
+    with open("file.txt", "w", encoding="utf-8") as file_:
+        file_.write(content)
+
+    assert count_lines("file.txt", block_size=2) == expected
+    assert len(list(iter_file_lines("file.txt"))) == expected
@@ -3,13 +3,11 @@
 from base64 import b64decode, b64encode
 
 import pytest
+from Cryptodome.Cipher import AES
 
-from encryptdef.core import (
-    InvalidEncryptedFormat,
-    InvalidKey,
-    decrypt,
-    encrypt,
-)
+from encryptdef.api import decrypt, encrypt
+from encryptdef.exceptions import InvalidEncryptedFormat, InvalidKey
+from encryptdef.kdf import derive_key
 from encryptdef.template import (
     TEMPLATE_ERROR_INVALID_ENCRYPTED_FORMAT,
     TEMPLATE_INVALID_KEY,
@@ -65,10 +63,25 @@ def test_decrypt_with_modified_message():
 
     encrypted_message = encrypt(message, password)
     parts = encrypted_message.split("*")
-    modified_cipher_text = b64encode(b"modified" + b64decode(parts[0])).decode(
+    modified_cipher_text = b64encode(b"modified" + b64decode(parts[1])).decode(
         "utf-8"
     )
-    modified_encrypted_message = "*".join([modified_cipher_text] + parts[1:])
+    modified_encrypted_message = "*".join(
+        [parts[0], modified_cipher_text] + parts[2:]
+    )
 
     with pytest.raises(InvalidKey):
         decrypt(modified_encrypted_message, password)
+
+
+def test_decrypt_legacy_message():
+    """Testa a função decrypt com uma mensagem no formato antigo"""
+    salt = b"0" * 16
+    cipher = AES.new(derive_key("password", salt), AES.MODE_GCM)
+    cipher_text, tag = cipher.encrypt_and_digest(b"legacy message")
+    legacy_message = "*".join(
+        b64encode(part).decode("utf-8")
+        for part in (cipher_text, salt, cipher.nonce, tag)
+    )
+
+    assert decrypt(legacy_message, "password") == "legacy message"
@@ -0,0 +1,26 @@
+"""Modulo para testar as funções encrypt_with_key e decrypt_with_key"""
+
+import pytest
+
+from encryptdef.api import decrypt_with_key, encrypt_with_key
+from encryptdef.exceptions import InvalidKey
+from encryptdef.kdf import derive_key
+
+
+def test_decrypt_with_key_roundtrip():
+    """Testa a criptografia de uma linha com uma chave já derivada"""
+    key = derive_key("password", b"0" * 16)
+    encrypted = encrypt_with_key("hello world", key)
+
+    assert len(encrypted.split("*")) == 3
+    assert decrypt_with_key(encrypted, key) == "hello world"
+
+
+def test_decrypt_with_key_wrong_key():
+    """Testa a função decrypt_with_key com a chave errada"""
+    key = derive_key("password", b"0" * 16)
+    wrong_key = derive_key("wrong-password", b"0" * 16)
+    encrypted = encrypt_with_key("hello world", key)
+
+    with pytest.raises(InvalidKey):
+        decrypt_with_key(encrypted, wrong_key)
@@ -4,7 +4,9 @@ import base64
 
 import pytest
 
-from encryptdef.core import encrypt
+from encryptdef.api import decrypt, encrypt
+from encryptdef.header import parse_header
+from encryptdef.kdf import ScryptParams
 
 
 def test_encrypt_output_format():
@@ -20,17 +22,31 @@ def test_encrypt_output_format():
         len(parts) == 4
     ), "Encrypted message should contain 4 parts separated by '*'"
 
+    # O cabeçalho carrega o salt e os parâmetros do Scrypt
+    header, cipher_text, nonce, tag = parts
+    fields = parse_header(header)
+    assert (fields["n"], fields["r"], fields["p"]) == ("16384", "8", "1")
+
     # Verificar se cada parte pode ser decodificada de base64
-    cipher_text, salt, nonce, tag = parts
     try:
         base64.b64decode(cipher_text)
-        base64.b64decode(salt)
+        base64.b64decode(fields["salt"])
         base64.b64decode(nonce)
         base64.b64decode(tag)
     except TypeError:
         pytest.fail("One of the parts could not be base64 decoded")
 
 
+def test_encrypt_with_custom_params():
+    """Testa a função encrypt com parâmetros do Scrypt escolhidos"""
+    params = ScryptParams(n=2**10, r=4, p=2)
+    encrypted_message = encrypt("message", "password", params)
+
+    fields = parse_header(encrypted_message.split("*")[0])
+    assert (fields["n"], fields["r"], fields["p"]) == ("1024", "4", "2")
+    assert decrypt(encrypted_message, "password") == "message"
+
+
 def test_encrypt_different_messages():
     """Testa a função encrypt diferentes valores e mesma senha"""
     password = "strongpassword123"
@@ -0,0 +1,134 @@
+"""Modulo para testar as funções encrypt_many e decrypt_many em batch.py"""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from unittest.mock import patch
+
+import pytest
+
+from encryptdef.api import Decryptor, Encryptor, decrypt, encrypt
+from encryptdef.backends import PROCESS_BACKEND, THREAD_BACKEND
+from encryptdef.batch import (
+    NONCE_SIZE,
+    TOKEN_PREFIX,
+    decrypt_many,
+    encrypt_many,
+    key_fields_size,
+)
+from encryptdef.exceptions import InvalidEncryptedFormat, InvalidKey
+from encryptdef.kdf import ScryptParams, derive_subkey
+from encryptdef.keys import KeyContext, RawKeyContext
+
+VALUES = ["ana@example.com", "", "çãõ 🔒", "bob@example.com"]
+FAST = ScryptParams(n=2**4)
+
+
+def _decode(token):
+    body = token.removeprefix(TOKEN_PREFIX)
+    return urlsafe_b64decode(body + "=" * (-len(body) % 4))
+
+
+def _encode(data):
+    return TOKEN_PREFIX + urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+@pytest.mark.parametrize("cipher", ["aes-gcm", "chacha20-poly1305"])
+def test_roundtrip_with_password(cipher):
+    """Testa a criptografia e a descriptografia de um lote com senha"""
+    tokens = encrypt_many(VALUES, "senha", FAST, cipher)
+
+    assert all(token.startswith(TOKEN_PREFIX) for token in tokens)
+    assert decrypt_many(tokens, "senha") == VALUES
+
+
+def test_roundtrip_with_raw_key():
+    """Testa um lote com uma chave bruta, sem Scrypt"""
+    key = RawKeyContext(b"k" * 32)
+    tokens = encrypt_many(VALUES, key)
+
+    assert decrypt_many(tokens, key) == VALUES
+    with pytest.raises(InvalidKey):
+        decrypt_many(tokens, "senha")
+
+
+def test_tokens_are_independent_and_compact():
+    """Testa se cada token é descriptografado sozinho e é menor que encrypt"""
+    context = KeyContext("senha", FAST)
+    tokens = encrypt_many(["a", "a"], context)
+
+    assert tokens[0] != tokens[1]
+    assert decrypt(tokens[1], "senha") == "a"
+    assert decrypt_many(tokens[::-1], "senha") == ["a", "a"]
+    assert len(tokens[0]) < len(encrypt("a", context))
+
+
+def test_batch_shares_one_key_and_unique_nonces():
+    """Testa se o lote usa uma subchave e nonces distintos"""
+    tokens = [_decode(token) for token in encrypt_many(["x"] * 100, "k", FAST)]
+    size = key_fields_size(tokens[0])
+
+    assert len({token[:size] for token in tokens}) == 1
+    assert len({token[size:][:NONCE_SIZE] for token in tokens}) == 100
+
+
+def test_decrypt_many_derives_each_key_once():
+    """Testa se tokens de vários lotes derivam cada chave uma única vez"""
+    tokens = encrypt_many(["a", "b"], "senha", FAST) + encrypt_many(
+        ["c"], "senha", FAST
+    )
+
+    with patch(
+        "encryptdef.header.derive_subkey", wraps=derive_subkey
+    ) as derive:
+        assert decrypt_many(tokens, "senha") == ["a", "b", "c"]
+    assert derive.call_count == 2
+
+
+@pytest.mark.parametrize("backend", [THREAD_BACKEND, PROCESS_BACKEND])
+def test_large_batch_in_workers(backend):
+    """Testa se lotes grandes divididos entre trabalhadores mantêm a ordem"""
+    values = [str(index) for index in range(50)]
+    key = RawKeyContext(b"k" * 32)
+
+    with patch("encryptdef.batch.PARALLEL_THRESHOLD", 10):
+        tokens = encrypt_many(values, key, max_workers=2, backend=backend)
+        decrypted = decrypt_many(tokens, key, max_workers=2, backend=backend)
+
+    assert decrypted == values
+    size = key_fields_size(_decode(tokens[0]))
+    nonces = {_decode(token)[size:][:NONCE_SIZE] for token in tokens}
+    assert len(nonces) == len(values)
+
+
+def test_tampered_token():
+    """Testa se um token alterado não é aceito"""
+    data = bytearray(_decode(encrypt_many(["segredo"], "senha", FAST)[0]))
+    data[-1] ^= 1
+
+    with pytest.raises(InvalidKey):
+        decrypt_many([_encode(bytes(data))], "senha")
+
+
+def test_tampered_cipher_id():
+    """Testa se os campos da chave são autenticados"""
+    data = bytearray(_decode(encrypt_many(["segredo"], "senha", FAST)[0]))
+    data[key_fields_size(data) - 1] = 1
+
+    with pytest.raises(InvalidKey):
+        decrypt_many([_encode(bytes(data))], "senha")
+
+
+@pytest.mark.parametrize(
+    "token", ["ed2.", "ed2.@@@", "ed2." + "A" * 20, "ed2.CQ", "encryptdef"]
+)
+def test_malformed_token(token):
+    """Testa tokens malformados"""
+    with pytest.raises(InvalidEncryptedFormat):
+        decrypt_many([token], "senha")
+
+
+def test_encryptor_and_decryptor():
+    """Testa os métodos de lote do Encryptor e do Decryptor"""
+    encryptor = Encryptor("senha", FAST, max_workers=1)
+    tokens = encryptor.encrypt_many(VALUES)
+
+    assert Decryptor("senha", max_workers=1).decrypt_many(tokens) == VALUES
@@ -0,0 +1,154 @@
+"""Modulo para testar o FileFollower e os checkpoints em follow.py"""
+
+import os
+import threading
+
+from encryptdef.follow import (
+    Checkpoint,
+    FileFollower,
+    find_by_inode,
+    load_checkpoint,
+    save_checkpoint,
+)
+
+
+def write(path, data, mode="a"):
+    """Escreve no arquivo acompanhado"""
+    with open(path, mode, encoding="utf-8") as file_:
+        file_.write(data)
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    """Testa se o checkpoint salvo é lido de volta"""
+    path = str(tmp_path / "out.offset")
+    checkpoint = Checkpoint(1, 2, 3, 4)
+
+    save_checkpoint(path, checkpoint)
+
+    assert load_checkpoint(path) == checkpoint
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_load_checkpoint_missing_or_corrupted(tmp_path):
+    """Testa se um checkpoint ausente ou inválido é ignorado"""
+    path = tmp_path / "out.offset"
+    assert load_checkpoint(str(path)) is None
+
+    path.write_text("{")
+    assert load_checkpoint(str(path)) is None
+
+
+def test_read_lines_keeps_partial_line(tmp_path):
+    """Testa se uma linha sem quebra de linha fica para a próxima leitura"""
+    path = str(tmp_path / "app.log")
+    write(path, "a\nb\nparcial")
+    follower = FileFollower(path)
+
+    assert follower.read_lines() == ["a\n", "b\n"]
+    assert follower.offset == 4
+
+    write(path, " completa\n")
+    assert follower.read_lines() == ["parcial completa\n"]
+    follower.close()
+
+
+def test_resume_from_checkpoint(tmp_path):
+    """Testa se a leitura continua da posição salva"""
+    path = str(tmp_path / "app.log")
+    write(path, "a\nb\n")
+    first = FileFollower(path)
+    first.read_lines()
+    checkpoint = first.checkpoint(0)
+    first.close()
+
+    write(path, "c\n")
+    follower = FileFollower(path, checkpoint)
+
+    assert follower.read_lines() == ["c\n"]
+    follower.close()
+
+
+def test_skip_lines(tmp_path):
+    """Testa se as linhas já processadas são puladas sem checkpoint"""
+    path = str(tmp_path / "app.log")
+    write(path, "a\nb\nc\n")
+    follower = FileFollower(path, skip_lines=2)
+
+    assert follower.read_lines() == ["c\n"]
+    follower.close()
+
+
+def test_truncated_file_restarts(tmp_path):
+    """Testa se um arquivo truncado no lugar é lido desde o início"""
+    path = str(tmp_path / "app.log")
+    write(path, "a\nb\n")
+    follower = FileFollower(path)
+    follower.read_lines()
+
+    write(path, "c\n", mode="w")
+
+    assert follower.check_rotation() == []
+    assert follower.read_lines() == ["c\n"]
+    follower.close()
+
+
+def test_rotation_while_following(tmp_path):
+    """Testa se o fim do arquivo rotacionado é lido antes do novo"""
+    path = str(tmp_path / "app.log")
+    write(path, "a\n")
+    follower = FileFollower(path)
+    follower.read_lines()
+
+    write(path, "b\nsem quebra")
+    os.rename(path, path + ".1")
+    write(path, "c\n")
+
+    assert follower.check_rotation() == ["b\n", "sem quebra\n"]
+    assert follower.read_lines() == ["c\n"]
+    follower.close()
+
+
+def test_rotation_while_stopped(tmp_path):
+    """Testa se o arquivo rotacionado é encontrado pelo inode ao reiniciar"""
+    path = str(tmp_path / "app.log")
+    write(path, "a\nb\n")
+    first = FileFollower(path)
+    first.read_lines(max_lines=1)
+    checkpoint = first.checkpoint(0)
+    first.close()
+
+    os.rename(path, path + ".1")
+    write(path, "c\n")
+    follower = FileFollower(path, checkpoint)
+
+    assert list(follower.iter_batches()) == [["b\n"], ["c\n"]]
+    follower.close()
+
+
+def test_find_by_inode(tmp_path):
+    """Testa a busca de um arquivo pelo inode"""
+    path = str(tmp_path / "app.log")
+    write(path, "a\n")
+    stat = os.stat(path)
+
+    assert find_by_inode(path, stat.st_dev, stat.st_ino) == path
+    assert find_by_inode(path, stat.st_dev, -1) is None
+
+
+def test_iter_batches_follow_until_stop(tmp_path):
+    """Testa se o modo follow entrega as linhas novas até ser encerrado"""
+    path = str(tmp_path / "app.log")
+    write(path, "a\n")
+    stop = threading.Event()
+    follower = FileFollower(path)
+    batches = []
+
+    for lines in follower.iter_batches(follow=True, stop=stop):
+        batches.append(lines)
+        if len(batches) == 1:
+            write(path, "b\n")
+        else:
+            stop.set()
+
+    assert batches == [["a\n"], ["b\n"]]
+    follower.close()
@@ -0,0 +1,75 @@
+"""Modulo para testar o cabeçalho versionado em header.py"""
+
+from base64 import b64encode
+
+import pytest
+
+from encryptdef.exceptions import InvalidEncryptedFormat, InvalidKey
+from encryptdef.header import (
+    build_header,
+    is_header,
+    parse_header,
+    read_kdf_fields,
+    subkey_from_fields,
+    verify_key_check,
+)
+from encryptdef.kdf import key_check_value
+
+
+def test_build_and_parse_header():
+    """Testa as funções build_header e parse_header"""
+    fields = {"kdf": "scrypt", "n": "16384", "salt": "c2FsdA=="}
+    header = build_header(fields)
+
+    assert is_header(header)
+    assert parse_header(header + "\n") == fields
+
+
+def test_is_header_legacy_line():
+    """Testa a função is_header com uma linha do formato antigo"""
+    assert not is_header("Y2lwaGVy*c2FsdA==*bm9uY2U=*dGFn")
+
+
+def test_parse_header_invalid_version():
+    """Testa a função parse_header com uma versão não suportada"""
+    with pytest.raises(InvalidEncryptedFormat):
+        parse_header("encryptdef:99:kdf=scrypt")
+
+
+def test_read_kdf_fields_missing_salt():
+    """Testa a função read_kdf_fields sem o campo salt"""
+    fields = {"kdf": "scrypt", "n": "16384", "r": "8", "p": "1"}
+
+    with pytest.raises(InvalidEncryptedFormat):
+        read_kdf_fields(fields)
+
+
+def test_read_kdf_fields_rejects_excessive_cost():
+    """Testa se um cabeçalho com custo exagerado é rejeitado"""
+    fields = {"kdf": "scrypt", "n": str(2**30), "r": "8", "p": "1", "salt": ""}
+
+    with pytest.raises(InvalidEncryptedFormat):
+        read_kdf_fields(fields)
+
+
+def test_subkey_from_fields_without_hkdf():
+    """Testa se cabeçalhos sem o campo hkdf usam a própria chave mestra"""
+    assert subkey_from_fields({}, b"k" * 32) == b"k" * 32
+
+
+def test_subkey_from_fields_invalid_hkdf():
+    """Testa a função subkey_from_fields com um salt de HKDF inválido"""
+    with pytest.raises(InvalidEncryptedFormat):
+        subkey_from_fields({"hkdf": "!!"}, b"k" * 32)
+
+
+def test_verify_key_check():
+    """Testa a função verify_key_check com a chave certa e a errada"""
+    fields = {"kcv": b64encode(key_check_value(b"k" * 32)).decode()}
+
+    assert verify_key_check(fields, b"k" * 32) == b"k" * 32
+    assert verify_key_check({}, b"x" * 32) == b"x" * 32
+    with pytest.raises(InvalidKey):
+        verify_key_check(fields, b"x" * 32)
+    with pytest.raises(InvalidEncryptedFormat):
+        verify_key_check({"kcv": "!!"}, b"k" * 32)
@@ -0,0 +1,62 @@
+"""Modulo para testar o tempo de inicialização da linha de comando"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Tempo máximo, em microssegundos, para importar encryptdef.cli. Em uma
+# máquina de desenvolvimento a importação leva cerca de 80 ms. O tempo
+# absoluto depende da máquina, por isso só é verificado com
+# ENCRYPTDEF_PERF_TESTS=1.
+IMPORT_TIME_BUDGET_US = 150_000
+PERF_TESTS = os.environ.get("ENCRYPTDEF_PERF_TESTS") == "1"
+
+# Módulos que só podem ser carregados nos caminhos que precisam deles
+LAZY_MODULES = [
+    "rich.progress",
+    "rich.markdown",
+    "importlib.metadata",
+    "logging.handlers",
+    "multiprocessing",
+    "Cryptodome.Cipher",
+    "Cryptodome.Protocol",
+]
+
+
+def import_times(module: str) -> dict:
+    """Importa o módulo em um novo interpretador com -X importtime"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stderr
+
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_cli_import_does_not_load_heavy_modules(module):
+    """Testa se os módulos pesados não são carregados pela linha de comando"""
+    assert module not in import_times("encryptdef.cli")
+
+
+@pytest.mark.skipif(
+    not PERF_TESTS, reason="defina ENCRYPTDEF_PERF_TESTS=1 para medir"
+)
+def test_cli_import_time_budget():
+    """Testa se a importação da linha de comando respeita o orçamento"""
+    best = min(
+        import_times("encryptdef.cli")["encryptdef.cli"] for _ in range(3)
+    )
+
+    assert best < IMPORT_TIME_BUDGET_US
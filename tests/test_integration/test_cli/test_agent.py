@@ -0,0 +1,74 @@
+"""Modulo para testar os comandos agent em cli.py"""
+
+import os
+import subprocess
+import sys
+
+from encryptdef.api import encrypt
+from encryptdef.kdf import ScryptParams
+
+COMMAND = [sys.executable, "-c", "from encryptdef.cli import main; main()"]
+
+
+def _run(args, env, **kwargs):
+    return subprocess.run(
+        COMMAND + args,
+        capture_output=True,
+        check=True,
+        text=True,
+        timeout=60,
+        env=env,
+        **kwargs,
+    )
+
+
+def test_agent_start_add_decrypt_stop(tmp_path):
+    """Teste do agente iniciado em segundo plano e usado pelo decrypt."""
+    socket_path = str(tmp_path / "agent.sock")
+    keyfile = tmp_path / "key.txt"
+    keyfile.write_text("senha\n")
+    env = {**os.environ, "ENCRYPTDEF_AGENT_SOCK": socket_path}
+
+    started = _run(["agent", "start", "--socket", socket_path], env)
+    assert "export ENCRYPTDEF_AGENT_SOCK;" in started.stdout
+    try:
+        _run(["agent", "add", "--keyfile", str(keyfile)], env)
+
+        encrypted = encrypt("segredo", "senha", ScryptParams(n=2**4))
+        decrypted = _run(
+            ["decrypt", "--message", encrypted, "--output", "raw"], env
+        )
+        assert decrypted.stdout.strip() == "segredo"
+
+        status = _run(["agent", "status"], env)
+        assert "Chaves derivadas em cache: 1" in status.stdout
+    finally:
+        _run(["agent", "stop"], env)
+
+
+def test_agent_command_without_socket(tmp_path):
+    """Teste dos comandos do agente sem ENCRYPTDEF_AGENT_SOCK."""
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key != "ENCRYPTDEF_AGENT_SOCK"
+    }
+    completed = subprocess.run(
+        COMMAND + ["agent", "status"],
+        capture_output=True,
+        text=True,
+        timeout=60,
+        env=env,
+        check=False,
+    )
+    assert completed.returncode == 2
+
+    completed = subprocess.run(
+        COMMAND + ["agent", "status", "--socket", str(tmp_path / "x.sock")],
+        capture_output=True,
+        text=True,
+        timeout=60,
+        env=env,
+        check=False,
+    )
+    assert completed.returncode == 1
@@ -0,0 +1,25 @@
+"""Modulo para testar o comando calibrate em cli.py"""
+
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from encryptdef.cli import main
+from encryptdef.kdf import ScryptParams
+
+
+@pytest.fixture(name="runner")
+def runner_fixture():
+    """Função fixture para teste"""
+    return CliRunner()
+
+
+@patch("encryptdef.cli.kdf.calibrate", return_value=ScryptParams(n=2**15))
+def test_calibrate_command(mock_calibrate, runner):
+    """Teste para o comando calibrate."""
+
+    result = runner.invoke(main, ["calibrate", "--target-ms", "250"])
+    assert result.exit_code == 0
+    mock_calibrate.assert_called_once_with(0.25, 8, 1, 2048 * 1024**2)
+    assert "--scrypt-n 32768" in result.output
@@ -7,8 +7,12 @@ from click.testing import CliRunner
 
 from encryptdef import core
 from encryptdef.cli import main
+from encryptdef.output import RAW_OUTPUT, OutputOptions
 from encryptdef.template import TEMPLATE_DECRYPT_KEY
 
+# O CliRunner não é um terminal, então a saída padrão é "raw"
+RAW = OutputOptions(RAW_OUTPUT)
+
 
 @pytest.fixture(name="runner")
 def runner_fixture():
@@ -28,10 +32,10 @@ def test_encrypt_command_with_message(
     )
     assert result.exit_code == 0
     mock_process_keyfile.assert_called_once_with(
-        None, "encrypt-helloworld", None, TEMPLATE_DECRYPT_KEY
+        None, "encrypt-helloworld", None, TEMPLATE_DECRYPT_KEY, "password", RAW
     )
     mock_decrypt_message.assert_called_once_with(
-        "encrypt-helloworld", "mock_key"
+        "encrypt-helloworld", "mock_key", RAW
     )
 
 
@@ -49,11 +53,15 @@ def test_encrypt_command_with_file(
     result = runner.invoke(main, ["decrypt", "--file", "encrypt-test.txt"])
     assert result.exit_code == 0
     mock_process_keyfile.assert_called_once_with(
-        None, None, "encrypt-test.txt", TEMPLATE_DECRYPT_KEY
+        None, None, "encrypt-test.txt", TEMPLATE_DECRYPT_KEY, "password", RAW
     )
     mock_assigning.assert_called_once_with("encrypt-test.txt", "decrypt-")
     mock_process_file.assert_called_once_with(
-        ["encrypt-test.txt", "mock_key", "decrypt-test.txt"], core.decrypt
+        ["encrypt-test.txt", "mock_key", "decrypt-test.txt"],
+        core.decrypt,
+        backend="thread",
+        output=RAW,
+        workers=None,
     )
 
 
@@ -76,9 +84,18 @@ def test_encrypt_command_with_file_with_keyfile(
     )
     assert result.exit_code == 0
     mock_process_keyfile.assert_called_once_with(
-        "key.txt", None, "encrypt-test.txt", TEMPLATE_DECRYPT_KEY
+        "key.txt",
+        None,
+        "encrypt-test.txt",
+        TEMPLATE_DECRYPT_KEY,
+        "password",
+        RAW,
     )
     mock_assigning.assert_called_once_with("encrypt-test.txt", "decrypt-")
     mock_process_file.assert_called_once_with(
-        ["encrypt-test.txt", "mock_key_file", "decrypt-test.txt"], core.decrypt
+        ["encrypt-test.txt", "mock_key_file", "decrypt-test.txt"],
+        core.decrypt,
+        backend="thread",
+        output=RAW,
+        workers=None,
     )
@@ -7,8 +7,13 @@ from click.testing import CliRunner
 
 from encryptdef import core
 from encryptdef.cli import main
+from encryptdef.kdf import ScryptParams
+from encryptdef.output import RAW_OUTPUT, OutputOptions
 from encryptdef.template import TEMPLATE_ENCRYPT_KEY
 
+# O CliRunner não é um terminal, então a saída padrão é "raw"
+RAW = OutputOptions(RAW_OUTPUT)
+
 
 @pytest.fixture(name="runner")
 def runner_fixture():
@@ -26,9 +31,11 @@ def test_encrypt_command_with_message(
     result = runner.invoke(main, ["encrypt", "--message", "hello world"])
     assert result.exit_code == 0
     mock_process_keyfile.assert_called_once_with(
-        None, "hello world", None, TEMPLATE_ENCRYPT_KEY
+        None, "hello world", None, TEMPLATE_ENCRYPT_KEY, "password", RAW
+    )
+    mock_encrypt_message.assert_called_once_with(
+        "hello world", "mock_key", ScryptParams(), "aes-gcm", RAW
     )
-    mock_encrypt_message.assert_called_once_with("hello world", "mock_key")
 
 
 @patch("encryptdef.cli.core.process_file")
@@ -45,11 +52,20 @@ def test_encrypt_command_with_file(
     result = runner.invoke(main, ["encrypt", "--file", "test.txt"])
     assert result.exit_code == 0
     mock_process_keyfile.assert_called_once_with(
-        None, None, "test.txt", TEMPLATE_ENCRYPT_KEY
+        None, None, "test.txt", TEMPLATE_ENCRYPT_KEY, "password", RAW
     )
     mock_assigning.assert_called_once_with("test.txt", "encrypt-")
     mock_process_file.assert_called_once_with(
-        ["test.txt", "mock_key", "encrypt-test.txt"], core.encrypt
+        ["test.txt", "mock_key", "encrypt-test.txt"],
+        core.encrypt,
+        binary=False,
+        backend="thread",
+        params=ScryptParams(),
+        cipher="aes-gcm",
+        output=RAW,
+        append=False,
+        follow=False,
+        workers=None,
     )
 
 
@@ -72,9 +88,85 @@ def test_encrypt_command_with_file_with_keyfile(
     )
     assert result.exit_code == 0
     mock_process_keyfile.assert_called_once_with(
-        "key.txt", None, "test.txt", TEMPLATE_ENCRYPT_KEY
+        "key.txt", None, "test.txt", TEMPLATE_ENCRYPT_KEY, "password", RAW
     )
     mock_assigning.assert_called_once_with("test.txt", "encrypt-")
     mock_process_file.assert_called_once_with(
-        ["test.txt", "mock_key_file", "encrypt-test.txt"], core.encrypt
+        ["test.txt", "mock_key_file", "encrypt-test.txt"],
+        core.encrypt,
+        binary=False,
+        backend="thread",
+        params=ScryptParams(),
+        cipher="aes-gcm",
+        output=RAW,
+        append=False,
+        follow=False,
+        workers=None,
+    )
+
+
+@patch("encryptdef.cli.core.encrypt_message")
+@patch("encryptdef.cli.core.process_keyfile_and_args", return_value="mock_key")
+def test_encrypt_command_with_kdf_profile_and_override(
+    mock_process_keyfile, mock_encrypt_message, runner
+):  # pylint: disable=W0613
+    """Teste para o comando encrypt com perfil e parâmetros do Scrypt."""
+
+    result = runner.invoke(
+        main,
+        [
+            "encrypt",
+            "--message",
+            "hello",
+            "--kdf-profile",
+            "archive",
+            "--scrypt-r",
+            "4",
+        ],
+    )
+    assert result.exit_code == 0
+    mock_encrypt_message.assert_called_once_with(
+        "hello", "mock_key", ScryptParams(n=2**20, r=4, p=1), "aes-gcm", RAW
     )
+
+
+@patch("encryptdef.cli.core.encrypt_message")
+@patch("encryptdef.cli.core.process_keyfile_and_args", return_value="mock_key")
+def test_encrypt_command_with_cipher(
+    mock_process_keyfile, mock_encrypt_message, runner
+):  # pylint: disable=W0613
+    """Teste para o comando encrypt com outro cifrador."""
+
+    result = runner.invoke(
+        main,
+        ["encrypt", "--message", "hello", "--cipher", "chacha20-poly1305"],
+    )
+    assert result.exit_code == 0
+    mock_encrypt_message.assert_called_once_with(
+        "hello", "mock_key", ScryptParams(), "chacha20-poly1305", RAW
+    )
+
+
+def test_encrypt_command_with_invalid_scrypt_n(runner):
+    """Teste para o comando encrypt com um n que não é potência de 2."""
+
+    result = runner.invoke(
+        main, ["encrypt", "--message", "hello", "--scrypt-n", "1000"]
+    )
+    assert result.exit_code == 2
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--follow", "--message", "hello"],
+        ["--append", "--file", "test.txt", "--binary"],
+        ["--append", "--file", "-", "--keyfile", "key.txt"],
+    ],
+)
+def test_encrypt_command_append_requires_text_file(args, runner):
+    """Teste para --append e --follow sem um arquivo de texto."""
+
+    result = runner.invoke(main, ["encrypt", *args])
+    assert result.exit_code == 2
+    assert "--append" in result.output
@@ -0,0 +1,194 @@
+"""Modulo para testar os formatos de saída dos comandos encrypt e decrypt"""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from encryptdef.cli import main
+
+
+@pytest.fixture(name="runner")
+def runner_fixture():
+    """Função fixture para teste"""
+    return CliRunner()
+
+
+@pytest.fixture(name="keyfile")
+def keyfile_fixture(tmp_path):
+    """Arquivo com a chave usada nos testes"""
+    keyfile = tmp_path / "key.txt"
+    keyfile.write_text("chave")
+    return str(keyfile)
+
+
+def test_raw_output_roundtrip(runner, keyfile):
+    """Testa se a saída raw contém apenas o texto cifrado e o texto claro"""
+    encrypted = runner.invoke(
+        main,
+        [
+            "encrypt",
+            "--keyfile",
+            keyfile,
+            "--message",
+            "oi",
+            "--output",
+            "raw",
+        ],
+    )
+    assert encrypted.exit_code == 0
+    assert encrypted.output.count("\n") == 1
+
+    decrypted = runner.invoke(
+        main,
+        [
+            "decrypt",
+            "--keyfile",
+            keyfile,
+            "--message",
+            encrypted.output.strip(),
+            "--output",
+            "raw",
+        ],
+    )
+    assert decrypted.exit_code == 0
+    assert decrypted.output == "oi\n"
+
+
+def test_ndjson_output_error_exit_code(runner, keyfile):
+    """Testa o erro estruturado e o código de saída de uma falha"""
+    result = runner.invoke(
+        main,
+        [
+            "decrypt",
+            "--keyfile",
+            keyfile,
+            "--message",
+            "invalido",
+            "--output",
+            "ndjson",
+        ],
+    )
+
+    assert result.exit_code == 1
+    entry = json.loads(result.stdout)
+    assert entry["operation"] == "decrypt"
+    assert entry["status"] == "error"
+    assert "[" not in entry["error"]
+
+
+def test_json_output_file_with_progress_fd(runner, keyfile, tmp_path):
+    """Testa o resultado JSON de um arquivo e os eventos de progresso"""
+    source = tmp_path / "dados.txt"
+    source.write_text("linha 1\nlinha 2\n")
+    read_fd, write_fd = os.pipe()
+
+    result = runner.invoke(
+        main,
+        [
+            "encrypt",
+            "--keyfile",
+            keyfile,
+            "--file",
+            str(source),
+            "--output",
+            "json",
+            "--progress-fd",
+            str(write_fd),
+        ],
+    )
+    os.close(write_fd)
+    with os.fdopen(read_fd, encoding="utf-8") as reader:
+        events = [json.loads(line) for line in reader]
+
+    assert result.exit_code == 0
+    entry = json.loads(result.stdout)
+    assert entry["status"] == "ok"
+    assert os.path.isfile(entry["result"])
+    assert events[0] == {"event": "start", "total": 2}
+    assert events[-1]["event"] == "finish"
+
+
+def test_progress_fd_must_be_open(runner, keyfile):
+    """Testa a recusa de um descritor de progresso fechado"""
+    read_fd, write_fd = os.pipe()
+    os.close(read_fd)
+    os.close(write_fd)
+
+    result = runner.invoke(
+        main,
+        [
+            "encrypt",
+            "--keyfile",
+            keyfile,
+            "--message",
+            "oi",
+            "--progress-fd",
+            str(write_fd),
+        ],
+    )
+
+    assert result.exit_code == 2
+
+
+def test_stdio_roundtrip(runner, keyfile):
+    """Testa se --file - lê da entrada padrão e escreve na saída padrão"""
+    encrypted = runner.invoke(
+        main,
+        ["encrypt", "--keyfile", keyfile, "--file", "-"],
+        input="linha 1\nlinha 2\n",
+    )
+    assert encrypted.exit_code == 0
+    assert encrypted.output.count("\n") == 3
+
+    decrypted = runner.invoke(
+        main,
+        ["decrypt", "--keyfile", keyfile, "--file", "-"],
+        input=encrypted.output,
+    )
+    assert decrypted.exit_code == 0
+    assert decrypted.output == "linha 1\nlinha 2\n"
+
+
+def test_stdio_requires_keyfile(runner):
+    """Testa se --file - sem --keyfile é um erro de uso"""
+    result = runner.invoke(main, ["encrypt", "--file", "-"], input="oi\n")
+
+    assert result.exit_code == 2
+    assert "--keyfile" in result.output
+
+
+def test_stdio_invalid_input(runner, keyfile):
+    """Testa se uma entrada inválida termina com código 1"""
+    result = runner.invoke(
+        main,
+        ["decrypt", "--keyfile", keyfile, "--file", "-"],
+        input="não criptografado\n",
+    )
+    assert result.exit_code == 1
+
+
+def test_no_progress_hides_progress_bar(runner, keyfile, tmp_path):
+    """Testa se --no-progress dispensa a barra de progresso do terminal"""
+    plain = tmp_path / "dados.txt"
+    plain.write_text("linha\n")
+
+    with patch("encryptdef.output.RichProgress") as mock_progress:
+        result = runner.invoke(
+            main,
+            [
+                "encrypt",
+                "--keyfile",
+                keyfile,
+                "--file",
+                str(plain),
+                "--output",
+                "rich",
+                "--no-progress",
+            ],
+        )
+
+    assert result.exit_code == 0, result.output
+    mock_progress.assert_not_called()
@@ -0,0 +1,103 @@
+"""Modulo para testar o comando serve em cli.py"""
+
+import json
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from encryptdef.api import decrypt
+from encryptdef.cli import main
+from encryptdef.kdf import ScryptParams
+
+
+@pytest.fixture(name="runner")
+def runner_fixture():
+    """Função fixture para teste"""
+    return CliRunner()
+
+
+@patch("encryptdef.server.Server.serve")
+@patch("encryptdef.server.Server.__init__", return_value=None)
+def test_serve_command(mock_init, mock_serve, runner, tmp_path):
+    """Teste para o comando serve com um socket e uma chave."""
+    keyfile = tmp_path / "key.txt"
+    keyfile.write_text("senha\n")
+    socket_path = str(tmp_path / "encryptdef.sock")
+
+    result = runner.invoke(
+        main,
+        [
+            "serve",
+            "--socket",
+            socket_path,
+            "--keyfile",
+            str(keyfile),
+            "--key-ttl",
+            "60",
+            "--workers",
+            "2",
+        ],
+    )
+    assert result.exit_code == 0
+    mock_init.assert_called_once_with(
+        "senha", ScryptParams(), "aes-gcm", 60.0, 1024, 2
+    )
+    assert mock_serve.call_args.args[0] == socket_path
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--key-format", "hex"],
+        ["--keyfile", "nao-existe.txt"],
+    ],
+)
+def test_serve_command_invalid_key(args, runner):
+    """Teste para o comando serve com uma chave inválida."""
+
+    result = runner.invoke(main, ["serve", "--stdio", *args])
+    assert result.exit_code == 2
+
+
+def test_serve_stdio(tmp_path):
+    """Teste do comando serve como co-processo pela entrada padrão."""
+    keyfile = tmp_path / "key.txt"
+    keyfile.write_text("senha")
+    requests = [
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "encrypt",
+            "params": {"value": "a"},
+        },
+        {"jsonrpc": "2.0", "id": 2, "method": "ping"},
+    ]
+
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from encryptdef.cli import main; main()",
+            "serve",
+            "--stdio",
+            "--keyfile",
+            str(keyfile),
+            "--kdf-profile",
+            "fast",
+        ],
+        input="".join(json.dumps(item) + "\n" for item in requests),
+        capture_output=True,
+        check=True,
+        text=True,
+        timeout=60,
+    )
+
+    responses = {
+        item["id"]: item["result"]
+        for item in map(json.loads, completed.stdout.splitlines())
+    }
+    assert responses[2] == "pong"
+    assert decrypt(responses[1], "senha") == "a"
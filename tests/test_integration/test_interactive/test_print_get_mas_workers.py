@@ -14,7 +14,7 @@ def test_print_get_max_workers_few_lines():
     assert result == 1
 
 
-@patch("os.cpu_count", return_value=4)
+@patch("encryptdef.interactive_interface.available_cpus", return_value=4)
 @patch("encryptdef.interactive_interface.console.input", return_value="2")
 def test_print_get_max_workers_many_lines_valid_choice(
     mock_cpu_count, mock_input
@@ -25,7 +25,7 @@ def test_print_get_max_workers_many_lines_valid_choice(
     assert result == 2
 
 
-@patch("os.cpu_count", return_value=4)
+@patch("encryptdef.interactive_interface.available_cpus", return_value=4)
 @patch(
     "encryptdef.interactive_interface.console.input",
     side_effect=["10", "*", " ", "dasd", "d", "E", "-1", "2"],
@@ -41,12 +41,13 @@ def test_print_get_max_workers_many_lines_invalid_choice(
     mock_log.assert_called_with(TEMPLATE_ERROR_INVALID_CHOICE, "error")
 
 
+@patch("os.sched_getaffinity", side_effect=AttributeError)
 @patch("os.cpu_count", return_value=None)
 @patch("encryptdef.interactive_interface.console.input", return_value="1")
 def test_print_get_max_workers_cpu_count_none(
-    mock_cpu_count, mock_input
+    mock_cpu_count, mock_input, mock_affinity
 ):  # pylint: disable=W0613
-    """Função de teste quando os.cpu_count retorna None"""
+    """Função de teste sem afinidade e quando os.cpu_count retorna None"""
     lines = ["line"] * 501
     result = print_get_max_workers(lines)
     assert result == 1
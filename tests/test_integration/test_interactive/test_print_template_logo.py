@@ -26,7 +26,7 @@ def mock_clear_console_fixture():
 @pytest.fixture(name="mock_markdown")
 def mock_markdown_fixture():
     """Função fixture para teste"""
-    with patch("encryptdef.interactive_interface.Markdown") as mock_mark:
+    with patch("rich.markdown.Markdown") as mock_mark:
         yield mock_mark
 
 
@@ -0,0 +1,38 @@
+"""Modulo para testar as funções iter_encrypt_lines e iter_decrypt_lines"""
+
+from itertools import count
+
+from encryptdef.api import encrypt, iter_decrypt_lines, iter_encrypt_lines
+from encryptdef.header import is_header
+
+
+def test_iter_encrypt_lines_roundtrip():
+    """Testa a ida e volta das linhas pelo gerador"""
+    lines = ["hello\n", "world\n", "\n"]
+
+    encrypted = list(iter_encrypt_lines(lines, "password", max_workers=2))
+
+    assert is_header(encrypted[0])
+    assert len(encrypted) == 4
+    assert list(iter_decrypt_lines(encrypted, "password", 2)) == lines
+
+
+def test_iter_encrypt_lines_is_lazy():
+    """Testa se o gerador libera resultados de uma entrada infinita"""
+    lines = (f"line{number}" for number in count())
+    encrypted = iter_encrypt_lines(lines, "password", max_workers=2)
+
+    assert is_header(next(encrypted))
+    assert next(encrypted).endswith("\n")
+    encrypted.close()
+
+
+def test_iter_decrypt_lines_legacy_format():
+    """Testa o gerador com linhas no formato antigo"""
+    lines = [encrypt("hello", "password") + "\n"]
+    assert list(iter_decrypt_lines(lines, "password")) == ["hello\n"]
+
+
+def test_iter_decrypt_lines_empty():
+    """Testa o gerador sem linhas"""
+    assert not list(iter_decrypt_lines([], "password"))
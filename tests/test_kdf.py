@@ -0,0 +1,70 @@
+"""Modulo para testar a derivação de chaves em kdf.py"""
+
+from unittest.mock import patch
+
+import pytest
+
+from encryptdef.kdf import (
+    SCRYPT_PROFILES,
+    ScryptParams,
+    calibrate,
+    derive_key,
+    resolve_params,
+    scrypt_maxmem,
+    validate_params,
+)
+
+
+def test_derive_key_high_cost_with_maxmem():
+    """Testa se o maxmem permite custos acima do limite padrão do hashlib"""
+    key = derive_key("password", b"0" * 16, n=2**15, r=8, p=1)
+    assert len(key) == 32
+
+
+def test_scrypt_maxmem_covers_required_memory():
+    """Testa se o maxmem cobre a memória exigida pelo Scrypt"""
+    params = ScryptParams(n=2**14, r=8, p=1)
+    assert scrypt_maxmem(params) > 128 * 8 * 2**14
+
+
+def test_resolve_params_profile_and_override():
+    """Testa a prioridade dos parâmetros explícitos sobre o perfil"""
+    assert resolve_params() == ScryptParams()
+    assert resolve_params("fast") == SCRYPT_PROFILES["fast"]
+    assert resolve_params("archive", r=4) == ScryptParams(n=2**20, r=4, p=1)
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        ScryptParams(n=1000),
+        ScryptParams(n=1),
+        ScryptParams(r=0),
+        ScryptParams(n=2**30),
+    ],
+)
+def test_validate_params_invalid(params):
+    """Testa a validação de parâmetros inválidos"""
+    with pytest.raises(ValueError):
+        validate_params(params)
+
+
+def test_resolve_params_unknown_profile():
+    """Testa um perfil inexistente"""
+    with pytest.raises(ValueError):
+        resolve_params("unknown")
+
+
+def test_calibrate_stops_at_target():
+    """Testa se a calibração escolhe o maior n dentro do tempo alvo"""
+    # Cada derivação leva 10 ms por 2**10 de n
+    durations = iter(
+        value for n in range(10, 30) for value in (0, (2 ** (n - 10)) * 0.01)
+    )
+    with (
+        patch("encryptdef.kdf.derive_key"),
+        patch("encryptdef.kdf.time.perf_counter", lambda: next(durations)),
+    ):
+        params = calibrate(0.1)
+
+    assert params == ScryptParams(n=2**13)
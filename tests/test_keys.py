@@ -0,0 +1,138 @@
+"""Modulo para testar o KeyContext em keys.py"""
+
+import pickle
+from base64 import b64encode
+from unittest.mock import patch
+
+import pytest
+
+from encryptdef.core import InvalidKey, decrypt, encrypt
+from encryptdef.header import parse_header
+from encryptdef.kdf import ScryptParams, derive_key
+from encryptdef.keys import (
+    KeyContext,
+    RawKeyContext,
+    as_key_context,
+    load_raw_key,
+)
+
+FAST_PARAMS = ScryptParams(n=2**10)
+
+
+def test_new_key_is_reproducible():
+    """Testa se a subchave é derivada novamente apenas com a senha"""
+    header, key = KeyContext("password", FAST_PARAMS).new_key()
+
+    assert len(key) == 32
+    assert "hkdf" in parse_header(header)
+    assert KeyContext("password").key_from_header(header) == key
+
+    with pytest.raises(InvalidKey):
+        KeyContext("wrong-password").key_from_header(header)
+
+
+def test_new_key_subkeys_are_distinct():
+    """Testa se cada chamada gera uma subchave diferente"""
+    context = KeyContext("password", FAST_PARAMS)
+
+    assert context.new_key()[1] != context.new_key()[1]
+
+
+def test_master_key_is_derived_once():
+    """Testa se o Scrypt roda uma única vez para várias mensagens"""
+    context = KeyContext("password", FAST_PARAMS)
+
+    with patch("encryptdef.keys.derive_key", wraps=derive_key) as mock_kdf:
+        messages = [encrypt(f"message{i}", context) for i in range(10)]
+        decrypted = [decrypt(message, context) for message in messages]
+
+    assert mock_kdf.call_count == 1
+    assert decrypted == [f"message{i}" for i in range(10)]
+
+
+def test_messages_decrypt_with_password_only():
+    """Testa se as mensagens de um contexto são autocontidas"""
+    context = KeyContext("password", FAST_PARAMS)
+
+    assert decrypt(encrypt("hello", context), "password") == "hello"
+
+
+def test_master_key_cache_is_bounded():
+    """Testa se o cache de chaves mestras descarta as mais antigas"""
+    context = KeyContext("password", FAST_PARAMS)
+
+    with (
+        patch("encryptdef.keys.MAX_CACHED_MASTER_KEYS", 2),
+        patch("encryptdef.keys.derive_key", return_value=b"k" * 32),
+    ):
+        for salt in (b"a", b"b", b"c"):
+            context.master_key(salt)
+
+    assert len(context._master_keys) == 2  # pylint: disable=W0212
+
+
+def test_key_context_pickle():
+    """Testa se o contexto pode ser enviado ao backend de processos"""
+    context = KeyContext("password", FAST_PARAMS)
+    header, key = context.new_key()
+
+    restored = pickle.loads(pickle.dumps(context))
+
+    assert restored.salt == context.salt
+    assert restored.key_from_header(header) == key
+
+
+def test_as_key_context():
+    """Testa se as_key_context reaproveita contextos existentes"""
+    context = KeyContext("password")
+
+    assert as_key_context(context) is context
+    assert as_key_context("password", FAST_PARAMS).params == FAST_PARAMS
+
+
+def test_raw_key_roundtrip():
+    """Testa mensagens com uma chave bruta, sem passar pelo Scrypt"""
+    context = RawKeyContext(b"k" * 32)
+
+    with patch("encryptdef.keys.derive_key") as mock_kdf:
+        message = encrypt("hello", context)
+        assert decrypt(message, RawKeyContext(b"k" * 32)) == "hello"
+
+    mock_kdf.assert_not_called()
+    assert parse_header(message.partition("*")[0])["kdf"] == "raw"
+
+
+def test_raw_key_mismatched_modes():
+    """Testa se senha e chave bruta não são confundidas"""
+    raw_message = encrypt("hello", RawKeyContext(b"k" * 32))
+    password_message = encrypt("hello", KeyContext("password", FAST_PARAMS))
+
+    with pytest.raises(InvalidKey):
+        decrypt(raw_message, "password")
+    with pytest.raises(InvalidKey):
+        decrypt(password_message, RawKeyContext(b"k" * 32))
+    with pytest.raises(InvalidKey):
+        decrypt(raw_message, RawKeyContext(b"x" * 32))
+
+
+@pytest.mark.parametrize(
+    "data, key_format",
+    [
+        (b"k" * 32, "raw"),
+        ((b"k" * 32).hex().encode() + b"\n", "hex"),
+        (b64encode(b"k" * 32) + b"\n", "base64"),
+    ],
+)
+def test_load_raw_key(data, key_format):
+    """Testa a função load_raw_key com cada formato"""
+    assert load_raw_key(data, key_format).key == b"k" * 32
+
+
+@pytest.mark.parametrize(
+    "data, key_format",
+    [(b"short", "raw"), (b"zz", "hex"), (b"!!", "base64")],
+)
+def test_load_raw_key_invalid(data, key_format):
+    """Testa a função load_raw_key com chaves inválidas"""
+    with pytest.raises(ValueError):
+        load_raw_key(data, key_format)
@@ -1,15 +1,24 @@
-""" Modulo para testar  log.py"""
+"""Modulo para testar  log.py"""
 
+import json
 import logging
 import os
+import threading
+import time
 from logging import handlers
 from unittest.mock import patch
 
-from encryptdef.log import configure_logger, get_logger, print_and_record_log
+from encryptdef.log import (
+    configure_logger,
+    get_logger,
+    print_and_record_log,
+    stop_logger,
+)
 
 
 def clear_logger_handlers():
     """Função para limpar as configurações do log"""
+    stop_logger()
     logger = get_logger()
     logger.handlers.clear()  # Limpa todos os handlers
     logger.setLevel(logging.NOTSET)  # Redefine o nível do logger
@@ -36,7 +45,7 @@ def test_configure_logger_creates_logfile():
     logger = get_logger()
 
     assert any(
-        isinstance(handler, handlers.RotatingFileHandler)
+        isinstance(handler, handlers.QueueHandler)
         for handler in logger.handlers
     )
     assert logger.level == logging.WARNING
@@ -66,6 +75,7 @@ def test_print_and_record_log_info():
             "Info message", style="info"
         )
 
+    stop_logger()
     with open(logfile, "r", encoding="utf-8") as log_file:
         log_contents = log_file.read()
         assert "Info message" in log_contents
@@ -83,24 +93,104 @@ def test_print_and_record_log_warning():
             "Info message", style="warning"
         )
 
+    stop_logger()
     with open(logfile, "r", encoding="utf-8") as log_file:
         log_contents = log_file.read()
         assert "Info message" in log_contents
 
 
-def test_configure_logger_creates_logfile_root_dir(monkeypatch):
-    """Testando as configurações de log"""
+def test_configure_logger_creates_logfile_default_location(
+    monkeypatch, tmp_path
+):
+    """Testando o arquivo de log no local padrão configurável"""
     clear_logger_handlers()
-    current_dir = os.getcwd()
-    logfile = os.path.join(current_dir, "encryptdef.log")
-    monkeypatch.setattr("encryptdef.log.__file__", logfile)
+    logfile = os.path.join(tmp_path, "state", "encryptdef.log")
+    monkeypatch.setattr("encryptdef.log.LOG_FILE", logfile)
 
     configure_logger("WARNING")
     logger = get_logger()
 
     assert any(
-        isinstance(handler, handlers.RotatingFileHandler)
+        isinstance(handler, handlers.QueueHandler)
         for handler in logger.handlers
     )
     assert logger.level == logging.WARNING
     assert os.path.isfile(logfile)
+
+
+def test_configure_logger_with_root_handler(tmp_path):
+    """Testa se um handler no logger root não impede a configuração"""
+    clear_logger_handlers()
+    get_logger().propagate = True
+    root_handler = logging.NullHandler()
+    logging.getLogger().addHandler(root_handler)
+    logfile = tmp_path / "encryptdef.log"
+
+    try:
+        configure_logger("INFO", logfile)
+        assert any(
+            isinstance(handler, handlers.QueueHandler)
+            for handler in get_logger().handlers
+        )
+        assert os.path.isfile(logfile)
+    finally:
+        logging.getLogger().removeHandler(root_handler)
+        clear_logger_handlers()
+
+
+def test_configure_logger_read_only_location(tmp_path):
+    """Testa se um local sem permissão de escrita não impede o uso"""
+    clear_logger_handlers()
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+
+    configure_logger("INFO", blocker / "encryptdef.log")
+
+    with patch("encryptdef.settings.console.print") as mock_console_print:
+        print_and_record_log("Info message")
+        mock_console_print.assert_called_once()
+    assert isinstance(get_logger().handlers[0], logging.NullHandler)
+
+
+def test_configure_logger_json_format(tmp_path):
+    """Testa os registros gravados como JSON, um por linha"""
+    clear_logger_handlers()
+    logfile = tmp_path / "encryptdef.log"
+    configure_logger("INFO", logfile, "json")
+
+    with patch("encryptdef.settings.console.print"):
+        print_and_record_log("Info message", "error")
+    stop_logger()
+
+    entry = json.loads(logfile.read_text(encoding="utf-8"))
+    assert entry["message"] == "Info message"
+    assert entry["level"] == "ERROR"
+    assert entry["name"] == "encryptdef"
+
+
+def test_print_and_record_log_does_not_wait_for_file(tmp_path):
+    """Testa se registrar uma mensagem não espera pela escrita em disco"""
+    clear_logger_handlers()
+    logfile = tmp_path / "encryptdef.log"
+    release = threading.Event()
+    emit = handlers.RotatingFileHandler.emit
+
+    def slow_emit(self, record):
+        release.wait(5)
+        emit(self, record)
+
+    with (
+        patch.object(handlers.RotatingFileHandler, "emit", slow_emit),
+        patch("encryptdef.settings.console.print"),
+    ):
+        configure_logger("INFO", logfile)
+        start = time.perf_counter()
+        for _ in range(100):
+            print_and_record_log("Info message")
+        elapsed = time.perf_counter() - start
+
+        release.set()
+        stop_logger()
+
+    assert elapsed < 1
+    assert logfile.read_text(encoding="utf-8").count("Info message") == 100
@@ -0,0 +1,187 @@
+"""Modulo para testar os formatos de saída em output.py"""
+
+import json
+import os
+from unittest.mock import patch
+
+from encryptdef.output import (
+    JSON_OUTPUT,
+    NDJSON_OUTPUT,
+    RAW_OUTPUT,
+    RICH_OUTPUT,
+    NdjsonProgress,
+    NullProgress,
+    OutputOptions,
+    RichProgress,
+    Throughput,
+    format_eta,
+    format_rate,
+    new_progress,
+    resolve_output_format,
+    write_error,
+    write_result,
+)
+
+
+def test_resolve_output_format_follows_tty():
+    """Testa o formato padrão em um terminal e fora dele"""
+    with patch("sys.stdout.isatty", return_value=True):
+        assert resolve_output_format(None) == RICH_OUTPUT
+    with patch("sys.stdout.isatty", return_value=False):
+        assert resolve_output_format(None) == RAW_OUTPUT
+        assert resolve_output_format(JSON_OUTPUT) == JSON_OUTPUT
+
+
+def test_write_result_formats(capsys):
+    """Testa o resultado em cada formato para scripts"""
+    fields = {"operation": "encrypt", "status": "ok", "result": "abc"}
+
+    write_result(OutputOptions(RAW_OUTPUT), fields)
+    assert capsys.readouterr().out == "abc\n"
+
+    write_result(OutputOptions(NDJSON_OUTPUT), fields)
+    out = capsys.readouterr().out
+    assert out.count("\n") == 1
+    assert json.loads(out) == fields
+
+    write_result(OutputOptions(JSON_OUTPUT), fields)
+    assert json.loads(capsys.readouterr().out) == fields
+
+
+def test_write_error_without_markup(capsys):
+    """Testa se os erros são escritos sem o markup do rich"""
+    write_error(OutputOptions(RAW_OUTPUT), "decrypt", "\n[red]falhou[/red]\n")
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert captured.err == "falhou\n"
+
+    write_error(OutputOptions(NDJSON_OUTPUT), "decrypt", "[red]falhou[/red]")
+    assert json.loads(capsys.readouterr().out) == {
+        "operation": "decrypt",
+        "status": "error",
+        "error": "falhou",
+    }
+
+
+def test_new_progress_by_output():
+    """Testa o indicador de progresso escolhido para cada saída"""
+    assert isinstance(new_progress(OutputOptions(RAW_OUTPUT)), NullProgress)
+    assert isinstance(
+        new_progress(OutputOptions(RAW_OUTPUT, progress_fd=2)), NdjsonProgress
+    )
+    assert isinstance(new_progress(), RichProgress)
+    assert isinstance(
+        new_progress(OutputOptions(RICH_OUTPUT, progress=False)), NullProgress
+    )
+    assert isinstance(
+        new_progress(OutputOptions(RICH_OUTPUT, 2, progress=False)),
+        NdjsonProgress,
+    )
+
+
+def test_ndjson_progress_events():
+    """Testa os eventos de progresso escritos no descritor"""
+    read_fd, write_fd = os.pipe()
+    try:
+        with NdjsonProgress(write_fd, interval=0) as progress:
+            task = progress.add_task("tarefa", total=2)
+            progress.update(task, advance=1)
+            progress.update(task, advance=1)
+        os.close(write_fd)
+
+        with os.fdopen(read_fd, encoding="utf-8") as reader:
+            events = [json.loads(line) for line in reader]
+    finally:
+        for fd in (read_fd, write_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    assert [event["event"] for event in events] == [
+        "start",
+        "progress",
+        "progress",
+        "finish",
+    ]
+    assert events[-1] == {"event": "finish", "completed": 2, "total": 2}
+
+
+def test_ndjson_progress_is_rate_limited():
+    """Testa se as atualizações frequentes geram poucos eventos"""
+    read_fd, write_fd = os.pipe()
+    with NdjsonProgress(write_fd, interval=60) as progress:
+        task = progress.add_task("tarefa", total=1000)
+        for _ in range(1000):
+            progress.update(task, advance=1)
+    os.close(write_fd)
+
+    with os.fdopen(read_fd, encoding="utf-8") as reader:
+        events = [json.loads(line)["event"] for line in reader]
+
+    assert events == ["start", "finish"]
+
+
+def test_ndjson_progress_reports_throughput():
+    """Testa a vazão e o tempo restante nos eventos de progresso"""
+    read_fd, write_fd = os.pipe()
+    with NdjsonProgress(write_fd, interval=0) as progress:
+        task = progress.add_task("tarefa", total=4, total_bytes=400)
+        progress.throughput.samples[0] = (0.0, 0)
+        progress.throughput.clock = lambda: 1.0
+        progress.update(task, advance=2)
+    os.close(write_fd)
+
+    with os.fdopen(read_fd, encoding="utf-8") as reader:
+        events = [json.loads(line) for line in reader]
+
+    assert events[1] == {
+        "event": "progress",
+        "completed": 2,
+        "total": 4,
+        "records_per_s": 2.0,
+        "bytes_per_s": 200.0,
+        "eta": 1.0,
+    }
+
+
+def test_throughput_moving_window():
+    """Testa se a vazão considera apenas a janela mais recente"""
+    now = [0.0]
+    throughput = Throughput(100, 1000, window=5, clock=lambda: now[0])
+    assert throughput.records_per_s is None
+    assert not throughput.fields()
+
+    # 10 registros por segundo nos primeiros 10 segundos, depois 50
+    for second in range(1, 16):
+        now[0] = float(second)
+        throughput.completed += 10 if second <= 10 else 50
+        throughput.sample()
+
+    assert throughput.records_per_s == 50
+    assert throughput.bytes_per_s == 500
+    assert throughput.eta == 0
+    assert throughput.describe() == "50.0 reg/s · 500.0 B/s"
+
+
+def test_format_rate_and_eta():
+    """Testa a formatação da vazão e do tempo restante"""
+    assert format_rate(950, "reg") == "950.0 reg/s"
+    assert format_rate(1_500_000, "B") == "1.5 MB/s"
+    assert format_eta(None) == "-:--:--"
+    assert format_eta(3723.4) == "1:02:03"
+
+
+def test_rich_progress_aggregates_updates():
+    """Testa se as atualizações frequentes chegam agrupadas ao rich"""
+    progress = RichProgress(interval=60)
+    with (
+        patch.object(progress.progress, "update") as mock_update,
+        progress,
+    ):
+        task = progress.add_task("tarefa", total=1000, total_bytes=8000)
+        for _ in range(1000):
+            progress.update(task, advance=1)
+
+    mock_update.assert_called_once()
+    assert mock_update.call_args.kwargs["advance"] == 1000
@@ -0,0 +1,165 @@
+"""Modulo para testar a função process_append_content em core.py"""
+
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from encryptdef.core import (
+    InvalidEncryptedFormat,
+    InvalidKey,
+    decrypt,
+    encrypt,
+    process_append_content,
+    process_file_content,
+)
+from encryptdef.follow import checkpoint_path, load_checkpoint
+from encryptdef.keys import RawKeyContext
+
+KEY = RawKeyContext(b"k" * 32)
+
+
+def decrypted_lines(path, tmp_path):
+    """Descriptografa o arquivo e retorna as linhas"""
+    target = tmp_path / "decrypted.txt"
+    process_file_content(path, KEY, str(target), decrypt, max_workers=1)
+    return target.read_text().splitlines()
+
+
+@pytest.fixture(name="paths")
+def paths_fixture(tmp_path):
+    """Arquivo acompanhado e arquivo criptografado"""
+    return str(tmp_path / "app.log"), str(tmp_path / "encrypt-app.log")
+
+
+def append(source, target, **kwargs):
+    """Acrescenta as linhas novas ao arquivo criptografado"""
+    assert process_append_content(source, KEY, target, **kwargs)
+
+
+def test_append_only_new_lines(paths, tmp_path):
+    """Testa se cada execução criptografa apenas as linhas novas"""
+    source, target = paths
+    with open(source, "w", encoding="utf-8") as file_:
+        file_.write("a\nb\n")
+    append(source, target)
+    header = open(target, encoding="utf-8").readline()
+
+    with open(source, "a", encoding="utf-8") as file_:
+        file_.write("c\nincompleta")
+    append(source, target)
+
+    assert open(target, encoding="utf-8").readline() == header
+    assert decrypted_lines(target, tmp_path) == ["a", "b", "c"]
+    assert load_checkpoint(checkpoint_path(target)).offset == 6
+
+
+def test_append_warns_pending_partial_line(paths, tmp_path):
+    """Testa o aviso da última linha sem quebra de linha no fim do arquivo"""
+    source, target = paths
+    with open(source, "w", encoding="utf-8") as file_:
+        file_.write("a\nb\nc")
+
+    with patch("encryptdef.core.print_and_record_log") as mock_log:
+        append(source, target)
+
+    warnings = [
+        call.args[0]
+        for call in mock_log.call_args_list
+        if call.args[1] == "warning"
+    ]
+    assert len(warnings) == 1
+    assert "1 BYTES" in warnings[0] and source in warnings[0]
+    assert decrypted_lines(target, tmp_path) == ["a", "b"]
+    assert load_checkpoint(checkpoint_path(target)).offset == 4
+
+
+def test_append_missing_source_keeps_no_target(paths):
+    """Testa se uma origem inexistente não deixa um arquivo gerado"""
+    source, target = paths
+
+    with pytest.raises(FileNotFoundError):
+        process_append_content(source, KEY, target)
+
+    assert not os.path.exists(target)
+
+
+def test_append_discards_lines_after_checkpoint(paths, tmp_path):
+    """Testa se linhas escritas depois do checkpoint não são duplicadas"""
+    source, target = paths
+    with open(source, "w", encoding="utf-8") as file_:
+        file_.write("a\n")
+    append(source, target)
+
+    # Simula uma interrupção entre a escrita e o checkpoint
+    with open(target, "a", encoding="utf-8") as file_:
+        file_.write("linha sem checkpoint\n")
+    with open(source, "a", encoding="utf-8") as file_:
+        file_.write("b\n")
+    append(source, target)
+
+    assert decrypted_lines(target, tmp_path) == ["a", "b"]
+
+
+def test_append_without_checkpoint_skips_encrypted_lines(paths, tmp_path):
+    """Testa se um arquivo criptografado antes continua sem duplicações"""
+    source, target = paths
+    with open(source, "w", encoding="utf-8") as file_:
+        file_.write("a\nb\n")
+    process_file_content(source, KEY, target, encrypt, max_workers=1)
+
+    with open(source, "a", encoding="utf-8") as file_:
+        file_.write("c\n")
+    append(source, target)
+
+    assert decrypted_lines(target, tmp_path) == ["a", "b", "c"]
+
+
+def test_append_to_stream_file(paths):
+    """Testa se um arquivo em blocos não recebe linhas"""
+    source, target = paths
+    with open(source, "w", encoding="utf-8") as file_:
+        file_.write("a\n")
+    with open(target, "w", encoding="utf-8") as file_:
+        file_.write("dados\n")
+
+    with pytest.raises(InvalidEncryptedFormat):
+        append(source, target)
+
+
+def test_append_wrong_key(paths):
+    """Testa se uma chave diferente da do cabeçalho é recusada"""
+    source, target = paths
+    with open(source, "w", encoding="utf-8") as file_:
+        file_.write("a\n")
+    append(source, target)
+
+    with pytest.raises(InvalidKey):
+        process_append_content(source, RawKeyContext(b"x" * 32), target)
+
+
+def test_follow_until_stop(paths, tmp_path, monkeypatch):
+    """Testa se o modo follow criptografa as linhas que chegam"""
+    source, target = paths
+    with open(source, "w", encoding="utf-8") as file_:
+        file_.write("a\n")
+    stop = threading.Event()
+    monkeypatch.setattr("encryptdef.follow.POLL_INTERVAL", 0.01)
+
+    thread = threading.Thread(
+        target=append,
+        args=(source, target),
+        kwargs={"follow": True, "stop": stop},
+    )
+    thread.start()
+    with open(source, "a", encoding="utf-8") as file_:
+        file_.write("b\n")
+    while load_checkpoint(checkpoint_path(target)) is None or (
+        load_checkpoint(checkpoint_path(target)).offset < 4
+    ):
+        stop.wait(0.01)
+    stop.set()
+    thread.join()
+
+    assert decrypted_lines(target, tmp_path) == ["a", "b"]
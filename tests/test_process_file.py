@@ -3,7 +3,13 @@
 import os
 from unittest.mock import patch
 
-from encryptdef.core import InvalidEncryptedFormat, InvalidKey, process_file
+from encryptdef.core import (
+    InvalidEncryptedFormat,
+    InvalidKey,
+    decrypt,
+    encrypt,
+    process_file,
+)
 from encryptdef.template import (
     TEMPLATE_EMPTY_FILE_ERROR,
     TEMPLATE_FILE_NOT_FOUND,
@@ -30,23 +36,34 @@ def mock_process_line_func_invalid(line, key):  # pylint: disable=W0613
     return 123
 
 
+def consume_lines(path, lines):  # pylint: disable=W0613
+    """Simula write_file consumindo as linhas processadas"""
+    for _ in lines:
+        pass
+
+
 def test_process_file_success():
     """Testa a função process_file"""
 
+    written_lines = []
+
     # Substitui as funções reais por mocks durante o teste
     with (
-        patch("encryptdef.core.read_file") as mock_read_file,
-        patch("encryptdef.core.write_file") as mock_write_file,
+        patch("encryptdef.core.count_lines", return_value=2),
+        patch("encryptdef.core.iter_file_lines") as mock_iter_file_lines,
+        patch(
+            "encryptdef.core.write_file",
+            side_effect=lambda path, lines: written_lines.extend(lines),
+        ) as mock_write_file,
     ):
         data_list = ["/path/to/file", "key", "new_file"]
 
-        mock_read_file.return_value = ["line1", "line2"]
+        mock_iter_file_lines.return_value = iter(["line1", "line2"])
 
         assert process_file(data_list, mock_encrypt) is True
-        mock_read_file.assert_called_once_with("/path/to/file")
-        mock_write_file.assert_called_once_with(
-            "new_file", ["encrypted-line1\n", "encrypted-line2\n"]
-        )
+        mock_iter_file_lines.assert_called_once_with("/path/to/file")
+        assert mock_write_file.call_args[0][0] == "new_file"
+        assert written_lines == ["encrypted-line1\n", "encrypted-line2\n"]
 
 
 def test_process_file_file_not_found():
@@ -54,7 +71,7 @@ def test_process_file_file_not_found():
     with (
         patch("encryptdef.core.console") as mock_console,
         patch("encryptdef.core.print_and_record_log") as mock_log,
-        patch("encryptdef.core.read_file", side_effect=FileNotFoundError),
+        patch("encryptdef.core.count_lines", side_effect=FileNotFoundError),
     ):
         data_list = ["/path/to/file", "key", "new_file"]
         assert process_file(data_list, mock_encrypt) is False
@@ -82,7 +99,9 @@ def test_process_file_invalid_key():
     """Testa a função process_file"""
     with (
         patch("encryptdef.core.print_and_record_log") as mock_log,
-        patch("encryptdef.core.read_file", return_value=["invalid"]),
+        patch("encryptdef.core.count_lines", return_value=1),
+        patch("encryptdef.core.iter_file_lines", return_value=["invalid"]),
+        patch("encryptdef.core.write_file", side_effect=consume_lines),
     ):
         data_list = ["/path/to/file", "invalid-key", "new_file"]
         assert process_file(data_list, mock_decrypt) is False
@@ -93,7 +112,7 @@ def test_process_file_empty_file():
     """Testa a função process_file"""
     with (
         patch("encryptdef.core.print_and_record_log") as mock_log,
-        patch("encryptdef.core.read_file", return_value=[]),
+        patch("encryptdef.core.count_lines", return_value=0),
     ):
         data_list = ["/path/to/file", "key", "new_file"]
         assert process_file(data_list, mock_decrypt) is False
@@ -117,8 +136,66 @@ def test_process_file_type_error():
     """Testa a função process_file"""
     with (
         patch("encryptdef.core.print_and_record_log") as mock_log,
-        patch("encryptdef.core.read_file", return_value=["invalid"]),
+        patch("encryptdef.core.count_lines", return_value=1),
+        patch("encryptdef.core.iter_file_lines", return_value=["invalid"]),
+        patch("encryptdef.core.write_file", side_effect=consume_lines),
     ):
         data_list = ["/path/to/file", "key", "new_file"]
         assert process_file(data_list, mock_process_line_func_invalid) is False
         mock_log.assert_called_with(TEMPLATE_TYPE_ERROR % {type(123)}, "error")
+
+
+def test_process_file_binary_roundtrip():
+    """Testa a função process_file no modo binário em blocos"""
+    data = os.urandom(200_000)
+    plain, enc, dec = map(os.path.abspath, ["data.bin", "enc.bin", "dec.bin"])
+    with open(plain, "wb") as file_:
+        file_.write(data)
+
+    with (
+        patch("encryptdef.core.print_get_max_workers", return_value=2),
+        patch("encryptdef.core.print_and_record_log"),
+    ):
+        assert process_file([plain, "key", enc], encrypt, binary=True)
+        assert process_file([enc, "key", dec], decrypt)
+
+    with open(dec, "rb") as file_:
+        assert file_.read() == data
+
+
+def test_process_file_binary_wrong_key_keeps_output():
+    """Testa se uma chave errada não altera um destino já existente"""
+    plain, enc, dec = map(os.path.abspath, ["data.bin", "enc.bin", "dec.bin"])
+    with open(plain, "wb") as file_:
+        file_.write(b"data")
+    with open(dec, "wb") as file_:
+        file_.write(b"anterior")
+
+    with (
+        patch("encryptdef.core.print_get_max_workers", return_value=1),
+        patch("encryptdef.core.print_and_record_log"),
+    ):
+        process_file([plain, "key", enc], encrypt, binary=True)
+        assert process_file([enc, "wrong", dec], decrypt) is False
+
+    with open(dec, "rb") as file_:
+        assert file_.read() == b"anterior"
+
+
+def test_process_file_wrong_key_keeps_output():
+    """Testa se uma chave errada não apaga uma saída descriptografada antes"""
+    plain, enc, dec = map(os.path.abspath, ["out.txt", "out.enc", "dec.txt"])
+    with open(plain, "w", encoding="utf-8") as file_:
+        file_.write("line1\n")
+    with open(dec, "w", encoding="utf-8") as file_:
+        file_.write("anterior\n")
+
+    with (
+        patch("encryptdef.core.print_get_max_workers", return_value=1),
+        patch("encryptdef.core.print_and_record_log"),
+    ):
+        assert process_file([plain, "key", enc], encrypt)
+        assert process_file([enc, "wrong", dec], decrypt) is False
+
+    with open(dec, "r", encoding="utf-8") as file_:
+        assert file_.read() == "anterior\n"
@@ -1,15 +1,19 @@
 """Modulo para testar a função process_file_content em core.py"""
 
+import os
 from unittest.mock import patch
 
 import pytest
 
 from encryptdef.core import (
     EmptyFileError,
+    InvalidKey,
     decrypt,
     encrypt,
     process_file_content,
 )
+from encryptdef.header import is_header
+from encryptdef.kdf import derive_key
 from encryptdef.template import (
     TEMPLATE_DECRYPTED_FILE,
     TEMPLATE_ENCRYPTED_FILE,
@@ -21,46 +25,42 @@ def process_lines_func(x, y):  # pylint: disable=W0613
     return x
 
 
+def decrypt_or_fail(line, key):  # pylint: disable=W0613
+    """Simula uma descriptografia que falha em uma linha"""
+    if line == "invalid":
+        raise InvalidKey("Invalid key")
+    return line
+
+
+def write_lines(file_path, lines):
+    """Cria um arquivo com as linhas fornecidas"""
+    with open(file_path, "w", encoding="utf-8") as file_:
+        file_.writelines(lines)
+
+
+def read_lines(file_path):
+    """Lê as linhas de um arquivo"""
+    with open(file_path, "r", encoding="utf-8") as file_:
+        return file_.readlines()
+
+
 def test_process_file_content_success():
     """Testa a função process_file_content"""
+    write_lines("testfile.txt", ["line1\n", "line2\n"])
 
-    # Substitui as funções reais por mocks durante o teste
     with (
-        patch("encryptdef.core.read_file") as mock_read_file,
         patch("encryptdef.core.print_get_max_workers") as mock_get_max_workers,
-        patch("encryptdef.core.process_lines") as mock_process_lines,
-        patch("encryptdef.core.write_file") as mock_write_file,
         patch("encryptdef.core.print_and_record_log") as mock_log,
     ):
-
-        # Simula a leitura de um arquivo
-        mock_read_file.return_value = ["line1\n", "line2\n"]
-
-        # Simula o cálculo de trabalhadores máximos
         mock_get_max_workers.return_value = 2
 
-        # Simula o processamento das linhas, retornando linhas processadas
-        mock_process_lines.return_value = [
-            "encrypted_line1\n",
-            "encrypted_line2\n",
-        ]
         result = process_file_content(
             "testfile.txt", "key", "newfile.txt", process_lines_func
         )
 
         assert result is True
-
-        # Verifica se read_file foi chamado com o argumento 'testfile.txt'
-        mock_read_file.assert_called_once_with("testfile.txt")
         mock_get_max_workers.assert_called_once()
-
-        # Verifica se process_lines foi chamado uma vez com os argumentos
-        mock_process_lines.assert_called_once_with(
-            ["line1\n", "line2\n"], "key", process_lines_func, 2
-        )
-        mock_write_file.assert_called_once_with(
-            "newfile.txt", ["encrypted_line1\n", "encrypted_line2\n"]
-        )
+        assert read_lines("newfile.txt") == ["line1\n", "line2\n"]
 
         # Verifica se print_and_record_log foi chamado uma vez
         mock_log.assert_called_once()
@@ -68,82 +68,94 @@ def test_process_file_content_success():
 
 def test_process_file_content_empty_file():
     """Testa a função process_file_content"""
-    with patch("encryptdef.core.read_file") as mock_read_file:
-        mock_read_file.return_value = []
+    write_lines("testfile.txt", [])
 
-        with pytest.raises(EmptyFileError):
-            process_file_content(
-                "testfile.txt", "key", "newfile.txt", lambda x, y: x
-            )
+    with pytest.raises(EmptyFileError):
+        process_file_content(
+            "testfile.txt", "key", "newfile.txt", lambda x, y: x
+        )
 
 
 def test_process_file_content_multithreading():
     """Testa a função process_file_content"""
+    lines = [f"line{number}\n" for number in range(1000)]
+    write_lines("testfile.txt", lines)
+
     with (
-        patch("encryptdef.core.read_file") as mock_read_file,
         patch("encryptdef.core.print_get_max_workers") as mock_get_max_workers,
-        patch("encryptdef.core.process_lines") as mock_process_lines,
-        patch("encryptdef.core.write_file") as mock_write_file,
+        patch("encryptdef.core.print_and_record_log"),
     ):
-
-        mock_read_file.return_value = [
-            "line1\n",
-            "line2\n",
-            "line3\n",
-            "line4\n",
-        ]
         mock_get_max_workers.return_value = 4
-        mock_process_lines.return_value = [
-            "processed_line1\n",
-            "processed_line2\n",
-            "processed_line3\n",
-            "processed_line4\n",
-        ]
 
         result = process_file_content(
-            "testfile.txt", "key", "newfile.txt", process_lines_func
+            "testfile.txt",
+            "key",
+            "newfile.txt",
+            lambda line, key: f"processed_{line}",
         )
 
         assert result is True
-        mock_read_file.assert_called_once_with("testfile.txt")
-        mock_get_max_workers.assert_called_once()
-        mock_process_lines.assert_called_once_with(
-            ["line1\n", "line2\n", "line3\n", "line4\n"],
-            "key",
-            process_lines_func,
-            4,
+        assert read_lines("newfile.txt") == [
+            f"processed_{line}" for line in lines
+        ]
+
+
+def test_process_file_content_streams_through_window():
+    """Testa se as linhas são lidas sob demanda, limitadas pela janela"""
+    consumed = []
+
+    def lazy_lines(file_path):  # pylint: disable=W0613
+        for number in range(1000):
+            consumed.append(number)
+            yield f"line{number}\n"
+
+    def check_write_file(file_path, lines):  # pylint: disable=W0613
+        next(lines)
+        # Apenas a janela de tarefas foi lida antes da primeira saída
+        assert len(consumed) < 100
+        for _ in lines:
+            pass
+
+    with (
+        patch("encryptdef.core.count_lines", return_value=1000),
+        patch("encryptdef.core.iter_file_lines", side_effect=lazy_lines),
+        patch("encryptdef.core.write_file", side_effect=check_write_file),
+        patch("encryptdef.core.print_get_max_workers", return_value=2),
+        patch("encryptdef.core.print_and_record_log"),
+    ):
+        process_file_content(
+            "testfile.txt", "key", "newfile.txt", process_lines_func
         )
-        mock_write_file.assert_called_once_with(
-            "newfile.txt",
-            [
-                "processed_line1\n",
-                "processed_line2\n",
-                "processed_line3\n",
-                "processed_line4\n",
-            ],
+
+    assert len(consumed) == 1000
+
+
+def test_process_file_content_failure_keeps_output():
+    """Testa se uma falha no processamento não altera nem apaga a saída"""
+    write_lines("testfile.txt", ["line1\n", "invalid\n"])
+    write_lines("newfile.txt", ["anterior\n"])
+
+    with (
+        patch("encryptdef.core.print_get_max_workers", return_value=1),
+        pytest.raises(InvalidKey),
+    ):
+        process_file_content(
+            "testfile.txt", "key", "newfile.txt", decrypt_or_fail
         )
 
+    assert read_lines("newfile.txt") == ["anterior\n"]
+
 
 def test_process_file_content_log_encrypt():
     """Testa a função process_file_content"""
+    write_lines("testfile.txt", ["line1\n", "line2\n"])
+
     with (
-        patch("encryptdef.core.read_file") as mock_read_file,
-        patch("encryptdef.core.print_get_max_workers") as mock_get_max_workers,
-        patch("encryptdef.core.process_lines") as mock_process_lines,
-        patch("encryptdef.core.write_file"),
+        patch("encryptdef.core.print_get_max_workers", return_value=2),
         patch("encryptdef.core.print_and_record_log") as mock_log,
     ):
-
-        mock_read_file.return_value = ["line1\n", "line2\n"]
-        mock_get_max_workers.return_value = 2
-        mock_process_lines.return_value = [
-            "encrypted_line1\n",
-            "encrypted_line2\n",
-        ]
-
-        process_line_func = encrypt
         result = process_file_content(
-            "testfile.txt", "key", "newfile.txt", process_line_func
+            "testfile.txt", "key", "newfile.txt", encrypt
         )
 
         assert result is True
@@ -153,26 +165,81 @@ def test_process_file_content_log_encrypt():
 
 def test_process_file_content_log_decrypt():
     """Testa a função process_file_content"""
+    write_lines("testfile.txt", [encrypt("line1", "key") + "\n"])
+
     with (
-        patch("encryptdef.core.read_file") as mock_read_file,
-        patch("encryptdef.core.print_get_max_workers") as mock_get_max_workers,
-        patch("encryptdef.core.process_lines") as mock_process_lines,
-        patch("encryptdef.core.write_file"),
+        patch("encryptdef.core.print_get_max_workers", return_value=2),
         patch("encryptdef.core.print_and_record_log") as mock_log,
     ):
-
-        mock_read_file.return_value = ["line1\n", "line2\n"]
-        mock_get_max_workers.return_value = 2
-        mock_process_lines.return_value = [
-            "decrypted_line1\n",
-            "decrypted_line2\n",
-        ]
-
-        process_line_func = decrypt
         result = process_file_content(
-            "testfile.txt", "key", "newfile.txt", process_line_func
+            "testfile.txt", "key", "newfile.txt", decrypt
         )
 
         assert result is True
         expected_log_message = TEMPLATE_DECRYPTED_FILE % "newfile.txt"
         mock_log.assert_called_with(expected_log_message, "debug")
+
+
+def test_process_file_content_versioned_roundtrip():
+    """Testa o formato versionado com a chave derivada uma vez por arquivo"""
+    with open("plain.txt", "w", encoding="utf-8") as file_:
+        file_.writelines(["line1\n", "line2\n"])
+
+    with (
+        patch("encryptdef.core.print_get_max_workers", return_value=1),
+        patch("encryptdef.core.print_and_record_log"),
+        patch(
+            "encryptdef.keys.derive_key", wraps=derive_key
+        ) as mock_derive_key,
+    ):
+        process_file_content("plain.txt", "key", "enc.txt", encrypt)
+        process_file_content("enc.txt", "key", "dec.txt", decrypt)
+
+    assert mock_derive_key.call_count == 2
+
+    with open("enc.txt", "r", encoding="utf-8") as file_:
+        assert is_header(file_.readline())
+
+    with open("dec.txt", "r", encoding="utf-8") as file_:
+        assert file_.readlines() == ["line1\n", "line2\n"]
+
+
+def test_process_file_content_legacy_decrypt():
+    """Testa se arquivos no formato antigo, linha a linha, ainda decriptam"""
+    with open("legacy.txt", "w", encoding="utf-8") as file_:
+        file_.writelines([encrypt("line1", "key") + "\n"])
+
+    with (
+        patch("encryptdef.core.print_get_max_workers", return_value=1),
+        patch("encryptdef.core.print_and_record_log"),
+    ):
+        process_file_content("legacy.txt", "key", "dec.txt", decrypt)
+
+    with open("dec.txt", "r", encoding="utf-8") as file_:
+        assert file_.readlines() == ["line1\n"]
+
+
+def test_process_file_content_wrong_key_fails_before_lines():
+    """Testa se a senha errada é detectada pelo cabeçalho, sem processar
+    nenhuma linha"""
+    lines = [f"line{number}\n" for number in range(1000)]
+    write_lines("plain.txt", lines)
+
+    with (
+        patch("encryptdef.core.print_get_max_workers", return_value=4),
+        patch("encryptdef.core.print_and_record_log"),
+    ):
+        process_file_content("plain.txt", "key", "enc.txt", encrypt)
+
+        with (
+            patch(
+                "encryptdef.keys.derive_key", wraps=derive_key
+            ) as mock_derive_key,
+            patch("encryptdef.api.decrypt_with_key") as mock_decrypt,
+            pytest.raises(InvalidKey),
+        ):
+            process_file_content("enc.txt", "wrong", "dec.txt", decrypt)
+
+    assert mock_derive_key.call_count == 1
+    mock_decrypt.assert_not_called()
+    assert not os.path.exists("dec.txt")
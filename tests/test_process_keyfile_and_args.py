@@ -6,7 +6,11 @@ import pytest
 import rich_click as click
 
 from encryptdef.core import process_keyfile_and_args
-from encryptdef.template import TEMPLATE_FILE_NOT_FOUND
+from encryptdef.keys import RawKeyContext
+from encryptdef.template import (
+    TEMPLATE_FILE_NOT_FOUND,
+    TEMPLATE_INVALID_RAW_KEY,
+)
 
 
 def test_process_keyfile_and_args_both_message_and_file_error():
@@ -51,3 +55,38 @@ def test_process_keyfile_and_args_keyfile_success():
     with patch("encryptdef.core.read_file", return_value=["test_key"]):
         key = process_keyfile_and_args("keyfile", None, "file", "template_key")
         assert key == "test_key"
+
+
+def test_process_keyfile_and_args_raw_key(tmp_path):
+    """Testa a função process_keyfile_and_args com uma chave bruta"""
+    keyfile = tmp_path / "key.hex"
+    keyfile.write_text((b"k" * 32).hex())
+
+    key = process_keyfile_and_args(
+        str(keyfile), None, "file", "template_key", "hex"
+    )
+
+    assert isinstance(key, RawKeyContext)
+    assert key.key == b"k" * 32
+
+
+def test_process_keyfile_and_args_raw_key_invalid(tmp_path):
+    """Testa a função process_keyfile_and_args com uma chave bruta curta"""
+    keyfile = tmp_path / "key.bin"
+    keyfile.write_bytes(b"short")
+
+    with (
+        patch("encryptdef.core.print_and_record_log") as mock_log,
+        pytest.raises(SystemExit),
+    ):
+        process_keyfile_and_args(
+            str(keyfile), None, "file", "template_key", "raw"
+        )
+
+    mock_log.assert_called_once_with(TEMPLATE_INVALID_RAW_KEY % 32, "error")
+
+
+def test_process_keyfile_and_args_raw_key_requires_keyfile():
+    """Testa a função process_keyfile_and_args sem o arquivo de chave"""
+    with pytest.raises(click.UsageError):
+        process_keyfile_and_args(None, None, "file", "template_key", "raw")
@@ -1,8 +1,10 @@
 """Modulo para testar a função process_lines em core.py"""
 
+import time
+
 import pytest
 
-from encryptdef.core import decrypt, encrypt, process_lines
+from encryptdef.core import InvalidKey, decrypt, encrypt, process_lines
 
 
 # Funções de exemplo para processamento de linha
@@ -137,3 +139,23 @@ def test_process_lines_with_decryption():
     processed_lines = process_lines(encrypted_lines, key, decrypt, max_workers)
     expected = ["hello\n", "world\n"]
     assert processed_lines == expected
+
+
+def test_process_lines_cancels_pending_on_error():
+    """Testa se as linhas pendentes são canceladas após a primeira falha"""
+    processed = []
+
+    def fail_line_10(line, key):  # pylint: disable=W0613
+        if line == "line10":
+            raise InvalidKey("Invalid key")
+        time.sleep(0.05)
+        processed.append(int(line[4:]))
+        return line
+
+    lines = [f"line{number}" for number in range(1000)]
+
+    with pytest.raises(InvalidKey):
+        process_lines(lines, "key", fail_line_10, 2)
+
+    # Apenas as linhas já em execução nos 2 trabalhadores terminam
+    assert len([number for number in processed if number > 10]) <= 2
@@ -0,0 +1,84 @@
+"""Modulo para testar a função process_stdio_content em core.py"""
+
+import io
+
+import pytest
+
+from encryptdef.core import decrypt, encrypt, process_stdio_content
+from encryptdef.exceptions import InvalidKey
+from encryptdef.keys import RawKeyContext
+from encryptdef.stream import read_stream_header
+
+KEY = RawKeyContext(b"k" * 32)
+
+
+class SlowSource(io.BytesIO):
+    """Entrada que exige que cada linha já tenha saído antes da próxima"""
+
+    def __init__(self, data, target):
+        super().__init__(data)
+        self.target = target
+        self.reads = 0
+
+    def __iter__(self):
+        for line in iter(self.readline, b""):
+            assert self.target.getvalue().count(b"\n") > self.reads
+            self.reads += 1
+            yield line
+
+
+def run(data, func, binary=False):
+    """Processa os bytes fornecidos e retorna a saída"""
+    target = io.BytesIO()
+    assert process_stdio_content(
+        KEY, func, binary, source=io.BytesIO(data), target=target
+    )
+    return target.getvalue()
+
+
+def test_process_stdio_content_text_roundtrip():
+    """Testa a criptografia e a descriptografia de linhas em fluxo"""
+    data = b"linha 1\nlinha 2\n\nlinha 4\n"
+    encrypted = run(data, encrypt)
+
+    assert encrypted.count(b"\n") == 5  # cabeçalho e quatro linhas
+    assert run(encrypted, decrypt) == data
+
+
+def test_process_stdio_content_binary_roundtrip():
+    """Testa a criptografia em blocos e a detecção ao descriptografar"""
+    data = bytes(range(256)) * 1000
+    encrypted = run(data, encrypt, binary=True)
+
+    assert read_stream_header(io.BytesIO(encrypted)) is not None
+    assert run(encrypted, decrypt) == data
+
+
+def test_process_stdio_content_delivers_each_record():
+    """Testa se cada linha é entregue antes da leitura da próxima"""
+    target = io.BytesIO()
+    source = SlowSource(b"a\nb\nc\n", target)
+
+    process_stdio_content(KEY, encrypt, source=source, target=target)
+
+    assert source.reads == 3
+    assert target.getvalue().count(b"\n") == 4
+
+
+def test_process_stdio_content_wrong_key():
+    """Testa se uma chave incorreta interrompe a descriptografia"""
+    encrypted = run(b"segredo\n", encrypt)
+
+    with pytest.raises(InvalidKey):
+        process_stdio_content(
+            RawKeyContext(b"x" * 32),
+            decrypt,
+            source=io.BytesIO(encrypted),
+            target=io.BytesIO(),
+        )
+
+
+def test_process_stdio_content_empty_input():
+    """Testa se uma entrada vazia gera apenas o cabeçalho"""
+    assert run(b"", decrypt) == b""
+    assert run(b"", encrypt).count(b"\n") == 1
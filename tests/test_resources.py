@@ -0,0 +1,203 @@
+"""Modulo para testar a detecção de recursos em resources.py"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from encryptdef import resources
+from encryptdef.backends import PROCESS_BACKEND, THREAD_BACKEND, worker_memory
+from encryptdef.cli import main
+from encryptdef.kdf import ScryptParams, derive_key, scrypt_maxmem
+from encryptdef.resources import (
+    MemoryBudget,
+    available_cpus,
+    available_memory,
+    cgroup_cpu_limit,
+    host_id,
+    memory_budget,
+    parse_size,
+    plan_workers,
+    set_max_memory,
+)
+
+MIB = 1024 * 1024
+
+
+@pytest.fixture(name="fake_system")
+def fake_system_fixture(tmp_path, monkeypatch):
+    """Raiz de cgroup, /proc/self/cgroup e /proc/meminfo falsos"""
+    root = tmp_path / "cgroup"
+    (root / "app").mkdir(parents=True)
+    proc_cgroup = tmp_path / "proc-cgroup"
+    proc_cgroup.write_text("0::/app\n")
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text(
+        f"MemTotal: 8000000 kB\nMemAvailable: {4096 * 1024} kB\n"
+    )
+
+    monkeypatch.setattr(resources, "CGROUP_ROOT", str(root))
+    monkeypatch.setattr(resources, "PROC_CGROUP", str(proc_cgroup))
+    monkeypatch.setattr(resources, "PROC_MEMINFO", str(meminfo))
+    monkeypatch.setattr(
+        resources.os, "sched_getaffinity", lambda _: {0, 1, 2, 3}
+    )
+    yield root
+    set_max_memory(None)
+
+
+def test_without_cgroup_limits(fake_system):  # pylint: disable=W0613
+    """Testa uma máquina sem limites de cgroup"""
+    assert cgroup_cpu_limit() is None
+    assert available_cpus() == 4
+    assert available_memory() == 4096 * MIB
+
+
+def test_cgroup_v2_limits(fake_system):
+    """Testa a cota de CPU e o limite de memória do cgroup v2"""
+    (fake_system / "cpu.max").write_text("max 100000\n")
+    (fake_system / "app" / "cpu.max").write_text("150000 100000\n")
+    (fake_system / "memory.max").write_text("max\n")
+    (fake_system / "app" / "memory.max").write_text(f"{512 * MIB}\n")
+    (fake_system / "app" / "memory.current").write_text(f"{112 * MIB}\n")
+
+    assert cgroup_cpu_limit() == 2
+    assert available_cpus() == 2
+    assert available_memory() == 400 * MIB
+
+
+def test_cgroup_v2_parent_limit(fake_system):
+    """Testa se o limite de um cgroup pai também vale"""
+    (fake_system / "memory.max").write_text(f"{256 * MIB}\n")
+    (fake_system / "memory.current").write_text("0\n")
+    (fake_system / "app" / "memory.max").write_text("max\n")
+
+    assert available_memory() == 256 * MIB
+
+
+def test_cgroup_v1_limits(fake_system):
+    """Testa a cota de CPU e o limite de memória do cgroup v1"""
+    (fake_system / "cpu").mkdir()
+    (fake_system / "cpu" / "cpu.cfs_quota_us").write_text("100000\n")
+    (fake_system / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    (fake_system / "memory").mkdir()
+    (fake_system / "memory" / "memory.limit_in_bytes").write_text(
+        f"{300 * MIB}\n"
+    )
+    (fake_system / "memory" / "memory.usage_in_bytes").write_text(
+        f"{100 * MIB}\n"
+    )
+
+    assert available_cpus() == 1
+    assert available_memory() == 200 * MIB
+
+
+def test_memory_budget_and_plan_workers(fake_system):
+    """Testa o orçamento de memória e os trabalhadores que cabem nele"""
+    (fake_system / "app" / "memory.max").write_text(f"{100 * MIB}\n")
+
+    assert memory_budget() == 75 * MIB
+    assert plan_workers(None, MIB) == 4
+    assert plan_workers(None, 30 * MIB) == 2
+    assert plan_workers(8, MIB) == 8
+    assert plan_workers(None, 200 * MIB) == 1
+
+    set_max_memory(40 * MIB)
+    assert memory_budget() == 40 * MIB
+    assert plan_workers(None, 30 * MIB) == 1
+
+
+def test_worker_memory_includes_scrypt_for_processes():
+    """Testa a memória de um trabalhador de cada backend"""
+    assert worker_memory(THREAD_BACKEND) < scrypt_maxmem(ScryptParams())
+    assert worker_memory(PROCESS_BACKEND) > scrypt_maxmem(ScryptParams())
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("1048576", MIB),
+        ("512M", 512 * MIB),
+        ("2g", 2048 * MIB),
+        ("1.5GiB", 1536 * MIB),
+        ("64 kb", 64 * 1024),
+    ],
+)
+def test_parse_size(text, expected):
+    """Testa a conversão de tamanhos"""
+    assert parse_size(text) == expected
+
+
+def test_host_id():
+    """Testa a identificação da máquina usada nos caches de medições"""
+    with (
+        patch("platform.node", return_value="servidor"),
+        patch("platform.machine", return_value="x86_64"),
+    ):
+        assert host_id() == "servidor/x86_64"
+
+
+@pytest.mark.parametrize("text", ["", "M", "-1G", "0", "10X"])
+def test_parse_size_invalid(text):
+    """Testa os tamanhos inválidos"""
+    with pytest.raises(ValueError):
+        parse_size(text)
+
+
+def test_memory_budget_limits_concurrency():
+    """Testa se as reservas acima do orçamento esperam"""
+    budget = MemoryBudget(2 * MIB)
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def work(_):
+        with budget.reserve(MIB):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.pop()
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(work, range(16)))
+
+    assert max(peak) == 2
+    assert budget.used == 0
+
+
+def test_memory_budget_oversized_reservation_runs_alone():
+    """Testa uma reserva maior que o orçamento inteiro"""
+    budget = MemoryBudget(MIB)
+    with budget.reserve(10 * MIB):
+        assert budget.used == MIB
+    assert budget.used == 0
+
+
+def test_derive_key_uses_kdf_budget(monkeypatch):
+    """Testa se o Scrypt reserva a memória do orçamento do processo"""
+    budget = MemoryBudget(64 * MIB)
+    monkeypatch.setattr("encryptdef.kdf.kdf_budget", lambda: budget)
+    reserved = []
+    original = budget.reserve
+
+    def reserve(size):
+        reserved.append(size)
+        return original(size)
+
+    monkeypatch.setattr(budget, "reserve", reserve)
+    derive_key("senha", b"s" * 16, n=2**4)
+
+    assert reserved == [scrypt_maxmem(ScryptParams(n=2**4))]
+
+
+def test_cli_invalid_max_memory():
+    """Testa o --max-memory inválido na linha de comando"""
+    result = CliRunner().invoke(
+        main, ["encrypt", "--message", "a", "--max-memory", "muito"]
+    )
+    assert result.exit_code == 2
@@ -0,0 +1,235 @@
+"""Modulo para testar o daemon de criptografia em server.py"""
+
+import asyncio
+import json
+import os
+import stat
+
+import pytest
+
+from encryptdef import server
+from encryptdef.api import decrypt, encrypt
+from encryptdef.kdf import ScryptParams
+from encryptdef.keys import RawKeyContext
+from encryptdef.server import (
+    INVALID_FORMAT_ERROR,
+    INVALID_KEY_ERROR,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    KeyCache,
+    Server,
+    start_unix_server,
+)
+
+KEY = RawKeyContext(b"k" * 32)
+FAST = ScryptParams(n=2**4)
+
+
+def _line(request_id, method, **params):
+    return json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": method,
+            "params": params,
+        }
+    ).encode()
+
+
+async def _with_batcher(srv, coroutine):
+    """Executa a corrotina com o Batcher do servidor rodando"""
+    batcher = asyncio.create_task(srv.batcher.run())
+    await asyncio.sleep(0)
+    try:
+        return await coroutine
+    finally:
+        batcher.cancel()
+
+
+def test_key_cache_reuses_and_expires_contexts():
+    """Testa o reaproveitamento e o descarte dos contextos por TTL"""
+    now = [0.0]
+    cache = KeyCache(ttl=10, params=FAST, clock=lambda: now[0])
+
+    first = cache.get("senha")
+    now[0] = 9
+    assert cache.get("senha") is first
+    now[0] = 18
+    assert cache.get("senha") is first
+    now[0] = 30
+    cache.purge()
+
+    assert len(cache) == 0
+    assert cache.get("senha") is not first
+    assert cache.get(KEY) is KEY
+
+
+def test_encrypt_and_decrypt_requests():
+    """Testa as requisições de criptografia e descriptografia"""
+    srv = Server(KEY, max_workers=1)
+
+    async def roundtrip():
+        encrypted = await srv.handle_line(_line(1, "encrypt", value="oi"))
+        decrypted = await srv.handle_line(
+            _line(2, "decrypt", value=encrypted["result"])
+        )
+        legacy = await srv.handle_line(
+            _line(3, "decrypt", value=encrypt("velho", KEY))
+        )
+        return encrypted, decrypted, legacy
+
+    encrypted, decrypted, legacy = asyncio.run(_with_batcher(srv, roundtrip()))
+
+    assert encrypted["id"] == 1
+    assert decrypt(encrypted["result"], KEY) == "oi"
+    assert decrypted == {"jsonrpc": "2.0", "id": 2, "result": "oi"}
+    assert legacy["result"] == "velho"
+
+
+def test_concurrent_requests_are_batched():
+    """Testa se requisições simultâneas formam lotes"""
+    srv = Server(KEY, max_workers=1)
+
+    async def many():
+        lines = [
+            _line(index, "encrypt", value=str(index)) for index in range(50)
+        ]
+        return await asyncio.gather(*(srv.handle_line(line) for line in lines))
+
+    responses = asyncio.run(_with_batcher(srv, many()))
+
+    assert [decrypt(item["result"], KEY) for item in responses] == [
+        str(index) for index in range(50)
+    ]
+    assert srv.batcher.requests == 50
+    assert srv.batcher.batches < 50
+
+
+def test_errors_go_only_to_their_request():
+    """Testa se um valor inválido não derruba o lote dos outros"""
+    srv = Server(KEY, max_workers=1)
+    token = encrypt("ok", KEY)
+
+    async def mixed():
+        return await asyncio.gather(
+            srv.handle_line(_line(1, "decrypt", value=token)),
+            srv.handle_line(_line(2, "decrypt", value="ed2.AAAA")),
+            srv.handle_line(
+                _line(
+                    3, "decrypt", value=encrypt("x", RawKeyContext(b"x" * 32))
+                )
+            ),
+        )
+
+    ok, malformed, wrong_key = asyncio.run(_with_batcher(srv, mixed()))
+
+    assert ok["result"] == "ok"
+    assert malformed["error"]["code"] == INVALID_FORMAT_ERROR
+    assert wrong_key["error"]["code"] == INVALID_KEY_ERROR
+
+
+def test_password_param_uses_cached_context():
+    """Testa o campo "password" no lugar da chave do servidor"""
+    srv = Server(params=FAST, max_workers=1)
+
+    async def with_password():
+        missing = await srv.handle_line(_line(1, "encrypt", value="a"))
+        encrypted = await srv.handle_line(
+            _line(2, "encrypt", value="a", password="senha")
+        )
+        return missing, encrypted
+
+    missing, encrypted = asyncio.run(_with_batcher(srv, with_password()))
+
+    assert missing["error"]["code"] == INVALID_PARAMS
+    assert decrypt(encrypted["result"], "senha") == "a"
+    assert len(srv.keys) == 1
+
+
+@pytest.mark.parametrize(
+    "line, code",
+    [
+        (b"{", PARSE_ERROR),
+        (b"[]", INVALID_REQUEST),
+        (b'{"jsonrpc": "1.0", "id": 1, "method": "ping"}', INVALID_REQUEST),
+        (_line(1, "sign", value="a"), METHOD_NOT_FOUND),
+        (_line(1, "encrypt", value=1), INVALID_PARAMS),
+        (_line(1, "encrypt", value="a", password=1), INVALID_PARAMS),
+    ],
+)
+def test_invalid_requests(line, code):
+    """Testa as respostas de erro do JSON-RPC"""
+    response = asyncio.run(Server(KEY).handle_line(line))
+
+    assert response["error"]["code"] == code
+
+
+def test_notification_has_no_response():
+    """Testa se uma requisição sem "id" não recebe resposta"""
+    line = b'{"jsonrpc": "2.0", "method": "ping"}'
+
+    assert asyncio.run(Server(KEY).handle_line(line)) is None
+
+
+def test_unix_socket_roundtrip(tmp_path):
+    """Testa o servidor em um socket Unix, com requisições em sequência"""
+    socket_path = str(tmp_path / "encryptdef.sock")
+    srv = Server(KEY, max_workers=2)
+
+    async def session():
+        ready = asyncio.Event()
+        serving = asyncio.create_task(srv.serve(socket_path, ready.set))
+        await ready.wait()
+        mode = stat.S_IMODE(os.stat(socket_path).st_mode)
+
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        for index in range(10):
+            writer.write(_line(index, "encrypt", value=f"v{index}") + b"\n")
+        writer.write(b"\n" + _line("p", "ping") + b"\n")
+        responses = [json.loads(await reader.readline()) for _ in range(11)]
+        writer.close()
+
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+        return mode, {item["id"]: item["result"] for item in responses}
+
+    mode, results = asyncio.run(session())
+
+    assert mode == 0o600
+    assert results.pop("p") == "pong"
+    assert {decrypt(token, KEY) for token in results.values()} == {
+        f"v{index}" for index in range(10)
+    }
+    assert not os.path.exists(socket_path)
+
+
+def test_socket_in_use_and_stale_socket(tmp_path):
+    """Testa um socket em uso e um socket abandonado"""
+    socket_path = str(tmp_path / "encryptdef.sock")
+
+    async def session():
+        first = await start_unix_server(
+            lambda reader, writer: None, socket_path
+        )
+        with pytest.raises(OSError):
+            await start_unix_server(lambda reader, writer: None, socket_path)
+        first.close()
+        await first.wait_closed()
+
+        # O arquivo continua lá, mas ninguém escuta
+        assert os.path.exists(socket_path)
+        second = await start_unix_server(
+            lambda reader, writer: None, socket_path
+        )
+        second.close()
+
+    asyncio.run(session())
+
+
+def test_stats():
+    """Testa o método stats"""
+    response = asyncio.run(server.Server(KEY).handle_line(_line(1, "stats")))
+
+    assert response["result"] == {"requests": 0, "batches": 0, "keys": 0}
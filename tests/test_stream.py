@@ -0,0 +1,131 @@
+"""Modulo para testar a criptografia em blocos em stream.py"""
+
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+
+from encryptdef.exceptions import InvalidEncryptedFormat, InvalidKey
+from encryptdef.stream import (
+    MAX_CHUNK_SIZE,
+    NONCE_PREFIX_SIZE,
+    decrypt_stream,
+    encrypt_stream,
+    frame_nonce,
+    is_stream_file,
+    read_stream_header,
+)
+
+
+def encrypt_bytes(data, password="password", chunk_size=16, max_workers=2):
+    """Criptografa os bytes fornecidos e retorna o resultado"""
+    target = io.BytesIO()
+    encrypt_stream(io.BytesIO(data), target, password, max_workers, chunk_size)
+    return target.getvalue()
+
+
+def decrypt_bytes(data, password="password", max_workers=2):
+    """Descriptografa os bytes fornecidos e retorna o resultado"""
+    target = io.BytesIO()
+    decrypt_stream(io.BytesIO(data), target, password, max_workers)
+    return target.getvalue()
+
+
+@pytest.mark.parametrize("size", [0, 1, 16, 100, 1000])
+def test_stream_roundtrip_binary_data(size):
+    """Testa se dados binários sobrevivem intactos à ida e volta"""
+    data = os.urandom(size)
+    assert decrypt_bytes(encrypt_bytes(data)) == data
+
+
+def test_stream_frame_count():
+    """Testa a quantidade de quadros gerados"""
+    target = io.BytesIO()
+    frames = encrypt_stream(io.BytesIO(b"x" * 40), target, "password", 1, 16)
+
+    assert frames == 3
+    target.seek(0)
+    assert read_stream_header(target)["chunk"] == "16"
+
+
+def test_stream_wrong_password():
+    """Testa a descriptografia com a senha errada"""
+    encrypted = encrypt_bytes(b"secret data")
+
+    with pytest.raises(InvalidKey):
+        decrypt_bytes(encrypted, password="wrong")
+
+
+def test_stream_truncated_last_frame():
+    """Testa se a remoção do último quadro é detectada"""
+    encrypted = encrypt_bytes(b"x" * 40)
+    truncated = encrypted[: -(4 + 8 + 16)]
+
+    with pytest.raises(InvalidKey):
+        decrypt_bytes(truncated)
+
+
+def test_stream_partial_frame():
+    """Testa um quadro cortado no meio"""
+    encrypted = encrypt_bytes(b"x" * 40)
+
+    with pytest.raises(InvalidEncryptedFormat):
+        decrypt_bytes(encrypted[:-1])
+
+
+@pytest.mark.parametrize("chunk", ["0", "-1", str(MAX_CHUNK_SIZE + 1)])
+def test_stream_rejects_invalid_chunk_size(chunk):
+    """Testa se o tamanho de bloco do cabeçalho é limitado antes da leitura"""
+    encrypted = encrypt_bytes(b"x" * 40).replace(
+        b",chunk=16,", f",chunk={chunk},".encode("utf-8"), 1
+    )
+
+    with (
+        patch("encryptdef.stream.as_key_context") as mock_context,
+        pytest.raises(InvalidEncryptedFormat),
+    ):
+        decrypt_bytes(encrypted)
+    mock_context.assert_not_called()
+
+
+@pytest.mark.parametrize("chunk_size", [0, MAX_CHUNK_SIZE + 1])
+def test_stream_encrypt_invalid_chunk_size(chunk_size):
+    """Testa se um tamanho de bloco fora do limite é recusado"""
+    with pytest.raises(ValueError):
+        encrypt_bytes(b"x", chunk_size=chunk_size)
+
+
+def test_is_stream_file():
+    """Testa a detecção do formato em blocos"""
+    with open("stream.bin", "wb") as file_:
+        file_.write(encrypt_bytes(b"data"))
+    with open("plain.txt", "w", encoding="utf-8") as file_:
+        file_.write("data\n")
+
+    assert is_stream_file("stream.bin")
+    assert not is_stream_file("plain.txt")
+
+
+def test_stream_roundtrip_chacha20_poly1305():
+    """Testa o formato em blocos com ChaCha20-Poly1305"""
+    data = os.urandom(100)
+    target = io.BytesIO()
+    encrypt_stream(
+        io.BytesIO(data), target, "password", 2, 16, cipher="chacha20-poly1305"
+    )
+
+    target.seek(0)
+    assert read_stream_header(target)["cipher"] == "chacha20-poly1305"
+    assert decrypt_bytes(target.getvalue()) == data
+
+
+def test_frame_nonce():
+    """Testa o nonce de 12 bytes único para cada quadro"""
+    prefix = b"p" * NONCE_PREFIX_SIZE
+    nonces = {frame_nonce(prefix, index) for index in range(3)}
+
+    assert len(nonces) == 3
+    assert all(
+        len(nonce) == 12 and nonce.startswith(prefix) for nonce in nonces
+    )
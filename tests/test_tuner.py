@@ -0,0 +1,206 @@
+"""Modulo para testar o ajuste automático dos trabalhadores em tuner.py"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from encryptdef import tuner
+from encryptdef.api import Decryptor, Encryptor, iter_process_lines
+from encryptdef.cli import main
+from encryptdef.tuner import (
+    AUTO_WORKERS,
+    WorkerTuner,
+    load_tuned_workers,
+    parse_workers,
+    resolve_workers,
+    save_tuned_workers,
+    task_name,
+)
+
+# pylint: disable=W0212
+
+
+@pytest.fixture(autouse=True, name="cache_dir")
+def cache_dir_fixture(tmp_path, monkeypatch):
+    """Diretório de cache isolado para cada teste"""
+    monkeypatch.setattr(tuner, "CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def slow_line(line, _key):
+    """Linha que espera, como uma linha limitada por E/S"""
+    time.sleep(0.002)
+    return line.upper()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("auto", AUTO_WORKERS), ("AUTO", AUTO_WORKERS), ("4", 4), (2, 2)],
+)
+def test_parse_workers(value, expected):
+    """Testa a conversão de --workers"""
+    assert parse_workers(value) == expected
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "muitos", "", 0])
+def test_parse_workers_invalid(value):
+    """Testa os valores inválidos de --workers"""
+    with pytest.raises(ValueError):
+        parse_workers(value)
+
+
+def test_resolve_workers():
+    """Testa a quantidade fixa usada por cada valor"""
+    with patch("encryptdef.tuner.plan_workers", return_value=6):
+        assert resolve_workers(None, "thread") == 6
+        assert resolve_workers(AUTO_WORKERS, "thread") == 6
+    assert resolve_workers(3, "process") == 3
+
+
+def test_task_name_unwraps_partial():
+    """Testa o nome da operação guardado no cache"""
+    assert task_name(partial(partial(slow_line, "a"), "b")) == "slow_line"
+
+
+def test_cache_round_trip_and_other_host(cache_dir):
+    """Testa o cache por operação e o descarte das medições de outro host"""
+    assert load_tuned_workers("encrypt_with_key") is None
+
+    save_tuned_workers("encrypt_with_key", 3)
+    save_tuned_workers("decrypt_with_key", 2)
+    assert load_tuned_workers("encrypt_with_key") == 3
+    assert load_tuned_workers("decrypt_with_key") == 2
+
+    cache_file = cache_dir / tuner.WORKERS_CACHE_FILE
+    cache_file.write_text(
+        json.dumps({"host": "outro", "workers": {"encrypt_with_key": 8}})
+    )
+    assert load_tuned_workers("encrypt_with_key") is None
+
+
+def test_tuner_climbs_while_throughput_improves():
+    """Testa a subida enquanto a vazão melhora e a volta à melhor"""
+    worker_tuner = WorkerTuner(8)
+    worker_tuner._step(10000.0)
+    assert worker_tuner.workers == 2
+
+    worker_tuner._step(20000.0)
+    assert (worker_tuner.best, worker_tuner.workers) == (2, 4)
+
+    worker_tuner._step(30000.0)
+    assert (worker_tuner.best, worker_tuner.workers) == (4, 8)
+
+    worker_tuner._step(30000.0)
+    assert (worker_tuner.best, worker_tuner.workers) == (4, 4)
+
+
+def test_tuner_keeps_one_worker_for_cpu_bound_lines():
+    """Testa registros baratos que não ganham nada com mais threads"""
+    worker_tuner = WorkerTuner(8)
+    worker_tuner._step(10000.0)
+    worker_tuner._step(9000.0)
+
+    assert (worker_tuner.best, worker_tuner.workers) == (1, 1)
+    assert worker_tuner._settle == tuner.SETTLE_ROUNDS
+
+
+def test_tuner_tries_all_workers_for_heavy_records():
+    """Testa o salto para o limite quando cada registro é caro"""
+    worker_tuner = WorkerTuner(8)
+    worker_tuner._step(100.0)
+
+    assert worker_tuner.record_cost == pytest.approx(0.01)
+    assert worker_tuner.workers == 8
+
+
+def test_tuner_starts_from_cache():
+    """Testa o ponto de partida guardado, limitado pelo pool"""
+    save_tuned_workers("slow_line", 16)
+    assert WorkerTuner(4, "slow_line").workers == 4
+
+
+def test_tuner_limits_active_tasks():
+    """Testa se a quantidade escolhida limita as tarefas em andamento"""
+    worker_tuner = WorkerTuner(8, interval=0.02)
+    running = []
+    peak = []
+
+    def work(_):
+        running.append(1)
+        peak.append(len(running))
+        time.sleep(0.002)
+        running.pop()
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(partial(worker_tuner.run, work), range(300)))
+
+    assert worker_tuner.measurements > 0
+    assert worker_tuner.best > 1
+    assert max(peak) <= 8
+
+
+def test_iter_process_lines_auto_keeps_order_and_saves():
+    """Testa as linhas em ordem com "auto" e a escolha guardada"""
+    lines = [f"linha{number}\n" for number in range(300)]
+    with patch("encryptdef.tuner.plan_workers", return_value=4):
+        result = list(
+            iter_process_lines(lines, "key", slow_line, AUTO_WORKERS)
+        )
+
+    assert result == [line.upper() for line in lines]
+    assert load_tuned_workers("slow_line") in range(1, 5)
+
+
+def test_encryptor_and_decryptor_auto(tmp_path):
+    """Testa a ida e volta de um arquivo com trabalhadores automáticos"""
+    plain, enc, dec = (tmp_path / name for name in ("a.txt", "e", "d"))
+    plain.write_text("".join(f"linha {n}\n" for n in range(50)))
+
+    encryptor = Encryptor("senha", max_workers=AUTO_WORKERS)
+    assert encryptor.line_workers == AUTO_WORKERS
+    assert isinstance(encryptor.max_workers, int)
+    encryptor.encrypt_file(str(plain), str(enc))
+    Decryptor("senha", AUTO_WORKERS).decrypt_file(str(enc), str(dec))
+
+    assert dec.read_text() == plain.read_text()
+
+
+def test_cli_workers_skips_prompt(tmp_path):
+    """Testa se --workers evita a pergunta dos arquivos grandes"""
+    keyfile = tmp_path / "key.txt"
+    keyfile.write_text("chave")
+    plain = tmp_path / "dados.txt"
+    plain.write_text("".join(f"linha {n}\n" for n in range(600)))
+
+    with patch("encryptdef.core.print_get_max_workers") as mock_prompt:
+        for workers in ("2", "auto"):
+            result = CliRunner().invoke(
+                main,
+                [
+                    "encrypt",
+                    "--keyfile",
+                    str(keyfile),
+                    "--file",
+                    str(plain),
+                    "--workers",
+                    workers,
+                    "--output",
+                    "rich",
+                ],
+            )
+            assert result.exit_code == 0, result.output
+
+    mock_prompt.assert_not_called()
+
+
+def test_cli_invalid_workers():
+    """Testa o --workers inválido na linha de comando"""
+    result = CliRunner().invoke(
+        main, ["encrypt", "--message", "a", "--workers", "0"]
+    )
+    assert result.exit_code == 2
@@ -4,6 +4,8 @@ import os
 from random import randint, sample
 from string import ascii_letters, digits
 
+import pytest
+
 from encryptdef.utils import write_file
 
 
@@ -23,3 +25,19 @@ def teste_write_file_positive():
         file_content_read = file_.readlines()
 
     assert file_content_read == file_content
+
+
+def test_write_file_error_keeps_existing_file(tmp_path):
+    """Testa se uma falha no meio da escrita não altera o arquivo"""
+    file = tmp_path / "file.txt"
+    file.write_text("anterior\n")
+
+    def failing_lines():
+        yield "nova\n"
+        raise ValueError("falha")
+
+    with pytest.raises(ValueError):
+        write_file(str(file), failing_lines())
+
+    assert file.read_text() == "anterior\n"
+    assert [path.name for path in tmp_path.iterdir()] == ["file.txt"]